@@ -0,0 +1,118 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Cost of dispatching actions to `on_action_*` handlers, on the server
+side through `Object.receive_action` and on the client side through
+`QtSession.on_action_message_batch`, compared with the previous
+`getattr` based dispatch and regrouped batch routing.
+
+Usage: python bench_action_dispatch.py [num_messages]
+
+"""
+from collections import defaultdict
+import sys
+import time
+
+from enaml.core.object import Object
+from enaml.qt.qt_object import QtObject
+from enaml.qt.qt_session import QtSession
+from enaml.utils import make_dispatcher
+
+
+ACTIONS = ('set_text', 'relayout', 'set_enabled', 'children_changed')
+
+
+#: The number of handled actions. The server objects are strict, so
+#: the handlers cannot count on the instances.
+COUNTER = [0]
+
+
+def legacy_dispatch(obj, name, *args):
+    handler = getattr(obj, 'on_action_' + name, None)
+    if handler is not None:
+        handler(*args)
+
+
+def legacy_batch(session, content):
+    actions = defaultdict(list)
+    for item in content['batch']:
+        actions[item[1]].append(item)
+    ordered = []
+    for key in ('children_changed', 'destroy', 'relayout'):
+        ordered.extend(actions.pop(key, ()))
+    for value in actions.itervalues():
+        ordered.extend(value)
+    objects = session._registered_objects
+    for object_id, action, msg_content in ordered:
+        legacy_dispatch(objects[object_id], action, msg_content)
+
+
+class Handlers(object):
+    """ A mixin which counts the dispatched actions.
+
+    """
+    def on_action_set_text(self, content):
+        COUNTER[0] += 1
+
+    def on_action_relayout(self, content):
+        COUNTER[0] += 1
+
+    def on_action_set_enabled(self, content):
+        COUNTER[0] += 1
+
+    def on_action_children_changed(self, content):
+        COUNTER[0] += 1
+
+
+class ServerObject(Handlers, Object):
+    pass
+
+
+class ClientObject(Handlers, QtObject):
+    pass
+
+
+def timed(func, *args):
+    start = time.time()
+    func(*args)
+    return (time.time() - start) * 1000
+
+
+def bench_server(count):
+    obj = ServerObject()
+    obj.state = 'active'
+    dispatch = make_dispatcher('on_action_')
+    messages = [(ACTIONS[idx % 4], {}) for idx in xrange(count)]
+
+    def run(dispatcher):
+        for action, content in messages:
+            dispatcher(obj, action, content)
+
+    print('server: getattr %8.2f ms  table %8.2f ms' % (
+        timed(run, legacy_dispatch), timed(run, dispatch)))
+
+
+def bench_client(count):
+    session = QtSession('bench', [])
+    objects = [ClientObject('o_%d' % idx, None, session)
+               for idx in xrange(100)]
+    for obj in objects:
+        session.register(obj)
+    batch = [('o_%d' % (idx % 100), ACTIONS[idx % 4], {})
+             for idx in xrange(count)]
+    content = {'batch': batch}
+    print('client: regrouped %8.2f ms  routed %8.2f ms' % (
+        timed(legacy_batch, session, content),
+        timed(session.on_action_message_batch, content)))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    print('%d messages' % count)
+    bench_server(count)
+    bench_client(count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Round-trip throughput and payload size of the wire codecs.
+
+The binary codec is a payload size optimization; its pure Python
+encoder is expected to be slower than the C accelerated json module.
+
+Usage: python bench_codec.py [num_widgets] [repeat]
+
+"""
+import sys
+import time
+
+from enaml.codec import BinaryCodec, JSONCodec
+
+
+def make_widget(idx):
+    return {
+        'object_id': 'o_%x' % idx,
+        'name': '',
+        'class': 'PushButton',
+        'bases': [
+            'AbstractButton', 'Control', 'ConstraintsWidget', 'Widget',
+            'Messenger', 'Declarative', 'Object',
+        ],
+        'enabled': True,
+        'visible': True,
+        'bgcolor': '',
+        'fgcolor': '',
+        'font': '',
+        'minimum_size': (-1, -1),
+        'maximum_size': (-1, -1),
+        'show_focus_rect': None,
+        'tool_tip': u'',
+        'status_tip': u'',
+        'text': u'Button %d' % idx,
+        'children': [],
+    }
+
+
+def make_snapshot(count):
+    return {
+        'object_id': 'o_root',
+        'name': 'main',
+        'class': 'Window',
+        'bases': ['Widget', 'Messenger', 'Declarative', 'Object'],
+        'children': [make_widget(idx) for idx in xrange(count)],
+    }
+
+
+def make_actions(count):
+    return [
+        ('o_%x' % (idx % 64), 'set_text', {'text': u'value %d' % idx})
+        for idx in xrange(count)
+    ]
+
+
+def bench(codec_type, snapshot, actions, repeat):
+    encoder = codec_type()
+    decoder = codec_type()
+    t0 = time.time()
+    for ignored in xrange(repeat):
+        data = encoder.encode(snapshot)
+        decoder.decode(data)
+    snap_time = (time.time() - t0) / repeat
+    snap_size = len(data)
+
+    t0 = time.time()
+    size = 0
+    for object_id, action, content in actions:
+        data = encoder.encode_action(object_id, action, content)
+        size += len(data)
+        decoder.decode_action(data)
+    action_time = time.time() - t0
+    return snap_time, snap_size, action_time, size
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    snapshot = make_snapshot(count)
+    actions = make_actions(50000)
+    print('%d widget snapshot, %d actions' % (count, len(actions)))
+    for codec_type in (JSONCodec, BinaryCodec):
+        snap_time, snap_size, action_time, size = bench(
+            codec_type, snapshot, actions, repeat
+        )
+        print('%-8s snapshot: %8.2f ms %9d bytes | actions: %8.0f msg/s '
+              '%5.1f bytes/msg' % (
+                  codec_type.name, snap_time * 1000, snap_size,
+                  len(actions) / action_time, float(size) / len(actions)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Encode, transfer and decode cost of the flat constraint encoding,
+compared with the nested `as_dict` trees it replaced.
+
+Usage: python bench_constraint_encoding.py [num_constraints]
+
+"""
+import sys
+import time
+
+from casuarius import ConstraintVariable as SolverVariable
+
+from enaml.codec import BinaryCodec
+from enaml.layout.constraint_encoding import (
+    decode_constraints, encode_constraints
+)
+from enaml.layout.constraint_variable import ConstraintVariable
+
+
+NAMES = ('left', 'top', 'width', 'height')
+
+
+def make_constraints(count):
+    # Box-like constraints between neighbouring widgets.
+    cns = []
+    for idx in xrange(count):
+        this = ConstraintVariable(NAMES[idx % 4], 'o_%d' % (idx // 4))
+        other = ConstraintVariable(NAMES[idx % 4], 'o_%d' % (idx // 4 + 1))
+        if idx % 3 == 0:
+            cns.append((this + 10 == other) | 'strong')
+        elif idx % 3 == 1:
+            cns.append(this >= 0)
+        else:
+            cns.append(this <= 0.5 * other + 3)
+    return cns
+
+
+def legacy_convert(info, variable):
+    cn_type = info['type']
+    if cn_type == 'linear_expression':
+        res = sum(legacy_convert(t, variable) for t in info['terms'])
+        res += info['constant']
+    elif cn_type == 'term':
+        res = info['coeff'] * legacy_convert(info['var'], variable)
+    else:
+        res = variable(info['owner'], info['name'])
+    return res
+
+
+def legacy_decode(infos, variable):
+    cns = []
+    for info in infos:
+        lhs = legacy_convert(info['lhs'], variable)
+        rhs = legacy_convert(info['rhs'], variable)
+        op = info['op']
+        if op == '==':
+            cn = lhs == rhs
+        elif op == '<=':
+            cn = lhs <= rhs
+        else:
+            cn = lhs >= rhs
+        cns.append(cn | info['strength'] | info['weight'])
+    return cns
+
+
+def make_variable():
+    variables = {}
+    def variable(owner, name):
+        key = (owner, name)
+        var = variables.get(key)
+        if var is None:
+            var = variables[key] = SolverVariable('%s|%s' % key)
+        return var
+    return variable
+
+
+def bench(label, encode, decode, cns):
+    t0 = time.time()
+    payload = encode(cns)
+    t1 = time.time()
+    data = BinaryCodec().encode(payload)
+    received = BinaryCodec().decode(data)
+    t2 = time.time()
+    decode(received, make_variable())
+    t3 = time.time()
+    print('%-8s encode %8.2f ms  transfer %8.2f ms %9d bytes  '
+          'decode %8.2f ms' % (label, (t1 - t0) * 1000, (t2 - t1) * 1000,
+                               len(data), (t3 - t2) * 1000))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    cns = make_constraints(count)
+    print('%d constraints' % count)
+    bench('as_dict', lambda cns: [cn.as_dict() for cn in cns],
+          legacy_decode, cns)
+    bench('flat', encode_constraints, decode_constraints, cns)
+
+
+if __name__ == '__main__':
+    main()
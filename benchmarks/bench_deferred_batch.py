@@ -0,0 +1,49 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Time-to-flush of a DeferredBatch holding many layout related tasks.
+
+Usage: python bench_deferred_batch.py [num_tasks]
+
+"""
+import sys
+import time
+
+from enaml.qt.qt_application import QtApplication
+from enaml.session import DeferredBatch
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    app = QtApplication([])
+    batch = DeferredBatch()
+    stats = {}
+
+    def on_triggered():
+        items = batch.release()
+        stats['flush'] = time.time()
+        stats['count'] = len(items)
+        app.stop()
+
+    batch.triggered.connect(on_triggered)
+
+    def fill():
+        stats['start'] = time.time()
+        actions = ('children_changed', 'relayout')
+        for idx in xrange(count):
+            task = (lambda idx=idx: ('o_%d' % idx, actions[idx % 2], {}))
+            batch.append(task)
+        stats['appended'] = time.time()
+
+    app.deferred_call(fill)
+    app.start()
+    append_time = stats['appended'] - stats['start']
+    flush_time = stats['flush'] - stats['appended']
+    print('%d tasks: append %.2f ms, time-to-flush %.2f ms' % (
+        stats['count'], append_time * 1000, flush_time * 1000))
+    app.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Construction throughput of an enamldef row type, with and without
+the compiled instantiation plan.
+
+Usage: python bench_enamldef_instantiation.py [count]
+
+"""
+import sys
+import time
+import types
+
+from enaml.core.enaml_compiler import EnamlCompiler
+from enaml.core.parser import parse
+
+
+SOURCE = """
+from enaml.layout.api import hbox
+from enaml.widgets.api import Container, Label, Field, CheckBox
+
+enamldef Row(Container): row:
+    attr record
+    constraints = [hbox(check, label, field)]
+    CheckBox: check:
+        checked := row.record['done']
+    Label: label:
+        text << row.record['name']
+    Field: field:
+        value << row.record['value']
+"""
+
+
+def load_row():
+    code = EnamlCompiler.compile(parse(SOURCE), '<bench>')
+    module = types.ModuleType('__bench__')
+    exec code in module.__dict__
+    return module.Row
+
+
+def run(Row, count, planned):
+    # A plan of False marks the type as one which must be populated by
+    # walking the description dicts.
+    type.__setattr__(Row, '_instantiation_plan', None if planned else False)
+    record = {'done': False, 'name': 'name', 'value': 'value'}
+    t0 = time.time()
+    for ignored in xrange(count):
+        Row(record=record)
+    return time.time() - t0
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    Row = load_row()
+    print('%d rows' % count)
+    for planned in (False, True):
+        elapsed = run(Row, count, planned)
+        print('planned=%-5s %8.1f ms  %8.0f rows/s' % (
+            planned, elapsed * 1000, count / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Load test for hosting many sessions in a headless ZMQApplication.
+
+Reports the rate at which sessions can be started and activated, and
+the resident memory used per idle session.
+
+Usage: python bench_headless_sessions.py [num_sessions] [num_widgets]
+
+"""
+import gc
+import resource
+import sys
+import time
+
+from enaml.session import Session
+from enaml.socket_interface import ActionSocketInterface
+from enaml.widgets.api import Window, Container, Label, PushButton
+from enaml.zeromq.zmq_application import ZMQApplication
+
+
+class CountingSocket(object):
+    """ An action socket which counts and discards the sent actions.
+
+    """
+    sent = 0
+
+    def on_message(self, callback):
+        pass
+
+    def send(self, object_id, action, content):
+        CountingSocket.sent += 1
+
+
+ActionSocketInterface.register(CountingSocket)
+
+
+class SmallSession(Session):
+    """ A session with a small window, typical of a form view.
+
+    """
+    num_widgets = 10
+
+    def on_open(self):
+        window = Window(title='Session')
+        container = Container(window)
+        for idx in xrange(self.num_widgets):
+            if idx % 2:
+                Label(container, text='label %d' % idx)
+            else:
+                PushButton(container, text='button %d' % idx)
+        self.windows.append(window)
+
+
+def rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    SmallSession.num_widgets = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    app = ZMQApplication([SmallSession.factory('small')])
+
+    # Warm up the imports and caches before measuring memory.
+    sid = app.start_session('small')
+    app.activate_session(sid, CountingSocket())
+    app.end_session(sid)
+    gc.collect()
+
+    start_rss = rss_kb()
+    t0 = time.time()
+    for ignored in xrange(count):
+        sid = app.start_session('small')
+        app.session(sid).snapshot()
+        app.activate_session(sid, CountingSocket())
+    elapsed = time.time() - t0
+    gc.collect()
+    used_kb = rss_kb() - start_rss
+
+    print('%d sessions of %d widgets' % (count, SmallSession.num_widgets))
+    print('sessions/sec: %.1f' % (count / elapsed))
+    print('memory per idle session: %.1f KB' % (float(used_kb) / count))
+    print('actions sent during activation: %d' % CountingSocket.sent)
+    app.destroy()
+
+
+if __name__ == '__main__':
+    main()
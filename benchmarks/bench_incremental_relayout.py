@@ -0,0 +1,74 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Time of a relayout caused by a constraints change on a single widget
+in a large container, compared with a full rebuild of the layout.
+
+Usage: python bench_incremental_relayout.py [num_widgets] [repeats]
+
+"""
+import sys
+import time
+
+from enaml.qt.qt_application import QtApplication
+from enaml.session import Session
+from enaml.widgets.api import Window, Container, Field
+
+
+class FormSession(Session):
+    """ A session with a window holding a container of many fields.
+
+    """
+    num_widgets = 1500
+
+    def on_open(self):
+        window = Window(title='Form')
+        container = Container(window)
+        for idx in xrange(self.num_widgets):
+            Field(container, value='field %d' % idx)
+        self.windows.append(window)
+
+
+def main():
+    if len(sys.argv) > 1:
+        FormSession.num_widgets = int(sys.argv[1])
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    factory = FormSession.factory('form', '')
+    app = QtApplication([factory])
+    session_id = app.start_session('form')
+    session = app.session(session_id)
+    qt_session = app._qt_sessions[session_id]
+    session.windows[0].show()
+    stats = {}
+
+    def run():
+        container = session.windows[0].children[0]
+        field = container.children[len(container.children) // 2]
+        qt_container = qt_session.lookup(container.object_id)
+        qt_field = qt_session.lookup(field.object_id)
+
+        start = time.time()
+        for idx in xrange(repeats):
+            field.constraints = [field.width >= 100 + idx]
+            qt_field.on_action_relayout(field._layout_info())
+        stats['incremental'] = (time.time() - start) / repeats
+
+        start = time.time()
+        for idx in xrange(repeats):
+            qt_container.init_layout()
+            qt_container.refresh()
+        stats['full'] = (time.time() - start) / repeats
+        app.stop()
+
+    app.deferred_call(run)
+    app.start()
+    print('%d widgets: incremental relayout %8.2f ms, full rebuild '
+          '%8.2f ms' % (FormSession.num_widgets, stats['incremental'] * 1000,
+                        stats['full'] * 1000))
+    app.end_session(session_id)
+    app.destroy()
+
+
+if __name__ == '__main__':
+    main()
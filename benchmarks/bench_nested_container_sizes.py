@@ -0,0 +1,98 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Cost of propagating size hint changes through nested containers.
+
+Every field in a tree of nested containers updates its size hint in
+the same cycle of the event loop. The benchmark reports the time until
+the sizes of all of the containers have settled, and the number of
+size computations made by the layout managers.
+
+Usage: python bench_nested_container_sizes.py [depth] [fields_per_level]
+
+"""
+import sys
+import time
+
+from enaml.layout.layout_manager import LayoutManager
+from enaml.qt.qt_application import QtApplication
+from enaml.qt.qt_container import QtContainer
+from enaml.qt.qt_field import QtField
+from enaml.session import Session
+from enaml.widgets.api import Window, Container, Field
+
+
+class NestedSession(Session):
+    """ A session with a window holding deeply nested containers.
+
+    """
+    depth = 5
+    num_fields = 20
+
+    def on_open(self):
+        window = Window(title='Nested')
+        parent = Container(window)
+        for level in xrange(self.depth):
+            for idx in xrange(self.num_fields):
+                Field(parent, value='level %d field %d' % (level, idx))
+            parent = Container(parent)
+        self.windows.append(window)
+
+
+def count_calls(cls, name, counts):
+    method = getattr(cls, name)
+    def wrapper(*args, **kwargs):
+        counts[name] = counts.get(name, 0) + 1
+        return method(*args, **kwargs)
+    setattr(cls, name, wrapper)
+
+
+def main():
+    if len(sys.argv) > 1:
+        NestedSession.depth = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        NestedSession.num_fields = int(sys.argv[2])
+    counts = {}
+    count_calls(LayoutManager, 'get_sizes', counts)
+    factory = NestedSession.factory('nested', '')
+    app = QtApplication([factory])
+    session_id = app.start_session('nested')
+    qt_session = app._qt_sessions[session_id]
+    app.session(session_id).windows[0].show()
+    stats = {}
+
+    def poll():
+        objects = qt_session._registered_objects.itervalues()
+        pending = any(
+            obj._size_refresh_pending for obj in objects
+            if isinstance(obj, QtContainer)
+        )
+        if pending:
+            app.deferred_call(poll)
+        else:
+            stats['settled'] = time.time()
+            app.stop()
+
+    def run():
+        objects = qt_session._registered_objects.values()
+        fields = [obj for obj in objects if isinstance(obj, QtField)]
+        counts.clear()
+        stats['start'] = time.time()
+        for field in fields:
+            field.size_hint_updated()
+        app.deferred_call(poll)
+
+    app.deferred_call(run)
+    app.start()
+    elapsed = stats['settled'] - stats['start']
+    print('depth %d, %d fields per level: settled in %8.2f ms with %d '
+          'size computations' % (NestedSession.depth,
+                                 NestedSession.num_fields, elapsed * 1000,
+                                 counts.get('get_sizes', 0)))
+    app.end_session(session_id)
+    app.destroy()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Bytes per object for Declarative, Widget and Container instances,
+with and without bound expressions.
+
+The size of an object is the size of everything reachable from it
+which is not shared with the other objects: its dict, its binding
+tables, its instance traits, and so on. The objects are initialized,
+as they are in a running session.
+
+Usage: python bench_object_memory.py [count]
+
+"""
+import gc
+import sys
+from types import BuiltinFunctionType, FunctionType, ModuleType
+
+from enaml.core.declarative import Declarative
+from enaml.core.expressions import SimpleExpression
+from enaml.widgets.api import Container
+from enaml.widgets.widget import Widget
+
+
+#: The types which are shared among objects and not counted.
+SHARED_TYPES = (
+    type, ModuleType, FunctionType, BuiltinFunctionType, basestring, int,
+    bool,
+)
+
+
+def deep_size(roots, seen):
+    size = 0
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, SHARED_TYPES) or obj is None:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return size
+
+
+def measure(cls, count, bound):
+    parent = Declarative()
+    func = lambda: 'name'
+    objects = [cls(parent) for ignored in xrange(count)]
+    if bound:
+        for obj in objects:
+            obj.bind_expression('name', SimpleExpression(func, {}))
+    for obj in objects:
+        obj.initialize()
+    seen = set([id(parent), id(parent.__dict__), id(parent._children)])
+    seen.add(id(func))
+    # Count the state which is shared by every object once, by sizing
+    # one extra object first and discarding its size.
+    extra = cls(parent)
+    extra.initialize()
+    deep_size([extra], seen)
+    return deep_size(objects, seen) / float(count)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    print('%d objects per measurement' % count)
+    for cls in (Declarative, Widget, Container):
+        for bound in (False, True):
+            size = measure(cls, count, bound)
+            print('%-12s bound=%-5s %8.1f bytes/object' % (
+                cls.__name__, bound, size))
+
+
+if __name__ == '__main__':
+    main()
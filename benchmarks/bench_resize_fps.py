@@ -0,0 +1,98 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Interactive resize rate of a large form, with and without coalesced
+resize events.
+
+The window is resized continuously, as during a drag, and the event
+loop is run between each resize. The benchmark reports the resize
+events handled per second and the layout solves per second. It runs
+headless on the offscreen platform where it is available.
+
+Usage: python bench_resize_fps.py [num_widgets] [seconds]
+
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from enaml.qt.qt.QtGui import QApplication
+from enaml.qt.qt_application import QtApplication
+from enaml.qt.qt_container import QtContainer
+from enaml.session import Session
+from enaml.widgets.api import Window, Container, Field, Label
+
+
+class FormSession(Session):
+    """ A session with a window holding a large form.
+
+    """
+    num_widgets = 500
+    coalesce = False
+
+    def on_open(self):
+        window = Window(title='Form')
+        container = Container(window, coalesce_resize=self.coalesce)
+        for idx in xrange(self.num_widgets):
+            if idx % 2:
+                Label(container, text='label %d' % idx)
+            else:
+                Field(container, value='field %d' % idx)
+        self.windows.append(window)
+
+
+def run(coalesce, duration, counts):
+    FormSession.coalesce = coalesce
+    factory = FormSession.factory('form', '')
+    app = QtApplication([factory])
+    session_id = app.start_session('form')
+    qt_session = app._qt_sessions[session_id]
+    window = app.session(session_id).windows[0]
+    window.show()
+    stats = {}
+
+    def drag():
+        widget = qt_session.lookup(window.object_id).widget()
+        width = widget.width()
+        height = widget.height()
+        process = QApplication.processEvents
+        counts['refresh'] = 0
+        events = 0
+        start = time.time()
+        while time.time() - start < duration:
+            widget.resize(width + events % 200, height + events % 100)
+            process()
+            events += 1
+        stats['elapsed'] = time.time() - start
+        stats['events'] = events
+        app.stop()
+
+    app.deferred_call(drag)
+    app.start()
+    app.end_session(session_id)
+    app.destroy()
+    elapsed = stats['elapsed']
+    print('coalesce=%-5s %8.1f resize events/s %8.1f solves/s' % (
+        coalesce, stats['events'] / elapsed, counts['refresh'] / elapsed))
+
+
+def main():
+    if len(sys.argv) > 1:
+        FormSession.num_widgets = int(sys.argv[1])
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    counts = {'refresh': 0}
+    refresh = QtContainer.refresh
+    def counting_refresh(self):
+        counts['refresh'] += 1
+        refresh(self)
+    QtContainer.refresh = counting_refresh
+    print('%d widgets' % FormSession.num_widgets)
+    for coalesce in (False, True):
+        run(coalesce, duration, counts)
+
+
+if __name__ == '__main__':
+    main()
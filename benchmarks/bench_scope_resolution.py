@@ -0,0 +1,74 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Evaluation time of an expression on the leaf of a deep tree which
+reads names supplied by the root. The expression is evaluated with a
+cold resolution cache, with a warm cache while an unrelated object is
+reparented before each evaluation, and with a warm cache.
+
+Usage: python bench_scope_resolution.py [depth] [iterations]
+
+"""
+import __builtin__
+import ast
+import sys
+import time
+from types import FunctionType
+
+from traits.api import Int
+
+from enaml.core.declarative import Declarative
+from enaml.core.dynamic_scope import invalidate_resolution_caches
+from enaml.core.enaml_compiler import compile_simple
+from enaml.core.expressions import SimpleExpression
+
+
+class Root(Declarative):
+    width = Int(3)
+    height = Int(4)
+
+
+def make_leaf(depth):
+    node = Root()
+    for ignored in xrange(depth):
+        node = Declarative(node)
+    return node
+
+
+def run(mode, depth, iterations):
+    leaf = make_leaf(depth)
+    py_ast = ast.parse('width * height + len(str(width))', mode='eval')
+    py_ast.lineno = 1
+    code = compile_simple(py_ast, '<bench>')
+    func = FunctionType(code, {'__builtins__': __builtin__})
+    expr = SimpleExpression(func, {})
+    other = Declarative()
+    parents = (Declarative(), Declarative())
+    t0 = time.time()
+    if mode == 'cold':
+        for ignored in xrange(iterations):
+            invalidate_resolution_caches()
+            expr.eval(leaf, 'value')
+    elif mode == 'reparent':
+        for idx in xrange(iterations):
+            other.set_parent(parents[idx & 1])
+            expr.eval(leaf, 'value')
+    else:
+        for ignored in xrange(iterations):
+            expr.eval(leaf, 'value')
+    return time.time() - t0
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    print('depth %d, %d evaluations' % (depth, iterations))
+    for mode in ('cold', 'reparent', 'warm'):
+        elapsed = run(mode, depth, iterations)
+        print('%-8s %8.1f ms  %6.2f us/eval' % (
+            mode, elapsed * 1000, elapsed * 1e6 / iterations))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Scaling benchmark for the sharded ZMQ session server.
+
+Starts a ZMQShardedServer with 1, 2, and 4 worker processes and reports
+the rate at which pipelined clients can start sessions, along with the
+speedup relative to a single worker. The front runs on a thread of this
+process and the clients use blocking DEALER sockets. The speedup is
+bounded by the number of cpus of the machine.
+
+Usage: python bench_sharded_sessions.py [num_sessions] [num_clients]
+
+"""
+import sys
+import threading
+import time
+
+import zmq
+from zmq.eventloop.ioloop import IOLoop
+
+from enaml.codec import JSONCodec
+from enaml.session import Session
+from enaml.widgets.api import Window, Container, Label, PushButton
+from enaml.zeromq.zmq_shard import ZMQShardedServer
+
+
+HOST = '127.0.0.1'
+
+
+class SmallSession(Session):
+    """ A session with a small window, typical of a form view.
+
+    """
+    def on_open(self):
+        window = Window(title='Session')
+        container = Container(window)
+        for idx in xrange(20):
+            if idx % 2:
+                Label(container, text='label %d' % idx)
+            else:
+                PushButton(container, text='button %d' % idx)
+        self.windows.append(window)
+
+
+def wait_ready(server, timeout=30.0):
+    end = time.time() + timeout
+    while time.time() < end:
+        if all(w['ready'] for w in server.health().itervalues()):
+            return
+        time.sleep(0.01)
+    raise RuntimeError('workers did not start')
+
+
+def run_clients(port, count, num_clients):
+    codec = JSONCodec()
+    # A private context is used and terminated so that the next server
+    # forks its workers while no zmq context exists in this process.
+    ctxt = zmq.Context()
+    clients = []
+    for ignored in xrange(num_clients):
+        sock = ctxt.socket(zmq.DEALER)
+        sock.connect('tcp://%s:%d' % (HOST, port))
+        clients.append(sock)
+    request = codec.encode_action('', 'start_session', {'name': 'small'})
+    poller = zmq.Poller()
+    for sock in clients:
+        poller.register(sock, zmq.POLLIN)
+
+    t0 = time.time()
+    for idx in xrange(count):
+        clients[idx % num_clients].send_multipart(['', request])
+    started = 0
+    while started < count:
+        for sock, ignored in poller.poll(10000):
+            session_id, payload = sock.recv_multipart()
+            if codec.decode_action(payload)[1] == 'session_started':
+                started += 1
+    elapsed = time.time() - t0
+
+    for sock in clients:
+        sock.close(linger=0)
+    ctxt.term()
+    return elapsed
+
+
+def bench(workers, count, num_clients):
+    ioloop = IOLoop()
+    port = 20000 + workers
+    factories = [SmallSession.factory('small')]
+    server = ZMQShardedServer(factories, HOST, port, workers, ioloop=ioloop)
+    thread = threading.Thread(target=server.start)
+    thread.daemon = True
+    thread.start()
+    wait_ready(server)
+    elapsed = run_clients(port, count, num_clients)
+    health = server.health()
+    ioloop.add_callback(server.stop)
+    thread.join()
+    return elapsed, health
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    num_clients = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    base = None
+    for workers in (1, 2, 4):
+        elapsed, health = bench(workers, count, num_clients)
+        rate = count / elapsed
+        if base is None:
+            base = rate
+        loads = sorted(w['sessions'] for w in health.itervalues())
+        print('%d workers: %8.1f sessions/sec  speedup %.2fx  loads %s' % (
+            workers, rate, rate / base, loads))
+
+
+if __name__ == '__main__':
+    main()
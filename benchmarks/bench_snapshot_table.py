@@ -0,0 +1,55 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Size and time comparison of plain and class table window snapshots.
+
+Usage: python bench_snapshot_table.py [num_widgets]
+
+"""
+import json
+import sys
+import time
+
+from enaml.codec import BinaryCodec
+from enaml.snapshot_table import SnapshotPacker
+from enaml.widgets.api import Window, Container, Label, PushButton, Field
+
+
+def make_window(count):
+    window = Window(title='Snapshot')
+    container = Container(window)
+    for idx in xrange(count):
+        kind = idx % 3
+        if kind == 0:
+            Label(container, text='label %d' % idx)
+        elif kind == 1:
+            PushButton(container, text='button %d' % idx)
+        else:
+            Field(container, value='field %d' % idx)
+    window.initialize()
+    return window
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    window = make_window(count)
+
+    t0 = time.time()
+    plain = [window.snapshot()]
+    t1 = time.time()
+    packed = SnapshotPacker().pack(plain)
+    t2 = time.time()
+
+    print('%d widgets' % count)
+    print('snapshot time: %.1f ms, pack time: %.1f ms' % (
+        (t1 - t0) * 1000, (t2 - t1) * 1000))
+    for label, data in (('plain', plain), ('table', packed)):
+        json_size = len(json.dumps(data))
+        binary_size = len(BinaryCodec().encode(data))
+        print('%-5s json: %9d bytes  binary: %9d bytes' % (
+            label, json_size, binary_size))
+
+
+if __name__ == '__main__':
+    main()
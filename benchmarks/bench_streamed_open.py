@@ -0,0 +1,80 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Time-to-first-paint and time-to-complete of a large notebook session,
+with and without a streamed initial snapshot.
+
+Usage: python bench_streamed_open.py [num_pages] [widgets_per_page]
+
+"""
+import sys
+
+from enaml.qt.qt_application import QtApplication
+from enaml.session import Session
+from enaml.widgets.api import Window, Container, Notebook, Page, Field, Label
+
+
+class NotebookSession(Session):
+    """ A session with a window holding a notebook of many pages.
+
+    """
+    num_pages = 40
+    num_widgets = 25
+
+    def on_open(self):
+        window = Window(title='Notebook')
+        container = Container(window)
+        notebook = Notebook(container)
+        for page_idx in xrange(self.num_pages):
+            page = Page(notebook, title='Page %d' % page_idx)
+            content = Container(page)
+            for idx in xrange(self.num_widgets):
+                if idx % 2:
+                    Label(content, text='label %d' % idx)
+                else:
+                    Field(content, value='field %d' % idx)
+        self.windows.append(window)
+
+
+def run(streamed):
+    factory = NotebookSession.factory(
+        'notebook', '', stream_snapshots=streamed
+    )
+    app = QtApplication([factory])
+    session_id = app.start_session('notebook')
+    qt_session = app._qt_sessions[session_id]
+    app.session(session_id).windows[0].show()
+
+    def poll():
+        if qt_session.open_stats()['complete'] is None:
+            app.timed_call(1, poll)
+        else:
+            app.stop()
+
+    app.deferred_call(poll)
+    app.start()
+    stats = qt_session.open_stats()
+    if stats['first_paint'] is None:
+        stats['first_paint'] = stats['complete']
+    app.end_session(session_id)
+    app.destroy()
+    return stats
+
+
+def main():
+    if len(sys.argv) > 1:
+        NotebookSession.num_pages = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        NotebookSession.num_widgets = int(sys.argv[2])
+    print('%d pages of %d widgets' % (
+        NotebookSession.num_pages, NotebookSession.num_widgets))
+    for streamed in (False, True):
+        stats = run(streamed)
+        print('streamed=%-5s first paint %7.1f ms  complete %7.1f ms  '
+              'chunks %d' % (streamed, stats['first_paint'] * 1000,
+                             stats['complete'] * 1000, stats['chunks']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Evaluation time of a `<<` expression `model.foo.bar` with the traced
+code path and with the static dependency chain.
+
+Usage: python bench_subscription_eval.py [iterations]
+
+"""
+import ast
+import sys
+import time
+from types import FunctionType
+
+from traits.api import HasTraits, Instance, Int
+
+from enaml.core.declarative import Declarative
+from enaml.core.enaml_compiler import (
+    compile_subscribe, static_dependency_chain
+)
+from enaml.core.expressions import SubscriptionExpression
+
+
+class Bar(HasTraits):
+    bar = Int(42)
+
+
+class Foo(HasTraits):
+    foo = Instance(Bar, ())
+
+
+def make_expression(static):
+    py_ast = ast.parse('model.foo.bar', mode='eval')
+    func = FunctionType(compile_subscribe(py_ast, '<bench>'), {})
+    if static:
+        func._chain = static_dependency_chain(py_ast)
+    return SubscriptionExpression(func, {'model': Foo()})
+
+
+def run(static, iterations):
+    owner = Declarative()
+    expr = make_expression(static)
+    t0 = time.time()
+    for ignored in xrange(iterations):
+        expr.eval(owner, 'value')
+    return time.time() - t0
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print('%d evaluations' % iterations)
+    for static in (False, True):
+        elapsed = run(static, iterations)
+        print('static=%-5s %8.1f ms  %6.2f us/eval' % (
+            static, elapsed * 1000, elapsed * 1e6 / iterations))
+
+
+if __name__ == '__main__':
+    main()
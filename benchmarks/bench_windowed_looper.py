@@ -0,0 +1,120 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Construction time, memory and scroll throughput of a Looper over a
+large list of records, with and without a window.
+
+Usage: python bench_windowed_looper.py [num_records] [window_size]
+
+"""
+import gc
+import resource
+import sys
+import time
+import types
+
+from enaml.core.enaml_compiler import EnamlCompiler
+from enaml.core.parser import parse
+from enaml.qt.qt_application import QtApplication
+from enaml.session import Session
+
+
+SOURCE = """
+from enaml.core.api import Looper
+from enaml.widgets.api import Window, Container, Label
+
+enamldef Main(Window): main:
+    attr rows
+    attr loop_window = None
+    Container:
+        Looper:
+            name = 'looper'
+            iterable = main.rows
+            window = main.loop_window
+            Label:
+                text << '%d: %s' % (loop_index, loop_item)
+"""
+
+
+def load_main():
+    code = EnamlCompiler.compile(parse(SOURCE), '<bench>')
+    module = types.ModuleType('__bench__')
+    exec code in module.__dict__
+    return module.Main
+
+
+class LooperSession(Session):
+    """ A session with a window holding a single looper.
+
+    """
+    main_cls = None
+    num_records = 20000
+    window = None
+
+    def on_open(self):
+        rows = ['record %d' % idx for idx in xrange(self.num_records)]
+        main = self.main_cls(rows=rows, loop_window=self.window)
+        self.windows.append(main)
+
+
+def rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run(app, window, steps):
+    LooperSession.window = window
+    gc.collect()
+    objects = len(gc.get_objects())
+    t0 = time.time()
+    session_id = app.start_session('looper')
+    t1 = time.time()
+    objects = len(gc.get_objects()) - objects
+    session = app.session(session_id)
+    looper = session.windows[0].find('looper')
+
+    t2 = time.time()
+    if window is None:
+        # Without a window, every scroll step is a full rebuild.
+        rows = looper.iterable
+        for idx in xrange(steps):
+            looper.iterable = rows[1:] + rows[:1]
+            rows = looper.iterable
+    else:
+        start, count = window
+        for idx in xrange(steps):
+            looper.window = (start + idx + 1, count)
+    t3 = time.time()
+
+    app.deferred_call(app.stop)
+    app.start()
+    t4 = time.time()
+    app.end_session(session_id)
+    return {
+        'build': t1 - t0, 'objects': objects, 'scroll': t3 - t2,
+        'client': t4 - t3, 'steps': steps,
+    }
+
+
+def main():
+    if len(sys.argv) > 1:
+        LooperSession.num_records = int(sys.argv[1])
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    LooperSession.main_cls = load_main()
+    factory = LooperSession.factory('looper')
+    app = QtApplication([factory])
+    print('%d records, window of %d' % (LooperSession.num_records, size))
+    for window, steps in ((None, 2), ((0, size), 200)):
+        before = rss_kb()
+        stats = run(app, window, steps)
+        print('window=%-10s build %8.1f ms  objects %8d  peak rss +%7d kB'
+              % (window, stats['build'] * 1000, stats['objects'],
+                 rss_kb() - before))
+        print('%18s scroll %7.2f ms/step (server) %7.2f ms/step (client)'
+              % ('', stats['scroll'] * 1000 / stats['steps'],
+                 stats['client'] * 1000 / stats['steps']))
+    app.destroy()
+
+
+if __name__ == '__main__':
+    main()
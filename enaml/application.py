@@ -3,10 +3,15 @@
 #  All rights reserved.
 #------------------------------------------------------------------------------
 from abc import ABCMeta, abstractmethod
+import cPickle
 from heapq import heappush, heappop
 from itertools import count
 import logging
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
 from threading import Lock
+from time import time
+import traceback
 
 
 logger = logging.getLogger(__name__)
@@ -99,6 +104,104 @@ class ScheduledTask(object):
         return self._result
 
 
+def _run_worker(callback, args, kwargs):
+    """ Run a callback in a worker and capture the outcome.
+
+    This is a module level function so that it may be pickled and sent
+    to a process pool.
+
+    Returns
+    -------
+    result : tuple
+        A 2-tuple of (success, value). On success, the value is the
+        return value of the callback. Otherwise, it is the formatted
+        traceback of the exception raised by the callback.
+
+    """
+    try:
+        return (True, callback(*args, **kwargs))
+    except Exception:
+        return (False, traceback.format_exc())
+
+
+def _run_process_worker(work):
+    """ Run pickled work in a worker process and capture the outcome.
+
+    The work is unpickled and the outcome is pickled in the worker, so
+    that a failure to do either is reported as a failed outcome rather
+    than being swallowed by the process pool, which would never invoke
+    the completion callback.
+
+    Parameters
+    ----------
+    work : str
+        The pickled (callback, args, kwargs) tuple of the work.
+
+    Returns
+    -------
+    result : str
+        The pickled outcome returned by `_run_worker`.
+
+    """
+    try:
+        outcome = _run_worker(*cPickle.loads(work))
+        return cPickle.dumps(outcome, cPickle.HIGHEST_PROTOCOL)
+    except Exception:
+        outcome = (False, traceback.format_exc())
+        return cPickle.dumps(outcome, cPickle.HIGHEST_PROTOCOL)
+
+
+class WorkerTask(ScheduledTask):
+    """ A ScheduledTask for work which is offloaded to a worker pool.
+
+    The work is run in a worker thread or process. When it completes,
+    the task is added to the application's task heap and executed on
+    the main event loop thread, where it delivers the result of the
+    work to the `notify` callback. If the work raised an exception, a
+    RuntimeError with the original traceback is raised when the task
+    is executed. Unscheduling the task before the work has started
+    in a thread pool will prevent the work from running.
+
+    """
+    def __init__(self, callback, args, kwargs):
+        """ Initialize a WorkerTask.
+
+        Parameters
+        ----------
+        callback : callable
+            The callable to run in the worker.
+
+        args : tuple
+            The tuple of positional arguments to pass to the callback.
+
+        kwargs : dict
+            The dict of keyword arguments to pass to the callback.
+
+        """
+        super(WorkerTask, self).__init__(self._deliver, (), {})
+        self._work = (callback, args, kwargs)
+        self._outcome = None
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _run(self):
+        """ Run the work for the task. This is called in a worker thread.
+
+        """
+        if self._valid:
+            return _run_worker(*self._work)
+
+    def _deliver(self):
+        """ Deliver the outcome of the work on the main thread.
+
+        """
+        success, value = self._outcome
+        if not success:
+            raise RuntimeError('Worker task failed:\n%s' % value)
+        return value
+
+
 class Application(object):
     """ The application object which manages the top-level communication
     protocol for serving Enaml views.
@@ -151,6 +254,14 @@ class Application(object):
         self._task_heap = []
         self._counter = count()
         self._heap_lock = Lock()
+        self._task_budget = None
+        self._slice_pending = False
+        self._task_stats = {'executed': 0, 'total': 0, 'slices': 0}
+        self._pool_lock = Lock()
+        self._thread_pool = None
+        self._process_pool = None
+        self._worker_threads = 4
+        self._worker_processes = None
         self.add_factories(factories)
 
     #--------------------------------------------------------------------------
@@ -165,16 +276,102 @@ class Application(object):
         finally:
             self._next_task()
 
+    def _process_tasks(self):
+        """ Processes tasks until the heap is empty or the task budget
+        is exhausted, then dispatches the next slice of tasks.
+
+        The budget is read after each task, so a task which turns the
+        budget off ends the slice and the remaining tasks are executed
+        one per cycle.
+
+        """
+        heap = self._task_heap
+        lock = self._heap_lock
+        with lock:
+            self._slice_pending = False
+        start = time()
+        executed = 0
+        try:
+            while True:
+                with lock:
+                    if not heap:
+                        break
+                    priority, ignored, task = heappop(heap)
+                executed += 1
+                task._execute()
+                budget = self._task_budget
+                if budget is None or time() - start >= budget / 1000.0:
+                    break
+        finally:
+            stats = self._task_stats
+            stats['executed'] = executed
+            stats['total'] += executed
+            stats['slices'] += 1
+            self._next_task()
+
+    def _push_task(self, task, priority):
+        """ Push a task onto the heap and start processing if needed.
+
+        This method is thread-safe.
+
+        """
+        heap = self._task_heap
+        with self._heap_lock:
+            needs_start = len(heap) == 0
+            item = (-priority, self._counter.next(), task)
+            heappush(heap, item)
+        if needs_start:
+            if self.is_main_thread():
+                self._next_task()
+            else:
+                self.deferred_call(self._next_task)
+
+    def _complete_task(self, task, priority, outcome):
+        """ Schedule a completed worker task for delivery.
+
+        This is called from a worker pool thread.
+
+        """
+        if outcome is None:
+            # The task was unscheduled before the work was run.
+            outcome = (True, None)
+        task._outcome = outcome
+        self._push_task(task, priority)
+
+    def _worker_pool(self, process):
+        """ Get the worker pool of the given type, creating it on demand.
+
+        """
+        with self._pool_lock:
+            if process:
+                pool = self._process_pool
+                if pool is None:
+                    pool = Pool(self._worker_processes)
+                    self._process_pool = pool
+            else:
+                pool = self._thread_pool
+                if pool is None:
+                    pool = ThreadPool(self._worker_threads)
+                    self._thread_pool = pool
+        return pool
+
     def _next_task(self):
         """ Pulls the next task off the heap and processes it on the
         main gui thread.
 
+        If a task budget is set, the next slice of tasks is dispatched
+        instead of a single task.
+
         """
         heap = self._task_heap
         with self._heap_lock:
             if heap:
-                priority, ignored, task = heappop(heap)
-                self.deferred_call(self._process_task, task)
+                if self._task_budget is None:
+                    priority, ignored, task = heappop(heap)
+                    self.deferred_call(self._process_task, task)
+                elif not self._slice_pending:
+                    self._slice_pending = True
+                    self.deferred_call(self._process_tasks)
 
     #--------------------------------------------------------------------------
     # Abstract API
@@ -346,18 +543,105 @@ class Application(object):
         if kwargs is None:
             kwargs = {}
         task = ScheduledTask(callback, args, kwargs)
-        heap = self._task_heap
-        with self._heap_lock:
-            needs_start = len(heap) == 0
-            item = (-priority, self._counter.next(), task)
-            heappush(heap, item)
-        if needs_start:
-            if self.is_main_thread():
-                self._next_task()
-            else:
-                self.deferred_call(self._next_task)
+        self._push_task(task, priority)
         return task
 
+    def submit(self, callback, args=None, kwargs=None, priority=0,
+               process=False):
+        """ Run a callable in a worker pool and deliver the result on
+        the event loop thread.
+
+        This is intended for blocking or long running work, such as
+        model queries, file scans, or image decoding, which should not
+        be run on the main gui thread. When the work completes, the
+        returned task is scheduled on the task heap with the given
+        priority and its `notify` callback is invoked with the result
+        on the main event loop thread. This call is thread-safe.
+
+        Parameters
+        ----------
+        callback : callable
+            The callable object to run in the worker pool.
+
+        args : tuple, optional
+            The positional arguments to pass to the callable.
+
+        kwargs : dict, optional
+            The keyword arguments to pass to the callable.
+
+        priority : int, optional
+            The queue priority for delivering the result. Smaller
+            values indicate lower priority, larger values indicate
+            higher priority. The default priority is zero.
+
+        process : bool, optional
+            If True, run the callable in the process pool instead of
+            the thread pool. This is appropriate for CPU bound work.
+            The callable and its arguments and result must be pickle-
+            able; if they are not, the task fails as if the callable
+            had raised. The default is False.
+
+        Returns
+        -------
+        result : WorkerTask
+            A task object which can be used to unschedule the task or
+            retrieve the results of the callable after the result has
+            been delivered.
+
+        """
+        if args is None:
+            args = ()
+        if kwargs is None:
+            kwargs = {}
+        task = WorkerTask(callback, args, kwargs)
+        if process:
+            try:
+                work = cPickle.dumps(task._work, cPickle.HIGHEST_PROTOCOL)
+            except Exception:
+                outcome = (False, traceback.format_exc())
+                self._complete_task(task, priority, outcome)
+                return task
+            done = lambda data: self._complete_task(
+                task, priority, cPickle.loads(data)
+            )
+            pool = self._worker_pool(True)
+            pool.apply_async(_run_process_worker, (work,), callback=done)
+        else:
+            done = lambda outcome: self._complete_task(task, priority, outcome)
+            pool = self._worker_pool(False)
+            pool.apply_async(task._run, callback=done)
+        return task
+
+    def set_worker_count(self, threads=None, processes=None):
+        """ Set the number of workers used by `submit`.
+
+        Existing worker pools are closed after their pending work is
+        complete and new pools are created on demand.
+
+        Parameters
+        ----------
+        threads : int, optional
+            The number of threads in the thread pool. If not given,
+            the current value is kept. The initial value is 4.
+
+        processes : int, optional
+            The number of processes in the process pool. If not given,
+            the current value is kept. The initial value is None, which
+            uses the number of cpus on the machine.
+
+        """
+        with self._pool_lock:
+            if threads is not None:
+                self._worker_threads = threads
+                if self._thread_pool is not None:
+                    self._thread_pool.close()
+                    self._thread_pool = None
+            if processes is not None:
+                self._worker_processes = processes
+                if self._process_pool is not None:
+                    self._process_pool.close()
+                    self._process_pool = None
+
     def has_pending_tasks(self):
         """ Get whether or not the application has pending tasks.
 
@@ -372,6 +656,69 @@ class Application(object):
             has_pending = len(heap) > 0
         return has_pending
 
+    def set_task_budget(self, ms):
+        """ Set the per-cycle time budget for executing scheduled tasks.
+
+        By default, each task scheduled with `schedule` is executed on
+        its own cycle of the event loop. When a budget is set, tasks
+        are instead executed in time-sliced batches: the task heap is
+        drained in priority order until the budget is exhausted, after
+        which control is yielded to the event loop so that pending
+        events, such as painting, can be processed before the next
+        slice is run.
+
+        Parameters
+        ----------
+        ms : float or None
+            The budget in milliseconds for each slice of tasks, or None
+            to execute one task per event loop cycle.
+
+        """
+        if ms is not None and ms < 0:
+            raise ValueError('The task budget must be >= 0')
+        self._task_budget = ms
+
+    def task_budget(self):
+        """ Get the per-cycle time budget for executing scheduled tasks.
+
+        Returns
+        -------
+        result : float or None
+            The budget in milliseconds for each slice of tasks, or None
+            if tasks are executed one per event loop cycle.
+
+        """
+        return self._task_budget
+
+    def task_stats(self):
+        """ Get statistics about the execution of scheduled tasks.
+
+        The execution counts are only maintained when a task budget
+        is in effect.
+
+        Returns
+        -------
+        result : dict
+            A dict with the following keys:
+
+            'executed'
+                The number of tasks executed in the last slice.
+
+            'total'
+                The total number of tasks executed in slices.
+
+            'slices'
+                The number of slices which have been run.
+
+            'backlog'
+                The number of tasks waiting to be executed.
+
+        """
+        stats = self._task_stats.copy()
+        with self._heap_lock:
+            stats['backlog'] = len(self._task_heap)
+        return stats
+
     def add_factories(self, factories):
         """ Add session factories to the application.
 
@@ -419,6 +766,12 @@ class Application(object):
         """
         for session in self.sessions():
             self.end_session(session.session_id)
+        with self._pool_lock:
+            for pool in (self._thread_pool, self._process_pool):
+                if pool is not None:
+                    pool.terminate()
+            self._thread_pool = None
+            self._process_pool = None
         self._all_factories = []
         self._named_factories = {}
         Application._instance = None
@@ -536,3 +889,44 @@ def schedule(callback, args=None, kwargs=None, priority=0):
         raise RuntimeError('Application instance does not exist')
     return app.schedule(callback, args, kwargs, priority)
 
+
+def submit(callback, args=None, kwargs=None, priority=0, process=False):
+    """ Run a callable in a worker pool and deliver the result on the
+    event loop thread.
+
+    This call is thread-safe.
+
+    This is a convenience function for invoking the same method on the
+    current application instance. If an application instance does not
+    exist, a RuntimeError will be raised.
+
+    Parameters
+    ----------
+    callback : callable
+        The callable object to run in the worker pool.
+
+    args : tuple, optional
+        The positional arguments to pass to the callable.
+
+    kwargs : dict, optional
+        The keyword arguments to pass to the callable.
+
+    priority : int, optional
+        The queue priority for delivering the result. The default
+        priority is zero.
+
+    process : bool, optional
+        If True, run the callable in the process pool instead of the
+        thread pool. The default is False.
+
+    Returns
+    -------
+    result : WorkerTask
+        A task object which can be used to unschedule the task or
+        retrieve the results of the callable.
+
+    """
+    app = Application.instance()
+    if app is None:
+        raise RuntimeError('Application instance does not exist')
+    return app.submit(callback, args, kwargs, priority, process)
@@ -0,0 +1,644 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Wire codecs for serializing Enaml messages.
+
+A codec converts the plain Python data structures which make up Enaml
+messages (dicts, lists, strings, numbers, booleans, and None) to and
+from a string suitable for transfer over the wire. Codecs are stateful
+and one instance should be used per connection, per direction pair; an
+instance maintains an encoding table for outgoing data and a decoding
+table for incoming data.
+
+JSON is the preferred codec. The binary codec trades encoding speed
+for smaller payloads, and is only used for a client which opts in to
+it by sending binary encoded data. See `BinaryCodec`.
+
+"""
+from abc import ABCMeta, abstractmethod
+import json
+from struct import Struct
+
+
+class AbstractCodec(object):
+    """ An abstract base class defining a wire codec.
+
+    """
+    __metaclass__ = ABCMeta
+
+    #: The registered name of the codec. This must be overridden by
+    #: subclasses and is used when negotiating a codec with a client.
+    name = ''
+
+    @classmethod
+    def detect(cls, data):
+        """ Get whether the given data was encoded with this codec.
+
+        Parameters
+        ----------
+        data : str
+            An encoded string received from the wire.
+
+        Returns
+        -------
+        result : bool
+            True if the data was encoded by this type of codec, False
+            otherwise. The default implementation returns False.
+
+        """
+        return False
+
+    @abstractmethod
+    def encode(self, obj):
+        """ Encode an object into a string.
+
+        Parameters
+        ----------
+        obj : object
+            The object to encode. It must be composed of dicts, lists,
+            tuples, strings, numbers, booleans, and None.
+
+        Returns
+        -------
+        result : str
+            The encoded string representation of the object.
+
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def decode(self, data):
+        """ Decode a string into an object.
+
+        Parameters
+        ----------
+        data : str
+            A string created by the `encode` method of a codec of the
+            same type.
+
+        Returns
+        -------
+        result : object
+            The decoded object.
+
+        """
+        raise NotImplementedError
+
+    def encode_action(self, object_id, action, content):
+        """ Encode an action message into a string.
+
+        This is a convenience method for implementations of the
+        `ActionSocketInterface` which need to send their messages
+        across a process boundary.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id of the target object.
+
+        action : str
+            The action that should be performed by the object.
+
+        content : dict
+            The content dictionary for the action.
+
+        Returns
+        -------
+        result : str
+            The encoded action message.
+
+        """
+        return self.encode((object_id, action, content))
+
+    def decode_action(self, data):
+        """ Decode a string created by `encode_action`.
+
+        Parameters
+        ----------
+        data : str
+            The encoded action message.
+
+        Returns
+        -------
+        result : tuple
+            A 3-tuple of (object_id, action, content).
+
+        """
+        object_id, action, content = self.decode(data)
+        return object_id, action, content
+
+    def mark(self):
+        """ Get a mark of the current state of the encoding table.
+
+        A transport which fails to deliver an encoded message must
+        roll the codec back to the mark taken before the message was
+        encoded, since the peer will never decode it.
+
+        Returns
+        -------
+        result : object
+            An opaque mark to pass to `rollback`. The default
+            implementation returns None.
+
+        """
+        return None
+
+    def rollback(self, mark):
+        """ Restore the encoding table to the state of a mark.
+
+        The mark must have been taken after the last message which was
+        delivered to the peer. The default implementation is a no-op.
+
+        Parameters
+        ----------
+        mark : object
+            A mark returned by a call to `mark`.
+
+        """
+        pass
+
+
+#: The characters which may begin a JSON document.
+_JSON_STARTS = frozenset('[{"-0123456789tfn')
+
+
+class JSONCodec(AbstractCodec):
+    """ A codec which encodes objects as JSON.
+
+    This is the preferred codec, since the C accelerated json module
+    is faster than the pure Python binary codec. It holds no state, but
+    instances should still be created per connection for consistency
+    with the other codecs.
+
+    """
+    name = 'json'
+
+    @classmethod
+    def detect(cls, data):
+        """ Get whether the given data was encoded as JSON.
+
+        """
+        stripped = data.lstrip()
+        return bool(stripped) and stripped[0] in _JSON_STARTS
+
+    def encode(self, obj):
+        """ Encode an object into a JSON string.
+
+        """
+        return json.dumps(obj)
+
+    def decode(self, data):
+        """ Decode a JSON string into an object.
+
+        """
+        return json.loads(data)
+
+
+#------------------------------------------------------------------------------
+# Binary Codec
+#------------------------------------------------------------------------------
+#: The magic prefix for binary encoded data. A JSON document can never
+#: begin with these bytes, which allows the codecs to be distinguished.
+BINARY_MAGIC = '\xeb\x01'
+
+#: The value tags for the binary codec.
+_NONE = 'N'
+_TRUE = 'T'
+_FALSE = 'F'
+_INT = 'i'
+_FLOAT = 'd'
+_BYTES = 's'
+_UNICODE = 'u'
+_LIST = 'l'
+_DICT = 'm'
+_REF = 'R'
+_DEFINE = 'D'
+
+#: The struct used to pack and unpack floats.
+_float_struct = Struct('<d')
+
+#: Strings which are interned in every binary codec table before any
+#: data is sent. These are the most frequent dict keys and action names
+#: in Enaml messages. The order of this tuple is part of the wire format
+#: and new entries must only ever be appended.
+STATIC_STRINGS = (
+    'object_id', 'name', 'class', 'bases', 'children', 'action',
+    'content', 'batch', 'order', 'removed', 'added', 'layout',
+    'constraints', 'resist', 'hug', 'enabled', 'visible', 'bgcolor',
+    'fgcolor', 'font', 'minimum_size', 'maximum_size',
+    'show_focus_rect', 'tool_tip', 'status_tip', 'text', 'value',
+    'checked', 'checkable', 'window', 'message_batch', 'relayout',
+    'children_changed', 'destroy', 'add_window', 'close', 'url_request',
+    'url_reply', 'id', 'url', 'metadata', 'status', 'resource', 'ok',
+    'fail', 'msg_id', 'msg_type', 'session_id', 'username', 'version',
+    'strength', 'weight', 'op', 'lhs', 'rhs', 'terms', 'constant',
+    'coefficient', 'var', 'owner', 'linear_constraint',
+    'linear_expression', 'term', 'linear_symbolic', 'strong', 'weak',
+    'medium', 'required', 'ignore', 'Object', 'Declarative', 'Messenger',
+    'Widget', 'ConstraintsWidget', 'Container', 'Window',
+)
+
+#: The dict keys whose string values are interned by the binary codec.
+#: Values under these keys are highly repetitive within a session, so
+#: they are sent in full once and referenced by index thereafter. If
+#: the value is a list, each string item in the list is interned.
+INTERNED_VALUE_KEYS = frozenset((
+    'object_id', 'class', 'bases', 'action', 'order', 'removed', 'owner',
+    'op', 'strength', 'resist', 'hug', 'msg_type', 'session_id',
+    'symbols',
+))
+
+#: The maximum number of entries in a binary codec string table. Once
+#: the table is full, new strings are sent inline.
+MAX_TABLE_SIZE = 1 << 16
+
+
+#: Precomputed single byte strings for small varints.
+_small_varints = tuple(chr(idx) for idx in xrange(0x80))
+
+
+def _varint(value):
+    """ Encode a non-negative integer as a base-128 varint string.
+
+    """
+    if value < 0x80:
+        return _small_varints[value]
+    chunks = []
+    push = chunks.append
+    while value > 0x7f:
+        push(chr((value & 0x7f) | 0x80))
+        value >>= 7
+    push(chr(value))
+    return ''.join(chunks)
+
+
+def _read_varint(data, pos):
+    """ Read a base-128 varint from the data at the given position.
+
+    Returns
+    -------
+    result : tuple
+        A 2-tuple of (value, new_pos).
+
+    """
+    byte = ord(data[pos])
+    pos += 1
+    if byte < 0x80:
+        return byte, pos
+    result = byte & 0x7f
+    shift = 7
+    while True:
+        byte = ord(data[pos])
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+class BinaryCodec(AbstractCodec):
+    """ A compact, schema-aware binary codec.
+
+    The binary codec writes a single tag byte per value followed by
+    the value payload. Integers and lengths are written as varints.
+    Dict keys, action names, object ids, and class names are interned
+    in a per-connection string table so that they are sent in full
+    only once. The table is seeded with `STATIC_STRINGS` so that even
+    the first message of a connection benefits from interning.
+
+    The binary codec is a payload size optimization only. It is
+    written in pure Python and is slower than the C accelerated json
+    module, so it pays off only when the cost of the transport
+    dominates, such as for remote clients on a slow link. It is never
+    chosen by default; a client opts in by sending binary data, and
+    is otherwise served with JSON.
+
+    Since the string table is built incrementally, the messages must
+    be decoded in the same order in which they were encoded. This is
+    guaranteed by the ordered transports used by Enaml. If an encode
+    fails partway, the strings it added to the table are removed so
+    that the tables of the two peers stay in sync.
+
+    """
+    name = 'binary'
+
+    def __init__(self):
+        """ Initialize a BinaryCodec.
+
+        """
+        # The encoding table maps an interned string directly to its
+        # encoded reference, so a table hit costs a single write.
+        self._enc_table = dict(
+            (s, _REF + _varint(idx)) for idx, s in enumerate(STATIC_STRINGS)
+        )
+        self._enc_order = []
+        self._dec_table = list(STATIC_STRINGS)
+
+    @classmethod
+    def detect(cls, data):
+        """ Get whether the given data was encoded by a BinaryCodec.
+
+        """
+        return data.startswith(BINARY_MAGIC)
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _write_interned(self, write, value):
+        """ Write a string value through the string table.
+
+        """
+        table = self._enc_table
+        ref = table.get(value)
+        if ref is not None:
+            write(ref)
+        elif len(table) < MAX_TABLE_SIZE:
+            table[value] = _REF + _varint(len(table))
+            self._enc_order.append(value)
+            write(_DEFINE)
+            self._write(write, value, False)
+        else:
+            self._write(write, value, False)
+
+    def _write(self, write, value, intern):
+        """ Write a value to the output.
+
+        Parameters
+        ----------
+        write : callable
+            The callable which accepts the output string chunks.
+
+        value : object
+            The value to write to the output.
+
+        intern : bool
+            Whether string values should be interned.
+
+        """
+        # The type checks are ordered by frequency in Enaml messages.
+        vtype = type(value)
+        if vtype is str:
+            if intern:
+                ref = self._enc_table.get(value)
+                if ref is not None:
+                    write(ref)
+                else:
+                    self._write_interned(write, value)
+            else:
+                write(_BYTES + _varint(len(value)))
+                write(value)
+        elif vtype is dict:
+            write(_DICT + _varint(len(value)))
+            interned_keys = INTERNED_VALUE_KEYS
+            table = self._enc_table
+            this_write = self._write
+            for key, item in value.iteritems():
+                ref = table.get(key)
+                if ref is not None:
+                    write(ref)
+                else:
+                    self._write_interned(write, key)
+                this_write(write, item, key in interned_keys)
+        elif vtype is unicode:
+            if intern:
+                self._write_interned(write, value)
+            else:
+                encoded = value.encode('utf-8')
+                write(_UNICODE + _varint(len(encoded)))
+                write(encoded)
+        elif vtype is list or vtype is tuple:
+            write(_LIST + _varint(len(value)))
+            this_write = self._write
+            for item in value:
+                this_write(write, item, intern)
+        elif value is None:
+            write(_NONE)
+        elif value is True:
+            write(_TRUE)
+        elif value is False:
+            write(_FALSE)
+        elif vtype is int or vtype is long:
+            # Zigzag encode the integer so negative values stay small.
+            if value >= 0:
+                write(_INT + _varint(value << 1))
+            else:
+                write(_INT + _varint(((-value) << 1) - 1))
+        elif vtype is float:
+            write(_FLOAT + _float_struct.pack(value))
+        elif isinstance(value, dict):
+            self._write(write, dict(value), intern)
+        elif isinstance(value, (list, tuple)):
+            self._write(write, list(value), intern)
+        elif isinstance(value, str):
+            self._write(write, str(value), intern)
+        elif isinstance(value, unicode):
+            self._write(write, unicode(value), intern)
+        else:
+            msg = "%r is not serializable by the binary codec"
+            raise TypeError(msg % (value,))
+
+    def _read(self, data, pos):
+        """ Read a value from the data at the given position.
+
+        Returns
+        -------
+        result : tuple
+            A 2-tuple of (value, new_pos).
+
+        """
+        tag = data[pos]
+        pos += 1
+        if tag == _REF:
+            idx, pos = _read_varint(data, pos)
+            return self._dec_table[idx], pos
+        if tag == _BYTES:
+            size, pos = _read_varint(data, pos)
+            end = pos + size
+            return data[pos:end], end
+        if tag == _DICT:
+            size, pos = _read_varint(data, pos)
+            result = {}
+            read = self._read
+            for ignored in xrange(size):
+                key, pos = read(data, pos)
+                result[key], pos = read(data, pos)
+            return result, pos
+        if tag == _LIST:
+            size, pos = _read_varint(data, pos)
+            result = []
+            push = result.append
+            read = self._read
+            for ignored in xrange(size):
+                item, pos = read(data, pos)
+                push(item)
+            return result, pos
+        if tag == _DEFINE:
+            value, pos = self._read(data, pos)
+            table = self._dec_table
+            if len(table) < MAX_TABLE_SIZE:
+                table.append(value)
+            return value, pos
+        if tag == _INT:
+            value, pos = _read_varint(data, pos)
+            if value & 1:
+                return -((value + 1) >> 1), pos
+            return value >> 1, pos
+        if tag == _UNICODE:
+            size, pos = _read_varint(data, pos)
+            end = pos + size
+            return data[pos:end].decode('utf-8'), end
+        if tag == _NONE:
+            return None, pos
+        if tag == _TRUE:
+            return True, pos
+        if tag == _FALSE:
+            return False, pos
+        if tag == _FLOAT:
+            end = pos + 8
+            return _float_struct.unpack(data[pos:end])[0], end
+        raise ValueError('Invalid binary codec tag %r at %d' % (tag, pos - 1))
+
+    #--------------------------------------------------------------------------
+    # AbstractCodec Interface
+    #--------------------------------------------------------------------------
+    def encode(self, obj):
+        """ Encode an object into a binary string.
+
+        """
+        chunks = [BINARY_MAGIC]
+        mark = len(self._enc_order)
+        try:
+            self._write(chunks.append, obj, False)
+        except Exception:
+            self.rollback(mark)
+            raise
+        return ''.join(chunks)
+
+    def mark(self):
+        """ Get a mark of the current state of the encoding table.
+
+        Returns
+        -------
+        result : int
+            The number of strings interned so far.
+
+        """
+        return len(self._enc_order)
+
+    def rollback(self, mark):
+        """ Remove the strings interned since the given mark.
+
+        Parameters
+        ----------
+        mark : int
+            The mark taken before the undelivered messages were
+            encoded.
+
+        """
+        order = self._enc_order
+        table = self._enc_table
+        for value in order[mark:]:
+            del table[value]
+        del order[mark:]
+
+    def decode(self, data):
+        """ Decode a binary string into an object.
+
+        """
+        if not data.startswith(BINARY_MAGIC):
+            raise ValueError('Data was not encoded by the binary codec')
+        value, pos = self._read(data, len(BINARY_MAGIC))
+        if pos != len(data):
+            raise ValueError('Extra data after binary codec payload')
+        return value
+
+    def encode_action(self, object_id, action, content):
+        """ Encode an action message into a binary string.
+
+        The object id and action name are always interned.
+
+        """
+        chunks = [BINARY_MAGIC, _LIST + _small_varints[3]]
+        write = chunks.append
+        mark = len(self._enc_order)
+        try:
+            self._write_interned(write, object_id)
+            self._write_interned(write, action)
+            self._write(write, content, False)
+        except Exception:
+            self.rollback(mark)
+            raise
+        return ''.join(chunks)
+
+
+#------------------------------------------------------------------------------
+# Codec Registry
+#------------------------------------------------------------------------------
+#: The registered codec types, in order of negotiation preference. JSON
+#: is preferred, since it is faster than the binary codec.
+_codec_types = [JSONCodec, BinaryCodec]
+
+
+def register_codec(codec_type):
+    """ Register a new codec type for negotiation.
+
+    The codec type is given preference over those already registered.
+
+    Parameters
+    ----------
+    codec_type : type
+        A subclass of AbstractCodec which implements the `detect`
+        classmethod.
+
+    """
+    if codec_type in _codec_types:
+        _codec_types.remove(codec_type)
+    _codec_types.insert(0, codec_type)
+
+
+def lookup_codec(name):
+    """ Lookup a registered codec type by name.
+
+    Parameters
+    ----------
+    name : str
+        The name of the codec type.
+
+    Returns
+    -------
+    result : type or None
+        The codec type with the given name, or None if no such codec
+        is registered.
+
+    """
+    for codec_type in _codec_types:
+        if codec_type.name == name:
+            return codec_type
+
+
+def negotiate_codec(data):
+    """ Select the codec type for data received from a client.
+
+    A server should call this with the first encoded frame received
+    from a client, then create an instance of the returned type to
+    communicate with that client. The client chooses the codec by the
+    encoding of its first frame. JSON is preferred and is used for
+    data which no codec claims; the binary codec is used only for a
+    client which sends binary data.
+
+    Parameters
+    ----------
+    data : str
+        An encoded string received from the client.
+
+    Returns
+    -------
+    result : type
+        The codec type which should be used for the client.
+
+    """
+    for codec_type in _codec_types:
+        if codec_type.detect(data):
+            return codec_type
+    return JSONCodec
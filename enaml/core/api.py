@@ -9,4 +9,5 @@ from .looper import Looper
 from .messenger import Messenger
 from .object import Object
 from .templated import Templated
+from .update_scheduler import batch_updates, set_batched_updates, update_stats
 
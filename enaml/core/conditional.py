@@ -2,12 +2,100 @@
 #  Copyright (c) 2013, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-from traits.api import Bool, Tuple, Property
+from collections import OrderedDict
+from weakref import ref
+
+from traits.api import Any, Bool, Tuple, Property
 
 from .declarative import scope_lookup
 from .templated import Templated
 
 
+class KeepAlivePool(object):
+    """ A process wide bound on the objects kept alive by Conditionals.
+
+    A `Conditional` with `keep_alive` enabled registers its detached
+    items with the pool. When the total number of objects in detached
+    subtrees exceeds `max_objects`, the least recently detached
+    subtrees are destroyed until the pool is within its bound.
+
+    The pool only holds weak references to the conditionals, so it does
+    not keep them alive, and the entry of a collected conditional is
+    removed from the pool.
+
+    """
+    def __init__(self, max_objects=5000):
+        """ Initialize a KeepAlivePool.
+
+        Parameters
+        ----------
+        max_objects : int, optional
+            The maximum number of objects to keep alive in detached
+            subtrees. The default is 5000.
+
+        """
+        self.max_objects = max_objects
+        self._entries = OrderedDict()
+        self._count = 0
+
+    def add(self, conditional, count):
+        """ Register the detached items of a conditional.
+
+        This may release the cached items of other conditionals, or of
+        the given conditional itself, in order to stay within bounds.
+
+        Parameters
+        ----------
+        conditional : Conditional
+            The conditional which detached its items.
+
+        count : int
+            The number of objects in the detached subtrees.
+
+        """
+        self.discard(conditional)
+        key = id(conditional)
+        entries = self._entries
+
+        def collected(wr):
+            entry = entries.get(key)
+            if entry is not None and entry[0] is wr:
+                del entries[key]
+                self._count -= entry[1]
+
+        entries[key] = (ref(conditional, collected), count)
+        self._count += count
+        while self._count > self.max_objects and entries:
+            ignored, (wr, victim_count) = entries.popitem(last=False)
+            self._count -= victim_count
+            victim = wr()
+            if victim is not None:
+                victim._release_cached_items()
+
+    def discard(self, conditional):
+        """ Remove a conditional from the pool, if present.
+
+        Parameters
+        ----------
+        conditional : Conditional
+            The conditional which no longer has detached items.
+
+        """
+        entry = self._entries.pop(id(conditional), None)
+        if entry is not None:
+            self._count -= entry[1]
+
+    def count(self):
+        """ Get the number of objects currently kept alive.
+
+        """
+        return self._count
+
+
+#: The keep alive pool shared by all conditionals.
+keep_alive_pool = KeepAlivePool()
+
+
 class Conditional(Templated):
     """ A templated object that represents conditional objects.
 
@@ -15,14 +103,30 @@ class Conditional(Templated):
     its template items and insert them into its parent; when False, the
     old items will be destroyed.
 
+    When `keep_alive` is True, the items are detached from the parent
+    instead of destroyed when the condition becomes False. The client
+    widgets are unparented and hidden but not destroyed. When the
+    condition becomes True again, the same items are re-attached with a
+    single children change, without rebuilding them on either side.
+    While detached, the items keep the conditional as their parent, so
+    dynamic scoping continues to resolve through the same ancestors.
+    They are held outside of the object tree however: they are not
+    children of the conditional, so `traverse`, `find`, `find_all`,
+    and `find_by_type` do not reach the hidden items. The number of
+    objects kept alive in this way is bounded by the `keep_alive_pool`.
+
     Creating a `Conditional` without a parent is a programming error.
 
     """
     #: The condition variable. If this is True, a copy of the children
     #: will be inserted into the parent. Otherwise, the old copies will
-    #: be destroyed.
+    #: be destroyed, or detached if `keep_alive` is True.
     condition = Bool(True)
 
+    #: Whether to keep the items alive when the condition is False, so
+    #: that they can be re-attached instead of rebuilt.
+    keep_alive = Bool(False)
+
     #: A read-only property which returns the tuple of items created
     #: by the conditional when `condition` is True.
     items = Property(fget=lambda self: self._items, depends_on='_items')
@@ -30,6 +134,16 @@ class Conditional(Templated):
     #: Private internal storage for the `items` property.
     _items = Tuple
 
+    #: The detached items which are being kept alive.
+    _cached_items = Tuple
+
+    #: The tuple of (identifiers, scope) pairs for the scopes used to
+    #: create the items. These are not type-checked for performance.
+    _scopes = Any(())
+
+    #: The tuple of (identifiers, scope) pairs of the detached items.
+    _cached_scopes = Any(())
+
     #--------------------------------------------------------------------------
     # Lifetime API
     #--------------------------------------------------------------------------
@@ -48,10 +162,13 @@ class Conditional(Templated):
 
         The conditional will destroy all of its items, provided that
         the items are not already destroyed and the parent is not in
-        the process of being destroyed.
+        the process of being destroyed. The detached items are always
+        released, since they are not part of the client tree of the
+        parent.
 
         """
         super(Conditional, self).pre_destroy()
+        self._release_cached_items()
         if len(self._items) > 0:
             parent = self.parent
             if not parent.is_destroying:
@@ -68,7 +185,11 @@ class Conditional(Templated):
 
         """
         super(Conditional, self).post_destroy()
+        keep_alive_pool.discard(self)
         self._items = ()
+        self._cached_items = ()
+        self._scopes = ()
+        self._cached_scopes = ()
 
     #--------------------------------------------------------------------------
     # Private API
@@ -83,18 +204,94 @@ class Conditional(Templated):
         if self.is_active:
             self._refresh_conditional_items()
 
+    def _keep_alive_changed(self, keep_alive):
+        """ A private change handler for the `keep_alive` attribute.
+
+        Disabling the keep alive releases any detached items.
+
+        """
+        if not keep_alive:
+            self._release_cached_items()
+
+    def _derived_scopes(self):
+        """ Get the scopes of the live items of the conditional.
+
+        """
+        return self._scopes + self._cached_scopes
+
+    def _derived_items(self):
+        """ Get the live items of the conditional.
+
+        """
+        return self._items + self._cached_items
+
+    def _hold_items(self, items):
+        """ Hold detached items outside of the object tree.
+
+        The items were moved under the conditional. They are removed
+        from its children and from the name index of the tree, but they
+        keep the conditional as their parent.
+
+        """
+        held = set(items)
+        self._children = tuple(
+            child for child in self._children if child not in held
+        )
+        index = self._tree_name_index()
+        if index is not None:
+            for item in items:
+                index.remove_subtree(item)
+
+    def _unhold_items(self, items):
+        """ Make held items children of the conditional again.
+
+        This allows the parenting methods to move the items back into
+        the parent, or to unparent them before they are released.
+
+        """
+        self._children += tuple(items)
+
+    def _release_cached_items(self):
+        """ Destroy the detached items which are being kept alive.
+
+        Each item is unparented before it is destroyed, so that it
+        sends its own destroy action to the client even when the
+        conditional is being destroyed.
+
+        """
+        cached = self._cached_items
+        self._cached_items = ()
+        self._cached_scopes = ()
+        keep_alive_pool.discard(self)
+        if len(cached) > 0:
+            self._unhold_items(cached)
+            with self.children_event_context():
+                for item in cached:
+                    if not item.is_destroyed:
+                        item.set_parent(None)
+                        item.destroy()
+
     def _refresh_conditional_items(self):
         """ A private method which refreshes the conditional items.
 
-        This method destroys the old items and creates and initializes
-        the new items.
+        This method destroys or detaches the old items and creates and
+        initializes or re-attaches the new items.
 
         """
         items = []
+        scopes = []
         condition = self.condition
         templates = self._templates
+        cached = self._cached_items
 
-        if condition and len(templates) > 0:
+        if condition and len(cached) > 0:
+            items = cached
+            scopes = self._cached_scopes
+            self._cached_items = ()
+            self._cached_scopes = ()
+            keep_alive_pool.discard(self)
+            self._unhold_items(cached)
+        elif condition and len(templates) > 0:
             # Each template is a 3-tuple of identifiers, globals, and
             # list of description dicts. There will only typically be
             # one template, but more can exist if the conditional was
@@ -106,6 +303,7 @@ class Conditional(Templated):
                 # are constructed with no parent since they are
                 # parented via `insert_children` later on.
                 scope = identifiers.copy()
+                scopes.append((identifiers, scope))
                 for descr in descriptions:
                     cls = scope_lookup(descr['type'], f_globals, descr)
                     instance = cls()
@@ -114,15 +312,28 @@ class Conditional(Templated):
                     items.append(instance)
 
         old_items = self._items
+        old_scopes = self._scopes
         self._items = items = tuple(items)
+        self._scopes = tuple(scopes)
+        detach = self.keep_alive and not condition
         if len(old_items) > 0 or len(items) > 0:
             with self.parent.children_event_context():
                 if len(old_items) > 0:
-                    for old in old_items:
-                        if not old.is_destroyed:
-                            old.destroy()
+                    if detach:
+                        self.insert_children(None, old_items)
+                        self._hold_items(old_items)
+                    else:
+                        for old in old_items:
+                            if not old.is_destroyed:
+                                old.destroy()
                 if len(items) > 0:
                     self.parent.insert_children(self, items)
-                    for item in items:
-                        item.initialize()
+                    if items is not cached:
+                        for item in items:
+                            item.initialize()
+        if detach and len(old_items) > 0:
+            self._cached_items = old_items
+            self._cached_scopes = old_scopes
+            count = sum(len(list(item.traverse())) for item in old_items)
+            keep_alive_pool.add(self, count)
 
@@ -5,10 +5,12 @@
 from types import FunctionType
 
 from traits.api import (
-    Any, Property, Disallow, ReadOnly, CTrait, Instance, Uninitialized,
+    Any, Property, Disallow, ReadOnly, CTrait, Uninitialized,
 )
 
-from .dynamic_scope import DynamicAttributeError
+from .dynamic_scope import (
+    DynamicAttributeError, invalidate_resolution_caches
+)
 from .exceptions import DeclarativeNameError, OperatorLookupError
 from .object import Object
 from .operator_context import OperatorContext
@@ -90,7 +92,8 @@ def _compute_default(obj, name):
     except Exception:
         import traceback
         # XXX I'd rather not hack into Declarative's private api.
-        expr = obj._expressions[name]
+        table = obj._expressions
+        expr = table[table.index(name) + 1]
         filename = expr._func.func_code.co_filename
         lineno = expr._func.func_code.co_firstlineno
         args = (filename, lineno, traceback.format_exc())
@@ -223,6 +226,35 @@ def scope_lookup(name, scope, description):
     return item
 
 
+def make_binding_func(binding, f_globals):
+    """ Create the function object for a binding dict.
+
+    Parameters
+    ----------
+    binding : dict
+        A binding dict created by the enaml compiler.
+
+    f_globals : dict
+        The globals dict to associate with the function.
+
+    """
+    code = binding['code']
+    # If the code is a tuple, it represents a delegation expression
+    # which is a combination of subscription and update functions.
+    if isinstance(code, tuple):
+        sub_code, upd_code = code
+        func = FunctionType(sub_code, f_globals)
+        func._update = FunctionType(upd_code, f_globals)
+    else:
+        func = FunctionType(code, f_globals)
+    # A static dependency chain computed by the compiler lets the
+    # subscription operators evaluate without code tracing.
+    chain = binding.get('chain')
+    if chain is not None:
+        func._chain = chain
+    return func
+
+
 def setup_bindings(instance, bindings, identifiers, f_globals):
     """ Setup the expression bindings for a declarative instance.
 
@@ -251,16 +283,7 @@ def setup_bindings(instance, bindings, identifiers, f_globals):
             lineno = binding['lineno']
             block = binding['block']
             raise OperatorLookupError(opname, filename, lineno, block)
-        code = binding['code']
-        # If the code is a tuple, it represents a delegation
-        # expression which is a combination of subscription
-        # and update functions.
-        if isinstance(code, tuple):
-            sub_code, upd_code = code
-            func = FunctionType(sub_code, f_globals)
-            func._update = FunctionType(upd_code, f_globals)
-        else:
-            func = FunctionType(code, f_globals)
+        func = make_binding_func(binding, f_globals)
         operator(instance, binding['name'], func, identifiers)
 
 
@@ -286,19 +309,18 @@ class Declarative(Object):
     #: by user code.
     operators = ReadOnly
 
-    #: The dictionary of bound expression objects. XXX These dicts are
-    #: typically small and waste space. We need to switch to a more
-    #: space efficient hash table at some point in the future. For
-    #: pathological cases of large numbers of objects, the savings
-    #: can be as high as 20% of the heap size.
-    _expressions = Instance(dict, ())
+    #: The binding table of bound expression objects. A binding table
+    #: is None until the first binding is added, and is then a flat
+    #: list of alternating names and values. Objects have only a few
+    #: bindings, so a linear scan of the list is as fast as a dict
+    #: lookup while using a fraction of the space, and objects with
+    #: no bindings pay nothing. A value is never a string, so a name
+    #: can only match at an even index.
+    _expressions = Any
 
-    #: The dictionary of bound listener objects. XXX These dicts are
-    #: typically small and waste space. We need to switch to a more
-    #: space efficient hash table at some point in the future. For
-    #: pathological cases of large numbers of objects, the savings
-    #: can be as high as 20% of the heap size.
-    _listeners = Instance(dict, ())
+    #: The binding table of bound listener objects. The value for each
+    #: name is a list of the listeners bound to that name.
+    _listeners = Any
 
     def __init__(self, parent=None, **kwargs):
         """ Initialize a declarative component.
@@ -459,6 +481,9 @@ class Declarative(Object):
         if '@' in cls.__prefix_traits__:
             anytrait_handler = cls.__prefix_traits__['@']
             ctrait._notifiers(1).append(anytrait_handler)
+        # A new attribute can shadow a name which was resolved on an
+        # ancestor or in the globals.
+        invalidate_resolution_caches()
 
     #--------------------------------------------------------------------------
     # Public API
@@ -485,10 +510,16 @@ class Declarative(Object):
         if curr is None or curr.trait_type is Disallow:
             msg = "Cannot bind expression. %s object has no attribute '%s'"
             raise AttributeError(msg % (self, name))
-        dct = self._expressions
-        if name not in dct:
+        table = self._expressions
+        if table is None:
             _wire_default(self, name)
-        dct[name] = expression
+            self._expressions = [name, expression]
+        elif name in table:
+            table[table.index(name) + 1] = expression
+        else:
+            _wire_default(self, name)
+            table.append(name)
+            table.append(expression)
 
     def bind_listener(self, name, listener):
         """ A private method used by the Enaml execution engine.
@@ -513,12 +544,16 @@ class Declarative(Object):
         if curr is None or curr.trait_type is Disallow:
             msg = "Cannot bind listener. %s object has no attribute '%s'"
             raise AttributeError(msg % (self, name))
-        dct = self._listeners
-        if name not in dct:
-            dct[name] = [listener]
+        table = self._listeners
+        if table is None:
+            self._listeners = [name, [listener]]
             self.add_notifier(name, ListenerNotifier)
+        elif name in table:
+            table[table.index(name) + 1].append(listener)
         else:
-            dct[name].append(listener)
+            table.append(name)
+            table.append([listener])
+            self.add_notifier(name, ListenerNotifier)
 
     def eval_expression(self, name):
         """ Evaluate a bound expression with the given name.
@@ -535,9 +570,9 @@ class Declarative(Object):
             if there is no expression bound to the given name.
 
         """
-        dct = self._expressions
-        if name in dct:
-            return dct[name].eval(self, name)
+        table = self._expressions
+        if table is not None and name in table:
+            return table[table.index(name) + 1].eval(self, name)
         return NotImplemented
 
     def refresh_expression(self, name):
@@ -568,8 +603,8 @@ class Declarative(Object):
             The new value to pass to the listeners.
 
         """
-        dct = self._listeners
-        if name in dct:
-            for listener in dct[name]:
+        table = self._listeners
+        if table is not None and name in table:
+            for listener in table[table.index(name) + 1]:
                 listener.value_changed(self, name, old, new)
 
@@ -3,6 +3,7 @@
 #  All rights reserved.
 #------------------------------------------------------------------------------
 from abc import ABCMeta, abstractmethod
+from itertools import count
 
 
 #------------------------------------------------------------------------------
@@ -50,6 +51,151 @@ class DynamicAttributeError(AttributeError):
     pass
 
 
+#: The current generation of the resolution caches. It is advanced by
+#: a change which can alter the supplier of a name in any tree.
+_generation = 0
+
+
+#: The source of the scope epochs of reparented objects.
+_epochs = count(1)
+
+
+#: The number of low bits of the `_flags` of an object which are left
+#: to its owner. The scope epoch of the object is stored above them.
+SCOPE_EPOCH_SHIFT = 3
+
+
+def invalidate_resolution_caches():
+    """ Invalidate all of the dynamic scope resolution caches.
+
+    This must be called when an attribute is added to a class after
+    objects have been created. A reparented object should instead be
+    given a new epoch with `new_scope_epoch`.
+
+    """
+    global _generation
+    _generation += 1
+
+
+def new_scope_epoch():
+    """ Get a new scope epoch for a reparented object.
+
+    An object stores its epoch in its `_flags` attribute, shifted left
+    by `SCOPE_EPOCH_SHIFT` bits. Epochs increase monotonically, so a
+    cached resolution is invalidated by reparenting any object on the
+    ancestor chain it walked, and by nothing else.
+
+    Returns
+    -------
+    result : int
+        An epoch greater than all of the epochs handed out before.
+
+    """
+    return next(_epochs)
+
+
+class ResolutionCache(object):
+    """ A cache of the ancestors which supply the names of a binding.
+
+    A ResolutionCache is owned by an expression and remembers the depth
+    in the tree of the ancestor of the owner object which supplied a
+    given name, or that no ancestor supplies the name. This replaces
+    the exception driven walk of the parent chain with a short walk
+    which does not fail.
+
+    Each entry also records the highest scope epoch of the objects
+    whose parent was followed by the walk. The entry is used only
+    while that epoch is unchanged, so reparenting an object discards
+    only the entries which walked through it. Every cache is discarded
+    on the next lookup after a call to `invalidate_resolution_caches`.
+    The cache does not hold references to the objects in the tree.
+
+    """
+    __slots__ = ('_generation', '_depths')
+
+    def __init__(self):
+        """ Initialize a ResolutionCache.
+
+        """
+        self._generation = _generation
+        self._depths = None
+
+    def resolve(self, obj, name):
+        """ Resolve a name by walking the ancestors of an object.
+
+        Parameters
+        ----------
+        obj : Object
+            The object from which to start the walk.
+
+        name : str
+            The name of the attribute to resolve.
+
+        Returns
+        -------
+        result : tuple
+            A 2-tuple of the ancestor which supplied the name and the
+            value of the attribute.
+
+        Raises
+        ------
+        KeyError
+            No ancestor of the object has the named attribute.
+
+        """
+        depths = self._depths
+        if depths is None or self._generation != _generation:
+            depths = self._depths = {}
+            self._generation = _generation
+        elif name in depths:
+            depth, stamp = depths[name]
+            epoch = 0
+            parent = obj
+            if depth < 0:
+                while parent is not None:
+                    current = parent._flags >> SCOPE_EPOCH_SHIFT
+                    if current > epoch:
+                        epoch = current
+                    parent = parent._parent
+                if epoch == stamp:
+                    raise KeyError(name)
+            else:
+                while depth:
+                    current = parent._flags >> SCOPE_EPOCH_SHIFT
+                    if current > epoch:
+                        epoch = current
+                    parent = parent._parent
+                    depth -= 1
+                if epoch == stamp:
+                    try:
+                        return parent, getattr(parent, name)
+                    except DynamicAttributeError:
+                        raise
+                    except AttributeError:
+                        # The getter raised an AttributeError on this
+                        # pass, so fall back to the full walk.
+                        pass
+        depth = 0
+        stamp = 0
+        parent = obj
+        while parent is not None:
+            try:
+                value = getattr(parent, name)
+            except DynamicAttributeError:
+                raise
+            except AttributeError:
+                current = parent._flags >> SCOPE_EPOCH_SHIFT
+                if current > stamp:
+                    stamp = current
+                parent = parent._parent
+                depth += 1
+            else:
+                depths[name] = (depth, stamp)
+                return parent, value
+        depths[name] = (-1, stamp)
+        raise KeyError(name)
+
+
 class DynamicScope(object):
     """ A custom mapping object that implements Enaml's dynamic scope.
 
@@ -64,7 +210,7 @@ class DynamicScope(object):
     order to avoid unnecessary reference cycles.
 
     """
-    def __init__(self, obj, identifiers, overrides, listener):
+    def __init__(self, obj, identifiers, overrides, listener, cache=None):
         """ Initialize a DynamicScope.
 
         Parameters
@@ -83,11 +229,17 @@ class DynamicScope(object):
             A listener which should be notified when a name is loaded
             via dynamic scoping.
 
+        cache : ResolutionCache, optional
+            The cache to use for resolving names on the ancestors of
+            the object. If not provided, the ancestors are walked on
+            every lookup.
+
         """
         self._obj = obj
         self._identifiers = identifiers
         self._overrides = overrides
         self._listener = listener
+        self._cache = cache
 
     def __getitem__(self, name):
         """ Lookup and return an item from the scope.
@@ -109,6 +261,13 @@ class DynamicScope(object):
         dct = self._identifiers
         if name in dct:
             return dct[name]
+        cache = self._cache
+        if cache is not None:
+            parent, value = cache.resolve(self._obj, name)
+            listener = self._listener
+            if listener is not None:
+                listener.dynamic_load(parent, name, value)
+            return value
         parent = self._obj
         while parent is not None:
             try:
@@ -67,7 +67,12 @@ from .code_tracing import inject_tracing, inject_inversion
 #     out the object tree has been shifted to the Declarative class. This
 #     is a touch slower, but provides a ton more flexibility and enables
 #     templated components like `Looper` and `Conditional`.
-COMPILER_VERSION = 8
+# 9 : Static dependency chains - 14 March 2013
+#     This adds a 'chain' entry to the binding dicts of `<<` and `:=`
+#     expressions which are plain attribute chains such as `a.b.c`.
+#     The runtime evaluates these chains directly and observes the
+#     links of the chain, without running traced bytecode.
+COMPILER_VERSION = 9
 
 
 # The Enaml compiler translates an Enaml AST into a decription dict
@@ -266,6 +271,40 @@ def compile_notify(py_ast, filename):
     return bp_code.to_code()
 
 
+def static_dependency_chain(py_ast):
+    """ Get the static dependency chain of a subscription expression.
+
+    An expression which is a plain name or a chain of attribute loads
+    rooted at a name, such as `model.foo.bar`, depends only on the
+    links of the chain. Such an expression can be evaluated and
+    observed without code tracing.
+
+    Parameters
+    ----------
+    py_ast : ast.Expression
+        A Python ast Expression node.
+
+    Returns
+    -------
+    result : tuple or None
+        The tuple of names in the chain, starting with the root name,
+        or None if the expression is not a plain attribute chain.
+
+    """
+    names = []
+    node = py_ast.body
+    while isinstance(node, ast.Attribute):
+        names.append(node.attr)
+        node = node.value
+    # The 'nonlocals' name is supplied by the runtime scope and must
+    # be evaluated by the traced code.
+    if not isinstance(node, ast.Name) or node.id == 'nonlocals':
+        return None
+    names.append(node.id)
+    names.reverse()
+    return tuple(names)
+
+
 def compile_subscribe(py_ast, filename):
     """ Compile an ast into a code object implementing operator `<<`.
 
@@ -518,6 +557,10 @@ class DeclarationCompiler(_NodeVisitor):
             'filename': self.filename,
             'block': self.block,
         }
+        if op_compiler in (compile_subscribe, compile_delegate):
+            chain = static_dependency_chain(py_ast)
+            if chain is not None:
+                binding['chain'] = chain
         obj['bindings'].append(binding)
 
     def visit_Instantiation(self, node):
@@ -4,6 +4,10 @@
 #------------------------------------------------------------------------------
 from traits.api import MetaHasTraits
 
+from .instantiation_plan import (
+    instantiation_plan, discard_instantiation_plan
+)
+
 
 class EnamlDef(MetaHasTraits):
     """ The type of an enamldef.
@@ -61,11 +65,17 @@ class EnamlDef(MetaHasTraits):
         descriptions = ob_type._descriptions
         if len(descriptions) > 0:
             with self.children_event_context():
-                # Each description is an independent `enamldef` block
-                # which gets its own independent identifiers scope.
-                for description, f_globals in descriptions:
-                    identifiers = {}
-                    self.populate(description, identifiers, f_globals)
+                # The compiled plan for the type performs the same work
+                # as `populate` without walking the description dicts.
+                plan = instantiation_plan(ob_type, self.operators)
+                if plan is None or not plan.execute(self):
+                    if plan is not None:
+                        discard_instantiation_plan(ob_type)
+                    # Each description is an independent `enamldef`
+                    # block which gets its own identifiers scope.
+                    for description, f_globals in descriptions:
+                        identifiers = {}
+                        self.populate(description, identifiers, f_globals)
         if len(kwargs) > 0:
             for key, value in kwargs.iteritems():
                 setattr(self, key, value)
@@ -2,6 +2,7 @@
 #  Copyright (c) 2012, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
+import __builtin__
 from collections import namedtuple
 from weakref import ref
 
@@ -9,8 +10,12 @@ from traits.api import HasTraits, Disallow, TraitListObject, TraitDictObject
 
 from .abstract_expressions import AbstractExpression, AbstractListener
 from .code_tracing import CodeTracer, CodeInverter
-from .dynamic_scope import DynamicScope, AbstractScopeListener, Nonlocals
+from .declarative import Declarative
+from .dynamic_scope import (
+    DynamicScope, AbstractScopeListener, Nonlocals, ResolutionCache
+)
 from .funchelper import call_func
+from .update_scheduler import scheduler
 
 
 #------------------------------------------------------------------------------
@@ -192,7 +197,7 @@ class BaseExpression(object):
     """ The base class of the standard Enaml expression classes.
 
     """
-    __slots__ = ('_func', '_f_locals')
+    __slots__ = ('_func', '_f_locals', '_scope_cache')
 
     def __init__(self, func, f_locals):
         """ Initialize a BaseExpression.
@@ -210,6 +215,7 @@ class BaseExpression(object):
         """
         self._func = func
         self._f_locals = f_locals
+        self._scope_cache = ResolutionCache()
 
 
 #------------------------------------------------------------------------------
@@ -229,7 +235,9 @@ class SimpleExpression(BaseExpression):
 
         """
         overrides = {'nonlocals': Nonlocals(owner, None)}
-        scope = DynamicScope(owner, self._f_locals, overrides, None)
+        scope = DynamicScope(
+            owner, self._f_locals, overrides, None, self._scope_cache
+        )
         with owner.operators:
             return call_func(self._func, (), {}, scope)
 
@@ -260,7 +268,9 @@ class NotificationExpression(BaseExpression):
             'event': NotificationEvent(owner, name, old, new),
             'nonlocals': Nonlocals(owner, None),
         }
-        scope = DynamicScope(owner, self._f_locals, overrides, None)
+        scope = DynamicScope(
+            owner, self._f_locals, overrides, None, self._scope_cache
+        )
         with owner.operators:
             call_func(self._func, (), {}, scope)
 
@@ -287,7 +297,9 @@ class UpdateExpression(BaseExpression):
         nonlocals = Nonlocals(owner, None)
         overrides = {'nonlocals': nonlocals}
         inverter = StandardInverter(nonlocals)
-        scope = DynamicScope(owner, self._f_locals, overrides, None)
+        scope = DynamicScope(
+            owner, self._f_locals, overrides, None, self._scope_cache
+        )
         with owner.operators:
             call_func(self._func, (inverter, new), {}, scope)
 
@@ -302,9 +314,9 @@ class SubscriptionNotifier(object):
     """ A simple object used for attaching notification handlers.
 
     """
-    __slots__ = ('owner', 'name', 'keyval', '__weakref__')
+    __slots__ = ('owner', 'name', 'keyval', 'rank', 'upstream', '__weakref__')
 
-    def __init__(self, owner, name, keyval):
+    def __init__(self, owner, name, keyval, rank=0, upstream=()):
         """ Initialize a SubscriptionNotifier.
 
         Parameters
@@ -318,25 +330,79 @@ class SubscriptionNotifier(object):
         keyval : object
             An object to use for testing equivalency of notifiers.
 
+        rank : int, optional
+            The dependency rank of the expression, used to order the
+            evaluations of a batched update. See `UpdateScheduler`.
+
+        upstream : tuple, optional
+            The subscription expressions which compute the attributes
+            observed by the expression.
+
         """
         self.owner = ref(owner)
         self.name = name
         self.keyval = keyval
+        self.rank = rank
+        self.upstream = upstream
 
     def notify(self):
         """ Notify that the expression is invalid.
 
+        The expression is refreshed immediately, unless the update
+        scheduler is batching, in which case it is marked dirty.
+
+        """
+        if scheduler.batching:
+            scheduler.notify(self)
+        else:
+            self.refresh()
+
+    def dependencies(self):
+        """ Get the notifiers of the upstream expressions.
+
+        Returns
+        -------
+        result : generator
+            A generator which yields the current notifier of each of
+            the upstream expressions which has been evaluated.
+
+        """
+        for expr in self.upstream:
+            notifier = expr._notifier
+            if notifier is not None:
+                yield notifier
+
+    def refresh(self):
+        """ Refresh the expression on its owner.
+
         """
         owner = self.owner()
         if owner is not None:
             owner.refresh_expression(self.name)
 
 
+def _traceable(obj, name):
+    """ Get whether an attribute load should be observed.
+
+    This applies the same test as `TraitsTracer._trace_trait`.
+
+    """
+    if isinstance(obj, HasTraits):
+        trait = obj.trait(name)
+        return trait is not None and trait.trait_type is not Disallow
+    return False
+
+
 class SubscriptionExpression(BaseExpression):
     """ An implementation of AbstractExpression for the `<<` operator.
 
+    If the function has a `_chain` attribute, it is the static
+    dependency chain computed by the compiler for an expression of the
+    form `a.b.c`. Such an expression is evaluated by walking the chain
+    directly, which avoids the cost of running the traced bytecode.
+
     """
-    __slots__ = ('_notifier')
+    __slots__ = ('_notifier', '_chain')
 
     def __init__(self, func, f_locals):
         """ Initialize a SubscriptionExpression.
@@ -344,6 +410,78 @@ class SubscriptionExpression(BaseExpression):
         """
         super(SubscriptionExpression, self).__init__(func, f_locals)
         self._notifier = None
+        self._chain = getattr(func, '_chain', None)
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _eval_chain(self, owner):
+        """ Evaluate the static dependency chain of the expression.
+
+        The root name is resolved with the same rules as DynamicScope,
+        followed by the globals and builtins of the function.
+
+        Returns
+        -------
+        result : tuple
+            A 2-tuple of the value of the expression and the list of
+            (obj, name) pairs which should be observed.
+
+        """
+        chain = self._chain
+        traced = []
+        root = chain[0]
+        f_locals = self._f_locals
+        if root in f_locals:
+            value = f_locals[root]
+        else:
+            try:
+                parent, value = self._scope_cache.resolve(owner, root)
+            except KeyError:
+                f_globals = self._func.func_globals
+                if root in f_globals:
+                    value = f_globals[root]
+                else:
+                    builtins = f_globals.get('__builtins__', __builtin__)
+                    if not isinstance(builtins, dict):
+                        builtins = builtins.__dict__
+                    if root not in builtins:
+                        raise NameError("name '%s' is not defined" % root)
+                    value = builtins[root]
+            else:
+                if _traceable(parent, root):
+                    traced.append((parent, root))
+        for attr in chain[1:]:
+            if _traceable(value, attr):
+                traced.append((value, attr))
+            value = getattr(value, attr)
+        return value, traced
+
+    def _upstream(self, traced):
+        """ Get the subscription expressions feeding the expression.
+
+        Parameters
+        ----------
+        traced : list
+            The list of (obj, name) pairs observed by the expression.
+
+        Returns
+        -------
+        result : tuple
+            The subscription expressions bound to the observed
+            attributes of declarative objects.
+
+        """
+        upstream = []
+        for obj, attr in traced:
+            if isinstance(obj, Declarative):
+                table = obj._expressions
+                if table is not None and attr in table:
+                    expr = table[table.index(attr) + 1]
+                    if isinstance(expr, SubscriptionExpression):
+                        if expr is not self:
+                            upstream.append(expr)
+        return tuple(upstream)
 
     #--------------------------------------------------------------------------
     # AbstractExpression Interface
@@ -352,11 +490,21 @@ class SubscriptionExpression(BaseExpression):
         """ Evaluate and return the expression value.
 
         """
-        tracer = TraitsTracer()
-        overrides = {'nonlocals': Nonlocals(owner, tracer)}
-        scope = DynamicScope(owner, self._f_locals, overrides, tracer)
-        with owner.operators:
-            result = call_func(self._func, (tracer,), {}, scope)
+        if self._chain is not None:
+            with owner.operators:
+                result, traced = self._eval_chain(owner)
+            # The order of a chain is fixed, so no sort is needed.
+            keyval = tuple((id(obj), attr) for obj, attr in traced)
+        else:
+            tracer = TraitsTracer()
+            overrides = {'nonlocals': Nonlocals(owner, tracer)}
+            scope = DynamicScope(
+                owner, self._f_locals, overrides, tracer, self._scope_cache
+            )
+            with owner.operators:
+                result = call_func(self._func, (tracer,), {}, scope)
+            traced = tracer.traced_items
+            keyval = tuple(sorted((id(obj), attr) for obj, attr in traced))
 
         # In most cases, the objects comprising the dependencies of an
         # expression will not change during subsequent evaluations of
@@ -368,11 +516,20 @@ class SubscriptionExpression(BaseExpression):
         # the object are not maintained by the expression. A sorted
         # tuple is used instead of a frozenset to reduced the memory
         # footprint. It is slightly slower to compute but ~5x smaller.
-        traced = tracer.traced_items
-        keyval = tuple(sorted((id(obj), attr) for obj, attr in traced))
         notifier = self._notifier
         if notifier is None or keyval != notifier.keyval:
-            notifier = SubscriptionNotifier(owner, name, keyval)
+            # The rank is derived from the subscription graph, so that
+            # a batched update evaluates this expression after all of
+            # the expressions which feed it.
+            rank = notifier.rank if notifier is not None else 0
+            upstream = self._upstream(traced)
+            for expr in upstream:
+                source = expr._notifier
+                if source is not None and source.rank >= rank:
+                    rank = source.rank + 1
+            notifier = SubscriptionNotifier(
+                owner, name, keyval, rank, upstream
+            )
             self._notifier = notifier
             handler = notifier.notify
             for obj, attr in traced:
@@ -403,7 +560,9 @@ class DelegationExpression(SubscriptionExpression):
         nonlocals = Nonlocals(owner, None)
         inverter = StandardInverter(nonlocals)
         overrides = {'nonlocals': nonlocals}
-        scope = DynamicScope(owner, self._f_locals, overrides, None)
+        scope = DynamicScope(
+            owner, self._f_locals, overrides, None, self._scope_cache
+        )
         with owner.operators:
             call_func(self._func._update, (inverter, new), {}, scope)
 
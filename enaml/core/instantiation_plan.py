@@ -0,0 +1,295 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import sys
+
+from .declarative import Declarative, make_binding_func, scope_lookup
+from .exceptions import DeclarativeNameError, OperatorLookupError
+
+
+#: The default populate function, which a plan is able to replace.
+_default_populate = Declarative.populate.im_func
+
+
+def has_default_populate(cls):
+    """ Get whether a class uses the default `Declarative.populate`.
+
+    Parameters
+    ----------
+    cls : type
+        The Declarative subclass of interest.
+
+    """
+    return cls.populate.im_func is _default_populate
+
+
+class BlockPlan(object):
+    """ The instantiation plan for one `enamldef` block.
+
+    A block plan is a flat list of steps in the order which the default
+    `Declarative.populate` would visit the description tree. The types
+    of the children are resolved, the operators are looked up, and the
+    binding functions are created once, when the plan is compiled. The
+    binding functions are shared by every instance created by the plan.
+
+    The subtree of a child whose class reimplements `populate` is not
+    expanded, and the child is populated by its own method instead.
+
+    """
+    __slots__ = ('_f_globals', '_types', '_steps')
+
+    def __init__(self, description, f_globals, operators):
+        """ Compile a BlockPlan.
+
+        Parameters
+        ----------
+        description : dict
+            The description dict for the block.
+
+        f_globals : dict
+            The globals dict for the block.
+
+        operators : OperatorContext
+            The operator context to use for resolving operators.
+
+        Raises
+        ------
+        DeclarativeNameError
+            A child type could not be resolved.
+
+        OperatorLookupError
+            A binding operator could not be resolved.
+
+        """
+        self._f_globals = f_globals
+        self._types = []
+        self._steps = []
+        self._compile(description, -1, None, operators)
+
+    def _compile(self, description, parent, cls, operators):
+        """ Compile the steps for a description and its children.
+
+        A step is a tuple of (parent, cls, description, identifier,
+        bindings, custom). The parent is the index of the step which
+        created the parent, or -1 for the root of the block.
+
+        """
+        index = len(self._steps)
+        custom = cls is not None and not has_default_populate(cls)
+        bindings = ()
+        if not custom:
+            bindings = tuple(
+                self._compile_binding(binding, operators)
+                for binding in description['bindings']
+            )
+        step = (
+            parent, cls, description, description['identifier'], bindings,
+            custom,
+        )
+        self._steps.append(step)
+        if not custom:
+            f_globals = self._f_globals
+            for child in description['children']:
+                name = child['type']
+                child_cls = scope_lookup(name, f_globals, child)
+                self._types.append((name, child_cls))
+                self._compile(child, index, child_cls, operators)
+
+    def _compile_binding(self, binding, operators):
+        """ Compile a binding into an (operator, name, func) tuple.
+
+        """
+        opname = binding['operator']
+        try:
+            operator = operators[opname]
+        except KeyError:
+            filename = binding['filename']
+            lineno = binding['lineno']
+            block = binding['block']
+            raise OperatorLookupError(opname, filename, lineno, block)
+        func = make_binding_func(binding, self._f_globals)
+        return (operator, binding['name'], func)
+
+    def is_valid(self):
+        """ Get whether the resolved types are still current.
+
+        """
+        f_globals = self._f_globals
+        for name, cls in self._types:
+            if f_globals.get(name) is not cls:
+                return False
+        return True
+
+    def execute(self, root, identifiers):
+        """ Populate a root object by executing the plan.
+
+        Parameters
+        ----------
+        root : Declarative
+            The instance which is the root of the block.
+
+        identifiers : dict
+            The identifiers scope for the block.
+
+        """
+        f_globals = self._f_globals
+        nodes = []
+        # The stack of (index, context) pairs for the open children
+        # event contexts. The steps are in depth-first order, so the
+        # subtree of a step ends with the first step whose parent is
+        # not below it, and the context of the step is closed there,
+        # just as `populate` closes it when the subtree is populated.
+        contexts = []
+        try:
+            for parent, cls, descr, ident, bindings, custom in self._steps:
+                if parent < 0:
+                    instance = root
+                else:
+                    while contexts and contexts[-1][0] != parent:
+                        contexts.pop()[1].__exit__(None, None, None)
+                    instance = cls(nodes[parent])
+                    context = instance.children_event_context()
+                    context.__enter__()
+                    contexts.append((len(nodes), context))
+                nodes.append(instance)
+                if custom:
+                    instance.populate(descr, identifiers, f_globals)
+                    continue
+                if ident:
+                    identifiers[ident] = instance
+                for operator, name, func in bindings:
+                    operator(instance, name, func, identifiers)
+        except:
+            exc_info = sys.exc_info()
+            while contexts:
+                contexts.pop()[1].__exit__(*exc_info)
+            raise exc_info[0], exc_info[1], exc_info[2]
+        while contexts:
+            contexts.pop()[1].__exit__(None, None, None)
+
+
+class FailedPlan(object):
+    """ A marker for a type whose plan could not be compiled.
+
+    The marker is cached in place of a plan, so that the failure is
+    not compiled again for every instance. It is only valid for the
+    operator context in which the compile failed.
+
+    """
+    __slots__ = ('_operators',)
+
+    def __init__(self, operators):
+        """ Initialize a FailedPlan.
+
+        Parameters
+        ----------
+        operators : OperatorContext
+            The operator context in which the compile failed.
+
+        """
+        self._operators = operators
+
+
+class InstantiationPlan(object):
+    """ The compiled instantiation plan for an `enamldef` type.
+
+    The plan replaces the walk of the description dicts which is done
+    by `Declarative.populate` each time the type is instantiated. It is
+    compiled once per type and operator context, and is only used for
+    types which do not reimplement `populate`.
+
+    """
+    __slots__ = ('_operators', '_blocks')
+
+    def __init__(self, cls, operators):
+        """ Compile an InstantiationPlan.
+
+        Parameters
+        ----------
+        cls : EnamlDef
+            The enamldef type to compile.
+
+        operators : OperatorContext
+            The operator context of the instances.
+
+        """
+        self._operators = operators
+        self._blocks = tuple(
+            BlockPlan(description, f_globals, operators)
+            for description, f_globals in cls._descriptions
+        )
+
+    def execute(self, instance):
+        """ Populate a new instance of the type.
+
+        Parameters
+        ----------
+        instance : Declarative
+            The new instance to populate.
+
+        Returns
+        -------
+        result : bool
+            True if the instance was populated. False if the plan is
+            stale and nothing was done, in which case the instance must
+            be populated with `populate`.
+
+        """
+        if instance.operators is not self._operators:
+            return False
+        blocks = self._blocks
+        for block in blocks:
+            if not block.is_valid():
+                return False
+        for block in blocks:
+            # Each block gets its own independent identifiers scope.
+            block.execute(instance, {})
+        return True
+
+
+def instantiation_plan(cls, operators):
+    """ Get the instantiation plan for an enamldef type.
+
+    Parameters
+    ----------
+    cls : EnamlDef
+        The enamldef type of interest.
+
+    operators : OperatorContext
+        The operator context of the new instance.
+
+    Returns
+    -------
+    result : InstantiationPlan or None
+        The plan for the type, or None if the type must be populated
+        with `populate`.
+
+    """
+    plan = cls.__dict__.get('_instantiation_plan')
+    if plan is False:
+        return None
+    if plan is not None and plan._operators is operators:
+        if isinstance(plan, FailedPlan):
+            return None
+        return plan
+    if not has_default_populate(cls):
+        type.__setattr__(cls, '_instantiation_plan', False)
+        return None
+    try:
+        plan = InstantiationPlan(cls, operators)
+    except (DeclarativeNameError, OperatorLookupError):
+        # Let the regular populate path report the error, and remember
+        # the failure so the plan is not compiled for every instance.
+        type.__setattr__(cls, '_instantiation_plan', FailedPlan(operators))
+        return None
+    type.__setattr__(cls, '_instantiation_plan', plan)
+    return plan
+
+
+def discard_instantiation_plan(cls):
+    """ Discard the cached instantiation plan for an enamldef type.
+
+    """
+    if '_instantiation_plan' in cls.__dict__:
+        type.__setattr__(cls, '_instantiation_plan', None)
@@ -2,12 +2,108 @@
 #  Copyright (c) 2013, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-from collections import Iterable
+from collections import Iterable, Sequence, Sized, defaultdict, deque
+from itertools import islice
+from types import CodeType
 
-from traits.api import Instance, Property, Tuple
+from traits.api import (
+    Any, Bool, Callable, Either, Instance, Int, Property, Tuple,
+)
 
 from .declarative import scope_lookup
 from .templated import Templated
+from .update_scheduler import batch_updates
+
+
+#: The names of the loop variables added to the scope of an iteration.
+LOOP_NAMES = frozenset(('loop_index', 'loop_item'))
+
+
+def _uses_names(code, names):
+    """ Get whether a code object or its nested code loads a name.
+
+    Parameters
+    ----------
+    code : types.CodeType
+        The code object to inspect.
+
+    names : frozenset
+        The set of names of interest.
+
+    """
+    if not names.isdisjoint(code.co_names):
+        return True
+    for const in code.co_consts:
+        if isinstance(const, CodeType) and _uses_names(const, names):
+            return True
+    return False
+
+
+def _refresh_iteration(iteration, scopes, names):
+    """ Refresh the expressions of an iteration which use loop names.
+
+    The expressions which were declared directly in the body of the
+    loop share the scopes of the iteration. The items created by a
+    templated object in the body, such as a `Conditional`, use copies
+    of those scopes, so the changed loop variables are first copied
+    into them. Only the expressions which use one of these scopes are
+    refreshed.
+
+    Parameters
+    ----------
+    iteration : tuple
+        The tuple of items created for the iteration.
+
+    scopes : tuple
+        The tuple of scope dicts of the iteration.
+
+    names : frozenset
+        The names of the loop variables which were changed.
+
+    """
+    # The items of a templated object are siblings of it, so those of
+    # a templated object at the top level of the body are walked too.
+    objects = []
+    seen = set()
+    roots = deque(iteration)
+    while roots:
+        for obj in roots.popleft().traverse():
+            if id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            objects.append(obj)
+            if isinstance(obj, Templated):
+                roots.extend(obj._derived_items())
+    sources = dict((id(scope), scope) for scope in scopes)
+    templated = [obj for obj in objects if isinstance(obj, Templated)]
+    # A derived scope may itself be the scope of a nested templated
+    # object, so the propagation is repeated until nothing changes.
+    propagated = True
+    while propagated:
+        propagated = False
+        for obj in templated:
+            for identifiers, scope in obj._derived_scopes():
+                source = sources.get(id(identifiers))
+                if source is None or id(scope) in sources:
+                    continue
+                for name in names:
+                    scope[name] = source[name]
+                sources[id(scope)] = scope
+                propagated = True
+    for obj in objects:
+        # A refreshed condition may have destroyed some of the items.
+        if obj.is_destroyed:
+            continue
+        table = getattr(obj, '_expressions', None)
+        if not table:
+            continue
+        pairs = zip(table[::2], table[1::2])
+        for name, expr in pairs:
+            if id(getattr(expr, '_f_locals', None)) not in sources:
+                continue
+            func = getattr(expr, '_func', None)
+            if func is not None and _uses_names(func.func_code, names):
+                obj.refresh_expression(name)
 
 
 class Looper(Templated):
@@ -25,12 +121,81 @@ class Looper(Templated):
     it creates. When the iterable for the looper is changed, the old
     items will be destroyed.
 
+    When `keyed` is True, a change to the iterable is applied as a diff
+    keyed on the result of the `key` callable for each item, or on the
+    item itself if `key` is not provided. The iterations of unchanged
+    keys keep their items and are moved into place, and only the items
+    of inserted or removed keys are created or destroyed. All of the
+    changes are published to the client as a single children change.
+    When the loop variables of a kept iteration change, the bound
+    expressions in the body of the loop which use them are refreshed,
+    including those of the items of a nested `Conditional`. Keys must
+    be hashable.
+
+    When `window` is a (start, count) tuple, only the items of the
+    iterable in that range are instantiated, so the cost of the looper
+    is proportional to the size of the window instead of the length of
+    the iterable. The iterations are recycled as the window moves: an
+    iteration whose index leaves the window is rebound to an index
+    which entered it, and its expressions which use the loop variables
+    are refreshed.
+
+    The items outside of the window are represented by the leading and
+    trailing `spacers`, which are the extents of the items before and
+    after the window given the `item_extent` of one iteration. The
+    `layout_items` of the looper place the items of the window between
+    the spacers, so that a box layout of the scrolled content keeps the
+    full height of the iterable and the items at their offset. The
+    window is typically bound to the viewport of a `ScrollArea`:
+
+        ScrollArea:
+            id: scroller
+            Container:
+                constraints << [vbox(*looper.layout_items)]
+                Looper:
+                    id: looper
+                    iterable = rows
+                    item_extent = 24
+                    window << (scroller.viewport[1] // 24,
+                               scroller.viewport[3] // 24 + 2)
+                    Label:
+                        text = loop_item.name
+
+    The windowed mode takes precedence over the keyed mode.
+
     Creating a `Looper` without a parent is a programming error.
 
     """
     #: The iterable to use when creating the items for the looper.
     iterable = Instance(Iterable)
 
+    #: Whether changes to the iterable should be applied as a keyed
+    #: diff instead of rebuilding every iteration.
+    keyed = Bool(False)
+
+    #: An optional callable which returns the key for an item of the
+    #: iterable. If not provided, the item itself is the key.
+    key = Callable
+
+    #: The (start, count) range of the iterable to instantiate, or None
+    #: if every item of the iterable should be instantiated.
+    window = Either(None, Tuple(Int, Int))
+
+    #: The extent, in pixels along the direction of the window, of the
+    #: items of one iteration. It is used to compute the `spacers` of a
+    #: window, which are zero if the extent is not positive.
+    item_extent = Int(0)
+
+    #: A read-only property which returns the (leading, trailing)
+    #: extents of the items of the iterable which are before and after
+    #: the window. Both are zero if the looper is not windowed.
+    spacers = Property(fget=lambda self: self._spacers, depends_on='_spacers')
+
+    #: A read-only property which returns the flat list of the items of
+    #: the looper between the leading and trailing spacer extents. It
+    #: is suitable as the items of a `vbox` or `hbox` layout helper.
+    layout_items = Property(depends_on=['_items', '_spacers'])
+
     #: A read-only property which returns the tuple of items created
     #: by the looper when it passes over the objects in the iterable.
     #: Each item in the tuple represents one iteration of the loop and
@@ -40,6 +205,16 @@ class Looper(Templated):
     #: Private storage for the `items` property.
     _items = Tuple
 
+    #: The tuple of scope tuples for each iteration, in the order of
+    #: the items. These are not type-checked for performance reasons.
+    _scopes = Any(())
+
+    #: The tuple of keys for each iteration when keyed.
+    _keys = Any(())
+
+    #: Private storage for the `spacers` property.
+    _spacers = Tuple(Int, Int)
+
     #--------------------------------------------------------------------------
     # Lifetime API
     #--------------------------------------------------------------------------
@@ -81,6 +256,23 @@ class Looper(Templated):
         super(Looper, self).post_destroy()
         self.iterable = None
         self._items = ()
+        self._scopes = ()
+        self._keys = ()
+        self._spacers = (0, 0)
+
+    #--------------------------------------------------------------------------
+    # Property Handlers
+    #--------------------------------------------------------------------------
+    def _get_layout_items(self):
+        """ The property getter for the 'layout_items' attribute.
+
+        """
+        leading, trailing = self._spacers
+        flat = [leading]
+        for iteration in self._items:
+            flat.extend(iteration)
+        flat.append(trailing)
+        return flat
 
     #--------------------------------------------------------------------------
     # Private API
@@ -95,42 +287,160 @@ class Looper(Templated):
         if self.is_active:
             self._refresh_loop_items()
 
+    def _window_changed(self):
+        """ A private change handler for the `window` attribute.
+
+        If the window changes while the looper is active, the loop
+        items will be refreshed.
+
+        """
+        if self.is_active:
+            self._refresh_loop_items()
+
+    def _item_extent_changed(self):
+        """ A private change handler for the `item_extent` attribute.
+
+        """
+        self._update_spacers()
+
+    def _update_spacers(self):
+        """ Update the spacer extents of the items outside the window.
+
+        The trailing extent of an iterable which is not sized is zero,
+        since the number of its items is not known.
+
+        """
+        window = self.window
+        iterable = self.iterable
+        extent = self.item_extent
+        if window is None or iterable is None or extent <= 0:
+            self._spacers = (0, 0)
+            return
+        start, count = window
+        start = max(start, 0)
+        stop = start + max(count, 0)
+        if isinstance(iterable, Sized):
+            length = len(iterable)
+            leading = min(start, length)
+            trailing = max(length - stop, 0)
+        else:
+            leading = start
+            trailing = 0
+        self._spacers = (leading * extent, trailing * extent)
+
+    def _key_func(self):
+        """ Get the callable which computes the key for an item.
+
+        """
+        key = self.key
+        if key is None:
+            return lambda item: item
+        return key
+
+    def _create_iteration(self, loop_index, loop_item):
+        """ Create the items for a single iteration of the loop.
+
+        Returns
+        -------
+        result : tuple
+            A 2-tuple of the tuple of new items and the tuple of scope
+            dicts used to create them.
+
+        """
+        iteration = []
+        scopes = []
+        # Each template is a 3-tuple of identifiers, globals, and list
+        # of description dicts. There will only typically be one
+        # template, but more can exist if the looper was subclassed via
+        # enamldef to provided default children.
+        for identifiers, f_globals, descriptions in self._templates:
+            # Each iteration of the loop gets a new scope which is the
+            # union of the existing scope and the loop variables. This
+            # also allows the loop children to add their own independent
+            # identifiers. The loop items are constructed with no parent
+            # since they are parented via `insert_children` later on.
+            scope = identifiers.copy()
+            scope['loop_index'] = loop_index
+            scope['loop_item'] = loop_item
+            for descr in descriptions:
+                cls = scope_lookup(descr['type'], f_globals, descr)
+                instance = cls()
+                with instance.children_event_context():
+                    instance.populate(descr, scope, f_globals)
+                iteration.append(instance)
+            scopes.append(scope)
+        return tuple(iteration), tuple(scopes)
+
+    @staticmethod
+    def _rebind_iteration(scopes, loop_index, loop_item):
+        """ Update the loop variables in the scopes of an iteration.
+
+        Returns
+        -------
+        result : set
+            The set of the names of the loop variables which changed.
+
+        """
+        changed = set()
+        for scope in scopes:
+            if scope['loop_index'] != loop_index:
+                scope['loop_index'] = loop_index
+                changed.add('loop_index')
+            if scope['loop_item'] is not loop_item:
+                scope['loop_item'] = loop_item
+                changed.add('loop_item')
+        return changed
+
+    def _window_items(self):
+        """ Get the (loop_index, loop_item) pairs inside the window.
+
+        """
+        iterable = self.iterable
+        if iterable is None:
+            return []
+        start, count = self.window
+        start = max(start, 0)
+        stop = start + max(count, 0)
+        if isinstance(iterable, Sequence):
+            return list(enumerate(iterable[start:stop], start))
+        return list(islice(enumerate(iterable), start, stop))
+
     def _refresh_loop_items(self):
         """ A private method which refreshes the loop items.
 
         This method destroys the old items and creates and initializes
-        the new items.
+        the new items. If the looper is windowed, the items are
+        recycled, and if it is keyed and the keys of the old items are
+        known, the items are diffed.
 
         """
+        if self.window is not None:
+            self._recycle_loop_items()
+            return
+
+        if self.keyed and len(self._keys) == len(self._items):
+            self._diff_loop_items()
+            return
+
         items = []
+        scopes = []
+        keys = []
         iterable = self.iterable
-        templates = self._templates
 
-        if iterable is not None and len(templates) > 0:
+        if iterable is not None and len(self._templates) > 0:
+            key_func = self._key_func() if self.keyed else None
             for loop_index, loop_item in enumerate(iterable):
-                # Each template is a 3-tuple of identifiers, globals, and
-                # list of description dicts. There will only typically be
-                # one template, but more can exist if the looper was
-                # subclassed via enamldef to provided default children.
-                iteration = []
-                for identifiers, f_globals, descriptions in templates:
-                    # Each iteration of the loop gets a new scope which
-                    # is the union of the existing scope and the loop
-                    # variables. This also allows the loop children to
-                    # add their own independent identifiers. The loop
-                    # items are constructed with no parent since they
-                    # are parented via `insert_children` later on.
-                    scope = identifiers.copy()
-                    scope['loop_index'] = loop_index
-                    scope['loop_item'] = loop_item
-                    for descr in descriptions:
-                        cls = scope_lookup(descr['type'], f_globals, descr)
-                        instance = cls()
-                        with instance.children_event_context():
-                            instance.populate(descr, scope, f_globals)
-                        iteration.append(instance)
-                items.append(tuple(iteration))
+                iteration, iter_scopes = self._create_iteration(
+                    loop_index, loop_item
+                )
+                items.append(iteration)
+                scopes.append(iter_scopes)
+                if key_func is not None:
+                    keys.append(key_func(loop_item))
 
+        self._keys = tuple(keys)
+        self._scopes = tuple(scopes)
+        self._spacers = (0, 0)
         old_items = self._items
         self._items = items = tuple(items)
         if len(old_items) > 0 or len(items) > 0:
@@ -146,3 +456,153 @@ class Looper(Templated):
                     for item in flat:
                         item.initialize()
 
+    def _diff_loop_items(self):
+        """ A private method which applies a keyed diff to the items.
+
+        The iterations of the keys which are still present are reused
+        and reordered, the iterations of new keys are created, and the
+        iterations of missing keys are destroyed. Duplicate keys are
+        matched in order.
+
+        """
+        old_items = self._items
+        old_scopes = self._scopes
+        available = defaultdict(deque)
+        for idx, key in enumerate(self._keys):
+            available[key].append(idx)
+
+        items = []
+        scopes = []
+        keys = []
+        created = []
+        stale = []
+        iterable = self.iterable
+        if iterable is not None and len(self._templates) > 0:
+            key_func = self._key_func()
+            for loop_index, loop_item in enumerate(iterable):
+                key = key_func(loop_item)
+                indices = available.get(key)
+                if indices:
+                    idx = indices.popleft()
+                    iteration = old_items[idx]
+                    iter_scopes = old_scopes[idx]
+                    changed = self._rebind_iteration(
+                        iter_scopes, loop_index, loop_item
+                    )
+                    if changed:
+                        stale.append((iteration, iter_scopes, changed))
+                else:
+                    iteration, iter_scopes = self._create_iteration(
+                        loop_index, loop_item
+                    )
+                    created.extend(iteration)
+                items.append(iteration)
+                scopes.append(iter_scopes)
+                keys.append(key)
+
+        removed = []
+        for indices in available.itervalues():
+            for idx in indices:
+                removed.extend(old_items[idx])
+
+        self._keys = tuple(keys)
+        self._scopes = tuple(scopes)
+        self._spacers = (0, 0)
+        self._apply_loop_items(items, created, removed, stale)
+
+    def _recycle_loop_items(self):
+        """ A private method which updates the items of the window.
+
+        The iterations whose index is still inside the window are kept
+        as-is. The iterations whose index left the window are rebound
+        to the indices which entered it. Iterations are only created
+        or destroyed when the size of the window changes.
+
+        """
+        old_items = self._items
+        old_scopes = self._scopes
+        visible = []
+        if len(self._templates) > 0:
+            visible = self._window_items()
+
+        slots = {}
+        for idx, iter_scopes in enumerate(old_scopes):
+            slots[iter_scopes[0]['loop_index']] = idx
+        wanted = set(loop_index for loop_index, ignored in visible)
+        free = deque(
+            idx for loop_index, idx in sorted(slots.iteritems())
+            if loop_index not in wanted
+        )
+
+        items = []
+        scopes = []
+        created = []
+        stale = []
+        for loop_index, loop_item in visible:
+            idx = slots.get(loop_index)
+            if idx is None and free:
+                idx = free.popleft()
+            if idx is not None:
+                iteration = old_items[idx]
+                iter_scopes = old_scopes[idx]
+                changed = self._rebind_iteration(
+                    iter_scopes, loop_index, loop_item
+                )
+                if changed:
+                    stale.append((iteration, iter_scopes, changed))
+            else:
+                iteration, iter_scopes = self._create_iteration(
+                    loop_index, loop_item
+                )
+                created.extend(iteration)
+            items.append(iteration)
+            scopes.append(iter_scopes)
+
+        removed = []
+        for idx in free:
+            removed.extend(old_items[idx])
+
+        self._keys = ()
+        self._scopes = tuple(scopes)
+        # The spacers and the items are published in one batch, so the
+        # layout items are re-evaluated once by a bound expression.
+        with batch_updates():
+            self._update_spacers()
+            self._apply_loop_items(items, created, removed, stale)
+
+    def _apply_loop_items(self, items, created, removed, stale):
+        """ Apply a new set of loop items to the parent of the looper.
+
+        Parameters
+        ----------
+        items : list
+            The list of iteration tuples in their new order.
+
+        created : list
+            The list of newly created items.
+
+        removed : list
+            The list of old items which should be destroyed.
+
+        stale : list
+            A list of (iteration, scopes, names) tuples for the kept
+            iterations whose loop variables were changed.
+
+        """
+        old_items = self._items
+        self._items = items = tuple(items)
+        if created or removed or items != old_items:
+            # A single children event context collapses all of the
+            # changes into one children change on the parent.
+            parent = self.parent
+            with parent.children_event_context():
+                for old in removed:
+                    if not old.is_destroyed:
+                        old.destroy()
+                if len(items) > 0:
+                    flat = [item for iteration in items for item in iteration]
+                    parent.insert_children(self, flat)
+                    for item in created:
+                        item.initialize()
+        for iteration, iter_scopes, changed in stale:
+            _refresh_iteration(iteration, iter_scopes, frozenset(changed))
@@ -4,6 +4,7 @@
 #------------------------------------------------------------------------------
 from traits.api import Instance, Uninitialized
 
+from enaml.snapshot_stream import SnapshotStream
 from enaml.utils import LoopbackGuard
 
 from .declarative import Declarative
@@ -19,7 +20,11 @@ class PublishAttributeNotifier(object):
 
         """
         if old is not Uninitialized and name not in obj.loopback_guard:
-            obj.send_action('set_' + name, {name: new})
+            session = obj.session
+            if session is not None and session.coalesce_attributes:
+                obj.batch_attribute(name, new)
+            else:
+                obj.send_action('set_' + name, {name: new})
 
     def equals(self, other):
         """ Compares this notifier against another for equality.
@@ -59,7 +64,9 @@ class ChildrenChangedTask(object):
         """ Create the content dictionary for the task.
 
         This method will also initialize and activate any new objects
-        which were added to the parent.
+        which were added to the parent. Added objects which are already
+        active exist on the client, so they are sent in the 'moved'
+        list by id instead of as a snapshot.
 
         """
         event = self._event
@@ -68,6 +75,11 @@ class ChildrenChangedTask(object):
         old_set = set(event.old)
         added = new_set - old_set
         removed = old_set - new_set
+        moved = set(obj for obj in added if obj.is_active)
+        added -= moved
+        content['moved'] = [
+            c.object_id for c in moved if isinstance(c, Messenger)
+        ]
         for obj in added:
             if obj.is_inactive:
                 obj.initialize()
@@ -81,6 +93,8 @@ class ChildrenChangedTask(object):
             c.snapshot() for c in added if isinstance(c, Messenger)
         ]
         session = self._parent.session
+        if session.compact_snapshots:
+            content['added'] = session.pack_snapshot(content['added'])
         for obj in added:
             if obj.is_initialized:
                 obj.activate(session)
@@ -132,6 +146,10 @@ class Messenger(Declarative):
         the current state of the widget tree which can be used by client
         side implementation to construct their own implementation tree.
 
+        If a SnapshotStream is active, the children returned by the
+        `deferred_children` method are left out of the snapshot and
+        are recorded with the stream.
+
         Returns
         -------
         result : dict
@@ -144,9 +162,33 @@ class Messenger(Declarative):
         snap['name'] = self.name
         snap['class'] = self.class_name()
         snap['bases'] = self.base_names()
-        snap['children'] = [c.snapshot() for c in self.snap_children()]
+        children = self.snap_children()
+        stream = SnapshotStream.active()
+        if stream is not None:
+            deferred = self.deferred_children()
+            if deferred:
+                stream.defer(self, deferred)
+                children = [c for c in children if c not in deferred]
+        snap['children'] = [c.snapshot() for c in children]
         return snap
 
+    def deferred_children(self):
+        """ Get the children whose snapshots may be streamed later.
+
+        When the initial snapshot of a session is streamed, the
+        subtrees of these children are sent to the client after the
+        first paint of the windows. The default implementation returns
+        an empty list. Subclasses should reimplement this method to
+        defer children which are not initially visible.
+
+        Returns
+        -------
+        result : list
+            The list of snapshot children which may be deferred.
+
+        """
+        return []
+
     def snap_children(self):
         """ Get an iterable of children to include in the snapshot.
 
@@ -222,7 +264,9 @@ class Messenger(Declarative):
         of simple attribute publishing. More complex cases will need
         to implement their own dispatching handlers. The handler for
         the changes will only send the action message if the attribute
-        name is not held by the loopback guard.
+        name is not held by the loopback guard. If the session has
+        enabled `coalesce_attributes`, the changes are batched and only
+        the last value set during an event loop cycle is sent.
 
         Parameters
         ----------
@@ -0,0 +1,237 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from collections import defaultdict
+from operator import itemgetter
+
+
+def _bfs_sorted(objects):
+    """ Sort the objects of a tree in breadth first traversal order.
+
+    The sort key of an object is its depth followed by the path of
+    child indices from the root of its tree. The positions of the
+    children of a parent are computed once per sort.
+
+    Parameters
+    ----------
+    objects : iterable
+        The objects to sort. They must belong to the same tree.
+
+    Returns
+    -------
+    result : list
+        The sorted objects. An object which is being moved, and is not
+        yet a child of its new parent, is left out.
+
+    """
+    positions = {}
+    keyed = []
+    for obj in objects:
+        path = []
+        node = obj
+        parent = node._parent
+        while parent is not None:
+            table = positions.get(parent)
+            if table is None:
+                table = positions[parent] = dict(
+                    (child, idx) for idx, child in enumerate(parent._children)
+                )
+            idx = table.get(node)
+            if idx is None:
+                path = None
+                break
+            path.append(idx)
+            node = parent
+            parent = node._parent
+        if path is not None:
+            path.reverse()
+            keyed.append(((len(path), path), obj))
+    keyed.sort(key=itemgetter(0))
+    return [obj for key, obj in keyed]
+
+
+def _is_descendant(obj, root):
+    """ Get whether an object is a root or one of its descendants.
+
+    """
+    while obj is not None:
+        if obj is root:
+            return True
+        obj = obj._parent
+    return False
+
+
+class NameIndex(object):
+    """ An index of the names and types of the objects in a tree.
+
+    A NameIndex is owned by the root object of a tree, and is kept up
+    to date incrementally by the Object parenting methods. It turns the
+    exact name lookups of `find` and `find_all`, and the lookups of
+    `find_by_type`, into dictionary lookups. Only the objects with a
+    non-empty name are entered in the name table.
+
+    Each indexed object holds a reference to the index in its
+    `_tree_index` attribute, so the index of a tree is found without
+    walking to the root. The breadth first order of the objects for a
+    name or a type is computed on the first lookup and kept until the
+    tree changes, so repeated lookups in a stable tree do not walk the
+    tree at all.
+
+    The index is created by `Object.enable_name_index`. While no index
+    exists in the process, the parenting methods skip the maintenance.
+
+    """
+    #: The number of indices which are currently enabled. This is used
+    #: by the parenting methods to skip the index lookups.
+    active = 0
+
+    def __init__(self):
+        """ Initialize a NameIndex.
+
+        """
+        self._names = defaultdict(set)
+        self._types = defaultdict(set)
+        self._name_orders = {}
+        self._type_orders = {}
+        NameIndex.active += 1
+
+    def release(self):
+        """ Release the index when its root no longer owns it.
+
+        """
+        for bucket in self._types.itervalues():
+            for obj in bucket:
+                if obj._tree_index is self:
+                    obj._tree_index = None
+        self._names.clear()
+        self._types.clear()
+        self.invalidate()
+        NameIndex.active -= 1
+
+    def invalidate(self):
+        """ Discard the cached orders after the tree has changed.
+
+        This is called by the parenting methods when objects are moved
+        or reordered within the tree.
+
+        """
+        self._name_orders.clear()
+        self._type_orders.clear()
+
+    def add_subtree(self, root):
+        """ Add an object and all of its descendants to the index.
+
+        """
+        names = self._names
+        types = self._types
+        for obj in root.traverse():
+            obj._tree_index = self
+            name = obj.name
+            if name:
+                names[name].add(obj)
+            types[type(obj)].add(obj)
+        self.invalidate()
+
+    def remove_subtree(self, root):
+        """ Remove an object and all of its descendants from the index.
+
+        Objects which are not in the index are ignored.
+
+        """
+        names = self._names
+        types = self._types
+        for obj in root.traverse():
+            if obj._tree_index is self:
+                obj._tree_index = None
+            name = obj.name
+            if name and name in names:
+                bucket = names[name]
+                bucket.discard(obj)
+                if not bucket:
+                    del names[name]
+            kind = type(obj)
+            if kind in types:
+                bucket = types[kind]
+                bucket.discard(obj)
+                if not bucket:
+                    del types[kind]
+        self.invalidate()
+
+    def rename(self, obj, old, new):
+        """ Update the name table for an object which was renamed.
+
+        """
+        names = self._names
+        orders = self._name_orders
+        if old and old in names:
+            bucket = names[old]
+            bucket.discard(obj)
+            if not bucket:
+                del names[old]
+            orders.pop(old, None)
+        if new:
+            names[new].add(obj)
+            orders.pop(new, None)
+
+    def lookup_name(self, name, root):
+        """ Get the objects under a root which have a given name.
+
+        Parameters
+        ----------
+        name : str
+            The exact name of interest. It must not be empty.
+
+        root : Object
+            The object which is the root of the search.
+
+        Returns
+        -------
+        result : list
+            The matching objects in breadth first order.
+
+        """
+        orders = self._name_orders
+        ordered = orders.get(name)
+        if ordered is None:
+            bucket = self._names.get(name)
+            if not bucket:
+                return []
+            ordered = orders[name] = _bfs_sorted(bucket)
+        return self._filtered(ordered, root)
+
+    def lookup_type(self, kind, root):
+        """ Get the objects under a root which are instances of a type.
+
+        Parameters
+        ----------
+        kind : type
+            The type of interest. Instances of subclasses match.
+
+        root : Object
+            The object which is the root of the search.
+
+        Returns
+        -------
+        result : list
+            The matching objects in breadth first order.
+
+        """
+        orders = self._type_orders
+        ordered = orders.get(kind)
+        if ordered is None:
+            found = []
+            for obj_type, bucket in self._types.iteritems():
+                if issubclass(obj_type, kind):
+                    found.extend(bucket)
+            ordered = orders[kind] = _bfs_sorted(found)
+        return self._filtered(ordered, root)
+
+    @staticmethod
+    def _filtered(ordered, root):
+        """ Filter ordered objects to the subtree of a root.
+
+        """
+        if root._parent is None:
+            return list(ordered)
+        return [obj for obj in ordered if _is_descendant(obj, root)]
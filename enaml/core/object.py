@@ -7,11 +7,13 @@ import logging
 import re
 
 from traits.api import (
-    HasStrictTraits, Disallow, Property, Str, Enum, ReadOnly, Any,
+    HasStrictTraits, Disallow, Property, Str, ReadOnly, Any, TraitError,
 )
 
 from enaml.utils import make_dispatcher, id_generator
 
+from .dynamic_scope import SCOPE_EPOCH_SHIFT, new_scope_epoch
+from .name_index import NameIndex
 from .trait_types import EnamlEvent
 
 
@@ -38,6 +40,34 @@ ParentEvent = namedtuple('ParentEvent', 'old new')
 object_id_generator = id_generator('o_')
 
 
+#: The lifecycle states of an Object, in order of progression.
+OBJECT_STATES = (
+    'inactive', 'initializing', 'initialized', 'activating', 'active',
+    'destroying', 'destroyed',
+)
+
+
+#: The indices of the lifecycle states, used by the state properties.
+(_INACTIVE, _INITIALIZING, _INITIALIZED, _ACTIVATING, _ACTIVE,
+ _DESTROYING, _DESTROYED) = range(len(OBJECT_STATES))
+
+
+#: A mapping of state name to state index.
+_STATE_INDICES = dict((state, idx) for idx, state in enumerate(OBJECT_STATES))
+
+
+#: The low bits of the flags of an Object which hold its state index.
+#: The scope epoch of the object is stored in the bits above them.
+_STATE_MASK = (1 << SCOPE_EPOCH_SHIFT) - 1
+
+
+def _state_test(index):
+    """ Create a property getter which tests the state of an Object.
+
+    """
+    return lambda self: self._flags & _STATE_MASK == index
+
+
 class ChildrenEventContext(object):
     """ A context manager which will emit a child event on an Object.
 
@@ -156,37 +186,41 @@ class Object(HasStrictTraits):
 
     #: The current state of the object in terms of its lifetime within
     #: a session. This value should not be manipulated by user code.
-    state = Enum(
-        'inactive', 'initializing', 'initialized', 'activating', 'active',
-        'destroying', 'destroyed',
-    )
+    #: The state is one of the strings in `OBJECT_STATES`. It is stored
+    #: as an index into that tuple in the low bits of the flags of the
+    #: object, which also hold its scope epoch, so the two cost a
+    #: single entry in the instance dict. Changes are notified.
+    state = Property
 
     #: A read-only property which is True if the object is inactive.
-    is_inactive = Property(fget=lambda self: self.state == 'inactive')
+    is_inactive = Property(fget=_state_test(_INACTIVE))
 
     #: A read-only property which is True if the object is initializing.
-    is_initializing = Property(fget=lambda self: self.state == 'initializing')
+    is_initializing = Property(fget=_state_test(_INITIALIZING))
 
     #: A read-only property which is True if the object is initialized.
-    is_initialized = Property(fget=lambda self: self.state == 'initialized')
+    is_initialized = Property(fget=_state_test(_INITIALIZED))
 
     #: A read-only property which is True if the object is activating.
-    is_activating = Property(fget=lambda self: self.state == 'activating')
+    is_activating = Property(fget=_state_test(_ACTIVATING))
 
     #: A read-only property which is True if the object is active.
-    is_active = Property(fget=lambda self: self.state == 'active')
+    is_active = Property(fget=_state_test(_ACTIVE))
 
     #: A read-only property which is True if the object is destroying.
-    is_destroying = Property(fget=lambda self: self.state == 'destroying')
+    is_destroying = Property(fget=_state_test(_DESTROYING))
 
     #: A read-only property which is True if the object is destroyed.
-    is_destroyed = Property(fget=lambda self: self.state == 'destroyed')
+    is_destroyed = Property(fget=_state_test(_DESTROYED))
 
     #: Private storage traits. These should *never* be manipulated by
     #: user code. For performance reasons, these are not type-checked.
     _parent = Any       # Object or None
     _children = Any     # tuple of Object
     _session = Any      # Session or None
+    _flags = Any(0)     # int, state index | scope epoch << shift
+    _name_index = Any   # NameIndex or None, only set on a root object
+    _tree_index = Any   # NameIndex or None, the index of the tree
 
     def __init__(self, parent=None, **kwargs):
         """ Initialize an Object.
@@ -212,6 +246,40 @@ class Object(HasStrictTraits):
             for key, value in kwargs.iteritems():
                 setattr(self, key, value)
 
+    #--------------------------------------------------------------------------
+    # Property Handlers
+    #--------------------------------------------------------------------------
+    def _get_state(self):
+        """ The property getter for the 'state' attribute.
+
+        """
+        return OBJECT_STATES[self._flags & _STATE_MASK]
+
+    def _set_state(self, state):
+        """ The property setter for the 'state' attribute.
+
+        """
+        new = _STATE_INDICES.get(state)
+        if new is None:
+            msg = "The 'state' of an Object must be one of %s, not %r."
+            raise TraitError(msg % (OBJECT_STATES, state))
+        flags = self._flags
+        old = flags & _STATE_MASK
+        if new != old:
+            self._flags = flags & ~_STATE_MASK | new
+            self.trait_property_changed('state', OBJECT_STATES[old], state)
+
+    #--------------------------------------------------------------------------
+    # Trait Change Handlers
+    #--------------------------------------------------------------------------
+    def _name_changed(self, old, new):
+        """ Keep the name index of the tree up to date.
+
+        """
+        index = self._tree_name_index()
+        if index is not None:
+            index.rename(self, old, new)
+
     #--------------------------------------------------------------------------
     # Lifetime API
     #--------------------------------------------------------------------------
@@ -254,7 +322,8 @@ class Object(HasStrictTraits):
         """ Called by a Session to activate the object tree.
 
         This method is called by a Session object to activate the object
-        tree for messaging.
+        tree for messaging. Children whose activation is deferred by the
+        session are left inactive.
 
         Parameters
         ----------
@@ -266,8 +335,10 @@ class Object(HasStrictTraits):
         self.pre_activate(session)
         self._session = session
         session.register(self)
+        is_deferred = session.is_deferred
         for child in self._children:
-            child.activate(session)
+            if not is_deferred(child):
+                child.activate(session)
         self.state = 'active'
         self.post_activate(session)
 
@@ -314,6 +385,12 @@ class Object(HasStrictTraits):
         parent = self._parent
         if parent is None or not parent.is_destroying:
             self.batch_action('destroy', {})
+            index = self._tree_name_index()
+            if index is not None:
+                index.remove_subtree(self)
+        if self._name_index is not None:
+            self._name_index.release()
+            self._name_index = None
         self.state = 'destroying'
         self.pre_destroy()
         if self._children:
@@ -382,16 +459,30 @@ class Object(HasStrictTraits):
             raise ValueError('cannot use `self` as Object parent')
         if parent is not None and not isinstance(parent, Object):
             raise TypeError('parent must be an Object or None')
+        old_index = self._tree_name_index()
         self._parent = parent
+        if old_index is not None:
+            # The cached orders are stale while the object is moved.
+            old_index.invalidate()
+        # The ancestors which supply the dynamically scoped names of
+        # this object and its descendants may have changed.
+        self._advance_scope_epoch()
         self.parent_event(ParentEvent(old_parent, parent))
         if old_parent is not None:
             old_kids = old_parent._children
             idx = old_kids.index(self)
             with old_parent.children_event_context():
                 old_parent._children = old_kids[:idx] + old_kids[idx + 1:]
+        # The index is updated once the object is in the children of
+        # its new parent, since the index orders the objects by their
+        # position in the children.
         if parent is not None:
             with parent.children_event_context():
                 parent._children += (self,)
+                if NameIndex.active:
+                    self._update_name_index(old_index)
+        elif NameIndex.active:
+            self._update_name_index(old_index)
 
     def insert_children(self, before, insert):
         """ Insert children into this object at the given location.
@@ -438,10 +529,16 @@ class Object(HasStrictTraits):
         if not added:
             new.extend(insert_tup)
 
+        moved = []
         for child in insert_tup:
             old_parent = child._parent
             if old_parent is not self:
+                old_index = child._tree_name_index()
+                moved.append((child, old_index))
                 child._parent = self
+                if old_index is not None:
+                    old_index.invalidate()
+                child._advance_scope_epoch()
                 child.parent_event(ParentEvent(old_parent, self))
                 if old_parent is not None:
                     old_kids = old_parent._children
@@ -452,6 +549,63 @@ class Object(HasStrictTraits):
 
         with self.children_event_context():
             self._children = tuple(new)
+            if NameIndex.active:
+                for child, old_index in moved:
+                    child._update_name_index(old_index)
+                # The children may have been reordered in place.
+                index = self._tree_index
+                if index is not None:
+                    index.invalidate()
+
+    def _advance_scope_epoch(self):
+        """ Give this object a new scope epoch after a reparent.
+
+        """
+        epoch = new_scope_epoch() << SCOPE_EPOCH_SHIFT
+        self._flags = self._flags & _STATE_MASK | epoch
+
+    def _tree_name_index(self):
+        """ Get the name index of the tree containing this object.
+
+        Returns
+        -------
+        result : NameIndex or None
+            The index owned by the root object, or None if the tree is
+            not indexed.
+
+        """
+        return self._tree_index
+
+    def _update_name_index(self, old_index):
+        """ Move this subtree between name indices after a reparent.
+
+        Parameters
+        ----------
+        old_index : NameIndex or None
+            The index of the tree which contained the object before it
+            was reparented.
+
+        """
+        own_index = self._name_index
+        parent = self._parent
+        if own_index is not None and parent is not None:
+            # A root which joins another tree gives up its own index.
+            self._name_index = None
+            own_index.release()
+            if old_index is own_index:
+                old_index = None
+        if parent is not None:
+            new_index = parent._tree_index
+        else:
+            new_index = self._name_index
+        if old_index is not new_index:
+            if old_index is not None:
+                old_index.remove_subtree(self)
+            if new_index is not None:
+                new_index.add_subtree(self)
+        elif new_index is not None:
+            # The subtree moved within the tree.
+            new_index.invalidate()
 
     def parent_event(self, event):
         """ Handle a `ParentEvent` posted to this object.
@@ -569,6 +723,26 @@ class Object(HasStrictTraits):
         if self.is_active:
             self._session.batch_task(self.object_id, action, task)
 
+    def batch_attribute(self, name, value):
+        """ Batch a 'set_<name>' action for an attribute change.
+
+        Unlike `batch_action`, repeated calls for the same attribute
+        before the batch is sent are collapsed, so that only the last
+        value is sent to the client. The action will only be batched
+        if the current state of the object is `active`.
+
+        Parameters
+        ----------
+        name : str
+            The name of the changed attribute.
+
+        value : object
+            The new value of the attribute.
+
+        """
+        if self.is_active:
+            self._session.batch_attribute(self.object_id, name, value)
+
     def receive_action(self, action, content):
         """ Receive an action from the client of this object.
 
@@ -669,6 +843,11 @@ class Object(HasStrictTraits):
             object is found with the given name.
 
         """
+        if not regex and name:
+            index = self._tree_name_index()
+            if index is not None:
+                found = index.lookup_name(name, self)
+                return found[0] if found else None
         if regex:
             rgx = re.compile(name)
             match = lambda n: bool(rgx.match(n))
@@ -703,6 +882,10 @@ class Object(HasStrictTraits):
             list if no objects are found with the given name.
 
         """
+        if not regex and name:
+            index = self._tree_name_index()
+            if index is not None:
+                return index.lookup_name(name, self)
         if regex:
             rgx = re.compile(name)
             match = lambda n: bool(rgx.match(n))
@@ -715,6 +898,53 @@ class Object(HasStrictTraits):
                 push(obj)
         return res
 
+    def find_by_type(self, kind):
+        """ Find all objects in the subtree which are of a given type.
+
+        Parameters
+        ----------
+        kind : type or tuple of types
+            The type of the objects for which to search. Instances of
+            subclasses also match.
+
+        Returns
+        -------
+        result : list of Object
+            The list of matching objects in breadth first order, or an
+            empty list if no objects match.
+
+        """
+        index = self._tree_name_index()
+        if index is not None:
+            return index.lookup_type(kind, self)
+        return [obj for obj in self.traverse() if isinstance(obj, kind)]
+
+    def enable_name_index(self):
+        """ Maintain an index of the names and types in this tree.
+
+        While enabled, exact name lookups by `find` and `find_all` and
+        lookups by `find_by_type` are served from the index instead of
+        by a traversal of the tree. The index is kept up to date as the
+        tree changes. It must be enabled on the root object, and it is
+        discarded if the root is later parented or destroyed.
+
+        """
+        if self._parent is not None:
+            raise ValueError('the name index must be enabled on a root')
+        if self._name_index is None:
+            index = NameIndex()
+            index.add_subtree(self)
+            self._name_index = index
+
+    def disable_name_index(self):
+        """ Discard the name index of this tree, if it exists.
+
+        """
+        index = self._name_index
+        if index is not None:
+            self._name_index = None
+            index.release()
+
     #--------------------------------------------------------------------------
     # HasTraits Fixes
     #--------------------------------------------------------------------------
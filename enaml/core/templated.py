@@ -56,3 +56,42 @@ class Templated(Declarative):
             template = (identifiers, f_globals, children)
             self._templates.append(template)
 
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _derived_scopes(self):
+        """ Get the scopes of the live items which are copies of the
+        scopes of the templates.
+
+        A `Looper` which keeps an iteration when its loop variables
+        change uses this to rebind the loop variables in the scopes of
+        the items created by templated objects in the body of the loop.
+        A templated object which defines the loop variables in the
+        scopes of its items should not report them. The default
+        implementation returns an empty tuple.
+
+        Returns
+        -------
+        result : tuple
+            A tuple of (identifiers, scope) pairs, where identifiers is
+            the scope of a template and scope is the copy of it used to
+            create live items.
+
+        """
+        return ()
+
+    def _derived_items(self):
+        """ Get the live items created from the scopes reported by
+        `_derived_scopes`.
+
+        The default implementation returns an empty tuple.
+
+        Returns
+        -------
+        result : tuple
+            The tuple of items, which may or may not be descendants of
+            the parent of the templated object.
+
+        """
+        return ()
+
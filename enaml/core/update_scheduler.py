@@ -0,0 +1,286 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from heapq import heappush, heappop
+from itertools import count
+
+
+class UpdateScheduler(object):
+    """ A scheduler for the batched re-evaluation of `<<` expressions.
+
+    By default, a change to a dependency of a subscription expression
+    re-evaluates the expression immediately. While the scheduler is
+    batching, a change only marks the expression dirty, and every dirty
+    expression is re-evaluated once when the batch is flushed.
+
+    Dirty expressions are evaluated in order of their rank. The rank of
+    an expression is derived from the subscription graph when it is
+    created, and is higher than the ranks of the expressions feeding
+    it. Before an expression is evaluated, it is deferred above any of
+    its upstream expressions which are still dirty, so an expression is
+    evaluated once per flush even when its rank is out of date. When
+    the evaluation of an expression dirties another expression through
+    a dependency outside of the graph, the rank of the latter is raised
+    above the former. Ranks are remembered between flushes.
+
+    There is a single scheduler per process; the methods of this class
+    must only be called from the main thread.
+
+    """
+    def __init__(self):
+        """ Initialize an UpdateScheduler.
+
+        """
+        #: True if notifications should be batched. This is kept up to
+        #: date for fast testing by the subscription notifiers.
+        self.batching = False
+        self._enabled = False
+        self._depth = 0
+        self._flushing = False
+        self._flush_posted = False
+        self._rank = 0
+        self._heap = []
+        self._dirty = {}
+        self._order = count()
+        self._notifications = 0
+        self._evaluations = 0
+        self._saved = 0
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _update_batching(self):
+        """ Update the fast `batching` flag.
+
+        """
+        self.batching = self._enabled or self._depth > 0 or self._flushing
+
+    def _post_flush(self):
+        """ Post a flush of the dirty expressions to the event loop.
+
+        If there is no application, the expressions are flushed
+        immediately.
+
+        """
+        if self._flush_posted:
+            return
+        from enaml.application import Application
+        app = Application.instance()
+        if app is None:
+            self.flush()
+        else:
+            self._flush_posted = True
+            app.deferred_call(self._on_flush_posted)
+
+    def _required_rank(self, notifier, seen):
+        """ Compute the lowest rank at which a notifier may be
+        evaluated after all of its dirty upstream notifiers.
+
+        Parameters
+        ----------
+        notifier : SubscriptionNotifier
+            The notifier of interest.
+
+        seen : set
+            The notifiers already visited, which breaks cycles.
+
+        Returns
+        -------
+        result : int
+            The required rank, or 0 if no upstream notifier is dirty.
+
+        """
+        dirty = self._dirty
+        rank = 0
+        for source in notifier.dependencies():
+            if source in dirty and source not in seen:
+                seen.add(source)
+                source_rank = max(
+                    dirty[source], self._required_rank(source, seen)
+                )
+                if source_rank >= rank:
+                    rank = source_rank + 1
+        return rank
+
+    def _on_flush_posted(self):
+        """ Handle the flush posted to the event loop.
+
+        """
+        self._flush_posted = False
+        self.flush()
+
+    #--------------------------------------------------------------------------
+    # Public API
+    #--------------------------------------------------------------------------
+    def set_enabled(self, enabled):
+        """ Set whether notifications are batched outside of a
+        `batch_updates` block.
+
+        When enabled, the dirty expressions are flushed on the next
+        cycle of the application event loop.
+
+        """
+        self._enabled = enabled
+        self._update_batching()
+        if not enabled and self._depth == 0:
+            self.flush()
+
+    def enabled(self):
+        """ Get whether batching is enabled outside of a block.
+
+        """
+        return self._enabled
+
+    def begin(self):
+        """ Begin a batch of updates. Batches may be nested.
+
+        """
+        self._depth += 1
+        self._update_batching()
+
+    def end(self):
+        """ End a batch of updates, flushing the dirty expressions if
+        the outermost batch was ended.
+
+        """
+        self._depth -= 1
+        self._update_batching()
+        if self._depth == 0:
+            self.flush()
+
+    def notify(self, notifier):
+        """ Handle the notification of a subscription notifier.
+
+        Parameters
+        ----------
+        notifier : SubscriptionNotifier
+            The notifier for the expression which was invalidated. It
+            must have a mutable `rank`, and `dependencies` and
+            `refresh` methods.
+
+        """
+        self._notifications += 1
+        if self._flushing and notifier.rank <= self._rank:
+            notifier.rank = self._rank + 1
+        rank = notifier.rank
+        dirty = self._dirty
+        if dirty.get(notifier) == rank:
+            self._saved += 1
+            return
+        dirty[notifier] = rank
+        heappush(self._heap, (rank, next(self._order), notifier))
+        if not self._flushing and self._depth == 0:
+            self._post_flush()
+
+    def flush(self):
+        """ Re-evaluate the dirty expressions in rank order.
+
+        """
+        if self._flushing:
+            return
+        self._flushing = True
+        self._update_batching()
+        heap = self._heap
+        dirty = self._dirty
+        deferred = set()
+        try:
+            while heap:
+                rank, ignored, notifier = heappop(heap)
+                # Skip the stale entries of notifiers which have since
+                # been raised to a higher rank.
+                if dirty.get(notifier) != rank:
+                    continue
+                # Defer a notifier whose upstream notifiers are still
+                # dirty. A notifier is deferred at most once per flush
+                # so that a dependency cycle cannot stall the flush.
+                if notifier not in deferred:
+                    required = self._required_rank(notifier, set([notifier]))
+                    if required > rank:
+                        deferred.add(notifier)
+                        notifier.rank = dirty[notifier] = required
+                        heappush(heap, (required, next(self._order), notifier))
+                        continue
+                del dirty[notifier]
+                self._rank = rank
+                self._evaluations += 1
+                notifier.refresh()
+        finally:
+            self._rank = 0
+            self._flushing = False
+            self._update_batching()
+
+    def stats(self):
+        """ Get the batching statistics of the scheduler.
+
+        Returns
+        -------
+        result : dict
+            A dict with the number of batched 'notifications', the
+            number of 'evaluations' run by flushes, and the number of
+            notifications 'saved' by merging them into an evaluation
+            which was already pending.
+
+        """
+        return {
+            'notifications': self._notifications,
+            'evaluations': self._evaluations,
+            'saved': self._saved,
+        }
+
+    def reset_stats(self):
+        """ Reset the batching statistics to zero.
+
+        """
+        self._notifications = 0
+        self._evaluations = 0
+        self._saved = 0
+
+
+#: The process wide update scheduler.
+scheduler = UpdateScheduler()
+
+
+class batch_updates(object):
+    """ A context manager which batches `<<` re-evaluations.
+
+    Within the block, changes to the dependencies of subscription
+    expressions only mark the expressions dirty. When the outermost
+    block exits, each dirty expression is re-evaluated once, so no
+    intermediate values are published.
+
+        with batch_updates():
+            model.first = 'Jane'
+            model.last = 'Doe'
+
+    """
+    def __enter__(self):
+        scheduler.begin()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        scheduler.end()
+
+
+def set_batched_updates(enabled):
+    """ Set whether `<<` re-evaluations are always batched.
+
+    When enabled, the dirty expressions are re-evaluated on the next
+    cycle of the application event loop instead of immediately.
+
+    Parameters
+    ----------
+    enabled : bool
+        Whether to enable the batched propagation mode.
+
+    """
+    scheduler.set_enabled(enabled)
+
+
+def update_stats():
+    """ Get the batching statistics of the update scheduler.
+
+    See `UpdateScheduler.stats`.
+
+    """
+    return scheduler.stats()
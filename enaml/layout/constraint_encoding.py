@@ -0,0 +1,268 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" A compact, flat encoding of lists of linear constraints.
+
+The encoding replaces the nested `as_dict` trees of the constraints
+with a dict of flat lists, which are cheap to serialize and to decode.
+Each constraint is normalized to the form `expr op 0`. The constraint
+variables are hash-consed into a symbol table, so each distinct
+variable is sent and resolved only once. The keys of the dict are:
+
+    symbols
+        The list of [owner, name] pairs of the constraint variables.
+
+    ops
+        The operator code of each constraint, an index into OPERATORS.
+
+    strengths
+        The strength code of each constraint, an index into STRENGTHS.
+
+    weights
+        The weight of each constraint.
+
+    constants
+        The constant of the normalized expression of each constraint.
+
+    sizes
+        The number of terms in the expression of each constraint.
+
+    vars
+        The symbol index of each term, for all of the constraints.
+
+    coeffs
+        The coefficient of each term, for all of the constraints.
+
+"""
+from itertools import izip
+
+from .constraint_variable import ConstraintVariable, Term, almost_equal
+
+
+#: The constraint operators, indexed by their code.
+OPERATORS = ('==', '<=', '>=')
+
+
+#: The constraint strengths, indexed by their code.
+STRENGTHS = ('required', 'strong', 'medium', 'weak')
+
+
+#: A mapping of operator to operator code.
+_OPERATOR_CODES = dict((op, idx) for idx, op in enumerate(OPERATORS))
+
+
+#: A mapping of strength to strength code.
+_STRENGTH_CODES = dict((name, idx) for idx, name in enumerate(STRENGTHS))
+
+
+def _collect_terms(symbolic, sign, terms):
+    """ Accumulate the terms of a linear symbolic into a dict.
+
+    Parameters
+    ----------
+    symbolic : LinearSymbolic
+        The side of a constraint to accumulate.
+
+    sign : float
+        The sign to apply to the coefficients and constant.
+
+    terms : dict
+        The dict of (owner, name) -> coefficient to update.
+
+    Returns
+    -------
+    result : float
+        The signed constant of the symbolic.
+
+    """
+    if isinstance(symbolic, ConstraintVariable):
+        pairs = ((symbolic, 1.0),)
+        constant = 0.0
+    elif isinstance(symbolic, Term):
+        pairs = ((symbolic.var, symbolic.coeff),)
+        constant = 0.0
+    else:
+        pairs = ((term.var, term.coeff) for term in symbolic.terms)
+        constant = symbolic.constant
+    for var, coeff in pairs:
+        key = (var.owner, var.name)
+        terms[key] = terms.get(key, 0.0) + sign * coeff
+    return sign * constant
+
+
+def encode_constraints(constraints):
+    """ Encode linear constraints into the flat constraint encoding.
+
+    Constraints whose normalized expression has no terms are constant
+    and are left out of the encoding.
+
+    Parameters
+    ----------
+    constraints : iterable
+        The LinearConstraint objects to encode.
+
+    Returns
+    -------
+    result : dict
+        The flat encoding of the constraints.
+
+    """
+    symbols = []
+    indices = {}
+    ops = []
+    strengths = []
+    weights = []
+    constants = []
+    sizes = []
+    variables = []
+    coeffs = []
+    for cn in constraints:
+        terms = {}
+        constant = _collect_terms(cn.lhs, 1.0, terms)
+        constant += _collect_terms(cn.rhs, -1.0, terms)
+        size = 0
+        for key, coeff in terms.iteritems():
+            if almost_equal(coeff, 0.0):
+                continue
+            index = indices.get(key)
+            if index is None:
+                index = indices[key] = len(symbols)
+                symbols.append(list(key))
+            variables.append(index)
+            coeffs.append(coeff)
+            size += 1
+        if size == 0:
+            continue
+        ops.append(_OPERATOR_CODES[cn.op])
+        strengths.append(_STRENGTH_CODES[cn.strength])
+        weights.append(cn.weight)
+        constants.append(constant)
+        sizes.append(size)
+    encoded = {
+        'symbols': symbols,
+        'ops': ops,
+        'strengths': strengths,
+        'weights': weights,
+        'constants': constants,
+        'sizes': sizes,
+        'vars': variables,
+        'coeffs': coeffs,
+    }
+    return encoded
+
+
+def canonical_constraints(encoded):
+    """ Compute a canonical form of a constraint encoding.
+
+    Two encodings of the same constraints have the same canonical form,
+    even if their terms were collected in a different order, or if the
+    box helpers which generated them minted different owner ids. The
+    owner id of a box helper has the form 'name|uuid', and is replaced
+    by the name and the order of the first appearance of the owner.
+
+    Parameters
+    ----------
+    encoded : dict
+        The flat encoding created by `encode_constraints`. An empty
+        list or None is accepted as an empty encoding.
+
+    Returns
+    -------
+    result : tuple
+        A hashable tuple with an (op, strength, weight, constant,
+        terms) tuple for each constraint, where terms is a sorted
+        tuple of (owner, name, coefficient) tuples.
+
+    """
+    if not encoded:
+        return ()
+    # The helper owners are sorted by their name only, so the order of
+    # the terms does not depend on the random part of the ids.
+    symbols = []
+    for owner, name in encoded['symbols']:
+        prefix, sep, ignored = owner.partition('|')
+        helper = prefix + sep if sep else None
+        symbols.append((helper or owner, name, owner, helper))
+    variables = encoded['vars']
+    coeffs = encoded['coeffs']
+    rows = []
+    start = 0
+    for size in encoded['sizes']:
+        end = start + size
+        terms = [
+            (symbols[variables[idx]], coeffs[idx])
+            for idx in xrange(start, end)
+        ]
+        terms.sort(key=lambda term: (term[0][:2], term[1]))
+        rows.append(terms)
+        start = end
+    renamed = {}
+    canonical = []
+    others = izip(
+        encoded['ops'], encoded['strengths'], encoded['weights'],
+        encoded['constants'],
+    )
+    for terms, (op, strength, weight, constant) in izip(rows, others):
+        items = []
+        for (ignored, name, owner, helper), coeff in terms:
+            if helper is not None:
+                alias = renamed.get(owner)
+                if alias is None:
+                    alias = renamed[owner] = helper + str(len(renamed))
+                owner = alias
+            items.append((owner, name, coeff))
+        items.sort()
+        canonical.append((op, strength, weight, constant, tuple(items)))
+    return tuple(canonical)
+
+
+def decode_constraints(encoded, primitive):
+    """ Decode the flat constraint encoding into solver constraints.
+
+    Parameters
+    ----------
+    encoded : dict
+        The flat encoding created by `encode_constraints`. An empty
+        list or None is accepted as an empty encoding.
+
+    primitive : callable
+        A callable which accepts an owner and a name and returns the
+        solver variable for that symbol. It is called once for each
+        symbol in the table.
+
+    Returns
+    -------
+    result : list
+        The list of solver constraints.
+
+    """
+    if not encoded:
+        return []
+    table = [primitive(owner, name) for owner, name in encoded['symbols']]
+    variables = encoded['vars']
+    coeffs = encoded['coeffs']
+    cns = []
+    push = cns.append
+    start = 0
+    rows = izip(
+        encoded['sizes'], encoded['ops'], encoded['constants'],
+        encoded['strengths'], encoded['weights'],
+    )
+    for size, op, constant, strength, weight in rows:
+        end = start + size
+        expr = constant
+        for index in xrange(start, end):
+            expr = expr + coeffs[index] * table[variables[index]]
+        start = end
+        if op == 0:
+            cn = expr == 0.0
+        elif op == 1:
+            cn = expr <= 0.0
+        elif op == 2:
+            cn = expr >= 0.0
+        else:
+            msg = 'Unhandled constraint operator code `%s`' % op
+            raise ValueError(msg)
+        push(cn | STRENGTHS[strength] | weight)
+    return cns
@@ -2,7 +2,7 @@
 #  Copyright (c) 2011, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-from casuarius import Solver, medium
+from casuarius import Solver, medium, weak
 
 
 class LayoutManager(object):
@@ -14,6 +14,10 @@ class LayoutManager(object):
         self._solver = Solver(autosolve=False)
         self._initialized = False
         self._running = False
+        #: A counter which is incremented each time the constraints
+        #: in the solver are changed. It can be used to memoize the
+        #: results of the size queries.
+        self.generation = 0
 
     def initialize(self, constraints):
         """ Initialize the solver with the given constraints.
@@ -33,6 +37,7 @@ class LayoutManager(object):
             solver.add_constraint(cn)
         solver.autosolve = True
         self._initialized = True
+        self.generation += 1
 
     def replace_constraints(self, old_cns, new_cns):
         """ Replace constraints in the solver.
@@ -56,6 +61,7 @@ class LayoutManager(object):
         for cn in new_cns:
             solver.add_constraint(cn)
         solver.autosolve = True
+        self.generation += 1
 
     def layout(self, cb, width, height, size, strength=medium, weight=1.0):
         """ Perform an iteration of the solver for the new width and
@@ -195,3 +201,52 @@ class LayoutManager(object):
             max_height = -1
         return (max_width, max_height)
 
+    def get_sizes(self, width, height, weight=0.1):
+        """ Compute the best, minimum and maximum sizes of the system.
+
+        This is equivalent to calling `get_min_size` with a weak
+        strength, followed by `get_min_size` and `get_max_size` with
+        a medium strength. All three sizes are computed in a single
+        edit session: the best size is read from the weak session,
+        and the minimum and maximum sizes from medium sessions nested
+        within it. The weak suggestion is always overridden by the
+        medium ones, so the nested results are unaffected by it.
+
+        Parameters
+        ----------
+        width : Constraint Variable
+            The constraint variable representing the width of the
+            main layout container.
+
+        height : Constraint Variable
+            The constraint variable representing the height of the
+            main layout container.
+
+        weight : float, optional
+            The weight to apply to the strengths. The default is 0.1.
+
+        Returns
+        -------
+        result : ((float, float), (float, float), (float or -1, float or -1))
+            The best, minimum and maximum sizes of the container. See
+            `get_min_size` and `get_max_size`.
+
+        """
+        if not self._initialized:
+            raise RuntimeError('Get sizes on uninitialized solver')
+        solver = self._solver
+        max_val = 2**24 - 1 # Arbitrary, but the max allowed by Qt.
+        min_values = [(width, 0.0), (height, 0.0)]
+        max_values = [(width, max_val), (height, max_val)]
+        with solver.suggest_values(min_values, weak, weight):
+            best = (width.value, height.value)
+            with solver.suggest_values(min_values, medium, weight):
+                min_size = (width.value, height.value)
+            with solver.suggest_values(max_values, medium, weight):
+                max_width = width.value
+                max_height = height.value
+        if abs(max_val - int(round(max_width))) <= 1:
+            max_width = -1
+        if abs(max_val - int(round(max_height))) <= 1:
+            max_height = -1
+        return (best, min_size, (max_width, max_height))
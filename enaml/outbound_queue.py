@@ -0,0 +1,285 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from collections import deque
+
+
+#: The policy which makes the sender deliver queued actions in-line
+#: until there is room in the queue. No actions are lost.
+BLOCK = 'block'
+
+#: The policy which discards the oldest queued action which also has
+#: the drop oldest policy. If there is no such action, the queue
+#: falls back to blocking.
+DROP_OLDEST = 'drop_oldest'
+
+#: The policy which replaces the content of a queued action with the
+#: same (object_id, action) pair, keeping its place in the queue. A
+#: new pair which overflows the queue falls back to blocking.
+MERGE = 'merge'
+
+#: The default maximum number of actions held by an OutboundQueue.
+DEFAULT_MAXSIZE = 10000
+
+
+class OutboundQueue(object):
+    """ A bounded queue of actions waiting to be sent on a socket.
+
+    An action socket pushes the actions it is asked to send into an
+    outbound queue, and drains the queue into the transport when the
+    receiving end is ready. The queue is bounded, and the policy of an
+    action determines what happens when an action is pushed into a
+    full queue, or when an action for the same (object_id, action)
+    pair is already queued. See the BLOCK, DROP_OLDEST, and MERGE
+    constants for the available policies.
+
+    A transport which can fill up may refuse an action by returning
+    False from its deliver callable. The action is then held at the
+    head of the queue until the next drain, so that the memory held
+    for a slow receiver is bounded by the size of the queue. When an
+    action is delivered in-line for the BLOCK policy and the transport
+    refuses it, the `block` callable is used to wait for the transport.
+
+    """
+    def __init__(self, deliver, maxsize=DEFAULT_MAXSIZE, policy=BLOCK,
+                 policies=None, block=None):
+        """ Initialize an OutboundQueue.
+
+        Parameters
+        ----------
+        deliver : callable
+            A callable which accepts (object_id, action, content) and
+            delivers the action to the transport. It may return False
+            to refuse the action when the transport is full.
+
+        maxsize : int, optional
+            The maximum number of actions to hold in the queue.
+
+        policy : str, optional
+            The policy for actions which do not have an explicit
+            policy. The default is BLOCK.
+
+        policies : dict, optional
+            A mapping of action name to policy.
+
+        block : callable, optional
+            A callable with the same signature as `deliver` which waits
+            until the transport accepts the action. It is used for the
+            in-line deliveries of the BLOCK policy when `deliver` has
+            refused the action. If it is not provided, a push which
+            cannot make room leaves the queue over its maximum size.
+
+        """
+        if maxsize < 1:
+            raise ValueError('The maxsize must be positive')
+        if policy not in (BLOCK, DROP_OLDEST, MERGE):
+            raise ValueError('Invalid queue policy: %s' % policy)
+        self._deliver = deliver
+        self._block = block
+        self._maxsize = maxsize
+        self._policy = policy
+        self._policies = {}
+        for action, action_policy in (policies or {}).iteritems():
+            self.set_policy(action, action_policy)
+        # Entries are lists of [object_id, action, content, alive]. A
+        # dropped entry is not removed from the middle of the deques;
+        # it is marked dead and skipped when it reaches the front.
+        self._entries = deque()
+        self._droppable = deque()
+        self._mergeable = {}
+        self._depth = 0
+        self._high_water = 0
+        self._delivered = 0
+        self._dropped = 0
+        self._merged = 0
+        self._blocked = 0
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _deliver_oldest(self, inline=False):
+        """ Deliver the oldest live entry to the transport.
+
+        The entry is removed from the queue only once the transport
+        has accepted it.
+
+        Parameters
+        ----------
+        inline : bool, optional
+            Whether the delivery is made in-line for the BLOCK policy,
+            in which case a refused entry is handed to the `block`
+            callable, if one was provided.
+
+        Returns
+        -------
+        result : bool
+            True if an entry was delivered, False if the queue is empty
+            or the transport refused the entry.
+
+        """
+        entries = self._entries
+        while entries and not entries[0][3]:
+            entries.popleft()
+        if not entries:
+            return False
+        entry = entries[0]
+        object_id, action, content = entry[0], entry[1], entry[2]
+        if self._deliver(object_id, action, content) is False:
+            block = self._block
+            if not inline or block is None:
+                return False
+            block(object_id, action, content)
+        entries.popleft()
+        entry[3] = False
+        self._depth -= 1
+        key = (object_id, action)
+        if self._mergeable.get(key) is entry:
+            del self._mergeable[key]
+        self._delivered += 1
+        return True
+
+    def _drop_oldest(self):
+        """ Drop the oldest live entry with the drop oldest policy.
+
+        Returns
+        -------
+        result : bool
+            True if an entry was dropped, False otherwise.
+
+        """
+        droppable = self._droppable
+        while droppable:
+            entry = droppable.popleft()
+            if entry[3]:
+                entry[3] = False
+                self._depth -= 1
+                self._dropped += 1
+                return True
+        return False
+
+    #--------------------------------------------------------------------------
+    # Public API
+    #--------------------------------------------------------------------------
+    def set_policy(self, action, policy):
+        """ Set the overflow policy for an action.
+
+        Parameters
+        ----------
+        action : str
+            The name of the action.
+
+        policy : str or None
+            One of BLOCK, DROP_OLDEST, or MERGE. None restores the
+            default policy of the queue.
+
+        """
+        if policy is None:
+            self._policies.pop(action, None)
+        elif policy not in (BLOCK, DROP_OLDEST, MERGE):
+            raise ValueError('Invalid queue policy: %s' % policy)
+        else:
+            self._policies[action] = policy
+
+    def push(self, object_id, action, content):
+        """ Push an action into the queue.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id of the target object.
+
+        action : str
+            The action that should be performed by the object.
+
+        content : dict
+            The content dictionary for the action.
+
+        """
+        policy = self._policies.get(action, self._policy)
+        if policy == MERGE:
+            entry = self._mergeable.get((object_id, action))
+            if entry is not None:
+                entry[2] = content
+                self._merged += 1
+                return
+        if self._depth >= self._maxsize:
+            if policy != DROP_OLDEST or not self._drop_oldest():
+                self._blocked += 1
+                while self._depth >= self._maxsize:
+                    if not self._deliver_oldest(True):
+                        break
+        entry = [object_id, action, content, True]
+        self._entries.append(entry)
+        if policy == MERGE:
+            self._mergeable[(object_id, action)] = entry
+        elif policy == DROP_OLDEST:
+            self._droppable.append(entry)
+        self._depth += 1
+        if self._depth > self._high_water:
+            self._high_water = self._depth
+        # Dead entries are compacted away so that memory stays bounded
+        # when a queue which never empties keeps dropping entries.
+        if len(self._entries) > 2 * self._maxsize:
+            self._entries = deque(e for e in self._entries if e[3])
+        if len(self._droppable) > 2 * self._maxsize:
+            self._droppable = deque(e for e in self._droppable if e[3])
+
+    def drain(self, limit=None):
+        """ Deliver the queued actions to the transport.
+
+        The drain stops early if the transport refuses an action.
+
+        Parameters
+        ----------
+        limit : int, optional
+            The maximum number of actions to deliver. The default
+            delivers all of the queued actions.
+
+        Returns
+        -------
+        result : int
+            The number of actions which remain in the queue.
+
+        """
+        count = self._depth if limit is None else min(limit, self._depth)
+        for ignored in xrange(count):
+            if not self._deliver_oldest():
+                break
+        if self._depth == 0:
+            self._droppable.clear()
+        return self._depth
+
+    def depth(self):
+        """ Get the number of actions waiting in the queue.
+
+        """
+        return self._depth
+
+    def stats(self):
+        """ Get the flow control statistics for the queue.
+
+        Returns
+        -------
+        result : dict
+            A dict with the current 'depth', the 'high_water' mark of
+            the depth, the 'maxsize' of the queue, and the number of
+            actions which were 'delivered', 'dropped', and 'merged',
+            and the number of pushes which 'blocked' on a full queue.
+
+        """
+        return {
+            'depth': self._depth,
+            'high_water': self._high_water,
+            'maxsize': self._maxsize,
+            'delivered': self._delivered,
+            'dropped': self._dropped,
+            'merged': self._merged,
+            'blocked': self._blocked,
+        }
+
+    def reset_high_water(self):
+        """ Reset the high water mark to the current depth.
+
+        """
+        self._high_water = self._depth
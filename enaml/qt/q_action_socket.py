@@ -4,10 +4,11 @@
 #------------------------------------------------------------------------------
 import types
 
+from enaml.outbound_queue import OutboundQueue, BLOCK, DEFAULT_MAXSIZE
 from enaml.socket_interface import ActionSocketInterface
 from enaml.weakmethod import WeakMethod
 
-from .qt.QtCore import QObject, Signal
+from .qt.QtCore import QObject, Qt, Signal
 
 
 class QActionSocket(QObject):
@@ -18,16 +19,115 @@ class QActionSocket(QObject):
     part of the application. Incoming socket messages can be delivered
     to the `receive` method of the socket.
 
+    Sent messages are held in a bounded OutboundQueue and are emitted
+    together as a batch on the next cycle of the event loop. The queued
+    connections of the `messagePosted` signal deliver a batch later, so
+    the socket refuses to emit the next batch until the previous one
+    has been delivered. While a batch is pending, new messages wait in
+    the queue, where the overflow policies apply. The overflow policy
+    can be configured per action. Since the receiver runs on the same
+    event loop, the BLOCK policy emits the oldest message in-line when
+    the queue is full, instead of waiting for the receiver.
+
     """
     #: A signal emitted when a message has been sent on the socket.
     messagePosted = Signal(object, object, object)
 
-    def __init__(self):
+    #: A private signal used to drain the queue on the next cycle.
+    _drainPosted = Signal()
+
+    #: A private signal which is delivered after the pending batch.
+    _batchPosted = Signal()
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, policy=BLOCK, policies=None):
         """ Initialize a QActionSocket.
 
+        Parameters
+        ----------
+        maxsize : int, optional
+            The maximum number of messages to hold in the queue.
+
+        policy : str, optional
+            The default overflow policy of the queue.
+
+        policies : dict, optional
+            A mapping of action name to overflow policy.
+
         """
         super(QActionSocket, self).__init__()
         self._callback = None
+        self._queue = OutboundQueue(
+            self._deliver, maxsize, policy, policies, self.messagePosted.emit
+        )
+        self._drain_pending = False
+        self._batch_pending = False
+        self._drainPosted.connect(self._onDrain, Qt.QueuedConnection)
+        self._batchPosted.connect(self._onBatchDelivered, Qt.QueuedConnection)
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _deliver(self, object_id, action, content):
+        """ Emit a queued message, unless a batch is still pending.
+
+        Returns
+        -------
+        result : bool
+            False if the previous batch has not yet been delivered.
+
+        """
+        if self._batch_pending:
+            return False
+        self.messagePosted.emit(object_id, action, content)
+        return True
+
+    def _drain(self):
+        """ Emit the queued messages as a batch.
+
+        The '_batchPosted' signal is queued behind the messages of the
+        batch, so its handler runs once they have been delivered.
+
+        """
+        if self._queue.depth() > 0:
+            self._queue.drain()
+            self._batch_pending = True
+            self._batchPosted.emit()
+
+    def _onDrain(self):
+        """ A private signal handler for the '_drainPosted' signal.
+
+        This handler emits the queued messages, unless the previous
+        batch is still pending.
+
+        """
+        self._drain_pending = False
+        if not self._batch_pending:
+            self._drain()
+
+    def _onBatchDelivered(self):
+        """ A private signal handler for the '_batchPosted' signal.
+
+        This handler emits the messages which were queued while the
+        previous batch was pending.
+
+        """
+        self._batch_pending = False
+        self._drain()
+
+    #--------------------------------------------------------------------------
+    # Public API
+    #--------------------------------------------------------------------------
+    def queue(self):
+        """ Get the outbound queue for the socket.
+
+        Returns
+        -------
+        result : OutboundQueue
+            The queue which holds the messages waiting to be emitted.
+            Its `stats` method reports the depth and high water mark.
+
+        """
+        return self._queue
 
     def on_message(self, callback):
         """ Register a callback for receiving messages sent by a client
@@ -61,7 +161,10 @@ class QActionSocket(QObject):
             The content dictionary for the action.
 
         """
-        self.messagePosted.emit(object_id, action, content)
+        self._queue.push(object_id, action, content)
+        if not self._drain_pending and not self._batch_pending:
+            self._drain_pending = True
+            self._drainPosted.emit()
 
     def receive(self, object_id, action, content):
         """ Receive a message sent to the socket.
@@ -80,7 +80,7 @@ class QtApplication(Application):
         groups = session.widget_groups[:]
         qt_session = QtSession(session_id, groups)
         self._qt_sessions[session_id] = qt_session
-        qt_session.open(session.snapshot())
+        qt_session.open(session.snapshot(), session.stream_snapshots)
 
         # Setup the sockets for the session pair
         server_socket = QActionSocket()
@@ -95,8 +95,9 @@ class QtConstraintsWidget(QtWidget):
     #: be called to trigger an appropriate relayout of the widget.
     _size_hint_cns = []
 
-    #: The list of constraint dictionaries defined by the user on
-    #: the server side Enaml widget.
+    #: The flat encoding of the constraints defined by the user on
+    #: the server side Enaml widget, or an empty list if none were
+    #: received. See `enaml.layout.constraint_encoding`.
     _user_cns = []
 
     #--------------------------------------------------------------------------
@@ -287,24 +288,28 @@ class QtConstraintsWidget(QtWidget):
         return cns
 
     def user_constraints(self):
-        """ Get the list of user constraints defined for this widget.
+        """ Get the user constraints defined for this widget.
 
-        The default implementation returns the list of constraint
-        information sent by the server.
+        The default implementation returns the constraint encoding
+        sent by the server.
 
         Returns
         -------
-        result : list
-            The list of dictionaries which represent the user defined
-            linear constraints.
+        result : dict or list
+            The flat encoding of the user defined linear constraints,
+            or an empty list if there are none.
 
         """
         return self._user_cns
 
-    def geometry_updater(self):
+    def geometry_updater(self, skip_unchanged=False):
         """ A method which can be called to create a function which
         will update the layout geometry of the underlying widget.
 
+        If `skip_unchanged` is True, the function will only update the
+        geometry of the widget when the computed rect differs from the
+        rect it last applied.
+
         The parameter and return values below describe the function
         that is returned by calling this method.
 
@@ -344,11 +349,22 @@ class QtConstraintsWidget(QtWidget):
         height = primitive('height')
         setgeo = self.widget_item().setGeometry
         rect = QRect
-        def update_geometry(dx, dy):
-            nx = x.value
-            ny = y.value
-            setgeo(rect(nx - dx, ny - dy, width.value, height.value))
-            return nx, ny
+        if skip_unchanged:
+            last = [None]
+            def update_geometry(dx, dy):
+                nx = x.value
+                ny = y.value
+                geo = (nx - dx, ny - dy, width.value, height.value)
+                if geo != last[0]:
+                    last[0] = geo
+                    setgeo(rect(*geo))
+                return nx, ny
+        else:
+            def update_geometry(dx, dy):
+                nx = x.value
+                ny = y.value
+                setgeo(rect(nx - dx, ny - dy, width.value, height.value))
+                return nx, ny
         # Store a reference to self on the updater, so that the layout
         # container can know the object on which the updater operates.
         update_geometry.item = self
@@ -3,58 +3,38 @@
 #  All rights reserved.
 #------------------------------------------------------------------------------
 from collections import deque
+from heapq import heappop, heappush
+from itertools import count
 
-from casuarius import weak
+from enaml.layout.constraint_encoding import decode_constraints
 from enaml.layout.layout_manager import LayoutManager
 
-from .qt.QtCore import QSize, Signal
+from .q_deferred_caller import deferredCall
+from .qt.QtCore import QSize, QTimer, Signal
 from .qt.QtGui import QFrame
 from .qt_constraints_widget import (
     QtConstraintsWidget, LayoutBox, size_hint_guard,
 )
 
 
-def _convert_cn_info(info, owners):
-    """ Converts the lhs or rhs of a linear constraint info dict into
-    its corresponding casuarius object.
+#: The interval, in milliseconds, of one frame. A container which
+#: coalesces resize events solves its layout at most once per frame.
+FRAME_INTERVAL = 16
 
-    """
-    cn_type = info['type']
-    if cn_type == 'linear_expression':
-        const = info['constant']
-        terms = info['terms']
-        convert = _convert_cn_info
-        res = sum(convert(t, owners) for t in terms) + const
-    elif cn_type == 'term':
-        coeff = info['coeff']
-        var = info['var']
-        res = coeff * _convert_cn_info(var, owners)
-    elif cn_type == 'linear_symbolic':
-        sym_name = info['name']
-        owner_id = info['owner']
-        owner = owners.get(owner_id, None)
-        if owner is None:
-            owner = owners[owner_id] = LayoutBox('_virtual', owner_id)
-        res = owner.primitive(sym_name)
-    else:
-        msg = 'Unhandled constraint info type `%s`' % cn_type
-        raise ValueError(msg)
-    return res
 
+def as_linear_constraints(encoded, owners):
+    """ Converts the flat encoding of a widget's constraints into a
+    list of casuarius linear constraints.
 
-def as_linear_constraint(info, owners):
-    """ Converts a constraint info dict into a casuarius linear
-    constraint.
-
-    For constraints specified in the info dict which do not have a
+    For constraints specified in the encoding which do not have a
     corresponding owner (e.g. those created by box helpers) a
     constraint variable will be synthesized.
 
     Parameters
     ----------
-    info : dict
-        A dictionary sent from an Enaml widget which specifies the
-        information for a linear constraint.
+    encoded : dict
+        The flat constraint encoding sent from an Enaml widget. See
+        `enaml.layout.constraint_encoding`.
 
     owners : dict
         A mapping from constraint id to an owner object which holds
@@ -62,27 +42,80 @@ def as_linear_constraint(info, owners):
 
     Returns
     -------
-    result : LinearConstraint
-        A casuarius linear constraint for the given dict.
+    result : list
+        The list of casuarius linear constraints for the encoding.
+
+    """
+    def primitive(owner_id, name):
+        owner = owners.get(owner_id, None)
+        if owner is None:
+            owner = owners[owner_id] = LayoutBox('_virtual', owner_id)
+        return owner.primitive(name)
+    return decode_constraints(encoded, primitive)
+
+
+class SizeRefreshQueue(object):
+    """ A queue of the containers whose sizes must be refreshed.
+
+    All of the queued containers are refreshed by a single deferred
+    pass, deepest first. The refresh of a container may change its
+    size hint, which queues its layout owner in turn. The owner is an
+    ancestor, and so is refreshed later in the same pass, once all of
+    its descendants are settled. A change to the size hints of a tree
+    of nested containers thus settles in one cycle of the event loop,
+    with one refresh per container.
 
     """
-    if info['type'] != 'linear_constraint':
-        msg = 'The info dict does not specify a linear constraint.'
-        raise ValueError(msg)
-    convert = _convert_cn_info
-    lhs = convert(info['lhs'], owners)
-    rhs = convert(info['rhs'], owners)
-    op = info['op']
-    if op == '==':
-        cn = lhs == rhs
-    elif op == '<=':
-        cn = lhs <= rhs
-    elif op == '>=':
-        cn = lhs >= rhs
-    else:
-        msg = 'Unhandled constraint operator `%s`' % op
-        raise ValueError(msg)
-    return cn | info['strength'] | info['weight']
+    def __init__(self):
+        """ Initialize a SizeRefreshQueue.
+
+        """
+        self._heap = []
+        self._counter = count()
+        self._scheduled = False
+
+    def push(self, container):
+        """ Queue a container for a refresh of its sizes.
+
+        Parameters
+        ----------
+        container : QtContainer
+            The container to refresh. It is the responsibility of the
+            caller to queue a container only once per refresh.
+
+        """
+        depth = 0
+        parent = container.parent()
+        while parent is not None:
+            depth += 1
+            parent = parent.parent()
+        # The counter keeps the order of the containers of the same
+        # depth, and prevents the containers from being compared.
+        item = (-depth, next(self._counter), container)
+        heappush(self._heap, item)
+        if not self._scheduled:
+            self._scheduled = True
+            deferredCall(self._process)
+
+    def _process(self):
+        """ Refresh the queued containers, deepest first.
+
+        """
+        heap = self._heap
+        try:
+            while heap:
+                heappop(heap)[2]._on_size_refresh()
+        finally:
+            self._scheduled = False
+            # A failed refresh leaves the remaining containers for the
+            # next cycle instead of dropping them.
+            if heap:
+                self._scheduled = True
+                deferredCall(self._process)
+
+
+#: The queue of the containers which have a pending size refresh.
+_size_refresh_queue = SizeRefreshQueue()
 
 
 class QContainer(QFrame):
@@ -170,6 +203,39 @@ class QtContainer(QtConstraintsWidget):
     #: A list of the current size hint constraints for the widget.
     _size_hint_cns = []
 
+    #: The tuple of the items in the layout table. It is used to detect
+    #: a change in the shape of the tree which requires a full rebuild.
+    _layout_items = ()
+
+    #: The tuple of the items whose size hint constraints are in the
+    #: solver of this container.
+    _size_hint_items = ()
+
+    #: A dict mapping the object id of a widget which contributes user
+    #: constraints to a tuple of (item, infos, cns), where infos is the
+    #: constraint encoding and cns the converted constraints.
+    _user_cn_table = {}
+
+    #: The number of constraint owners after the last full rebuild.
+    _cn_owners_count = 0
+
+    #: A tuple of (manager, generation, sizes) which memoizes the
+    #: sizes computed by the layout manager for its generation.
+    _size_cache = None
+
+    #: The key of the sizes last applied by `refresh_sizes`.
+    _sizes_key = None
+
+    #: Whether a refresh of the sizes is queued in the size refresh
+    #: queue for the next cycle of the event loop.
+    _size_refresh_pending = False
+
+    #: Whether resize events are coalesced into one solve per frame.
+    _coalesce_resize = False
+
+    #: The single shot QTimer which triggers the coalesced refresh.
+    _resize_timer = None
+
     #--------------------------------------------------------------------------
     # Setup Methods
     #--------------------------------------------------------------------------
@@ -190,6 +256,20 @@ class QtContainer(QtConstraintsWidget):
         # The resized signal is connected directly to the refresh
         # method to save the overhead of the extra function call.
         self.widget().resized.connect(self.refresh)
+        self.set_coalesce_resize(tree['coalesce_resize'])
+
+    def destroy(self):
+        """ A reimplemented destructor method.
+
+        This method stops the resize timer before the widget which owns
+        it is destroyed.
+
+        """
+        timer = self._resize_timer
+        if timer is not None:
+            timer.stop()
+            self._resize_timer = None
+        super(QtContainer, self).destroy()
 
     def init_layout(self):
         """ Initializes the layout for the container.
@@ -210,10 +290,58 @@ class QtContainer(QtConstraintsWidget):
             manager.initialize(cns)
             self._offset_table = offset_table
             self._layout_table = layout_table
+            self._layout_items = tuple(u.item for _, u in layout_table)
             self._layout_manager = manager
             self._refresh = self._build_refresher(manager)
             self.refresh_sizes()
 
+    #--------------------------------------------------------------------------
+    # Message Handlers
+    #--------------------------------------------------------------------------
+    def on_action_set_coalesce_resize(self, content):
+        """ Handle the 'set_coalesce_resize' action from the Enaml
+        widget.
+
+        """
+        self.set_coalesce_resize(content['coalesce_resize'])
+
+    #--------------------------------------------------------------------------
+    # Widget Update Methods
+    #--------------------------------------------------------------------------
+    def set_coalesce_resize(self, coalesce):
+        """ Set whether resize events are coalesced into at most one
+        layout solve per frame.
+
+        When enabled, the geometry of a widget laid out by this
+        container is only updated when its computed rect changes.
+
+        """
+        if coalesce == self._coalesce_resize:
+            return
+        self._coalesce_resize = coalesce
+        resized = self.widget().resized
+        if coalesce:
+            # The timer is parented to the widget, so that it cannot
+            # outlive it.
+            timer = self._resize_timer = QTimer(self.widget())
+            timer.setSingleShot(True)
+            timer.setInterval(FRAME_INTERVAL)
+            timer.timeout.connect(self._on_resize_timeout)
+            resized.disconnect(self.refresh)
+            resized.connect(self._on_resized)
+        else:
+            timer = self._resize_timer
+            timer.stop()
+            timer.setParent(None)
+            self._resize_timer = None
+            resized.disconnect(self._on_resized)
+            resized.connect(self.refresh)
+        # The geometry updaters depend on the mode, so the layout table
+        # of an initialized layout is rebuilt.
+        if self._owns_layout and self._layout_manager is not None:
+            tables = self._build_layout_table()
+            self._offset_table, self._layout_table = tables
+
     #--------------------------------------------------------------------------
     # Public Layout Handling
     #--------------------------------------------------------------------------
@@ -225,7 +353,8 @@ class QtContainer(QtConstraintsWidget):
         if self._owns_layout:
             item = self.widget_item()
             old_hint = item.sizeHint()
-            self.init_layout()
+            if not self._update_layout():
+                self.init_layout()
             self.refresh()
             new_hint = item.sizeHint()
             # If the size hint constraints are empty, it indicates that
@@ -252,8 +381,17 @@ class QtContainer(QtConstraintsWidget):
 
         This method is normally called automatically at the proper
         times. It should not normally need to be called by user code.
+        The sizes are only recomputed if the constraints in the solver
+        or the hug and resist policies have changed.
 
         """
+        manager = self._layout_manager
+        generation = manager.generation if manager is not None else -1
+        key = (manager, generation, self._owns_layout, self._hug,
+               self._resist)
+        if key == self._sizes_key:
+            return
+        self._sizes_key = key
         widget = self.widget()
         widget.setSizeHint(self.compute_best_size())
         widget.setMinimumSize(self.compute_min_size())
@@ -280,10 +418,15 @@ class QtContainer(QtConstraintsWidget):
         if self._owns_layout:
             manager = self._layout_manager
             if manager is not None:
-                with size_hint_guard(self):
-                    manager.replace_constraints(old_cns, new_cns)
-                    self.refresh_sizes()
-                    self.refresh()
+                manager.replace_constraints(old_cns, new_cns)
+                # The sizes are refreshed on the next cycle of the event
+                # loop, so that the replacements made by the children in
+                # this cycle are handled by a single pass. The queue
+                # refreshes the containers bottom-up, so the changes to
+                # the size hint cascade to the ancestors in that pass.
+                if not self._size_refresh_pending:
+                    self._size_refresh_pending = True
+                    _size_refresh_queue.push(self)
         else:
             self._layout_owner.replace_constraints(old_cns, new_cns)
 
@@ -391,6 +534,144 @@ class QtContainer(QtConstraintsWidget):
     #--------------------------------------------------------------------------
     # Private Layout Handling
     #--------------------------------------------------------------------------
+    def _on_resized(self):
+        """ A private signal handler for the resized signal, used when
+        resize events are coalesced.
+
+        The timer is not restarted while it is active, so a continuous
+        stream of resize events still solves the layout once per frame.
+
+        """
+        if self._widget is None:
+            return
+        timer = self._resize_timer
+        if timer is not None and not timer.isActive():
+            timer.start()
+
+    def _on_resize_timeout(self):
+        """ A private signal handler for the timeout of the resize timer,
+        which solves the coalesced resize events.
+
+        """
+        if self._widget is None:
+            return
+        self.refresh()
+
+    def _on_size_refresh(self):
+        """ A private method which refreshes the sizes and the layout
+        after the constraints were replaced.
+
+        This is called by the size refresh queue.
+
+        """
+        self._size_refresh_pending = False
+        if self._widget is None or self._layout_manager is None:
+            return
+        with size_hint_guard(self):
+            self.refresh_sizes()
+            self.refresh()
+
+    def _layout_sizes(self):
+        """ A private method which returns the best, minimum and maximum
+        sizes computed by the layout manager.
+
+        The sizes are memoized until the constraints in the solver are
+        changed. This method must only be called when the container
+        owns its layout and has a layout manager.
+
+        """
+        manager = self._layout_manager
+        cache = self._size_cache
+        if cache is not None:
+            if cache[0] is manager and cache[1] == manager.generation:
+                return cache[2]
+        primitive = self.layout_box.primitive
+        width = primitive('width')
+        height = primitive('height')
+        sizes = manager.get_sizes(width, height)
+        self._size_cache = (manager, manager.generation, sizes)
+        return sizes
+
+    def _collect_layout_items(self):
+        """ A private method which collects the items which would be
+        placed in the layout table, in the same order.
+
+        Unlike `_build_layout_table`, this method does not create the
+        geometry updaters or transfer the layout ownership of children.
+
+        Returns
+        -------
+        result : tuple
+            The tuple of constraints widgets laid out by this container.
+
+        """
+        items = []
+        push_item = items.append
+        queue = deque(self.children())
+        push = queue.extend
+        pop = queue.popleft
+        QtConstraintsWidget_ = QtConstraintsWidget
+        QtContainer_ = QtContainer
+        isinst = isinstance
+        while queue:
+            item = pop()
+            if isinst(item, QtConstraintsWidget_):
+                push_item(item)
+                if isinst(item, QtContainer_):
+                    if item._layout_owner is self:
+                        push(item.children())
+        return tuple(items)
+
+    def _update_layout(self):
+        """ A private method which applies the changed constraints of
+        the laid out widgets to the current solver.
+
+        The user constraints of each widget are compared against those
+        which were last converted, and only the constraints of the
+        widgets which changed are replaced in the solver. Size hint
+        constraints which were cleared since the last layout are added
+        back. This is only possible when the shape of the layout tree
+        has not changed.
+
+        Returns
+        -------
+        result : bool
+            True if the solver was updated, or False if the layout must
+            be rebuilt with `init_layout`.
+
+        """
+        manager = self._layout_manager
+        if manager is None:
+            return False
+        if self._collect_layout_items() != self._layout_items:
+            return False
+        # Constraint helpers may create new virtual owners on every
+        # relayout. A full rebuild drops the ones no longer in use.
+        owners = self._cn_owners
+        if len(owners) > 2 * self._cn_owners_count:
+            return False
+        table = self._user_cn_table
+        updates = []
+        old_cns = []
+        new_cns = []
+        as_cns = as_linear_constraints
+        for key, (item, infos, cns) in table.iteritems():
+            new_infos = item.user_constraints()
+            if new_infos is infos or new_infos == infos:
+                continue
+            converted = as_cns(new_infos, owners)
+            updates.append((key, (item, new_infos, converted)))
+            old_cns.extend(cns)
+            new_cns.extend(converted)
+        for item in self._size_hint_items:
+            if not item._size_hint_cns:
+                new_cns.extend(item.size_hint_constraints())
+        if old_cns or new_cns:
+            manager.replace_constraints(old_cns, new_cns)
+            table.update(updates)
+            self.refresh_sizes()
+        return True
+
     def _build_refresher(self, manager):
         """ A private method which will build a function which, when
         called, will refresh the layout for the container.
@@ -465,6 +746,7 @@ class QtContainer(QtConstraintsWidget):
         QtConstraintsWidget_ = QtConstraintsWidget
         QtContainer_ = QtContainer
         isinst = isinstance
+        skip_unchanged = self._coalesce_resize
 
         # The queue yields the items in the tree in breadth-first order
         # starting with the immediate children of this container. If a
@@ -475,7 +757,8 @@ class QtContainer(QtConstraintsWidget):
         while queue:
             offset_index, item = pop()
             if isinst(item, QtConstraintsWidget_):
-                push_item((offset_index, item.geometry_updater()))
+                updater = item.geometry_updater(skip_unchanged)
+                push_item((offset_index, updater))
                 push_offset(zero_offset)
                 running_index += 1
                 if isinst(item, QtContainer_):
@@ -510,8 +793,10 @@ class QtContainer(QtConstraintsWidget):
         # info dictionaries provided by the Enaml widgets.
         box = self.layout_box
         cn_owners = {self.object_id(): box}
-        cn_dicts = list(self.user_constraints())
-        cn_dicts_extend = cn_dicts.extend
+        cn_sources = [self]
+        add_source = cn_sources.append
+        size_hint_items = []
+        add_size_hint_item = size_hint_items.append
 
         # The list of raw casuarius constraints which will be returned
         # from this method to be added to the casuarius solver.
@@ -528,20 +813,31 @@ class QtContainer(QtConstraintsWidget):
             raw_cns_extend(child.hard_constraints())
             if isinst(child, QtContainer_):
                 if child.transfer_layout_ownership(self):
-                    cn_dicts_extend(child.user_constraints())
+                    add_source(child)
                     raw_cns_extend(child.contents_constraints())
                 else:
                     raw_cns_extend(child.size_hint_constraints())
+                    add_size_hint_item(child)
             else:
                 raw_cns_extend(child.size_hint_constraints())
-                cn_dicts_extend(child.user_constraints())
-
-        # Convert the list of Enaml constraints info dicts to actual
-        # casuarius LinearConstraint objects for the solver.
-        add_cn = raw_cns.append
-        as_cn = as_linear_constraint
-        for info in cn_dicts:
-            add_cn(as_cn(info, cn_owners))
+                add_size_hint_item(child)
+                add_source(child)
+
+        # Convert the Enaml constraint encodings to actual casuarius
+        # LinearConstraint objects for the solver. The encodings are
+        # converted once all of the owners are known, and are kept per
+        # widget so that a relayout can replace only those which have
+        # changed.
+        user_cn_table = {}
+        as_cns = as_linear_constraints
+        for source in cn_sources:
+            infos = source.user_constraints()
+            cns = as_cns(infos, cn_owners)
+            user_cn_table[source.object_id()] = (source, infos, cns)
+            raw_cns_extend(cns)
+        self._user_cn_table = user_cn_table
+        self._size_hint_items = tuple(size_hint_items)
+        self._cn_owners_count = len(cn_owners)
 
         # We keep a strong reference to the constraint owners dict,
         # since it may include instances of LayoutBox which were
@@ -584,6 +880,9 @@ class QtContainer(QtConstraintsWidget):
         self._refresh = owner.refresh
         self._offset_table = []
         self._layout_table = []
+        self._layout_items = ()
+        self._size_hint_items = ()
+        self._user_cn_table = {}
         self._cn_owners = {}
         return True
 
@@ -622,10 +921,7 @@ class QtContainer(QtConstraintsWidget):
         if resist_width in shrink and resist_height in shrink:
             return QSize(0, 0)
         if self._owns_layout and self._layout_manager is not None:
-            primitive = self.layout_box.primitive
-            width = primitive('width')
-            height = primitive('height')
-            w, h = self._layout_manager.get_min_size(width, height)
+            w, h = self._layout_sizes()[1]
             if resist_width in shrink:
                 w = 0
             if resist_height in shrink:
@@ -652,10 +948,7 @@ class QtContainer(QtConstraintsWidget):
 
         """
         if self._owns_layout and self._layout_manager is not None:
-            primitive = self.layout_box.primitive
-            width = primitive('width')
-            height = primitive('height')
-            w, h = self._layout_manager.get_min_size(width, height, weak)
+            w, h = self._layout_sizes()[0]
             return QSize(w, h)
         return QSize()
 
@@ -679,10 +972,7 @@ class QtContainer(QtConstraintsWidget):
         if hug_width in expanding and hug_height in expanding:
             return QSize(16777215, 16777215)
         if self._owns_layout and self._layout_manager is not None:
-            primitive = self.layout_box.primitive
-            width = primitive('width')
-            height = primitive('height')
-            w, h = self._layout_manager.get_max_size(width, height)
+            w, h = self._layout_sizes()[2]
             if w < 0 or hug_width in expanding:
                 w = 16777215
             if h < 0 or hug_height in expanding:
@@ -428,6 +428,17 @@ class QtObject(object):
         if widget is not None:
             widget.setParent(self._widget)
 
+    def reattached(self):
+        """ Called when this object was moved to a new parent by a
+        'children_changed' action.
+
+        The default implementation of this method is a no-op. Widgets
+        reimplement it to restore the visibility which the toolkit
+        resets when a widget is reparented.
+
+        """
+        pass
+
     def index_of(self, child):
         """ Return the index of the given child.
 
@@ -510,8 +521,15 @@ class QtObject(object):
             if child is not None and child._parent is self:
                 child.set_parent(None)
 
+        # Reparent the existing children which were moved here.
+        for object_id in content.get('moved', ()):
+            child = lookup(object_id)
+            if child is not None:
+                child.set_parent(self)
+                child.reattached()
+
         # Build or reparent the children being added.
-        for tree in content['added']:
+        for tree in self._session.unpack_snapshot(content['added']):
             object_id = tree['object_id']
             child = lookup(object_id)
             if child is not None:
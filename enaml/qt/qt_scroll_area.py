@@ -2,6 +2,7 @@
 #  Copyright (c) 2012, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
+from .q_deferred_caller import deferredCall
 from .qt.QtCore import Qt, QEvent, QSize, Signal
 from .qt.QtGui import QScrollArea
 from .qt_constraints_widget import QtConstraintsWidget
@@ -26,6 +27,10 @@ class QCustomScrollArea(QScrollArea):
     #: the scroll area is no longer valid.
     layoutRequested = Signal()
 
+    #: A signal emitted when the visible region of the scroll widget
+    #: may have changed due to scrolling or resizing.
+    viewportChanged = Signal()
+
     #: A private internally cached size hint.
     _size_hint = QSize()
 
@@ -43,6 +48,22 @@ class QCustomScrollArea(QScrollArea):
             self.layoutRequested.emit()
         return res
 
+    def scrollContentsBy(self, dx, dy):
+        """ A reimplemented parent class method which emits the
+        `viewportChanged` signal after the contents are scrolled.
+
+        """
+        super(QCustomScrollArea, self).scrollContentsBy(dx, dy)
+        self.viewportChanged.emit()
+
+    def resizeEvent(self, event):
+        """ A reimplemented parent class method which emits the
+        `viewportChanged` signal after the area is resized.
+
+        """
+        super(QCustomScrollArea, self).resizeEvent(event)
+        self.viewportChanged.emit()
+
     def setWidget(self, widget):
         """ Set the widget for this scroll area.
 
@@ -99,6 +120,12 @@ class QtScrollArea(QtConstraintsWidget):
     #: A private cache of the old size hint for the scroll area.
     _old_hint = None
 
+    #: The last viewport sent to the Enaml widget.
+    _old_viewport = None
+
+    #: Whether a viewport update has been posted to the event loop.
+    _viewport_pending = False
+
     #--------------------------------------------------------------------------
     # Setup Methods
     #--------------------------------------------------------------------------
@@ -125,6 +152,7 @@ class QtScrollArea(QtConstraintsWidget):
         widget = self.widget()
         widget.setWidget(self.scroll_widget())
         widget.layoutRequested.connect(self.on_layout_requested)
+        widget.viewportChanged.connect(self.on_viewport_changed)
 
     #--------------------------------------------------------------------------
     # Utility Methods
@@ -174,6 +202,34 @@ class QtScrollArea(QtConstraintsWidget):
             self._old_hint = new_hint
             self.size_hint_updated()
 
+    def on_viewport_changed(self):
+        """ Handle the `viewportChanged` signal from the QScrollArea.
+
+        The updates are coalesced so that at most one 'viewport_changed'
+        action is sent per cycle of the event loop.
+
+        """
+        if not self._viewport_pending:
+            self._viewport_pending = True
+            deferredCall(self.send_viewport)
+
+    def send_viewport(self):
+        """ Send the visible region of the scroll widget to the Enaml
+        widget, if it has changed.
+
+        """
+        self._viewport_pending = False
+        widget = self.widget()
+        if widget is None:
+            return
+        hbar = widget.horizontalScrollBar()
+        vbar = widget.verticalScrollBar()
+        size = widget.viewport().size()
+        viewport = (hbar.value(), vbar.value(), size.width(), size.height())
+        if viewport != self._old_viewport:
+            self._old_viewport = viewport
+            self.send_action('viewport_changed', {'viewport': viewport})
+
     #--------------------------------------------------------------------------
     # Overrides
     #--------------------------------------------------------------------------
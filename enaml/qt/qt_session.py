@@ -2,11 +2,13 @@
 #  Copyright (c) 2012, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-from collections import defaultdict
 import logging
+import time
 
+from enaml.snapshot_table import SnapshotUnpacker
 from enaml.utils import make_dispatcher
 
+from .q_deferred_caller import deferredCall
 from .qt_resource_manager import QtResourceManager
 from .qt_widget_registry import QtWidgetRegistry
 
@@ -18,6 +20,14 @@ logger = logging.getLogger(__name__)
 dispatch_action = make_dispatcher('on_action_', logger)
 
 
+#: The actions of a message batch which are dispatched first, in order.
+_BATCH_ORDER = ('children_changed', 'destroy', 'relayout')
+
+
+#: The set of the actions in `_BATCH_ORDER`.
+_BATCH_PRIORITY = frozenset(_BATCH_ORDER)
+
+
 class URLRequest(object):
     """ A simple object for making url requests.
 
@@ -82,21 +92,67 @@ class QtSession(object):
         self._registered_objects = {}
         self._windows = []
         self._socket = None
+        self._unpacker = SnapshotUnpacker()
+        self._streamed = False
+        self._open_stats = {
+            'first_paint': None, 'complete': None, 'chunks': 0,
+        }
+        self._open_time = None
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _on_first_paint(self):
+        """ Record the first paint time of the session windows.
+
+        This is invoked on the first cycle of the event loop after the
+        windows are activated, by which time they have been painted.
+
+        """
+        if self._open_time is None:
+            return
+        elapsed = time.time() - self._open_time
+        stats = self._open_stats
+        stats['first_paint'] = elapsed
+        if not self._streamed:
+            stats['complete'] = elapsed
+            self._log_open_stats()
+
+    def _log_open_stats(self):
+        """ Log the progress statistics for opening the session.
+
+        """
+        stats = self._open_stats
+        first_paint = stats['first_paint']
+        if first_paint is None:
+            first_paint = stats['complete']
+        msg = 'Session %s opened: first paint %.3fs, complete %.3fs, %d chunks'
+        logger.debug(msg % (
+            self._session_id, first_paint, stats['complete'], stats['chunks']
+        ))
 
     #--------------------------------------------------------------------------
     # Public API
     #--------------------------------------------------------------------------
-    def open(self, snapshot):
+    def open(self, snapshot, streamed=False):
         """ Open the session using the given snapshot.
 
         Parameters
         ----------
-        snapshot : list of dicts
-            The list of tree snapshots to build for this session.
+        snapshot : list of dicts or dict
+            The list of tree snapshots to build for this session, or
+            a packed class table snapshot of the trees.
+
+        streamed : bool, optional
+            Whether the snapshot is the skeleton of a streamed snapshot.
+            If True, the open is complete when the server session sends
+            the 'snapshot_complete' action. The default is False.
 
         """
+        self._open_time = time.time()
+        self._streamed = streamed
         windows = self._windows
-        for tree in snapshot:
+        for tree in self.unpack_snapshot(snapshot):
             window = self.build(tree, None)
             if window is not None:
                 windows.append(window)
@@ -118,15 +174,31 @@ class QtSession(object):
         socket.on_message(self.on_message)
         for window in self._windows:
             window.activate()
+        deferredCall(self._on_first_paint)
+
+    def open_stats(self):
+        """ Get the progress statistics for opening the session.
+
+        Returns
+        -------
+        result : dict
+            A dict with the seconds from the call to `open` until the
+            first event loop cycle after the windows were shown as
+            'first_paint', the seconds until the whole tree was built
+            as 'complete', and the number of streamed 'chunks'. The
+            times are None until the corresponding stage is reached.
+
+        """
+        return self._open_stats.copy()
 
     def build(self, tree, parent):
         """ Build and return a new widget using the given tree dict.
 
         Parameters
         ----------
-        tree : dict
+        tree : dict or list
             The dictionary snapshot representation of the tree of
-            items to build.
+            items to build, or a node of a class table snapshot.
 
         parent : QtObject or None
             The parent for the tree, or None if the tree is top-level.
@@ -139,6 +211,7 @@ class QtSession(object):
             the building errors will be sent to the error logger.
 
         """
+        tree = self._unpacker.expand(tree)
         groups = self._widget_groups
         factory = QtWidgetRegistry.lookup(tree['class'], groups)
         if factory is None:
@@ -157,6 +230,28 @@ class QtSession(object):
             self.build(child, obj)
         return obj
 
+    def unpack_snapshot(self, snapshot):
+        """ Unpack a snapshot sent by the server session.
+
+        Class table entries carried by a packed snapshot are added to
+        the table of the session, so every packed snapshot must be
+        unpacked in the order it was received.
+
+        Parameters
+        ----------
+        snapshot : object
+            A packed class table snapshot, a snapshot dict, or a list
+            of snapshot dicts.
+
+        Returns
+        -------
+        result : list
+            The list of top-level snapshot dicts. Each dict can be
+            passed to `build`.
+
+        """
+        return self._unpacker.load(snapshot)
+
     def register(self, obj):
         """ Register an object with the session.
 
@@ -287,11 +382,22 @@ class QtSession(object):
         """ Handle the 'add_window' action from the Enaml session.
 
         """
-        window = self.build(content['window'], None)
-        if window is not None:
-            self._windows.append(window)
-            window.initialize()
-            window.activate()
+        for tree in self.unpack_snapshot(content['window']):
+            window = self.build(tree, None)
+            if window is not None:
+                self._windows.append(window)
+                window.initialize()
+                window.activate()
+
+    def on_action_snapshot_complete(self, content):
+        """ Handle the 'snapshot_complete' action from the Enaml session.
+
+        """
+        stats = self._open_stats
+        stats['chunks'] = content['chunks']
+        if self._open_time is not None:
+            stats['complete'] = time.time() - self._open_time
+            self._log_open_stats()
 
     def on_action_url_reply(self, content):
         """ Handle the 'url_reply' action from the Enaml session.
@@ -314,25 +420,24 @@ class QtSession(object):
         order 'children_changed' -> 'destroy' -> 'relayout' -> other...
 
         """
-        actions = defaultdict(list)
-        for item in content['batch']:
-            action = item[1]
-            actions[action].append(item)
-        ordered = []
-        batch_order = ('children_changed', 'destroy', 'relayout')
-        for key in batch_order:
-            ordered.extend(actions.pop(key, ()))
-        for value in actions.itervalues():
-            ordered.extend(value)
+        # The batch is routed in one pass per priority action and one
+        # pass for the rest, which avoids regrouping the messages.
+        batch = content['batch']
         objects = self._registered_objects
-        for object_id, action, msg_content in ordered:
-            try:
-                obj = objects[object_id]
-            except KeyError:
-                msg = "Invalid object id sent to QtSession %s:%s"
-                logger.warn(msg % (object_id, action))
-            else:
-                dispatch_action(obj, action, msg_content)
+        for key in _BATCH_ORDER + (None,):
+            for object_id, action, msg_content in batch:
+                if key is None:
+                    if action in _BATCH_PRIORITY:
+                        continue
+                elif action != key:
+                    continue
+                try:
+                    obj = objects[object_id]
+                except KeyError:
+                    msg = "Invalid object id sent to QtSession %s:%s"
+                    logger.warn(msg % (object_id, action))
+                else:
+                    dispatch_action(obj, action, msg_content)
 
     def on_action_close(self, content):
         """ Handle the 'close' action sent by the Enaml session.
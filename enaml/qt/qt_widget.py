@@ -53,6 +53,10 @@ class QtWidget(QtObject):
     #: color of the widget has been changed.
     _fgcolor_changed = False
 
+    #: The visibility last requested by the Enaml widget. It is used
+    #: to restore the visibility after the widget is reparented.
+    _visible = True
+
     def create_widget(self, parent, tree):
         """ Creates the underlying QWidget object.
 
@@ -92,6 +96,13 @@ class QtWidget(QtObject):
             res = self._widget_item = QWidgetItem(self.widget())
         return res
 
+    def reattached(self):
+        """ Restore the visibility of the widget after it was moved to
+        a new parent.
+
+        """
+        self.widget().setVisible(self._visible)
+
     #--------------------------------------------------------------------------
     # Message Handlers
     #--------------------------------------------------------------------------
@@ -209,6 +220,7 @@ class QtWidget(QtObject):
             Whether or not the widget is visible.
 
         """
+        self._visible = visible
         self.widget().setVisible(visible)
 
     def set_bgcolor(self, bgcolor):
@@ -5,14 +5,17 @@
 import logging
 
 from traits.api import (
-    HasTraits, Instance, List, Str, ReadOnly, Enum, Property, on_trait_change
+    HasTraits, Instance, List, Str, ReadOnly, Enum, Property, Bool, Int,
+    on_trait_change
 )
 
 from enaml.widgets.window import Window
 
-from .application import deferred_call
+from .application import deferred_call, schedule
 from .resource_manager import ResourceManager
 from .signaling import Signal
+from .snapshot_stream import SnapshotStream
+from .snapshot_table import SnapshotPacker
 from .socket_interface import ActionSocketInterface
 from .utils import make_dispatcher
 
@@ -27,18 +30,21 @@ dispatch_action = make_dispatcher('on_action_', logger)
 class DeferredBatch(object):
     """ A class which aggregates batch items.
 
-    Each time an item is added to this object, its tick count is
-    incremented and a tick down event is posted to the event queue.
-    When the object receives the tick down event, it decrements its
-    tick count, and if it's zero, fires the `triggered` signal.
+    When the first item is added to the batch, a single flush event is
+    posted to the event queue. If more items are added to the batch
+    before the flush event is processed, the flush is re-posted once
+    when it arrives so that it runs after the events which were queued
+    in the meantime. When a flush event arrives and no items have been
+    added since it was posted, the `triggered` signal is fired.
 
     This allows a consumer of the batch to continually add items and
     have the `triggered` signal fired only when the event queue is
-    fully drained of relevant messages.
+    fully drained of relevant messages, while posting at most one
+    pending flush event regardless of the number of items added.
 
     """
-    #: A signal emitted when the tick count of the batch reaches zero
-    #: and the owner of the batch should consume the messages.
+    #: A signal emitted when the event queue has drained and the owner
+    #: of the batch should consume the messages.
     triggered = Signal()
 
     def __init__(self):
@@ -46,24 +52,27 @@ class DeferredBatch(object):
 
         """
         self._items = []
-        self._tick = 0
+        self._pending = False
+        self._dirty = False
 
     #--------------------------------------------------------------------------
     # Private API
     #--------------------------------------------------------------------------
-    def _tick_down(self):
-        """ A private handler method which ticks down the batch.
+    def _flush(self):
+        """ A private handler method which flushes the batch.
 
-        The tick down events are called in a deferred fashion to allow
-        for the aggregation of batch events. When the tick reaches
-        zero, the `triggered` signal will be emitted.
+        The flush event is called in a deferred fashion to allow for
+        the aggregation of batch events. If items were added since the
+        flush was posted, the flush is posted again. Otherwise, the
+        `triggered` signal will be emitted.
 
         """
-        self._tick -= 1
-        if self._tick == 0:
-            self.triggered.emit()
+        if self._dirty:
+            self._dirty = False
+            deferred_call(self._flush)
         else:
-            deferred_call(self._tick_down)
+            self._pending = False
+            self.triggered.emit()
 
     #--------------------------------------------------------------------------
     # Public API
@@ -84,8 +93,7 @@ class DeferredBatch(object):
     def append(self, item):
         """ Append an item to the batch.
 
-        This will cause the batch to tick up and then start the tick
-        down process if necessary.
+        This will post a flush event if one is not already pending.
 
         Parameters
         ----------
@@ -94,9 +102,60 @@ class DeferredBatch(object):
 
         """
         self._items.append(item)
-        if self._tick == 0:
-            deferred_call(self._tick_down)
-        self._tick += 1
+        if self._pending:
+            self._dirty = True
+        else:
+            self._pending = True
+            deferred_call(self._flush)
+
+
+class AttributeTask(object):
+    """ A batch task which sends the last value set for an attribute.
+
+    Instances of this class are created by `Session.batch_attribute`
+    and added to the session's deferred batch. When invoked, the task
+    pops the pending value from the session and creates the message
+    for the 'set_<name>' action.
+
+    """
+    __slots__ = ('_session', '_key')
+
+    def __init__(self, session, key):
+        """ Initialize an AttributeTask.
+
+        Parameters
+        ----------
+        session : Session
+            The session which owns the pending attribute values.
+
+        key : tuple
+            The (object_id, name) key of the pending attribute value.
+
+        """
+        self._session = session
+        self._key = key
+
+    def __call__(self):
+        """ Create the message for the pending attribute value.
+
+        Returns
+        -------
+        result : tuple or None
+            The (object_id, action, content) message for the batch,
+            or None if the object was destroyed or the session was
+            closed before the batch was triggered.
+
+        """
+        session = self._session
+        key = self._key
+        pending = session._pending_attributes
+        if key not in pending:
+            return None
+        value = pending.pop(key)
+        object_id, name = key
+        if object_id not in session._registered_objects:
+            return None
+        return (object_id, 'set_' + name, {name: value})
 
 
 class URLReply(object):
@@ -208,10 +267,55 @@ class Session(HasTraits):
     #: A read-only property which is True if the session is closed.
     is_closed = Property(fget=lambda self: self.state == 'closed')
 
+    #: Whether attribute changes published by the session's objects
+    #: should be coalesced. When True, the 'set_<name>' actions sent
+    #: for published attributes are added to the deferred message
+    #: batch and only the last value set for a given object and
+    #: attribute during an event loop cycle is sent to the client.
+    #: This should be set before the session is activated.
+    coalesce_attributes = Bool(False)
+
+    #: Whether the snapshots sent to the client should use the compact
+    #: class table format. When True, the class name, bases, and the
+    #: default attribute values of each widget class are sent once per
+    #: session, and each node carries only its non-default attributes.
+    #: See `enaml.snapshot_table`. This should be set before the session
+    #: is activated.
+    compact_snapshots = Bool(False)
+
+    #: Whether the initial snapshot of the session should be streamed.
+    #: When True, `snapshot` returns a skeleton of the windows which
+    #: omits the subtrees deferred by `Messenger.deferred_children`.
+    #: Once the session is activated, the deferred subtrees are sent
+    #: as prioritized 'children_changed' actions, followed by a
+    #: 'snapshot_complete' action on the session.
+    stream_snapshots = Bool(False)
+
+    #: The private list of (priority, parent, children) chunks which
+    #: were deferred by the last streamed snapshot.
+    _snapshot_chunks = Instance(list, ())
+
+    #: The private number of deferred chunks which remain to be sent.
+    _chunks_remaining = Int(0)
+
+    #: The private set of the deferred children whose chunks have not
+    #: yet been sent. They are not activated with their windows, so
+    #: they send no actions before the client has built them.
+    _deferred_objects = Instance(set, ())
+
+    #: The private packer which holds the class table of the session
+    #: when `compact_snapshots` is True.
+    _snapshot_packer = Instance(SnapshotPacker, ())
+
     #: A private dictionary of objects registered with this session.
     #: This value should not be manipulated by user code.
     _registered_objects = Instance(dict, ())
 
+    #: A private dictionary of the pending attribute values which
+    #: have been batched when `coalesce_attributes` is True. The keys
+    #: are (object_id, name) tuples.
+    _pending_attributes = Instance(dict, ())
+
     #: The private deferred message batch used for collapsing layout
     #: related messages into a single batch to send to the client
     #: session for more efficient handling.
@@ -258,10 +362,67 @@ class Session(HasTraits):
         message batch.
 
         """
-        batch = [task() for task in self._batch.release()]
+        batch = []
+        push = batch.append
+        for task in self._batch.release():
+            item = task()
+            if item is not None:
+                push(item)
         content = {'batch': batch}
         self.send(self.session_id, 'message_batch', content)
 
+    def _stream_chunks(self):
+        """ Schedule the chunks deferred by the streamed snapshot.
+
+        Each chunk is sent by a separate scheduled task, so the client
+        can paint between the chunks. When no chunks were deferred, the
+        'snapshot_complete' action is sent immediately.
+
+        """
+        chunks = self._snapshot_chunks
+        self._snapshot_chunks = []
+        self._chunks_remaining = len(chunks)
+        if not chunks:
+            self.send(self.session_id, 'snapshot_complete', {'chunks': 0})
+            return
+        total = len(chunks)
+        for priority, parent, children in chunks:
+            args = (parent, children, total)
+            schedule(self._send_chunk, args, priority=priority)
+
+    def _send_chunk(self, parent, children, total):
+        """ Send a chunk of deferred subtrees to the client.
+
+        The chunk is sent as a 'children_changed' action for the parent
+        of the subtrees, after which the subtrees are activated. Until
+        then, the subtrees send no actions, so none are lost before
+        the client has built them. Subtrees which were destroyed, or
+        reparented and activated since the skeleton was taken, are
+        skipped, since their changes have already been sent.
+
+        """
+        if not self.is_active:
+            return
+        self._deferred_objects.difference_update(children)
+        if parent.is_active:
+            added = [
+                c for c in children
+                if c.parent is parent and c.is_initialized
+            ]
+            if added:
+                snaps = [c.snapshot() for c in added]
+                if self.compact_snapshots:
+                    snaps = self.pack_snapshot(snaps)
+                order = [c.object_id for c in parent.snap_children()]
+                content = {'order': order, 'removed': [], 'added': snaps}
+                self.send(parent.object_id, 'children_changed', content)
+                for child in added:
+                    child.activate(self)
+        self._chunks_remaining -= 1
+        if self._chunks_remaining == 0:
+            content = {'chunks': total}
+            self.send(self.session_id, 'snapshot_complete', content)
+
     @on_trait_change('windows:destroyed')
     def _on_window_destroyed(self, obj, name, old, new):
         """ A trait handler for the `destroyed` event on the windows.
@@ -338,11 +499,18 @@ class Session(HasTraits):
 
         """
         self.state = 'activating'
+        if self.stream_snapshots:
+            self._deferred_objects = set(
+                child for ignored, parent, children in self._snapshot_chunks
+                for child in children
+            )
         for window in self.windows:
             window.activate(self)
         self.socket = socket
         socket.on_message(self.on_message)
         self.state = 'active'
+        if self.stream_snapshots:
+            self._stream_chunks()
 
     def close(self):
         """ Called by the application when the session is closed.
@@ -362,6 +530,12 @@ class Session(HasTraits):
             window.destroy()
         self.windows = []
         self._registered_objects = {}
+        self._pending_attributes = {}
+        self._batch.release()
+        self._snapshot_packer = SnapshotPacker()
+        self._snapshot_chunks = []
+        self._chunks_remaining = 0
+        self._deferred_objects = set()
         self.socket.on_message(None)
         self.socket = None
         self.state = 'closed'
@@ -388,7 +562,10 @@ class Session(HasTraits):
                 # be told to create it. Otherwise, the window's parent
                 # will create it during the children changed event.
                 if window.parent is None:
-                    content = {'window': window.snapshot()}
+                    snap = window.snapshot()
+                    if self.compact_snapshots:
+                        snap = self.pack_snapshot([snap])
+                    content = {'window': snap}
                     self.send(self.session_id, 'add_window', content)
                 window.activate(self)
 
@@ -397,12 +574,43 @@ class Session(HasTraits):
 
         Returns
         -------
-        result : list
+        result : list or dict
             A list of snapshots representing the current windows for
-            this session.
+            this session. If `compact_snapshots` is True, the list is
+            packed into a class table snapshot dict. If
+            `stream_snapshots` is True and the session is not yet
+            active, the snapshots omit the deferred subtrees.
 
         """
-        return [window.snapshot() for window in self.windows]
+        if self.stream_snapshots and not self.is_active:
+            with SnapshotStream() as stream:
+                snap = [window.snapshot() for window in self.windows]
+            self._snapshot_chunks = stream.chunks()
+        else:
+            snap = [window.snapshot() for window in self.windows]
+        if self.compact_snapshots:
+            snap = self.pack_snapshot(snap)
+        return snap
+
+    def pack_snapshot(self, trees):
+        """ Pack a list of snapshot trees with the session class table.
+
+        The class table entries which have not yet been sent to the
+        client are included in the packed snapshot, so the result must
+        be sent to the client.
+
+        Parameters
+        ----------
+        trees : list
+            The list of plain snapshot dicts to pack.
+
+        Returns
+        -------
+        result : dict
+            The packed class table snapshot.
+
+        """
+        return self._snapshot_packer.pack(trees)
 
     def register(self, obj):
         """ Register an object with the session.
@@ -418,6 +626,27 @@ class Session(HasTraits):
         """
         self._registered_objects[obj.object_id] = obj
 
+    def is_deferred(self, obj):
+        """ Get whether the activation of an object is deferred.
+
+        This method is called by an Object when it activates its
+        children. The children deferred by a streamed snapshot are
+        activated when their chunk is sent to the client. It should
+        never be called by user code.
+
+        Parameters
+        ----------
+        obj : Object
+            The object which is about to be activated.
+
+        Returns
+        -------
+        result : bool
+            True if the object must not be activated with its parent.
+
+        """
+        return obj in self._deferred_objects
+
     def unregister(self, obj):
         """ Unregister an object from the session.
 
@@ -501,6 +730,35 @@ class Session(HasTraits):
         ctask = lambda: (object_id, action, task())
         self._batch.append(ctask)
 
+    def batch_attribute(self, object_id, name, value):
+        """ Batch a 'set_<name>' action for an attribute change.
+
+        The value is stored as pending for the (object_id, name) pair
+        and a task is added to the internal batch the first time the
+        pair is seen. Subsequent calls before the batch is triggered
+        simply replace the pending value, so the client receives only
+        the last value. Since the message is sent as part of the batch,
+        its ordering relative to 'children_changed' and 'destroy' is
+        preserved, and pending values for destroyed objects are dropped.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id of the client object.
+
+        name : str
+            The name of the changed attribute.
+
+        value : object
+            The new value of the attribute.
+
+        """
+        pending = self._pending_attributes
+        key = (object_id, name)
+        if key not in pending:
+            self._batch.append(AttributeTask(self, key))
+        pending[key] = value
+
     def on_message(self, object_id, action, content):
         """ Receive a message sent to an object owned by this session.
 
@@ -0,0 +1,85 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+
+
+class SnapshotStream(object):
+    """ A collector for the subtrees deferred by a streamed snapshot.
+
+    While a SnapshotStream is active, `Messenger.snapshot` omits the
+    children returned by `Messenger.deferred_children` and records
+    them with the stream instead. The session then sends the deferred
+    subtrees to the client as 'children_changed' chunks after the
+    skeleton of the windows has been built.
+
+    Streams are used as context managers:
+
+        with SnapshotStream() as stream:
+            snap = window.snapshot()
+        chunks = stream.chunks()
+
+    """
+    #: The currently active stream, or None.
+    _active = None
+
+    @staticmethod
+    def active():
+        """ Get the currently active snapshot stream.
+
+        Returns
+        -------
+        result : SnapshotStream or None
+            The active stream, or None if no stream is active.
+
+        """
+        return SnapshotStream._active
+
+    def __init__(self):
+        """ Initialize a SnapshotStream.
+
+        """
+        self._chunks = []
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = SnapshotStream._active
+        SnapshotStream._active = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        SnapshotStream._active = self._previous
+        self._previous = None
+
+    def defer(self, parent, children):
+        """ Record children whose subtrees were left out of a snapshot.
+
+        The priority of the chunk is the negated depth of the parent,
+        so that the chunks closer to the root are sent first.
+
+        Parameters
+        ----------
+        parent : Messenger
+            The object whose snapshot omitted the children.
+
+        children : list
+            The list of children which were omitted.
+
+        """
+        depth = 0
+        ancestor = parent.parent
+        while ancestor is not None:
+            depth += 1
+            ancestor = ancestor.parent
+        self._chunks.append((-depth, parent, list(children)))
+
+    def chunks(self):
+        """ Get the deferred chunks in the order they were recorded.
+
+        Returns
+        -------
+        result : list
+            A list of (priority, parent, children) tuples.
+
+        """
+        return self._chunks[:]
@@ -0,0 +1,175 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" A compact snapshot format which uses a per-session class table.
+
+A plain snapshot repeats the 'class' and 'bases' of an object and the
+value of every published attribute in each node of the tree. In the
+table format, the class name, bases, and a dict of default attribute
+values are sent once per session as an entry of a class table. Each
+node is a list of [class_index, object_id, attrs, children], where the
+attrs dict contains only the values which differ from the defaults of
+the class.
+
+The defaults of a class are the attribute values of the first node of
+that class packed by the session. Comparing against an exemplar rather
+than the trait defaults keeps the format independent of how a widget
+computes its snapshot, and it is lossless for any choice of defaults.
+
+A packed snapshot is a dict with a 'format' key of 'table', a list of
+the 'classes' added to the table since the previous packed snapshot,
+and the list of packed 'trees'. The table is cumulative, so packed
+snapshots must be unpacked in the order in which they were packed.
+
+"""
+
+
+#: The value of the 'format' key of a packed snapshot.
+TABLE_FORMAT = 'table'
+
+#: The snapshot keys which are stored in the node or the class table
+#: rather than in the attribute dict.
+STRUCTURAL_KEYS = frozenset(['object_id', 'class', 'bases', 'children'])
+
+
+def is_packed(snapshot):
+    """ Get whether a snapshot is in the class table format.
+
+    Parameters
+    ----------
+    snapshot : object
+        A snapshot as sent to the client. This is either a packed
+        snapshot dict, a plain snapshot dict, or a list of plain
+        snapshot dicts.
+
+    Returns
+    -------
+    result : bool
+        True if the snapshot is a packed snapshot, False otherwise.
+
+    """
+    return isinstance(snapshot, dict) and snapshot.get('format') == TABLE_FORMAT
+
+
+class SnapshotPacker(object):
+    """ The server side of the class table snapshot format.
+
+    """
+    def __init__(self):
+        """ Initialize a SnapshotPacker.
+
+        """
+        self._indices = {}
+        self._defaults = []
+        self._added = []
+
+    def _pack_node(self, tree):
+        """ Pack a plain snapshot tree into a table node.
+
+        """
+        key = (tree['class'], tuple(tree['bases']))
+        index = self._indices.get(key)
+        if index is None:
+            defaults = {}
+            for name, value in tree.iteritems():
+                if name not in STRUCTURAL_KEYS:
+                    defaults[name] = value
+            index = len(self._defaults)
+            self._indices[key] = index
+            self._defaults.append(defaults)
+            self._added.append([tree['class'], tree['bases'], defaults])
+            attrs = {}
+        else:
+            defaults = self._defaults[index]
+            attrs = {}
+            for name, value in tree.iteritems():
+                if name in STRUCTURAL_KEYS:
+                    continue
+                if name not in defaults or defaults[name] != value:
+                    attrs[name] = value
+        children = [self._pack_node(child) for child in tree['children']]
+        return [index, tree['object_id'], attrs, children]
+
+    def pack(self, trees):
+        """ Pack a list of plain snapshot trees.
+
+        Parameters
+        ----------
+        trees : list
+            The list of plain snapshot dicts to pack.
+
+        Returns
+        -------
+        result : dict
+            The packed snapshot. Its 'classes' list contains the class
+            table entries which were not included in a previously
+            packed snapshot.
+
+        """
+        packed = [self._pack_node(tree) for tree in trees]
+        classes = self._added
+        self._added = []
+        return {'format': TABLE_FORMAT, 'classes': classes, 'trees': packed}
+
+
+class SnapshotUnpacker(object):
+    """ The client side of the class table snapshot format.
+
+    """
+    def __init__(self):
+        """ Initialize a SnapshotUnpacker.
+
+        """
+        self._classes = []
+
+    def load(self, snapshot):
+        """ Load a snapshot and return its top-level trees.
+
+        Parameters
+        ----------
+        snapshot : object
+            A packed snapshot dict, a plain snapshot dict, or a list of
+            plain snapshot dicts.
+
+        Returns
+        -------
+        result : list
+            The list of top-level tree dicts. The trees of a packed
+            snapshot are expanded with `expand`, so their children are
+            still table nodes.
+
+        """
+        if is_packed(snapshot):
+            self._classes.extend(snapshot['classes'])
+            return [self.expand(node) for node in snapshot['trees']]
+        if isinstance(snapshot, dict):
+            return [snapshot]
+        return list(snapshot)
+
+    def expand(self, node):
+        """ Expand a table node into a snapshot dict.
+
+        Parameters
+        ----------
+        node : list or dict
+            A table node. A plain snapshot dict is returned unchanged.
+
+        Returns
+        -------
+        result : dict
+            The snapshot dict for the node. The 'children' of the dict
+            are the unexpanded nodes of the children.
+
+        """
+        if isinstance(node, dict):
+            return node
+        index, object_id, attrs, children = node
+        class_name, bases, defaults = self._classes[index]
+        tree = defaults.copy()
+        tree.update(attrs)
+        tree['object_id'] = object_id
+        tree['class'] = class_name
+        tree['bases'] = bases
+        tree['children'] = children
+        return tree
@@ -0,0 +1,234 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from collections import deque
+import threading
+import time
+import unittest
+
+from enaml.application import Application
+
+
+class LoopApplication(Application):
+    """ A minimal Application with a manually pumped event queue.
+
+    """
+    def __init__(self):
+        super(LoopApplication, self).__init__([])
+        self.queue = deque()
+        self.cycles = 0
+        self.thread = threading.current_thread()
+
+    def start_session(self, name):
+        raise NotImplementedError
+
+    def end_session(self, session_id):
+        raise NotImplementedError
+
+    def session(self, session_id):
+        return None
+
+    def sessions(self):
+        return []
+
+    def start(self):
+        queue = self.queue
+        while queue:
+            self.cycles += 1
+            queue.popleft()()
+
+    def stop(self):
+        self.queue.clear()
+
+    def deferred_call(self, callback, *args, **kwargs):
+        self.queue.append(lambda: callback(*args, **kwargs))
+
+    def timed_call(self, ms, callback, *args, **kwargs):
+        self.deferred_call(callback, *args, **kwargs)
+
+    def is_main_thread(self):
+        return threading.current_thread() is self.thread
+
+    def wait_for_events(self, timeout=5.0):
+        end = time.time() + timeout
+        while not self.queue and time.time() < end:
+            time.sleep(0.001)
+
+
+class TestSchedule(unittest.TestCase):
+
+    def setUp(self):
+        self.app = LoopApplication()
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def test_priority_order(self):
+        app = self.app
+        results = []
+        app.set_task_budget(1000)
+        for priority in (0, 5, 2):
+            app.schedule(results.append, (priority,), priority=priority)
+        app.start()
+        self.assertEqual(results, [5, 2, 0])
+
+    def test_one_task_per_cycle(self):
+        app = self.app
+        for idx in xrange(10):
+            app.schedule(lambda: None)
+        app.start()
+        self.assertEqual(app.cycles, 10)
+        self.assertFalse(app.has_pending_tasks())
+
+    def test_budget_batches_tasks(self):
+        app = self.app
+        app.set_task_budget(1000)
+        for idx in xrange(10):
+            app.schedule(lambda: None)
+        app.start()
+        self.assertEqual(app.cycles, 1)
+        stats = app.task_stats()
+        self.assertEqual(stats['executed'], 10)
+        self.assertEqual(stats['total'], 10)
+        self.assertEqual(stats['backlog'], 0)
+
+    def test_budget_yields(self):
+        app = self.app
+        app.set_task_budget(0)
+        for idx in xrange(3):
+            app.schedule(time.sleep, (0.001,))
+        app.queue.popleft()()
+        stats = app.task_stats()
+        self.assertEqual(stats['executed'], 1)
+        self.assertEqual(stats['backlog'], 2)
+        app.start()
+        self.assertEqual(app.task_stats()['total'], 3)
+
+    def test_unschedule(self):
+        app = self.app
+        app.set_task_budget(1000)
+        results = []
+        task = app.schedule(results.append, (1,))
+        task.unschedule()
+        app.start()
+        self.assertEqual(results, [])
+        self.assertFalse(task.pending())
+
+    def test_notify(self):
+        app = self.app
+        app.set_task_budget(1000)
+        results = []
+        task = app.schedule(lambda: 42)
+        task.notify(results.append)
+        app.start()
+        self.assertEqual(results, [42])
+        self.assertEqual(task.result(), 42)
+
+    def test_budget_turned_off_by_task(self):
+        app = self.app
+        app.set_task_budget(1000)
+        results = []
+        app.schedule(app.set_task_budget, (None,))
+        for idx in xrange(3):
+            app.schedule(results.append, (idx,))
+        app.start()
+        self.assertEqual(results, [0, 1, 2])
+        self.assertEqual(app.cycles, 4)
+
+    def test_budget_turned_off_before_slice(self):
+        app = self.app
+        app.set_task_budget(1000)
+        results = []
+        for idx in xrange(2):
+            app.schedule(results.append, (idx,))
+        app.set_task_budget(None)
+        app.start()
+        self.assertEqual(results, [0, 1])
+
+    def test_invalid_budget(self):
+        self.assertRaises(ValueError, self.app.set_task_budget, -1)
+
+
+def double(value):
+    return value * 2
+
+
+def make_unpicklable():
+    return lambda: None
+
+
+class TestSubmit(unittest.TestCase):
+
+    def setUp(self):
+        self.app = LoopApplication()
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def test_result_delivered_on_main_thread(self):
+        app = self.app
+        results = []
+        task = app.submit(lambda x: (x * 2, threading.current_thread()), (21,))
+        task.notify(lambda res: results.append(
+            (res[0], res[1], threading.current_thread())
+        ))
+        app.wait_for_events()
+        app.start()
+        value, worker, main = results[0]
+        self.assertEqual(value, 42)
+        self.assertTrue(worker is not app.thread)
+        self.assertTrue(main is app.thread)
+        self.assertFalse(task.pending())
+
+    def test_unschedule(self):
+        app = self.app
+        results = []
+        gate = threading.Event()
+        app.set_worker_count(threads=1)
+        blocker = app.submit(gate.wait)
+        task = app.submit(results.append, (1,))
+        task.unschedule()
+        gate.set()
+        while task.pending():
+            app.wait_for_events()
+            app.start()
+        self.assertEqual(results, [])
+        self.assertFalse(blocker.pending())
+
+    def test_failure(self):
+        app = self.app
+        task = app.submit(lambda: 1 / 0)
+        app.wait_for_events()
+        self.assertRaises(RuntimeError, app.start)
+        self.assertFalse(task.pending())
+
+    def test_process_pool(self):
+        app = self.app
+        app.set_worker_count(processes=1)
+        results = []
+        task = app.submit(double, (21,), process=True)
+        task.notify(results.append)
+        app.wait_for_events()
+        app.start()
+        self.assertEqual(results, [42])
+        self.assertFalse(task.pending())
+
+    def test_process_unpicklable_callable(self):
+        app = self.app
+        task = app.submit(lambda: 1, process=True)
+        app.wait_for_events()
+        self.assertRaises(RuntimeError, app.start)
+        self.assertFalse(task.pending())
+
+    def test_process_unpicklable_result(self):
+        app = self.app
+        app.set_worker_count(processes=1)
+        task = app.submit(make_unpicklable, process=True)
+        app.wait_for_events()
+        self.assertRaises(RuntimeError, app.start)
+        self.assertFalse(task.pending())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import json
+import unittest
+
+from enaml.codec import (
+    BinaryCodec, JSONCodec, BINARY_MAGIC, MAX_TABLE_SIZE, negotiate_codec,
+    lookup_codec, _codec_types,
+)
+
+
+def make_snapshot():
+    return {
+        'object_id': 'o_1a',
+        'name': u'main',
+        'class': 'PushButton',
+        'bases': ['AbstractButton', 'Control', 'ConstraintsWidget', 'Widget'],
+        'enabled': True,
+        'visible': False,
+        'bgcolor': '',
+        'minimum_size': (-1, -1),
+        'tool_tip': u'caf\xe9',
+        'value': 3.25,
+        'big': 2 ** 70,
+        'neg': -300,
+        'none': None,
+        'children': [
+            {'object_id': 'o_1b', 'class': 'Label', 'children': []},
+        ],
+    }
+
+
+class TestBinaryCodec(unittest.TestCase):
+
+    def test_round_trip(self):
+        encoder = BinaryCodec()
+        decoder = BinaryCodec()
+        snap = make_snapshot()
+        data = encoder.encode(snap)
+        self.assertTrue(data.startswith(BINARY_MAGIC))
+        result = decoder.decode(data)
+        expected = json.loads(json.dumps(snap))
+        self.assertEqual(result, expected)
+
+    def test_interning_across_messages(self):
+        encoder = BinaryCodec()
+        decoder = BinaryCodec()
+        first = encoder.encode(make_snapshot())
+        second = encoder.encode(make_snapshot())
+        self.assertTrue(len(second) < len(first))
+        expected = json.loads(json.dumps(make_snapshot()))
+        self.assertEqual(decoder.decode(first), expected)
+        self.assertEqual(decoder.decode(second), expected)
+
+    def test_smaller_than_json(self):
+        snap = make_snapshot()
+        size = len(BinaryCodec().encode(snap))
+        self.assertTrue(size < len(json.dumps(snap)))
+
+    def test_action_round_trip(self):
+        encoder = BinaryCodec()
+        decoder = BinaryCodec()
+        for ignored in range(2):
+            data = encoder.encode_action('o_2', 'set_text', {'text': u'hi'})
+            result = decoder.decode_action(data)
+            self.assertEqual(result, ('o_2', 'set_text', {'text': u'hi'}))
+
+    def test_table_limit(self):
+        encoder = BinaryCodec()
+        decoder = BinaryCodec()
+        keys = ['k%d' % idx for idx in xrange(MAX_TABLE_SIZE + 10)]
+        obj = dict.fromkeys(keys, 1)
+        self.assertEqual(decoder.decode(encoder.encode(obj)), obj)
+        self.assertEqual(decoder.decode(encoder.encode(obj)), obj)
+
+    def test_failed_encode_rolls_back_table(self):
+        encoder = BinaryCodec()
+        decoder = BinaryCodec()
+        bad = [{'fresh_key': 'x'}, object()]
+        self.assertRaises(TypeError, encoder.encode, bad)
+        self.assertRaises(
+            TypeError, encoder.encode_action, 'o_new', 'act', {'x': bad}
+        )
+        obj = {'fresh_key': 1}
+        self.assertEqual(decoder.decode(encoder.encode(obj)), obj)
+        data = encoder.encode_action('o_new', 'act', {})
+        self.assertEqual(decoder.decode_action(data), ('o_new', 'act', {}))
+
+    def test_rollback_to_mark(self):
+        encoder = BinaryCodec()
+        decoder = BinaryCodec()
+        mark = encoder.mark()
+        encoder.encode_action('o_new', 'act', {'fresh_key': 'x'})
+        # The message was not delivered, so it is encoded again.
+        encoder.rollback(mark)
+        data = encoder.encode_action('o_new', 'act', {'fresh_key': 'x'})
+        self.assertEqual(
+            decoder.decode_action(data), ('o_new', 'act', {'fresh_key': 'x'})
+        )
+
+    def test_invalid_data(self):
+        self.assertRaises(ValueError, BinaryCodec().decode, '{}')
+        self.assertRaises(TypeError, BinaryCodec().encode, object())
+
+
+class TestNegotiation(unittest.TestCase):
+
+    def test_negotiate_binary(self):
+        data = BinaryCodec().encode({})
+        self.assertTrue(negotiate_codec(data) is BinaryCodec)
+
+    def test_negotiate_json_fallback(self):
+        data = JSONCodec().encode({})
+        self.assertTrue(negotiate_codec(data) is JSONCodec)
+        self.assertTrue(negotiate_codec('') is JSONCodec)
+
+    def test_json_preferred(self):
+        action = JSONCodec().encode_action('', 'discover', {})
+        self.assertTrue(JSONCodec.detect(action))
+        self.assertFalse(BinaryCodec.detect(action))
+        self.assertFalse(JSONCodec.detect(BinaryCodec().encode([])))
+        self.assertTrue(_codec_types[0] is JSONCodec)
+
+    def test_lookup(self):
+        self.assertTrue(lookup_codec('binary') is BinaryCodec)
+        self.assertTrue(lookup_codec('json') is JSONCodec)
+        self.assertTrue(lookup_codec('missing') is None)
+
+
+if __name__ == '__main__':
+    unittest.main()
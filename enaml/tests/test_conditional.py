@@ -0,0 +1,153 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import gc
+import unittest
+
+from enaml.core.conditional import Conditional, KeepAlivePool, keep_alive_pool
+from enaml.core.enaml_compiler import EnamlCompiler
+from enaml.core.parser import parse
+from enaml.session import Session
+
+from .test_application import LoopApplication
+from .test_session import RecordingSocket
+
+
+SOURCE = """
+from enaml.core.conditional import Conditional
+from enaml.widgets.api import Container, Field, Window
+
+enamldef Main(Window):
+    Container:
+        Conditional:
+            keep_alive = True
+            Field:
+                text = u'field'
+"""
+
+
+class ConditionalSession(Session):
+    """ A session with a window holding a keep alive conditional.
+
+    """
+    def on_open(self):
+        code = EnamlCompiler.compile(parse(SOURCE), '__enaml_tests__')
+        ns = {}
+        exec code in ns
+        self.windows.append(ns['Main']())
+
+
+class Cached(object):
+
+    def __init__(self):
+        self.released = False
+
+    def _release_cached_items(self):
+        self.released = True
+
+
+class TestKeepAlivePool(unittest.TestCase):
+
+    def test_eviction(self):
+        pool = KeepAlivePool(max_objects=10)
+        first = Cached()
+        second = Cached()
+        pool.add(first, 6)
+        pool.add(second, 6)
+        self.assertTrue(first.released)
+        self.assertFalse(second.released)
+        self.assertEqual(pool.count(), 6)
+
+    def test_weakly_held(self):
+        pool = KeepAlivePool()
+        pool.add(Cached(), 6)
+        gc.collect()
+        self.assertEqual(pool.count(), 0)
+        kept = Cached()
+        pool.add(kept, 4)
+        gc.collect()
+        self.assertEqual(pool.count(), 4)
+
+
+class TestKeepAliveConditional(unittest.TestCase):
+
+    def setUp(self):
+        self.app = LoopApplication()
+        self.socket = RecordingSocket()
+        self.session = ConditionalSession()
+        self.session.open('s_1')
+        self.session.activate(self.socket)
+        container = self.session.windows[0].children[0]
+        self.container = container
+        self.conditional = [
+            child for child in container.children
+            if isinstance(child, Conditional)
+        ][0]
+
+    def tearDown(self):
+        keep_alive_pool.discard(self.conditional)
+        self.app.destroy()
+
+    def batched_actions(self):
+        self.app.start()
+        actions = []
+        for ignored, action, content in self.socket.messages:
+            if action == 'message_batch':
+                actions.extend(content['batch'])
+        del self.socket.messages[:]
+        return actions
+
+    def test_reattach(self):
+        conditional = self.conditional
+        item, = conditional.items
+        conditional.condition = False
+        self.assertEqual(conditional.items, ())
+        self.assertIs(item.parent, conditional)
+        self.assertTrue(item.is_active)
+        self.assertTrue(keep_alive_pool.count() > 0)
+        conditional.condition = True
+        self.assertEqual(conditional.items, (item,))
+        self.assertIs(item.parent, self.container)
+
+    def test_detached_items_are_not_found(self):
+        conditional = self.conditional
+        window = self.session.windows[0]
+        window.enable_name_index()
+        item, = conditional.items
+        item.name = 'kept'
+        self.assertIs(window.find('kept'), item)
+        conditional.condition = False
+        self.assertIs(item.parent, conditional)
+        self.assertEqual(list(conditional.children), [])
+        self.assertNotIn(item, list(window.traverse()))
+        self.assertIsNone(window.find('kept'))
+        self.assertEqual(window.find_all('kept'), [])
+        self.assertEqual(window.find_by_type(type(item)), [])
+        window.disable_name_index()
+        self.assertIsNone(window.find('kept'))
+        window.enable_name_index()
+        conditional.condition = True
+        self.assertIs(window.find('kept'), item)
+        self.assertIs(window.find_by_type(type(item))[0], item)
+        window.disable_name_index()
+        self.assertIs(window.find('kept'), item)
+
+    def test_destroy_releases_cached_items(self):
+        conditional = self.conditional
+        item, = conditional.items
+        conditional.condition = False
+        self.batched_actions()
+        count = keep_alive_pool.count()
+        conditional.destroy()
+        self.assertTrue(item.is_destroyed)
+        self.assertEqual(keep_alive_pool.count(), count - 1)
+        # The detached item is not in the client tree of the container,
+        # so it must be destroyed on the client by its own action.
+        self.assertIn(
+            (item.object_id, 'destroy', {}), self.batched_actions()
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from enaml.layout.constraint_encoding import (
+    decode_constraints, encode_constraints
+)
+from enaml.layout.constraint_variable import ConstraintVariable
+
+
+class TestConstraintEncoding(unittest.TestCase):
+
+    def setUp(self):
+        self.width = ConstraintVariable('width', 'o_1')
+        self.left = ConstraintVariable('left', 'o_1')
+        self.other = ConstraintVariable('width', 'o_2')
+
+    def decode(self, encoded):
+        variables = {}
+        def primitive(owner, name):
+            key = (owner, name)
+            self.assertNotIn(key, variables)
+            var = variables[key] = ConstraintVariable(name, owner)
+            return var
+        return decode_constraints(encoded, primitive)
+
+    def test_symbols_are_shared(self):
+        cns = [
+            self.width >= 10,
+            (self.width == 2 * self.other) | 'strong',
+            self.left + self.width <= self.other + 5,
+        ]
+        encoded = encode_constraints(cns)
+        self.assertEqual(len(encoded['symbols']), 3)
+        self.assertEqual(encoded['sizes'], [1, 2, 3])
+        self.assertEqual(encoded['ops'], [2, 0, 1])
+        self.assertEqual(encoded['strengths'], [0, 1, 0])
+
+    def test_round_trip(self):
+        cns = [
+            (self.width >= 10) | 'weak' | 0.5,
+            self.left + 2 * self.width == self.other - 3,
+        ]
+        decoded = self.decode(encode_constraints(cns))
+        self.assertEqual(len(decoded), 2)
+        first, second = decoded
+        self.assertEqual(first.op, '>=')
+        self.assertEqual(first.strength, 'weak')
+        self.assertEqual(first.weight, 0.5)
+        self.assertEqual(str(first.lhs), 'width - 10.0')
+        self.assertEqual(second.op, '==')
+        terms = dict(
+            ((t.var.owner, t.var.name), t.coeff) for t in second.lhs.terms
+        )
+        self.assertEqual(terms, {
+            ('o_1', 'left'): 1.0, ('o_1', 'width'): 2.0,
+            ('o_2', 'width'): -1.0,
+        })
+        self.assertEqual(second.lhs.constant, 3.0)
+
+    def test_constant_constraints_are_dropped(self):
+        encoded = encode_constraints([self.width == self.width + 1])
+        self.assertEqual(encoded['sizes'], [])
+        self.assertEqual(self.decode(encoded), [])
+        self.assertEqual(self.decode([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,7 +6,13 @@ from unittest import TestCase
 
 from traits.api import TraitError
 
-from ..widgets.constraints_widget import ConstraintsWidget
+from ..layout.layout_helpers import hbox, spacer, vbox
+from ..widgets.constraints_widget import (
+    ConstraintsWidget, layout_fingerprint, relayout_stats,
+    reset_relayout_stats,
+)
+from ..widgets.container import Container
+from .test_application import LoopApplication
 
 
 class TestLayoutComponent(TestCase):
@@ -51,3 +57,70 @@ class TestLayoutComponent(TestCase):
             self.assertRaises(TraitError, comp.trait_set, resist_width=bad_val)
             self.assertRaises(TraitError, comp.trait_set, resist_height=bad_val)
 
+    def test_layout_fingerprint(self):
+        """ Test that equal layout info has an equal fingerprint.
+
+        """
+        comp = ConstraintsWidget()
+        comp.constraints = [comp.width >= 10]
+        first = layout_fingerprint(comp._layout_info())
+        comp.constraints = [comp.width >= 10]
+        self.assertEqual(layout_fingerprint(comp._layout_info()), first)
+        comp.hug_width = 'weak'
+        self.assertNotEqual(layout_fingerprint(comp._layout_info()), first)
+
+    def test_box_helper_fingerprint(self):
+        """ Test that recomputed box helpers have an equal fingerprint.
+
+        """
+        container = Container()
+        first = ConstraintsWidget(container)
+        second = ConstraintsWidget(container)
+        for helper in (
+            lambda: hbox(first, spacer, second),
+            lambda: vbox(first, second),
+        ):
+            container.constraints = [helper()]
+            fingerprint = layout_fingerprint(container._layout_info())
+            container.constraints = [helper()]
+            self.assertEqual(
+                layout_fingerprint(container._layout_info()), fingerprint,
+            )
+        container.constraints = [hbox(second, spacer, first)]
+        swapped = layout_fingerprint(container._layout_info())
+        container.constraints = [hbox(first, spacer, second)]
+        self.assertNotEqual(
+            layout_fingerprint(container._layout_info()), swapped,
+        )
+
+
+class TestRelayoutSuppression(TestCase):
+    """ Test the suppression of unchanged relayout actions.
+
+    """
+    def setUp(self):
+        self.app = LoopApplication()
+        reset_relayout_stats()
+        self.container = Container()
+        self.first = ConstraintsWidget(self.container)
+        self.second = ConstraintsWidget(self.container)
+
+    def tearDown(self):
+        reset_relayout_stats()
+        self.app.destroy()
+
+    def relayout(self, constraints):
+        self.container.constraints = constraints
+        self.container._send_relayout()
+        self.app.start()
+
+    def test_recomputed_hbox_is_suppressed(self):
+        first, second = self.first, self.second
+        self.relayout([hbox(first, spacer, second)])
+        self.assertEqual(relayout_stats(), {'sent': 1, 'suppressed': 0})
+        self.relayout([hbox(first, spacer, second)])
+        self.assertEqual(relayout_stats(), {'sent': 1, 'suppressed': 1})
+        self.relayout([vbox(first, second)])
+        self.assertEqual(relayout_stats(), {'sent': 2, 'suppressed': 1})
+        self.relayout([vbox(first, second)])
+        self.assertEqual(relayout_stats(), {'sent': 2, 'suppressed': 2})
@@ -0,0 +1,106 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from enaml.core.dynamic_scope import (
+    SCOPE_EPOCH_SHIFT, DynamicScope, ResolutionCache,
+    invalidate_resolution_caches, new_scope_epoch
+)
+from enaml.core.object import Object
+
+
+class Node(object):
+
+    _flags = 0
+
+    parent = property(lambda self: self._parent)
+
+    def __init__(self, parent=None, **attrs):
+        self._parent = parent
+        self.__dict__.update(attrs)
+
+    def reparent(self, parent):
+        self._parent = parent
+        self._flags = new_scope_epoch() << SCOPE_EPOCH_SHIFT
+
+
+class TestResolutionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.root = Node(value=1)
+        self.middle = Node(self.root)
+        self.leaf = Node(self.middle)
+        self.cache = ResolutionCache()
+
+    def test_resolve(self):
+        cache = self.cache
+        for ignored in xrange(2):
+            parent, value = cache.resolve(self.leaf, 'value')
+            self.assertIs(parent, self.root)
+            self.assertEqual(value, 1)
+        self.assertRaises(KeyError, cache.resolve, self.leaf, 'missing')
+        self.assertRaises(KeyError, cache.resolve, self.leaf, 'missing')
+
+    def test_invalidate(self):
+        cache = self.cache
+        cache.resolve(self.leaf, 'value')
+        self.assertRaises(KeyError, cache.resolve, self.leaf, 'missing')
+        self.middle.value = 2
+        self.middle.missing = 3
+        invalidate_resolution_caches()
+        self.assertEqual(cache.resolve(self.leaf, 'value'), (self.middle, 2))
+        self.assertEqual(cache.resolve(self.leaf, 'missing'), (self.middle, 3))
+
+    def test_reparent_invalidates_walked_chain(self):
+        cache = self.cache
+        self.assertEqual(cache.resolve(self.leaf, 'value'), (self.root, 1))
+        self.assertRaises(KeyError, cache.resolve, self.leaf, 'missing')
+        other = Node(value=2, missing=3)
+        self.middle.reparent(other)
+        self.assertEqual(cache.resolve(self.leaf, 'value'), (other, 2))
+        self.assertEqual(cache.resolve(self.leaf, 'missing'), (other, 3))
+
+    def test_reparent_elsewhere_keeps_entries(self):
+        cache = self.cache
+        self.assertEqual(cache.resolve(self.leaf, 'value'), (self.root, 1))
+        # An unrelated reparent does not discard the entry, so a name
+        # added to the middle node without invalidation is not seen.
+        Node().reparent(Node())
+        self.middle.value = 2
+        self.assertEqual(cache.resolve(self.leaf, 'value'), (self.root, 1))
+        # Reparenting the supplier itself does not affect the entry.
+        self.root.reparent(Node(value=3))
+        self.assertEqual(cache.resolve(self.leaf, 'value'), (self.root, 1))
+        self.leaf.reparent(self.middle)
+        self.assertEqual(cache.resolve(self.leaf, 'value'), (self.middle, 2))
+
+    def test_scope(self):
+        scope = DynamicScope(self.leaf, {'local': 0}, {}, None, self.cache)
+        self.assertEqual(scope['local'], 0)
+        self.assertEqual(scope['value'], 1)
+        self.assertTrue('value' in scope)
+        self.assertFalse('missing' in scope)
+
+
+class TestObjectScopeEpoch(unittest.TestCase):
+
+    def test_reparent_advances_epoch(self):
+        root = Object()
+        child = Object(root)
+        child.state = 'active'
+        epoch = child._flags >> SCOPE_EPOCH_SHIFT
+        self.assertTrue(epoch > 0)
+        other = Object()
+        child.set_parent(other)
+        self.assertTrue(child._flags >> SCOPE_EPOCH_SHIFT > epoch)
+        epoch = child._flags >> SCOPE_EPOCH_SHIFT
+        root.insert_children(None, [child])
+        self.assertTrue(child._flags >> SCOPE_EPOCH_SHIFT > epoch)
+        self.assertEqual(child.state, 'active')
+        self.assertEqual(root._flags >> SCOPE_EPOCH_SHIFT, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
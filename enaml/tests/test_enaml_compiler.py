@@ -0,0 +1,31 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import ast
+import unittest
+
+from enaml.core.enaml_compiler import static_dependency_chain
+
+
+def chain(source):
+    return static_dependency_chain(ast.parse(source, mode='eval'))
+
+
+class TestStaticDependencyChain(unittest.TestCase):
+
+    def test_name(self):
+        self.assertEqual(chain('model'), ('model',))
+
+    def test_attribute_chain(self):
+        self.assertEqual(chain('model.foo.bar'), ('model', 'foo', 'bar'))
+
+    def test_dynamic_expressions(self):
+        self.assertIsNone(chain('model.foo + 1'))
+        self.assertIsNone(chain('model.items[0].name'))
+        self.assertIsNone(chain('model.get().name'))
+        self.assertIsNone(chain('nonlocals.foo'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from traits.api import Any, List
+
+from enaml.core.declarative import Declarative
+from enaml.core.enaml_compiler import EnamlCompiler
+from enaml.core.exceptions import DeclarativeNameError
+from enaml.core.instantiation_plan import FailedPlan, InstantiationPlan
+from enaml.core.operator_context import OperatorContext
+from enaml.core.operators import OPERATORS
+from enaml.core.parser import parse
+
+
+SOURCE = """
+enamldef Leaf(Recorder):
+    name = 'leaf'
+    Recorder:
+        name = 'leaf_child'
+
+enamldef Main(Recorder): main:
+    name = 'main'
+    Recorder: first:
+        name = 'first'
+        value << second.value
+        Recorder: inner:
+            name = 'inner'
+            ref = main
+            Leaf:
+                ref = inner
+    Recorder: second:
+        name = 'second'
+        value = 42
+        ref = first
+        Item:
+            name = 'item'
+    Custom:
+        name = 'custom'
+        Recorder:
+            name = 'custom_child'
+"""
+
+
+MISSING_SOURCE = """
+enamldef Main(Recorder):
+    Missing:
+        name = 'missing'
+"""
+
+
+class Recorder(Declarative):
+    """ A declarative which records the children events it receives.
+
+    """
+    #: The shared log of (name, children names) event records.
+    events = []
+
+    ref = Any
+
+    value = Any
+
+    def children_event(self, event):
+        super(Recorder, self).children_event(event)
+        names = tuple(child.name for child in event.new)
+        self.events.append((self.name, names))
+
+
+class Custom(Recorder):
+    """ A recorder which reimplements `populate`.
+
+    """
+    populated = List
+
+    def populate(self, description, identifiers, f_globals):
+        self.populated.append(description['type'])
+        super(Custom, self).populate(description, identifiers, f_globals)
+
+
+class OtherItem(Recorder):
+    pass
+
+
+def compile_source(source):
+    code = EnamlCompiler.compile(parse(source), '__enaml_tests__')
+    ns = {'Recorder': Recorder, 'Custom': Custom, 'Item': Recorder}
+    exec code in ns
+    return ns
+
+
+def path(obj):
+    names = []
+    while obj is not None:
+        names.append(obj.name)
+        obj = obj.parent
+    return '/'.join(reversed(names))
+
+
+def describe(obj):
+    """ Describe the tree, identifiers and bindings of an object.
+
+    """
+    expressions = obj._expressions or []
+    ref = obj.ref
+    return (
+        type(obj).__name__,
+        obj.name,
+        obj.value,
+        path(ref) if ref is not None else None,
+        tuple(expressions[::2]),
+        tuple(describe(child) for child in obj.children),
+    )
+
+
+class TestInstantiationPlan(unittest.TestCase):
+
+    def setUp(self):
+        del Recorder.events[:]
+        self.ns = compile_source(SOURCE)
+
+    def build(self, planned):
+        """ Build a Main and return its description and events.
+
+        """
+        main_cls = self.ns['Main']
+        if not planned:
+            type.__setattr__(main_cls, '_instantiation_plan', False)
+        del Recorder.events[:]
+        main = main_cls()
+        result = (describe(main), list(Recorder.events))
+        if not planned:
+            type.__setattr__(main_cls, '_instantiation_plan', None)
+        return result
+
+    def plan(self):
+        return self.ns['Main'].__dict__.get('_instantiation_plan')
+
+    def test_plan_matches_populate(self):
+        expected = self.build(False)
+        self.assertIsNone(self.plan())
+        self.assertEqual(self.build(True), expected)
+        self.assertIsInstance(self.plan(), InstantiationPlan)
+        # A second instance executes the cached plan.
+        self.assertEqual(self.build(True), expected)
+
+    def test_children_events_follow_subtrees(self):
+        tree, events = self.build(True)
+        order = [name for name, children in events]
+        # The event of a child is sent when its subtree is complete,
+        # before the events of its next siblings.
+        self.assertEqual(order, [
+            'leaf', 'inner', 'first', 'second', 'custom', 'main',
+        ])
+        self.assertEqual(events[-1], (
+            'main', ('first', 'second', 'custom'),
+        ))
+
+    def test_custom_populate_child(self):
+        main = self.ns['Main']()
+        custom = main.children[-1]
+        self.assertIsInstance(custom, Custom)
+        self.assertEqual(custom.populated, ['Custom'])
+        self.assertEqual(
+            [child.name for child in custom.children], ['custom_child'],
+        )
+
+    def test_rebound_global(self):
+        self.build(True)
+        plan = self.plan()
+        self.ns['Item'] = OtherItem
+        expected = self.build(False)
+        self.assertEqual(self.build(True), expected)
+        self.assertEqual(expected[0][5][1][5][0][0], 'OtherItem')
+        self.assertIsNot(self.plan(), plan)
+
+    def test_operator_context_change(self):
+        expected = self.build(False)
+        self.build(True)
+        plan = self.plan()
+        calls = []
+
+        def op_simple(obj, name, func, identifiers):
+            calls.append((type(obj).__name__, name))
+            OPERATORS['__operator_Equal__'](obj, name, func, identifiers)
+
+        operators = OperatorContext(OPERATORS)
+        operators['__operator_Equal__'] = op_simple
+        with operators:
+            self.assertEqual(self.build(True), expected)
+        self.assertIsNot(self.plan(), plan)
+        self.assertIs(self.plan()._operators, operators)
+        self.assertIn(('Recorder', 'value'), calls)
+        self.assertIn(('Leaf', 'ref'), calls)
+        # The original context compiles its own plan again.
+        self.assertEqual(self.build(True), expected)
+        self.assertIsNot(self.plan()._operators, operators)
+
+
+class TestFailedPlan(unittest.TestCase):
+
+    def test_failure_is_cached(self):
+        ns = compile_source(MISSING_SOURCE)
+        main_cls = ns['Main']
+        self.assertRaises(DeclarativeNameError, main_cls)
+        failed = main_cls.__dict__['_instantiation_plan']
+        self.assertIsInstance(failed, FailedPlan)
+        self.assertRaises(DeclarativeNameError, main_cls)
+        self.assertIs(main_cls.__dict__['_instantiation_plan'], failed)
+        # The populate path builds the type once the name exists.
+        ns['Missing'] = Recorder
+        main = main_cls()
+        self.assertEqual(main.children[0].name, 'missing')
+        self.assertIs(main_cls.__dict__['_instantiation_plan'], failed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from casuarius import ConstraintVariable, medium, strong, weak
+
+from enaml.layout.layout_manager import LayoutManager
+
+
+def make_manager(bounded):
+    """ Create an initialized manager for a small constraint system.
+
+    """
+    width = ConstraintVariable('width')
+    height = ConstraintVariable('height')
+    constraints = [
+        width >= 10,
+        height >= 5,
+        (width == 50) | weak,
+        (height == 20) | strong,
+        (width == 40) | medium,
+    ]
+    if bounded:
+        constraints.extend([width <= 300, height <= 100])
+    manager = LayoutManager()
+    manager.initialize(constraints)
+    return manager, width, height
+
+
+class TestLayoutManager(unittest.TestCase):
+
+    def test_get_sizes_matches_separate_queries(self):
+        for bounded in (False, True):
+            manager, width, height = make_manager(bounded)
+            expected = (
+                manager.get_min_size(width, height, weak),
+                manager.get_min_size(width, height),
+                manager.get_max_size(width, height),
+            )
+            self.assertEqual(manager.get_sizes(width, height), expected)
+            # The shared session leaves nothing behind in the solver.
+            self.assertEqual(manager.get_sizes(width, height), expected)
+            self.assertEqual(
+                manager.get_min_size(width, height, weak), expected[0],
+            )
+
+    def test_get_sizes_values(self):
+        manager, width, height = make_manager(True)
+        best, min_size, max_size = manager.get_sizes(width, height)
+        self.assertEqual(min_size, (40.0, 20.0))
+        self.assertEqual(max_size, (40.0, 20.0))
+
+    def test_get_sizes_unbounded_max(self):
+        width = ConstraintVariable('width')
+        height = ConstraintVariable('height')
+        manager = LayoutManager()
+        manager.initialize([width >= 10, height >= 5, height <= 100])
+        best, min_size, max_size = manager.get_sizes(width, height)
+        self.assertEqual(min_size, (10.0, 5.0))
+        self.assertEqual(max_size, (-1, 100.0))
+
+    def test_get_sizes_uninitialized(self):
+        manager = LayoutManager()
+        width = ConstraintVariable('width')
+        height = ConstraintVariable('height')
+        self.assertRaises(RuntimeError, manager.get_sizes, width, height)
+
+
+if __name__ == '__main__':
+    unittest.main()
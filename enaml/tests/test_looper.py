@@ -0,0 +1,286 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from enaml.core.conditional import Conditional
+from enaml.core.enaml_compiler import EnamlCompiler
+from enaml.core.looper import Looper
+from enaml.core.parser import parse
+
+
+SOURCE = """
+from enaml.core.declarative import Declarative
+from enaml.core.looper import Looper
+
+enamldef Row(Declarative):
+    attr text
+
+enamldef Main(Declarative):
+    attr rows
+    attr layout << looper.layout_items
+    Looper:
+        id: looper
+        iterable = rows
+        item_extent = 24
+        window = (10, 5)
+        Row:
+            text = str(loop_item)
+"""
+
+
+KEYED_SOURCE = """
+from enaml.core.conditional import Conditional
+from enaml.core.declarative import Declarative
+from enaml.core.looper import Looper
+
+enamldef Row(Declarative):
+    attr text
+    attr index
+
+enamldef Main(Declarative):
+    attr rows
+    Looper:
+        keyed = True
+        key = lambda row: row[0]
+        iterable << rows
+        Row:
+            text = loop_item
+            index = loop_index
+            Conditional:
+                Row:
+                    text = 'inner ' + loop_item
+        Conditional:
+            Row:
+                text = 'top ' + loop_item
+"""
+
+
+NESTED_WINDOW_SOURCE = """
+from enaml.core.conditional import Conditional
+from enaml.core.declarative import Declarative
+from enaml.core.looper import Looper
+
+enamldef Row(Declarative):
+    attr text
+
+enamldef Main(Declarative):
+    attr rows
+    Looper:
+        iterable = rows
+        window = (0, 2)
+        Row:
+            text = '%s %d' % (loop_item, loop_index)
+            Conditional:
+                Row:
+                    text = 'inner ' + loop_item
+"""
+
+
+def make_main(rows, source=SOURCE):
+    code = EnamlCompiler.compile(parse(source), '__enaml_tests__')
+    ns = {}
+    exec code in ns
+    main = ns['Main'](rows=rows)
+    main.initialize()
+    return main
+
+
+def find_looper(main):
+    return [child for child in main.children if isinstance(child, Looper)][0]
+
+
+class TestWindowedLooper(unittest.TestCase):
+
+    def setUp(self):
+        self.main = make_main(range(100))
+        self.looper = [
+            child for child in self.main.children
+            if isinstance(child, Looper)
+        ][0]
+        # Only the looper is marked active, so that it applies changes
+        # to its window without a session to send actions to.
+        self.looper.state = 'active'
+
+    def texts(self):
+        return [item.text for iteration in self.looper.items
+                for item in iteration]
+
+    def test_spacers(self):
+        looper = self.looper
+        self.assertEqual(self.texts(), ['10', '11', '12', '13', '14'])
+        self.assertEqual(looper.spacers, (10 * 24, 85 * 24))
+        looper.window = (50, 5)
+        self.assertEqual(self.texts(), ['50', '51', '52', '53', '54'])
+        self.assertEqual(looper.spacers, (50 * 24, 45 * 24))
+        looper.window = (98, 5)
+        self.assertEqual(self.texts(), ['98', '99'])
+        self.assertEqual(looper.spacers, (98 * 24, 0))
+        looper.item_extent = 10
+        self.assertEqual(looper.spacers, (980, 0))
+        looper.window = None
+        self.assertEqual(len(self.texts()), 100)
+        self.assertEqual(looper.spacers, (0, 0))
+
+    def test_layout_items(self):
+        looper = self.looper
+        layout = looper.layout_items
+        self.assertEqual(layout[0], 240)
+        self.assertEqual(layout[-1], 85 * 24)
+        self.assertEqual([item.text for item in layout[1:-1]], self.texts())
+        # The items of the window follow the looper in its parent.
+        children = self.main.children
+        start = children.index(looper) - len(layout) + 2
+        self.assertEqual(list(children[start:start + 5]), layout[1:-1])
+
+    def test_bound_layout_evaluated_once(self):
+        main = self.main
+        looper = self.looper
+        self.assertEqual(main.layout, looper.layout_items)
+        changes = []
+        main.on_trait_change(lambda new: changes.append(new), 'layout')
+        looper.window = (12, 5)
+        # The spacers and the items change in one batch.
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(changes[0][0], 12 * 24)
+        texts = [item.text for item in changes[0][1:-1]]
+        self.assertEqual(texts, ['12', '13', '14', '15', '16'])
+
+
+class TestRecycledNestedTemplated(unittest.TestCase):
+
+    def setUp(self):
+        self.main = make_main(['a', 'b', 'c', 'd'], NESTED_WINDOW_SOURCE)
+        self.looper = find_looper(self.main)
+        self.looper.state = 'active'
+
+    def texts(self):
+        texts = []
+        for iteration in self.looper.items:
+            row = iteration[0]
+            inner = [
+                child.text for child in row.children
+                if not isinstance(child, Conditional)
+            ]
+            texts.append((row.text, inner))
+        return texts
+
+    def test_window_move(self):
+        self.assertEqual(self.texts(), [
+            ('a 0', ['inner a']), ('b 1', ['inner b']),
+        ])
+        rows = [iteration[0] for iteration in self.looper.items]
+        self.looper.window = (1, 2)
+        # The row of index 0 is recycled for index 2.
+        self.assertEqual(self.texts(), [
+            ('b 1', ['inner b']), ('c 2', ['inner c']),
+        ])
+        recycled = [iteration[0] for iteration in self.looper.items]
+        self.assertEqual(recycled, [rows[1], rows[0]])
+
+
+class TestKeyedLooper(unittest.TestCase):
+
+    def setUp(self):
+        self.main = make_main(['a1', 'b1', 'c1'], KEYED_SOURCE)
+        self.looper = find_looper(self.main)
+        # Only the looper is marked active, so that it applies changes
+        # to its iterable without a session to send actions to.
+        self.looper.state = 'active'
+        self.changes = []
+        self.main.on_trait_change(self.on_children, 'children')
+
+    def on_children(self, new):
+        self.changes.append(new)
+
+    def rows(self):
+        return [iteration[0] for iteration in self.looper.items]
+
+    def texts(self):
+        return [row.text for row in self.rows()]
+
+    def inner_texts(self):
+        texts = []
+        for row in self.rows():
+            for child in row.children:
+                if not isinstance(child, Conditional):
+                    texts.append(child.text)
+        return texts
+
+    def test_insert(self):
+        old = self.rows()
+        self.main.rows = ['a1', 'x1', 'b1', 'c1']
+        rows = self.rows()
+        self.assertEqual(self.texts(), ['a1', 'x1', 'b1', 'c1'])
+        self.assertEqual([row.index for row in rows], [0, 1, 2, 3])
+        self.assertIs(rows[0], old[0])
+        self.assertIs(rows[2], old[1])
+        self.assertIs(rows[3], old[2])
+        self.assertEqual(len(self.changes), 1)
+
+    def test_remove(self):
+        old = self.rows()
+        self.main.rows = ['a1', 'c1']
+        self.assertEqual(self.rows(), [old[0], old[2]])
+        self.assertTrue(old[1].is_destroyed)
+        self.assertEqual([row.index for row in self.rows()], [0, 1])
+        self.assertNotIn(old[1], self.main.children)
+        self.assertEqual(len(self.changes), 1)
+
+    def test_move(self):
+        old = self.rows()
+        self.main.rows = ['c1', 'a1', 'b1']
+        self.assertEqual(self.rows(), [old[2], old[0], old[1]])
+        self.assertEqual([row.index for row in self.rows()], [0, 1, 2])
+        # The items follow the new order in the parent.
+        children = [
+            child for child in self.main.children if child in old
+        ]
+        self.assertEqual(children, self.rows())
+        self.assertEqual(len(self.changes), 1)
+
+    def test_duplicate_keys(self):
+        self.main.rows = ['a1', 'a2', 'b1']
+        first = self.rows()
+        self.main.rows = ['b1', 'a3', 'a4']
+        rows = self.rows()
+        # Duplicate keys are matched in order.
+        self.assertEqual(rows, [first[2], first[0], first[1]])
+        self.assertEqual(self.texts(), ['b1', 'a3', 'a4'])
+        self.assertEqual(self.inner_texts(), [
+            'inner b1', 'inner a3', 'inner a4',
+        ])
+
+    def top_texts(self):
+        return [
+            iteration[1].items[0].text for iteration in self.looper.items
+        ]
+
+    def test_rebind_nested_templated(self):
+        old = self.rows()
+        # The simple expressions are evaluated before the rebind.
+        self.assertEqual(self.inner_texts(), [
+            'inner a1', 'inner b1', 'inner c1',
+        ])
+        self.assertEqual(self.top_texts(), ['top a1', 'top b1', 'top c1'])
+        self.main.rows = ['b2', 'a2', 'c1']
+        self.assertEqual(self.rows(), [old[1], old[0], old[2]])
+        self.assertEqual(self.texts(), ['b2', 'a2', 'c1'])
+        self.assertEqual(self.inner_texts(), [
+            'inner b2', 'inner a2', 'inner c1',
+        ])
+        # The items of a conditional at the top level of the body are
+        # siblings of the rows.
+        self.assertEqual(self.top_texts(), ['top b2', 'top a2', 'top c1'])
+        self.assertEqual(len(self.changes), 1)
+
+    def test_unchanged(self):
+        old = self.rows()
+        self.main.rows = ['a1', 'b1', 'c1']
+        self.assertEqual(self.rows(), old)
+        self.assertEqual(self.changes, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+from collections import deque
+import unittest
+
+from enaml.core.name_index import NameIndex
+
+
+class Node(object):
+
+    _tree_index = None
+
+    def __init__(self, parent=None, name=''):
+        self.name = name
+        self._parent = parent
+        self._children = ()
+        if parent is not None:
+            parent._children += (self,)
+
+    def traverse(self):
+        stack = deque([self])
+        while stack:
+            obj = stack.popleft()
+            yield obj
+            stack.extend(obj._children)
+
+
+class Leaf(Node):
+    pass
+
+
+class TestNameIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.root = Node(name='root')
+        self.left = Node(self.root, name='left')
+        self.right = Node(self.root)
+        self.deep = Leaf(self.left, name='target')
+        self.shallow = Leaf(self.right, name='target')
+        self.index = NameIndex()
+        self.index.add_subtree(self.root)
+
+    def tearDown(self):
+        self.index.release()
+
+    def test_lookup_name_order(self):
+        index = self.index
+        found = index.lookup_name('target', self.root)
+        self.assertEqual(found, [self.deep, self.shallow])
+        self.assertEqual(index.lookup_name('target', self.right),
+                         [self.shallow])
+        self.assertEqual(index.lookup_name('missing', self.root), [])
+
+    def test_lookup_type(self):
+        index = self.index
+        self.assertEqual(index.lookup_type(Leaf, self.root),
+                         [self.deep, self.shallow])
+        self.assertEqual(len(index.lookup_type(Node, self.root)), 5)
+
+    def test_remove_and_rename(self):
+        index = self.index
+        index.remove_subtree(self.left)
+        index.remove_subtree(self.left)
+        self.assertEqual(index.lookup_name('target', self.root),
+                         [self.shallow])
+        self.assertEqual(index.lookup_name('left', self.root), [])
+        index.rename(self.shallow, 'target', 'other')
+        self.assertEqual(index.lookup_name('target', self.root), [])
+        self.assertEqual(index.lookup_name('other', self.root),
+                         [self.shallow])
+
+    def test_active_count(self):
+        active = NameIndex.active
+        index = NameIndex()
+        self.assertEqual(NameIndex.active, active + 1)
+        index.release()
+        self.assertEqual(NameIndex.active, active)
+
+
+if __name__ == '__main__':
+    unittest.main()
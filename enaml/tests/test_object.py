@@ -0,0 +1,240 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from traits.api import List, TraitError
+
+from enaml.core.name_index import NameIndex
+from enaml.core.object import OBJECT_STATES, Object
+
+
+class Leaf(Object):
+    pass
+
+
+class Finder(Object):
+    """ An object which searches its tree from its parent events.
+
+    """
+    #: The objects with the same name found by the last parent event.
+    found = List
+
+    def parent_event(self, event):
+        super(Finder, self).parent_event(event)
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        self.found = root.find_all(self.name)
+
+
+class TestObjectState(unittest.TestCase):
+
+    def setUp(self):
+        self.obj = Object()
+        self.changes = []
+        self.obj.on_trait_change(self.on_state, 'state')
+
+    def on_state(self, obj, name, old, new):
+        self.changes.append((old, new))
+
+    def test_default_state(self):
+        obj = self.obj
+        self.assertEqual(obj.state, 'inactive')
+        self.assertTrue(obj.is_inactive)
+        self.assertFalse(obj.is_active)
+
+    def test_state_properties(self):
+        obj = self.obj
+        names = (
+            'is_inactive', 'is_initializing', 'is_initialized',
+            'is_activating', 'is_active', 'is_destroying', 'is_destroyed',
+        )
+        for state, name in zip(OBJECT_STATES, names):
+            obj.state = state
+            self.assertEqual(obj.state, state)
+            flags = [getattr(obj, other) for other in names]
+            self.assertEqual(flags, [other == name for other in names])
+
+    def test_state_notifications(self):
+        obj = self.obj
+        obj.state = 'initializing'
+        obj.state = 'initializing'
+        obj.state = 'initialized'
+        self.assertEqual(self.changes, [
+            ('inactive', 'initializing'), ('initializing', 'initialized'),
+        ])
+
+    def test_invalid_state(self):
+        obj = self.obj
+        self.assertRaises(TraitError, setattr, obj, 'state', 'unknown')
+        self.assertEqual(obj.state, 'inactive')
+        self.assertEqual(self.changes, [])
+
+    def test_lifecycle_transitions(self):
+        obj = self.obj
+        child = Object(obj)
+        obj.initialize()
+        self.assertTrue(obj.is_initialized)
+        self.assertTrue(child.is_initialized)
+        obj.destroy()
+        self.assertTrue(obj.is_destroyed)
+        self.assertTrue(child.is_destroyed)
+        self.assertEqual(self.changes, [
+            ('inactive', 'initializing'), ('initializing', 'initialized'),
+            ('initialized', 'destroying'), ('destroying', 'destroyed'),
+        ])
+
+    def test_reparent_keeps_state(self):
+        obj = self.obj
+        obj.state = 'active'
+        obj.set_parent(Object())
+        self.assertEqual(obj.state, 'active')
+        self.assertTrue(obj.is_active)
+        self.assertEqual(self.changes, [('inactive', 'active')])
+
+
+class TestObjectNameIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.active = NameIndex.active
+        self.root = Object(name='root')
+        self.left = Object(self.root, name='left')
+        self.right = Object(self.root, name='right')
+        self.deep = Leaf(self.left, name='target')
+        self.shallow = Leaf(self.right, name='target')
+        self.root.enable_name_index()
+
+    def tearDown(self):
+        self.root.disable_name_index()
+        self.assertEqual(NameIndex.active, self.active)
+
+    def assertIndexed(self, root):
+        """ Check the indexed lookups against a traversal.
+
+        """
+        index = root._name_index
+        self.assertIsNotNone(index)
+        names = set(obj.name for obj in root.traverse() if obj.name)
+        for name in names:
+            expected = [obj for obj in root.traverse() if obj.name == name]
+            self.assertEqual(index.lookup_name(name, root), expected)
+        expected = [obj for obj in root.traverse() if isinstance(obj, Leaf)]
+        self.assertEqual(index.lookup_type(Leaf, root), expected)
+
+    def test_enable_name_index(self):
+        root = self.root
+        self.assertIndexed(root)
+        self.assertEqual(root.find_all('target'), [self.deep, self.shallow])
+        self.assertEqual(root.find('target'), self.deep)
+        self.assertEqual(self.right.find('target'), self.shallow)
+        self.assertEqual(root.find_by_type(Leaf), [self.deep, self.shallow])
+        self.assertRaises(ValueError, self.left.enable_name_index)
+
+    def test_set_parent(self):
+        root = self.root
+        self.shallow.set_parent(self.left)
+        self.assertIndexed(root)
+        self.assertEqual(self.left.find_all('target'),
+                         [self.deep, self.shallow])
+        self.left.set_parent(None)
+        self.assertIndexed(root)
+        self.assertEqual(root.find('target'), None)
+        self.assertEqual(self.left.find('target'), self.deep)
+        self.left.set_parent(self.right)
+        self.assertIndexed(root)
+        self.assertEqual(root.find_all('target'), [self.deep, self.shallow])
+
+    def test_set_parent_joins_indexed_tree(self):
+        other = Object(name='other')
+        Leaf(other, name='target')
+        other.enable_name_index()
+        other.set_parent(self.root)
+        # The joining root gives up its own index.
+        self.assertIsNone(other._name_index)
+        self.assertEqual(NameIndex.active, self.active + 1)
+        self.assertIndexed(self.root)
+        self.assertEqual(len(self.root.find_all('target')), 3)
+
+    def test_insert_children(self):
+        root = self.root
+        extra = Leaf(name='target')
+        root.insert_children(self.left, [self.shallow, extra])
+        self.assertIndexed(root)
+        self.assertEqual(root.find_all('target'),
+                         [self.shallow, extra, self.deep])
+        self.assertEqual(root.find_by_type(Leaf),
+                         [self.shallow, extra, self.deep])
+
+    def test_reorder_children(self):
+        root = self.root
+        self.assertEqual(root.find('target'), self.deep)
+        root.insert_children(self.left, [self.right])
+        self.assertIndexed(root)
+        self.assertEqual(root.find('target'), self.shallow)
+
+    def test_tree_index_reference(self):
+        root = self.root
+        index = root._name_index
+        for obj in root.traverse():
+            self.assertIs(obj._tree_index, index)
+        self.left.set_parent(None)
+        self.assertIsNone(self.left._tree_index)
+        self.assertIsNone(self.deep._tree_index)
+        self.left.set_parent(self.right)
+        self.assertIs(self.deep._tree_index, index)
+        root.disable_name_index()
+        for obj in root.traverse():
+            self.assertIsNone(obj._tree_index)
+
+    def test_cached_order(self):
+        root = self.root
+        found = root.find_all('target')
+        index = root._name_index
+        self.assertEqual(index._name_orders['target'], found)
+        self.assertEqual(root.find_all('target'), found)
+        self.shallow.set_parent(self.left)
+        self.assertNotIn('target', index._name_orders)
+        self.assertIndexed(root)
+
+    def test_name_changed(self):
+        root = self.root
+        self.deep.name = 'renamed'
+        self.assertIndexed(root)
+        self.assertEqual(root.find_all('target'), [self.shallow])
+        self.assertEqual(root.find('renamed'), self.deep)
+        self.deep.name = ''
+        self.assertEqual(root.find('renamed'), None)
+
+    def test_destroy(self):
+        root = self.root
+        self.left.destroy()
+        self.assertIndexed(root)
+        self.assertEqual(root.find_all('target'), [self.shallow])
+        self.assertEqual(root.find('left'), None)
+
+    def test_destroy_root(self):
+        self.root.destroy()
+        self.assertIsNone(self.root._name_index)
+        self.assertEqual(NameIndex.active, self.active)
+
+    def test_find_from_parent_event(self):
+        root = self.root
+        finder = Finder(name='target')
+        finder.set_parent(self.left)
+        self.assertEqual(finder.found, [self.deep, self.shallow])
+        self.assertEqual(root.find_all('target'),
+                         [self.deep, finder, self.shallow])
+        finder.set_parent(self.right)
+        self.assertEqual(finder.found, [self.deep, self.shallow])
+        self.assertEqual(root.find_all('target'),
+                         [self.deep, self.shallow, finder])
+        root.insert_children(None, [finder])
+        self.assertEqual(finder.found, [self.deep, self.shallow])
+        self.assertEqual(root.find_all('target'),
+                         [finder, self.deep, self.shallow])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from enaml.outbound_queue import OutboundQueue, BLOCK, DROP_OLDEST, MERGE
+
+
+class TestOutboundQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.sent = []
+        self.deliver = lambda *args: self.sent.append(args)
+
+    def test_drain_in_order(self):
+        queue = OutboundQueue(self.deliver, maxsize=10)
+        for idx in xrange(3):
+            queue.push('o_1', 'set_value', {'value': idx})
+        self.assertEqual(self.sent, [])
+        self.assertEqual(queue.drain(), 0)
+        values = [content['value'] for _, _, content in self.sent]
+        self.assertEqual(values, [0, 1, 2])
+
+    def test_block(self):
+        queue = OutboundQueue(self.deliver, maxsize=2, policy=BLOCK)
+        for idx in xrange(3):
+            queue.push('o_1', 'set_value', {'value': idx})
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(queue.depth(), 2)
+        queue.drain()
+        stats = queue.stats()
+        self.assertEqual(stats['delivered'], 3)
+        self.assertEqual(stats['blocked'], 1)
+        self.assertEqual(stats['high_water'], 2)
+
+    def test_drop_oldest(self):
+        queue = OutboundQueue(self.deliver, maxsize=2)
+        queue.set_policy('set_value', DROP_OLDEST)
+        queue.push('o_1', 'relayout', {})
+        for idx in xrange(3):
+            queue.push('o_1', 'set_value', {'value': idx})
+        queue.drain()
+        self.assertEqual(
+            self.sent,
+            [('o_1', 'relayout', {}), ('o_1', 'set_value', {'value': 2})],
+        )
+        self.assertEqual(queue.stats()['dropped'], 2)
+        self.assertEqual(queue.stats()['blocked'], 0)
+
+    def test_merge(self):
+        queue = OutboundQueue(self.deliver, policies={'set_value': MERGE})
+        queue.push('o_1', 'set_value', {'value': 1})
+        queue.push('o_2', 'set_value', {'value': 1})
+        queue.push('o_1', 'set_value', {'value': 2})
+        self.assertEqual(queue.depth(), 2)
+        queue.drain()
+        self.assertEqual(
+            self.sent,
+            [('o_1', 'set_value', {'value': 2}),
+             ('o_2', 'set_value', {'value': 1})],
+        )
+        queue.push('o_1', 'set_value', {'value': 3})
+        self.assertEqual(queue.depth(), 1)
+        self.assertEqual(queue.stats()['merged'], 1)
+
+    def test_drop_memory_bounded(self):
+        queue = OutboundQueue(self.deliver, maxsize=4, policy=DROP_OLDEST)
+        for idx in xrange(100):
+            queue.push('o_1', 'set_value', {'value': idx})
+        self.assertEqual(queue.depth(), 4)
+        self.assertTrue(len(queue._entries) <= 8)
+        queue.drain()
+        values = [content['value'] for _, _, content in self.sent]
+        self.assertEqual(values, [96, 97, 98, 99])
+
+    def test_refused_actions_are_held(self):
+        accepted = []
+        room = [1]
+        def deliver(*args):
+            if not room[0]:
+                return False
+            room[0] -= 1
+            accepted.append(args)
+        queue = OutboundQueue(deliver, maxsize=10)
+        for idx in xrange(3):
+            queue.push('o_1', 'set_value', {'value': idx})
+        self.assertEqual(queue.drain(), 2)
+        self.assertEqual(len(accepted), 1)
+        room[0] = 5
+        self.assertEqual(queue.drain(), 0)
+        values = [content['value'] for _, _, content in accepted]
+        self.assertEqual(values, [0, 1, 2])
+        self.assertEqual(queue.stats()['delivered'], 3)
+
+    def test_block_waits_on_refusal(self):
+        blocked = []
+        queue = OutboundQueue(
+            lambda *args: False, maxsize=2, policy=BLOCK,
+            block=lambda *args: blocked.append(args),
+        )
+        for idx in xrange(4):
+            queue.push('o_1', 'set_value', {'value': idx})
+        self.assertEqual(queue.depth(), 2)
+        values = [content['value'] for _, _, content in blocked]
+        self.assertEqual(values, [0, 1])
+        self.assertEqual(queue.drain(), 2)
+
+    def test_invalid_policy(self):
+        queue = OutboundQueue(self.deliver)
+        self.assertRaises(ValueError, queue.set_policy, 'set_value', 'spam')
+        self.assertRaises(ValueError, OutboundQueue, self.deliver, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from enaml.session import Session
+from enaml.socket_interface import ActionSocketInterface
+from enaml.widgets.api import Container, Field, Notebook, Page, Window
+
+from .test_application import LoopApplication
+
+
+class RecordingSocket(ActionSocketInterface):
+    """ An action socket which records the messages sent to it.
+
+    """
+    def __init__(self):
+        self.messages = []
+        self.callback = None
+
+    def on_message(self, callback):
+        self.callback = callback
+
+    def send(self, object_id, action, content):
+        self.messages.append((object_id, action, content))
+
+
+class EmptySession(Session):
+    """ A session which creates no windows.
+
+    """
+    def on_open(self):
+        pass
+
+
+class TestCoalescedAttributes(unittest.TestCase):
+
+    def setUp(self):
+        self.app = LoopApplication()
+        self.socket = RecordingSocket()
+        self.session = EmptySession(coalesce_attributes=True)
+        self.session.open('s_1')
+        self.session.activate(self.socket)
+        self.session._registered_objects['o_1'] = object()
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def test_last_value_wins(self):
+        session = self.session
+        session.batch_attribute('o_1', 'text', u'a')
+        session.batch_attribute('o_1', 'text', u'b')
+        self.app.start()
+        self.assertEqual(self.socket.messages, [
+            ('s_1', 'message_batch',
+             {'batch': [('o_1', 'set_text', {'text': u'b'})]}),
+        ])
+
+    def test_flush_after_close(self):
+        session = self.session
+        session.batch_attribute('o_1', 'text', u'a')
+        session.batch_attribute('o_1', 'value', None)
+        tasks = list(session._batch._items)
+        session.close()
+        for task in tasks:
+            self.assertIsNone(task())
+        self.app.start()
+        actions = [action for ignored, action, ignored in self.socket.messages]
+        self.assertEqual(actions, ['close'])
+
+
+class NotebookSession(Session):
+    """ A session with a window holding a notebook of two pages.
+
+    """
+    def on_open(self):
+        window = Window()
+        notebook = Notebook(window)
+        self.fields = []
+        for idx in xrange(2):
+            page = Page(notebook, title=u'page %d' % idx)
+            container = Container(page)
+            self.fields.append(Field(container, text=u'field %d' % idx))
+        self.windows.append(window)
+
+
+class TestStreamedSnapshots(unittest.TestCase):
+
+    def setUp(self):
+        self.app = LoopApplication()
+        self.socket = RecordingSocket()
+        self.session = NotebookSession(stream_snapshots=True)
+        self.session.open('s_1')
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def test_deferred_subtree_activated_with_chunk(self):
+        session = self.session
+        first, second = session.fields
+        session.snapshot()
+        session.activate(self.socket)
+        self.assertTrue(first.is_active)
+        self.assertFalse(second.is_active)
+        second.text = u'changed'
+        self.assertEqual(self.socket.messages, [])
+
+        self.app.start()
+        actions = [action for ignored, action, ignored in self.socket.messages]
+        self.assertEqual(actions, ['children_changed', 'snapshot_complete'])
+        content = self.socket.messages[0][2]
+        container = content['added'][0]
+        self.assertEqual(container['children'][0]['text'], u'changed')
+        self.assertTrue(second.is_active)
+
+        second.text = u'again'
+        self.assertEqual(
+            self.socket.messages[-1],
+            (second.object_id, 'set_text', {'text': u'again'}),
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
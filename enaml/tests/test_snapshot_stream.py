@@ -0,0 +1,40 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from enaml.snapshot_stream import SnapshotStream
+
+
+class Node(object):
+
+    def __init__(self, parent=None):
+        self.parent = parent
+
+
+class TestSnapshotStream(unittest.TestCase):
+
+    def test_active(self):
+        self.assertTrue(SnapshotStream.active() is None)
+        with SnapshotStream() as outer:
+            self.assertTrue(SnapshotStream.active() is outer)
+            with SnapshotStream() as inner:
+                self.assertTrue(SnapshotStream.active() is inner)
+            self.assertTrue(SnapshotStream.active() is outer)
+        self.assertTrue(SnapshotStream.active() is None)
+
+    def test_priority_by_depth(self):
+        root = Node()
+        child = Node(root)
+        grandchild = Node(child)
+        with SnapshotStream() as stream:
+            stream.defer(grandchild, ['a'])
+            stream.defer(root, ['b', 'c'])
+        chunks = stream.chunks()
+        self.assertEqual(chunks[0], (-2, grandchild, ['a']))
+        self.assertEqual(chunks[1], (0, root, ['b', 'c']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import json
+import unittest
+
+from enaml.snapshot_table import SnapshotPacker, SnapshotUnpacker, is_packed
+
+
+BUTTON_BASES = ['AbstractButton', 'Control', 'ConstraintsWidget', 'Widget']
+
+
+def make_button(idx, enabled=True):
+    return {
+        'object_id': 'o_%d' % idx,
+        'class': 'PushButton',
+        'bases': BUTTON_BASES,
+        'name': '',
+        'text': 'button %d' % idx,
+        'enabled': enabled,
+        'visible': True,
+        'tool_tip': '',
+        'children': [],
+    }
+
+
+def make_window(count):
+    return {
+        'object_id': 'o_w',
+        'class': 'Window',
+        'bases': ['Widget'],
+        'name': 'main',
+        'title': 'Window',
+        'children': [make_button(idx, idx != 3) for idx in xrange(count)],
+    }
+
+
+def expand(unpacker, tree):
+    tree = unpacker.expand(tree)
+    tree['children'] = [expand(unpacker, c) for c in tree['children']]
+    return tree
+
+
+class TestSnapshotTable(unittest.TestCase):
+
+    def test_round_trip(self):
+        packer = SnapshotPacker()
+        unpacker = SnapshotUnpacker()
+        packed = packer.pack([make_window(5)])
+        self.assertTrue(is_packed(packed))
+        packed = json.loads(json.dumps(packed))
+        trees = [expand(unpacker, t) for t in unpacker.load(packed)]
+        self.assertEqual(trees, json.loads(json.dumps([make_window(5)])))
+
+    def test_only_changed_attributes(self):
+        packed = SnapshotPacker().pack([make_window(5)])
+        self.assertEqual(len(packed['classes']), 2)
+        buttons = packed['trees'][0][3]
+        self.assertEqual(buttons[3][2], {'text': 'button 3', 'enabled': False})
+        self.assertEqual(buttons[4][2], {'text': 'button 4'})
+
+    def test_table_sent_once(self):
+        packer = SnapshotPacker()
+        unpacker = SnapshotUnpacker()
+        unpacker.load(packer.pack([make_window(2)]))
+        second = packer.pack([make_button(10)])
+        self.assertEqual(second['classes'], [])
+        tree = unpacker.load(second)[0]
+        self.assertEqual(tree, make_button(10))
+
+    def test_plain_snapshots(self):
+        unpacker = SnapshotUnpacker()
+        window = make_window(1)
+        self.assertEqual(unpacker.load([window]), [window])
+        self.assertEqual(unpacker.load(window), [window])
+        self.assertTrue(unpacker.expand(window) is window)
+
+    def test_smaller(self):
+        window = make_window(200)
+        packed = SnapshotPacker().pack([window])
+        self.assertTrue(len(json.dumps(packed)) * 2 < len(json.dumps(window)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from traits.api import Int
+
+from enaml.core.declarative import Declarative
+from enaml.core.expressions import SubscriptionExpression
+from enaml.core.update_scheduler import (
+    UpdateScheduler, batch_updates, scheduler
+)
+
+
+class FakeNotifier(object):
+
+    def __init__(self, log, name, downstream=None, upstream=()):
+        self.rank = 0
+        self.log = log
+        self.name = name
+        self.downstream = downstream
+        self.upstream = upstream
+
+    def dependencies(self):
+        return iter(self.upstream)
+
+    def refresh(self):
+        self.log.append(self.name)
+        if self.downstream is not None:
+            self.downstream()
+
+
+class TestUpdateScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = UpdateScheduler()
+        self.log = []
+
+    def test_immediate_when_not_batching(self):
+        self.assertFalse(self.scheduler.batching)
+
+    def test_merge_in_batch(self):
+        scheduler = self.scheduler
+        notifier = FakeNotifier(self.log, 'a')
+        scheduler.begin()
+        for ignored in xrange(5):
+            scheduler.notify(notifier)
+        self.assertEqual(self.log, [])
+        scheduler.end()
+        self.assertEqual(self.log, ['a'])
+        stats = scheduler.stats()
+        self.assertEqual(stats['evaluations'], 1)
+        self.assertEqual(stats['saved'], 4)
+
+    def test_nested_batches(self):
+        scheduler = self.scheduler
+        notifier = FakeNotifier(self.log, 'a')
+        scheduler.begin()
+        scheduler.begin()
+        scheduler.notify(notifier)
+        scheduler.end()
+        self.assertEqual(self.log, [])
+        scheduler.end()
+        self.assertEqual(self.log, ['a'])
+
+    def test_dependency_order(self):
+        scheduler = self.scheduler
+        log = self.log
+        a = FakeNotifier(log, 'a')
+        b = FakeNotifier(log, 'b', upstream=[a])
+        a.downstream = lambda: scheduler.notify(b)
+        # The first batch defers 'b' until 'a' has been evaluated.
+        scheduler.begin()
+        scheduler.notify(b)
+        scheduler.notify(a)
+        scheduler.end()
+        self.assertEqual(log, ['a', 'b'])
+        self.assertTrue(b.rank > a.rank)
+        self.assertEqual(scheduler.stats()['evaluations'], 2)
+
+    def test_stale_chain_is_deferred_once(self):
+        scheduler = self.scheduler
+        log = self.log
+        a = FakeNotifier(log, 'a')
+        b = FakeNotifier(log, 'b', upstream=[a])
+        c = FakeNotifier(log, 'c', upstream=[b])
+        a.rank = 5
+        b.rank = 1
+        scheduler.begin()
+        scheduler.notify(c)
+        scheduler.notify(b)
+        scheduler.notify(a)
+        scheduler.end()
+        self.assertEqual(log, ['a', 'b', 'c'])
+        self.assertTrue(a.rank < b.rank < c.rank)
+
+    def test_dependency_cycle(self):
+        scheduler = self.scheduler
+        log = self.log
+        a = FakeNotifier(log, 'a')
+        b = FakeNotifier(log, 'b', upstream=[a])
+        a.upstream = [b]
+        scheduler.begin()
+        scheduler.notify(a)
+        scheduler.notify(b)
+        scheduler.end()
+        self.assertEqual(sorted(log), ['a', 'b'])
+
+    def test_raised_rank_is_not_saved(self):
+        scheduler = self.scheduler
+        log = self.log
+        b = FakeNotifier(log, 'b')
+        a = FakeNotifier(log, 'a', lambda: scheduler.notify(b))
+        scheduler.begin()
+        scheduler.notify(a)
+        scheduler.notify(b)
+        scheduler.end()
+        # 'b' was pending when 'a' dirtied it through a dependency
+        # outside of the graph, so it was moved to a higher rank.
+        self.assertEqual(log, ['a', 'b'])
+        stats = scheduler.stats()
+        self.assertEqual(stats['notifications'], 3)
+        self.assertEqual(stats['evaluations'], 2)
+        self.assertEqual(stats['saved'], 0)
+
+    def test_enabled_without_application(self):
+        scheduler = self.scheduler
+        scheduler.set_enabled(True)
+        self.assertTrue(scheduler.batching)
+        scheduler.notify(FakeNotifier(self.log, 'a'))
+        self.assertEqual(self.log, ['a'])
+        scheduler.set_enabled(False)
+        self.assertFalse(scheduler.batching)
+
+
+class Model(Declarative):
+
+    value = Int
+
+
+def chain_expression(name):
+    def func():
+        pass
+    func._chain = (name, 'value')
+    return func
+
+
+class TestBatchedExpressions(unittest.TestCase):
+
+    def setUp(self):
+        self.a = Model()
+        self.b = Model()
+        self.c = Model()
+        self.b.bind_expression(
+            'value', SubscriptionExpression(chain_expression('a'),
+                                            {'a': self.a})
+        )
+        self.c.bind_expression(
+            'value', SubscriptionExpression(chain_expression('b'),
+                                            {'b': self.b})
+        )
+
+    def notifier(self, obj):
+        table = obj._expressions
+        return table[table.index('value') + 1]._notifier
+
+    def test_rank_from_graph(self):
+        self.assertEqual(self.c.value, 0)
+        self.assertTrue(
+            self.notifier(self.c).rank > self.notifier(self.b).rank
+        )
+
+    def test_single_evaluation_with_stale_rank(self):
+        self.assertEqual(self.c.value, 0)
+        self.notifier(self.b).rank = 3
+        self.notifier(self.c).rank = 0
+        scheduler.reset_stats()
+        with batch_updates():
+            self.a.value = 5
+            self.b.value = 7
+        self.assertEqual(self.b.value, 5)
+        self.assertEqual(self.c.value, 5)
+        self.assertEqual(scheduler.stats()['evaluations'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from enaml.utils import dispatch_table, make_dispatcher
+
+
+class Base(object):
+
+    def __init__(self):
+        self.log = []
+
+    def on_action_first(self, content):
+        self.log.append(('base', content))
+
+    def on_action_second(self, content):
+        self.log.append(('second', content))
+
+
+class Derived(Base):
+
+    def on_action_first(self, content):
+        self.log.append(('derived', content))
+
+
+class TestDispatcher(unittest.TestCase):
+
+    def test_dispatch_table(self):
+        table = dispatch_table(Derived, 'on_action_')
+        self.assertEqual(sorted(table), ['first', 'second'])
+        self.assertIs(table['first'], Derived.__dict__['on_action_first'])
+
+    def test_dispatch(self):
+        dispatch = make_dispatcher('on_action_')
+        base = Base()
+        derived = Derived()
+        dispatch(base, 'first', 1)
+        dispatch(derived, 'first', 2)
+        dispatch(derived, 'second', 3)
+        dispatch(derived, 'missing', 4)
+        self.assertEqual(base.log, [('base', 1)])
+        self.assertEqual(derived.log, [('derived', 2), ('second', 3)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,336 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import socket
+import time
+import unittest
+
+import zmq
+from zmq.eventloop.ioloop import IOLoop
+from zmq.eventloop.zmqstream import ZMQStream
+
+from enaml.codec import BinaryCodec, JSONCodec
+from enaml.session_factory import SessionFactory
+from enaml.zeromq import zmq_server
+from enaml.zeromq.zmq_application import ZMQApplication
+from enaml.zeromq.zmq_server import (
+    SERVER_ID, ClientReaper, ZMQActionSocket, ZMQServer, ZMQSessionHost,
+    unpack_action,
+)
+
+from .test_session import EmptySession
+
+
+class FakeLoop(object):
+    """ An ioloop which runs its callbacks when asked to.
+
+    """
+    def __init__(self):
+        self.callbacks = []
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def add_timeout(self, deadline, callback):
+        self.callbacks.append(callback)
+
+    def run(self):
+        while self.callbacks:
+            self.callbacks.pop(0)()
+
+
+class RefusingSocket(object):
+    """ A socket which refuses a number of sends with zmq.Again.
+
+    """
+    def __init__(self, refusals):
+        self.refusals = refusals
+        self.sent = []
+
+    def send_multipart(self, frames, flags=0):
+        if self.refusals > 0 and flags & zmq.NOBLOCK:
+            self.refusals -= 1
+            raise zmq.Again()
+        self.sent.append(frames)
+
+
+class FakeStream(object):
+
+    def __init__(self, socket):
+        self.socket = socket
+        self.io_loop = FakeLoop()
+
+
+def free_port():
+    """ Get a tcp port on the loopback interface which is not in use.
+
+    """
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def run_until(ioloop, condition, timeout=5.0):
+    """ Run an ioloop until a condition is met or the timeout expires.
+
+    """
+    deadline = time.time() + timeout
+
+    def check():
+        if condition() or time.time() > deadline:
+            ioloop.stop()
+        else:
+            ioloop.add_timeout(time.time() + 0.005, check)
+
+    ioloop.add_callback(check)
+    ioloop.start()
+    return condition()
+
+
+def make_factories():
+    return [SessionFactory('empty', 'An empty session', EmptySession)]
+
+
+class ZMQClient(object):
+    """ A client which talks to a server through a DEALER socket.
+
+    """
+    def __init__(self, ioloop, port, codec_type=JSONCodec):
+        dealer = zmq.Context.instance().socket(zmq.DEALER)
+        dealer.connect('tcp://127.0.0.1:%d' % port)
+        self.received = []
+        self.stream = ZMQStream(dealer, ioloop)
+        self.stream.on_recv(self.received.append)
+        self.codec_type = codec_type
+        self.codecs = {}
+
+    def codec(self, session_id):
+        codec = self.codecs.get(session_id)
+        if codec is None:
+            codec = self.codecs[session_id] = self.codec_type()
+        return codec
+
+    def send(self, session_id, action, content):
+        codec = self.codec(session_id)
+        payload = codec.encode_action(SERVER_ID, action, content)
+        self.stream.socket.send_multipart([session_id, payload])
+
+    def actions(self):
+        result = []
+        for session_id, payload in self.received:
+            decoded = self.codec(session_id).decode_action(payload)
+            result.append((session_id,) + decoded)
+        del self.received[:]
+        return result
+
+    def close(self):
+        self.stream.close(linger=0)
+
+
+class TestZMQActionSocket(unittest.TestCase):
+
+    def test_refused_send_redefines_strings(self):
+        socket = RefusingSocket(refusals=2)
+        stream = FakeStream(socket)
+        action_socket = ZMQActionSocket('client', 's_1', stream, BinaryCodec())
+        action_socket.send('o_new', 'fresh_action', {'fresh_key': 'a'})
+        action_socket.send('o_new', 'fresh_action', {'fresh_key': 'b'})
+        stream.io_loop.run()
+        self.assertEqual(len(socket.sent), 2)
+        decoder = BinaryCodec()
+        actions = [unpack_action(frames, decoder) for frames in socket.sent]
+        self.assertEqual(actions, [
+            ('client', 's_1', ('o_new', 'fresh_action', {'fresh_key': 'a'})),
+            ('client', 's_1', ('o_new', 'fresh_action', {'fresh_key': 'b'})),
+        ])
+
+
+class TestClientReaper(unittest.TestCase):
+
+    def setUp(self):
+        self.ioloop = IOLoop()
+        self.reaped = []
+        self.reaper = ClientReaper(self.reaped.append, 10.0, self.ioloop)
+
+    def tearDown(self):
+        self.reaper.stop()
+        self.ioloop.close()
+
+    def test_reap_idle_client(self):
+        reaper = self.reaper
+        self.assertTrue(reaper.touch('idle'))
+        self.assertTrue(reaper.touch('busy'))
+        reaper._last_seen['idle'] -= 20.0
+        reaper._reap()
+        self.assertEqual(self.reaped, ['idle'])
+        self.assertFalse(reaper.touch('idle'))
+        self.assertTrue(reaper.touch('busy'))
+        reaper._reap()
+        self.assertEqual(self.reaped, ['idle'])
+
+    def test_reaped_memory_is_bounded(self):
+        reaper = self.reaper
+        old = zmq_server.REAPED_MEMORY
+        zmq_server.REAPED_MEMORY = 2
+        try:
+            for routing_id in ('a', 'b', 'c'):
+                reaper.touch(routing_id)
+                reaper._last_seen[routing_id] -= 20.0
+                reaper._reap()
+        finally:
+            zmq_server.REAPED_MEMORY = old
+        self.assertTrue(reaper.touch('a'))
+        self.assertFalse(reaper.touch('b'))
+        self.assertFalse(reaper.touch('c'))
+
+    def test_no_timeout(self):
+        reaper = ClientReaper(self.reaped.append, None, self.ioloop)
+        self.assertTrue(reaper.touch('client'))
+        reaper.stop()
+
+
+class TestZMQApplication(unittest.TestCase):
+
+    def setUp(self):
+        self.ioloop = IOLoop()
+        self.app = ZMQApplication(make_factories(), self.ioloop)
+
+    def tearDown(self):
+        self.app.destroy()
+        self.ioloop.close()
+
+    def test_session_lifetime(self):
+        app = self.app
+        self.assertRaises(ValueError, app.start_session, 'missing')
+        session_id = app.start_session('empty', 's_1')
+        self.assertEqual(session_id, 's_1')
+        self.assertRaises(ValueError, app.start_session, 'empty', 's_1')
+        socket = ZMQActionSocket(
+            'client', 's_1', FakeStream(RefusingSocket(0)), JSONCodec(),
+        )
+        app.activate_session('s_1', socket)
+        self.assertTrue(app.session('s_1').is_active)
+        app.end_session('s_1')
+        self.assertIsNone(app.session('s_1'))
+        self.assertRaises(ValueError, app.end_session, 's_1')
+
+    def test_deferred_call(self):
+        calls = []
+        self.app.deferred_call(calls.append, 1)
+        self.app.deferred_call(calls.append, 2)
+        self.assertTrue(run_until(self.ioloop, lambda: len(calls) == 2))
+        self.assertEqual(calls, [1, 2])
+        self.assertTrue(self.app.is_main_thread())
+
+
+class TestZMQSessionHost(unittest.TestCase):
+
+    def setUp(self):
+        self.socket = RefusingSocket(0)
+        self.stream = FakeStream(self.socket)
+        self.app = ZMQApplication(make_factories(), self.stream.io_loop)
+        self.host = ZMQSessionHost(self.app, self.stream)
+
+    def tearDown(self):
+        self.app.destroy()
+
+    def test_start_and_end_session(self):
+        host = self.host
+        session_id = host.start_session('client', 'empty', 'json', 's_1')
+        self.stream.io_loop.run()
+        frames, = self.socket.sent
+        routing_id, channel, action = unpack_action(frames, JSONCodec())
+        self.assertEqual((routing_id, channel), ('client', 's_1'))
+        self.assertEqual(action[1], 'session_started')
+        self.assertEqual(action[2]['session_id'], session_id)
+        self.assertEqual(host.stats()['sessions'], 1)
+        self.assertRaises(ValueError, host.end_session, 'other', 's_1')
+        host.end_session('client', 's_1')
+        self.assertEqual(host.stats()['sessions'], 0)
+
+    def test_deliver_and_end_client(self):
+        host = self.host
+        host.start_session('client', 'empty', 'json', 's_1')
+        host.start_session('client', 'empty', 'json', 's_2')
+        host.start_session('other', 'empty', 'json', 's_3')
+        received = []
+        socket = host._sockets['s_1']
+        socket.on_message(lambda *args: received.append(args))
+        payload = JSONCodec().encode_action('o_1', 'clicked', {})
+        host.deliver('other', 's_1', payload)
+        host.deliver('client', 's_1', payload)
+        self.assertEqual(received, [('o_1', 'clicked', {})])
+        self.assertEqual(host.stats()['messages'], 1)
+        ended = host.end_client('client')
+        self.assertEqual(sorted(ended), ['s_1', 's_2'])
+        self.assertEqual([s.session_id for s in self.app.sessions()], ['s_3'])
+
+
+class TestZMQServer(unittest.TestCase):
+
+    def setUp(self):
+        self.ioloop = IOLoop()
+        self.app = ZMQApplication(make_factories(), self.ioloop)
+        self.port = free_port()
+        self.server = ZMQServer(self.app, '127.0.0.1', self.port)
+        self.client = ZMQClient(self.ioloop, self.port, BinaryCodec)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+        self.server._stream.close(linger=0)
+        self.app.destroy()
+        self.ioloop.close()
+
+    def request(self, session_id, action, content, replies=1):
+        client = self.client
+        client.send(session_id, action, content)
+        run_until(self.ioloop, lambda: len(client.received) >= replies)
+        return client.actions()
+
+    def test_discover_and_sessions(self):
+        reply, = self.request(SERVER_ID, 'discover', {})
+        self.assertEqual(reply[2], 'discover_reply')
+        self.assertEqual(reply[3]['sessions'][0]['name'], 'empty')
+        started, = self.request(SERVER_ID, 'start_session', {'name': 'empty'})
+        session_id = started[0]
+        self.assertEqual(started[2], 'session_started')
+        self.assertEqual(started[3]['session_id'], session_id)
+        self.assertIsNotNone(self.app.session(session_id))
+        closed, = self.request(
+            SERVER_ID, 'end_session', {'session_id': session_id},
+        )
+        self.assertEqual(closed[:3], (session_id, session_id, 'close'))
+        self.assertEqual(self.app.sessions(), [])
+        error, = self.request(SERVER_ID, 'start_session', {'name': 'bad'})
+        self.assertEqual(error[2], 'error')
+
+    def test_reaped_client_must_reconnect(self):
+        self.request(SERVER_ID, 'discover', {})
+        self.request(SERVER_ID, 'start_session', {'name': 'empty'})
+        reaper = self.server._reaper
+        for routing_id in reaper._last_seen:
+            reaper._last_seen[routing_id] -= 1000.0
+        reaper._reap()
+        self.assertEqual(self.app.sessions(), [])
+        client = self.client
+        run_until(self.ioloop, lambda: client.received)
+        self.assertEqual(client.actions()[0][2], 'close')
+        for ignored in xrange(2):
+            error, = self.request(SERVER_ID, 'discover', {})
+            self.assertEqual(error[2], 'error')
+            self.assertTrue(error[3]['reconnect'])
+        self.assertEqual(self.server._codecs, {})
+
+        # A new socket is served with fresh codecs.
+        self.client.close()
+        self.client = ZMQClient(self.ioloop, self.port, BinaryCodec)
+        reply, = self.request(SERVER_ID, 'discover', {})
+        self.assertEqual(reply[2], 'discover_reply')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from zmq.eventloop.ioloop import IOLoop
+
+from enaml.codec import BinaryCodec, JSONCodec
+from enaml.zeromq.zmq_server import SERVER_ID, unpack_action
+from enaml.zeromq.zmq_shard import ZMQFrontSocket, ZMQShardedServer
+
+from .test_zmq_server import (
+    FakeStream, RefusingSocket, ZMQClient, free_port, make_factories,
+    run_until,
+)
+
+
+class TestZMQFrontSocket(unittest.TestCase):
+
+    def test_refused_messages_keep_their_order(self):
+        socket = RefusingSocket(refusals=3)
+        stream = FakeStream(socket)
+        front = ZMQFrontSocket('client', stream, JSONCodec())
+        front.send(SERVER_ID, 'discover_reply', {'sessions': []})
+        front.forward('s_1', 'first')
+        front.forward('s_1', 'second')
+        stream.io_loop.run()
+        self.assertEqual(socket.sent[1:], [
+            ['client', 's_1', 'first'],
+            ['client', 's_1', 'second'],
+        ])
+        reply = unpack_action(socket.sent[0], JSONCodec())
+        self.assertEqual(
+            reply, ('client', SERVER_ID, (
+                SERVER_ID, 'discover_reply', {'sessions': []},
+            )),
+        )
+
+    def test_full_queue_does_not_drop(self):
+        socket = RefusingSocket(refusals=100)
+        stream = FakeStream(socket)
+        encoder = BinaryCodec()
+        front = ZMQFrontSocket('client', stream, BinaryCodec(), maxsize=2)
+        payloads = [
+            encoder.encode_action('o_%d' % idx, 'set_value', {'value': idx})
+            for idx in xrange(5)
+        ]
+        for payload in payloads:
+            front.forward('s_1', payload)
+        stream.io_loop.run()
+        self.assertEqual(
+            [frames[2] for frames in socket.sent], payloads,
+        )
+        self.assertEqual(front.queue().stats()['dropped'], 0)
+        decoder = BinaryCodec()
+        values = [
+            decoder.decode_action(frames[2])[2]['value']
+            for frames in socket.sent
+        ]
+        self.assertEqual(values, range(5))
+
+
+class TestZMQShardedServer(unittest.TestCase):
+
+    def setUp(self):
+        self.ioloop = IOLoop()
+        port = free_port()
+        self.server = ZMQShardedServer(
+            make_factories(), '127.0.0.1', port, workers=1,
+            ioloop=self.ioloop,
+        )
+        self.client = ZMQClient(self.ioloop, port, BinaryCodec)
+        workers = self.server._workers.values()
+        run_until(self.ioloop, lambda: all(w.ready for w in workers))
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+        self.ioloop.close()
+
+    def request(self, session_id, action, content):
+        client = self.client
+        client.send(session_id, action, content)
+        run_until(self.ioloop, lambda: client.received)
+        return client.actions()
+
+    def test_sessions_are_forwarded(self):
+        reply, = self.request(SERVER_ID, 'discover', {})
+        self.assertEqual(reply[2], 'discover_reply')
+        started, = self.request(SERVER_ID, 'start_session', {'name': 'empty'})
+        session_id = started[0]
+        self.assertEqual(started[2], 'session_started')
+        self.assertEqual(started[3]['session_id'], session_id)
+        closed, = self.request(
+            SERVER_ID, 'end_session', {'session_id': session_id},
+        )
+        self.assertEqual(closed[:3], (session_id, session_id, 'close'))
+        health, = self.server.health().values()
+        self.assertTrue(health['alive'])
+
+    def test_reaped_client_must_reconnect(self):
+        self.request(SERVER_ID, 'discover', {})
+        reaper = self.server._reaper
+        for routing_id in reaper._last_seen:
+            reaper._last_seen[routing_id] -= 1000.0
+        reaper._reap()
+        for ignored in xrange(2):
+            error, = self.request(SERVER_ID, 'discover', {})
+            self.assertEqual(error[2], 'error')
+            self.assertTrue(error[3]['reconnect'])
+        self.assertEqual(self.server._clients, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,10 @@
 #  Copyright (c) 2012, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
+from enaml.layout.api import hbox, vbox
+from enaml.qt.qt_container import QtContainer
+from enaml.qt.qt_field import QtField
+
 from .enaml_test_case import EnamlTestCase
 
 
@@ -39,6 +43,215 @@ enamldef MainView(Window):
         self.assertTrue(initial_size[0] < no_padding_size[0])
         self.assertTrue(initial_size[1] < no_padding_size[1])
 
+
+class TestIncrementalRelayout(EnamlTestCase):
+    """ Unit tests comparing an incremental relayout of a Container
+    against a full rebuild with `init_layout`.
+
+    """
+
+    def setUp(self):
+        enaml_source = """
+from enaml.layout.api import hbox, vbox
+from enaml.widgets.api import Container, Window, Field
+
+enamldef MainView(Window):
+    Container:
+        constraints = [vbox(first, second, inner)]
+        Field: first:
+            text = u'first'
+        Field: second:
+            text = u'second'
+        Container: inner:
+            share_layout = True
+            constraints = [hbox(third)]
+            Field: third:
+                text = u'third'
+"""
+        self.parse_and_create(enaml_source)
+        self.server_owner = self.find_server_widget(self.view, "Container")
+        self.first, self.second, self.inner = self.server_owner.children
+        self.third = self.inner.children[0]
+        self.owner = self.find_client(self.client_view, self.server_owner)
+
+    def find_client(self, root, server):
+        """ Find the client object of a server widget.
+
+        """
+        if root.object_id() == server.object_id:
+            return root
+        for child in root.children():
+            found = self.find_client(child, server)
+            if found is not None:
+                return found
+        return None
+
+    def layout_state(self):
+        """ The geometries of the laid out widgets and the sizes of
+        the owner.
+
+        """
+        owner = self.owner
+        widget = owner.widget()
+        geometries = [
+            updater.item.widget().geometry().getRect()
+            for _, updater in owner._layout_table
+        ]
+        sizes = (
+            widget.sizeHint().toTuple(), widget.minimumSize().toTuple(),
+            widget.maximumSize().toTuple(),
+        )
+        return geometries, sizes
+
+    def assertMatchesInitLayout(self):
+        """ Check the current layout against a full rebuild.
+
+        """
+        owner = self.owner
+        incremental = self.layout_state()
+        owner.init_layout()
+        owner.refresh()
+        self.assertEqual(self.layout_state(), incremental)
+
+    def test_changed_user_constraints(self):
+        """ Test a relayout for changed user constraints.
+
+        """
+        manager = self.owner._layout_manager
+        initial = self.layout_state()
+        with self.app.process_events():
+            self.server_owner.constraints = [
+                hbox(self.first, self.second, self.inner),
+            ]
+        # The solver is updated in place instead of being rebuilt.
+        self.assertIs(self.owner._layout_manager, manager)
+        self.assertNotEqual(self.layout_state(), initial)
+        self.assertMatchesInitLayout()
+
+    def test_changed_shared_constraints(self):
+        """ Test a relayout for changed constraints of a container
+        which shares the layout of its parent.
+
+        """
+        manager = self.owner._layout_manager
+        with self.app.process_events():
+            self.inner.constraints = [vbox(self.third, spacing=40)]
+        self.assertIs(self.owner._layout_manager, manager)
+        self.assertMatchesInitLayout()
+
+    def test_cleared_size_hints(self):
+        """ Test a relayout which adds back cleared size hints.
+
+        """
+        manager = self.owner._layout_manager
+        client_first = self.find_client(self.client_view, self.first)
+        with self.app.process_events():
+            self.first.hug_width = 'strong'
+        self.assertIs(self.owner._layout_manager, manager)
+        self.assertTrue(client_first._size_hint_cns)
+        self.assertMatchesInitLayout()
+
+
+class TestNestedSizeRefresh(EnamlTestCase):
+    """ Unit tests for the refresh of the sizes of nested containers.
+
+    """
+
+    def setUp(self):
+        enaml_source = """
+from enaml.widgets.api import Container, Window, Field
+
+enamldef MainView(Window):
+    Container:
+        Field:
+            pass
+        Container:
+            Field:
+                pass
+            Container:
+                Field:
+                    pass
+"""
+        self.parse_and_create(enaml_source)
+
+    def client_objects(self, kind):
+        found = []
+        stack = [self.client_view]
+        while stack:
+            obj = stack.pop(0)
+            if isinstance(obj, kind):
+                found.append(obj)
+            stack.extend(obj.children())
+        return found
+
+    def test_cascade_in_one_pass(self):
+        """ Test that the sizes of nested containers settle bottom-up
+        in one pass.
+
+        """
+        containers = self.client_objects(QtContainer)
+        self.assertEqual(len(containers), 3)
+        refreshed = []
+        for container in containers:
+            def on_size_refresh(container=container):
+                refreshed.append(container)
+                type(container)._on_size_refresh(container)
+            container._on_size_refresh = on_size_refresh
+        with self.app.process_events():
+            for field in self.client_objects(QtField):
+                field.size_hint_updated()
+        self.assertEqual(refreshed, containers[::-1])
+        for container in containers:
+            self.assertFalse(container._size_refresh_pending)
+
+
+class TestCoalescedResize(EnamlTestCase):
+    """ Unit tests for a Container which coalesces resize events.
+
+    """
+
+    def setUp(self):
+        enaml_source = """
+from enaml.widgets.api import Container, Window, Field
+
+enamldef MainView(Window):
+    Container:
+        coalesce_resize = True
+        Field:
+            pass
+"""
+        self.parse_and_create(enaml_source)
+        self.client_widget = self.find_client_widget(
+            self.client_view, "QtContainer"
+        )
+        for child in self.client_view.children():
+            if isinstance(child, QtContainer):
+                self.container = child
+
+    def test_timer_parent(self):
+        """ Test that the resize timer is owned by the widget.
+
+        """
+        timer = self.container._resize_timer
+        self.assertIs(timer.parent(), self.client_widget)
+        self.container.set_coalesce_resize(False)
+        self.assertIsNone(self.container._resize_timer)
+        self.assertIsNone(timer.parent())
+
+    def test_destroy(self):
+        """ Test that a destroyed container ignores pending resizes.
+
+        """
+        container = self.container
+        timer = container._resize_timer
+        container._on_resized()
+        self.assertTrue(timer.isActive())
+        container.destroy()
+        self.assertIsNone(container._resize_timer)
+        container._on_resized()
+        container._on_resize_timeout()
+
+
 if __name__ == '__main__':
     import unittest
     unittest.main()
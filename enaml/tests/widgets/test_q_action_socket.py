@@ -0,0 +1,85 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import unittest
+
+from enaml.outbound_queue import MERGE
+from enaml.qt.q_action_socket import QActionSocket
+from enaml.qt.qt.QtCore import Qt
+
+from .enaml_test_case import TestingQtApplication
+
+
+class Receiver(object):
+    """ A receiver which records the messages posted by a socket.
+
+    """
+    def __init__(self):
+        self.messages = []
+
+    def receive(self, object_id, action, content):
+        self.messages.append((object_id, action, content))
+
+
+class TestQActionSocket(unittest.TestCase):
+    """ Unit tests for the flow control of the QActionSocket.
+
+    """
+    def setUp(self):
+        self.app = TestingQtApplication.instance()
+        if self.app is None:
+            self.app = TestingQtApplication([])
+        self.receiver = Receiver()
+        self.socket = QActionSocket(maxsize=2, policies={'set_value': MERGE})
+        self.socket.messagePosted.connect(
+            self.receiver.receive, Qt.QueuedConnection
+        )
+
+    def tearDown(self):
+        self.app.stop()
+
+    def test_refuse_while_batch_pending(self):
+        """ Test that messages wait while the previous batch is pending.
+
+        """
+        socket = self.socket
+        socket.send('o_1', 'set_text', {'text': u'a'})
+        socket._onDrain()
+        self.assertEqual(socket.queue().depth(), 0)
+        # The first batch has not been delivered, so these are held in
+        # the queue, where the merge policy applies.
+        socket.send('o_1', 'set_value', {'value': 1})
+        socket.send('o_1', 'set_value', {'value': 2})
+        self.assertEqual(socket.queue().depth(), 1)
+        self.assertEqual(socket.queue().stats()['merged'], 1)
+        with self.app.process_events():
+            pass
+        with self.app.process_events():
+            pass
+        self.assertEqual(self.receiver.messages, [
+            ('o_1', 'set_text', {'text': u'a'}),
+            ('o_1', 'set_value', {'value': 2}),
+        ])
+        self.assertEqual(socket.queue().depth(), 0)
+
+    def test_block_emits_inline_when_full(self):
+        """ Test that the BLOCK policy does not lose messages.
+
+        """
+        socket = self.socket
+        socket.send('o_1', 'set_text', {'text': u'a'})
+        socket._onDrain()
+        for idx in xrange(4):
+            socket.send('o_1', 'set_text', {'text': unicode(idx)})
+        self.assertEqual(socket.queue().depth(), 2)
+        with self.app.process_events():
+            pass
+        with self.app.process_events():
+            pass
+        texts = [msg[2]['text'] for msg in self.receiver.messages]
+        self.assertEqual(texts, [u'a', u'0', u'1', u'2', u'3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
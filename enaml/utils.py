@@ -240,10 +240,45 @@ def log_exceptions(func):
 
 
 
+def dispatch_table(cls, prefix):
+    """ Build the table of the specially named handlers of a class.
+
+    Parameters
+    ----------
+    cls : type
+        The class whose handler methods should be collected.
+
+    prefix : str
+        The prefix of the names of the handler methods.
+
+    Returns
+    -------
+    result : dict
+        A dict mapping the dispatch name, which is the method name with
+        the prefix removed, to the plain function for the handler. The
+        functions must be called with the instance as first argument.
+
+    """
+    table = {}
+    start = len(prefix)
+    for attr in dir(cls):
+        if attr.startswith(prefix):
+            func = getattr(getattr(cls, attr), 'im_func', None)
+            if func is not None:
+                table[attr[start:]] = func
+    return table
+
+
 def make_dispatcher(prefix, logger=None):
     """ Create a function which will dispatch arguments to specially
     named handler methods on an object.
 
+    The handlers of a class are collected into a table the first time
+    an instance of that class is dispatched upon, so the dispatch does
+    not build a method name or perform an attribute lookup. Handler
+    methods must therefore be defined on the class, and not added to
+    the class or its instances after the first dispatch.
+
     Parameters
     ----------
     prefix : str
@@ -260,10 +295,16 @@ def make_dispatcher(prefix, logger=None):
         it is equivalent to `getattr(obj, prefix + name)(*args)`
 
     """
+    tables = {}
+
     def dispatcher(obj, name, *args):
-        handler = getattr(obj, prefix + name, None)
+        cls = type(obj)
+        table = tables.get(cls)
+        if table is None:
+            table = tables[cls] = dispatch_table(cls, prefix)
+        handler = table.get(name)
         if handler is not None:
-            handler(*args)
+            handler(obj, *args)
         elif logger is not None:
             msg = "no dispatch handler found for '%s' on `%s` object"
             logger.warn(msg % (name, obj))
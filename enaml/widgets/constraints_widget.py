@@ -2,11 +2,16 @@
 #  Copyright (c) 2011, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-from traits.api import Property, Enum, Instance, List
+from hashlib import md5
+
+from traits.api import Property, Enum, Instance, List, Str
 
 from enaml.application import Application, ScheduledTask
 from enaml.layout.ab_constrainable import ABConstrainable
 from enaml.layout.box_model import BoxModel
+from enaml.layout.constraint_encoding import (
+    canonical_constraints, encode_constraints,
+)
 from enaml.layout.layout_helpers import expand_constraints
 
 from .widget import Widget
@@ -16,6 +21,64 @@ from .widget import Widget
 PolicyEnum = Enum('ignore', 'weak', 'medium', 'strong', 'required')
 
 
+#: The counters of the relayout actions. See `relayout_stats`.
+_relayout_counts = {'sent': 0, 'suppressed': 0}
+
+
+def _freeze(value):
+    """ Convert layout info into a canonical hashable structure.
+
+    """
+    if isinstance(value, dict):
+        items = value.iteritems()
+        return tuple(sorted((key, _freeze(val)) for key, val in items))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def layout_fingerprint(info):
+    """ Compute the fingerprint of a layout info dict.
+
+    Parameters
+    ----------
+    info : dict
+        The layout info dict created by `ConstraintsWidget._layout_info`.
+
+    Returns
+    -------
+    result : str
+        A digest which is equal for layout info dicts with equivalent
+        constraints, even if they were generated by new box helpers.
+
+    """
+    canonical = dict(info)
+    canonical['constraints'] = canonical_constraints(info['constraints'])
+    return md5(repr(_freeze(canonical))).digest()
+
+
+def relayout_stats():
+    """ Get the counts of the relayout actions of all widgets.
+
+    Returns
+    -------
+    result : dict
+        A dict with the number of 'relayout' actions which were 'sent'
+        to the client, and the number which were 'suppressed' because
+        the layout info had not changed since it was last sent.
+
+    """
+    return dict(_relayout_counts)
+
+
+def reset_relayout_stats():
+    """ Reset the counts of the relayout actions to zero.
+
+    """
+    for key in _relayout_counts:
+        _relayout_counts[key] = 0
+
+
 def get_from_box_model(self, name):
     """ Property getter for all attributes that come from the box model.
 
@@ -105,6 +168,9 @@ class ConstraintsWidget(Widget):
     #: The private application task used to collapse layout messages.
     _layout_task = Instance(ScheduledTask)
 
+    #: The fingerprint of the layout info last sent to the client.
+    _layout_fingerprint = Str
+
     #: The private storage the box model instance for this component.
     _box_model = Instance(BoxModel)
     def __box_model_default(self):
@@ -120,7 +186,8 @@ class ConstraintsWidget(Widget):
         attributes dict. The value is a dict with the following keys.
 
         'constraints'
-            A list of dictionaries representing linear constraints.
+            The flat encoding of the linear constraints. See
+            `enaml.layout.constraint_encoding`.
 
         'resist_clip'
             A tuple containing width and height clip policies.
@@ -130,7 +197,9 @@ class ConstraintsWidget(Widget):
 
         """
         snap = super(ConstraintsWidget, self).snapshot()
-        snap['layout'] = self._layout_info()
+        info = self._layout_info()
+        self._layout_fingerprint = layout_fingerprint(info)
+        snap['layout'] = info
         return snap
 
     def bind(self):
@@ -176,7 +245,9 @@ class ConstraintsWidget(Widget):
         If an Enaml Application instance exists, then multiple `relayout`
         actions will be collapsed into a single action that will be sent
         on the next cycle of the event loop. If no application exists,
-        then the action is sent immediately.
+        then the action is sent immediately. The action is suppressed if
+        the fingerprint of the layout info is unchanged since the info
+        was last sent to the client.
 
         """
         # The relayout action is deferred until the next cycle of the
@@ -193,7 +264,14 @@ class ConstraintsWidget(Widget):
                 def notifier(ignored):
                     self._layout_task = None
                 def layout_task():
-                    self.batch_action('relayout', self._layout_info())
+                    info = self._layout_info()
+                    fingerprint = layout_fingerprint(info)
+                    if fingerprint == self._layout_fingerprint:
+                        _relayout_counts['suppressed'] += 1
+                    else:
+                        self._layout_fingerprint = fingerprint
+                        _relayout_counts['sent'] += 1
+                        self.batch_action('relayout', info)
                 task = app.schedule(layout_task)
                 task.notify(notifier)
                 self._layout_task = task
@@ -222,22 +300,21 @@ class ConstraintsWidget(Widget):
         return info
 
     def _generate_constraints(self):
-        """ Creates a list of constraint info dictionaries.
+        """ Creates the flat encoding of the constraints.
 
         This method converts the list of symbolic constraints returned
-        by the call to '_collect_constraints' into a list of constraint
-        info dictionaries which can be serialized and sent to clients.
+        by the call to '_collect_constraints' into the flat constraint
+        encoding which can be serialized and sent to clients.
 
         Returns
         -------
-        result : list of dicts
-            A list of dictionaries which are serializable versions of
-            the symbolic constraints defined for the widget.
+        result : dict
+            The flat encoding of the symbolic constraints defined for
+            the widget. See `enaml.layout.constraint_encoding`.
 
         """
         cns = self._collect_constraints()
-        cns = [cn.as_dict() for cn in expand_constraints(self, cns)]
-        return cns
+        return encode_constraints(expand_constraints(self, cns))
 
     def _collect_constraints(self):
         """ Creates a list of symbolic constraints for the component.
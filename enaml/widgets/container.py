@@ -39,6 +39,14 @@ class Container(ConstraintsWidget):
     #: marked as True to enable sharing.
     share_layout = Bool(False)
 
+    #: Whether the client should coalesce bursts of resize events into
+    #: at most one layout solve per frame, and skip the geometry update
+    #: of widgets whose computed rect has not changed. This can make
+    #: interactive resizing of large layouts much smoother, at the cost
+    #: of the layout trailing the resize by up to one frame. This is
+    #: False by default.
+    coalesce_resize = Bool(False)
+
     #: A read-only symbolic object that represents the internal left
     #: boundary of the content area of the container.
     contents_left = Property(fget=get_from_box_model)
@@ -96,12 +104,22 @@ class Container(ConstraintsWidget):
     #--------------------------------------------------------------------------
     # Initialization
     #--------------------------------------------------------------------------
+    def snapshot(self):
+        """ Return a dictionary which contains all the state necessary to
+        initialize a client widget.
+
+        """
+        snap = super(Container, self).snapshot()
+        snap['coalesce_resize'] = self.coalesce_resize
+        return snap
+
     def bind(self):
         """ Bind the necessary change handlers for the control.
 
         """
         super(Container, self).bind()
         self.on_trait_change(self._send_relayout, 'share_layout, padding')
+        self.publish_attributes('coalesce_resize')
 
     #--------------------------------------------------------------------------
     # Children Events
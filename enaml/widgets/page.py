@@ -57,6 +57,18 @@ class Page(Widget):
         super(Page, self).bind()
         self.publish_attributes('title', 'closable', 'icon_source')
 
+    def deferred_children(self):
+        """ Get the children whose snapshots may be streamed later.
+
+        The contents of every page but the first page of a notebook
+        are deferred, since only the first page is initially shown.
+
+        """
+        pages = getattr(self.parent, 'pages', ())
+        if pages and pages[0] is not self:
+            return self.snap_children()
+        return []
+
     #--------------------------------------------------------------------------
     # Private API
     #--------------------------------------------------------------------------
@@ -2,7 +2,7 @@
 #  Copyright (c) 2012, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-from traits.api import Enum, Property, Bool, cached_property
+from traits.api import Enum, Property, Bool, Int, Tuple, cached_property
 
 from .constraints_widget import ConstraintsWidget
 from .container import Container
@@ -29,6 +29,13 @@ class ScrollArea(ConstraintsWidget):
     #: need for scrollbars or to make use of extra space.
     widget_resizable = Bool(True)
 
+    #: The visible region of the scroll widget as an (x, y, width,
+    #: height) tuple in the coordinates of the scroll widget. This is
+    #: updated by the client when the area is scrolled or resized and
+    #: should not be set by user code. It is suitable for binding the
+    #: `window` of a Looper which populates the scroll widget.
+    viewport = Tuple(Int, Int, Int, Int)
+
     #: A read only property which returns the scrolled widget.
     scroll_widget = Property(depends_on='children')
 
@@ -62,6 +69,17 @@ class ScrollArea(ConstraintsWidget):
         attrs = ('horizontal_policy', 'vertical_policy', 'widget_resizable')
         self.publish_attributes(*attrs)
 
+    #--------------------------------------------------------------------------
+    # Message Handling
+    #--------------------------------------------------------------------------
+    def on_action_viewport_changed(self, content):
+        """ Handle the 'viewport_changed' action from the client widget.
+
+        The content will contain the 'viewport' of the scroll area.
+
+        """
+        self.viewport = tuple(content['viewport'])
+
     #--------------------------------------------------------------------------
     # Private API
     #--------------------------------------------------------------------------
@@ -19,6 +19,23 @@ class StackItem(Widget):
     #: A read only property which returns the items's stack widget.
     stack_widget = Property(depends_on='children')
 
+    #--------------------------------------------------------------------------
+    # Snapshot API
+    #--------------------------------------------------------------------------
+    def deferred_children(self):
+        """ Get the children whose snapshots may be streamed later.
+
+        The contents of the items which are not at the current index of
+        the parent stack are deferred, since they are not shown.
+
+        """
+        items = getattr(self.parent, 'stack_items', ())
+        if self in items:
+            index = self.parent.index
+            if not 0 <= index < len(items) or items[index] is not self:
+                return self.snap_children()
+        return []
+
     #--------------------------------------------------------------------------
     # Private API
     #--------------------------------------------------------------------------
@@ -75,8 +75,9 @@ class WxConstraintsWidget(WxWidget):
     #: be called to trigger an appropriate relayout of the widget.
     _size_hint_cns = []
 
-    #: The list of constraint dictionaries defined by the user on
-    #: the server side Enaml widget.
+    #: The flat encoding of the constraints defined by the user on
+    #: the server side Enaml widget, or an empty list if none were
+    #: received. See `enaml.layout.constraint_encoding`.
     _user_cns = []
 
     #--------------------------------------------------------------------------
@@ -269,16 +270,16 @@ class WxConstraintsWidget(WxWidget):
         return cns
 
     def user_constraints(self):
-        """ Get the list of user constraints defined for this widget.
+        """ Get the user constraints defined for this widget.
 
-        The default implementation returns the list of constraint
-        information sent by the server.
+        The default implementation returns the constraint encoding
+        sent by the server.
 
         Returns
         -------
-        result : list
-            The list of dictionaries which represent the user defined
-            linear constraints.
+        result : dict or list
+            The flat encoding of the user defined linear constraints,
+            or an empty list if there are none.
 
         """
         return self._user_cns
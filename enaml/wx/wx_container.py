@@ -5,6 +5,7 @@
 from collections import deque
 
 from casuarius import weak
+from enaml.layout.constraint_encoding import decode_constraints
 from enaml.layout.layout_manager import LayoutManager
 
 import wx
@@ -12,47 +13,19 @@ import wx
 from .wx_constraints_widget import WxConstraintsWidget, LayoutBox
 
 
-def _convert_cn_info(info, owners):
-    """ Converts the lhs or rhs of a linear constraint info dict into
-    its corresponding casuarius object.
+def as_linear_constraints(encoded, owners):
+    """ Converts the flat encoding of a widget's constraints into a
+    list of casuarius linear constraints.
 
-    """
-    cn_type = info['type']
-    if cn_type == 'linear_expression':
-        const = info['constant']
-        terms = info['terms']
-        convert = _convert_cn_info
-        res = sum(convert(t, owners) for t in terms) + const
-    elif cn_type == 'term':
-        coeff = info['coeff']
-        var = info['var']
-        res = coeff * _convert_cn_info(var, owners)
-    elif cn_type == 'linear_symbolic':
-        sym_name = info['name']
-        owner_id = info['owner']
-        owner = owners.get(owner_id, None)
-        if owner is None:
-            owner = owners[owner_id] = LayoutBox('_virtual', owner_id)
-        res = owner.primitive(sym_name)
-    else:
-        msg = 'Unhandled constraint info type `%s`' % cn_type
-        raise ValueError(msg)
-    return res
-
-
-def as_linear_constraint(info, owners):
-    """ Converts a constraint info dict into a casuarius linear
-    constraint.
-
-    For constraints specified in the info dict which do not have a
+    For constraints specified in the encoding which do not have a
     corresponding owner (e.g. those created by box helpers) a
     constraint variable will be synthesized.
 
     Parameters
     ----------
-    info : dict
-        A dictionary sent from an Enaml widget which specifies the
-        information for a linear constraint.
+    encoded : dict
+        The flat constraint encoding sent from an Enaml widget. See
+        `enaml.layout.constraint_encoding`.
 
     owners : dict
         A mapping from constraint id to an owner object which holds
@@ -60,27 +33,16 @@ def as_linear_constraint(info, owners):
 
     Returns
     -------
-    result : LinearConstraint
-        A casuarius linear constraint for the given dict.
+    result : list
+        The list of casuarius linear constraints for the encoding.
 
     """
-    if info['type'] != 'linear_constraint':
-        msg = 'The info dict does not specify a linear constraint.'
-        raise ValueError(msg)
-    convert = _convert_cn_info
-    lhs = convert(info['lhs'], owners)
-    rhs = convert(info['rhs'], owners)
-    op = info['op']
-    if op == '==':
-        cn = lhs == rhs
-    elif op == '<=':
-        cn = lhs <= rhs
-    elif op == '>=':
-        cn = lhs >= rhs
-    else:
-        msg = 'Unhandled constraint operator `%s`' % op
-        raise ValueError(msg)
-    return cn | info['strength'] | info['weight']
+    def primitive(owner_id, name):
+        owner = owners.get(owner_id, None)
+        if owner is None:
+            owner = owners[owner_id] = LayoutBox('_virtual', owner_id)
+        return owner.primitive(name)
+    return decode_constraints(encoded, primitive)
 
 
 class wxContainer(wx.PyPanel):
@@ -529,11 +491,11 @@ class WxContainer(WxConstraintsWidget):
 
         """
         # The mapping of constraint owners and the list of constraint
-        # info dictionaries provided by the Enaml widgets.
+        # encodings provided by the Enaml widgets.
         box = self.layout_box
         cn_owners = {self.object_id(): box}
-        cn_dicts = list(self.user_constraints())
-        cn_dicts_extend = cn_dicts.extend
+        cn_infos = [self.user_constraints()]
+        add_info = cn_infos.append
 
         # The list of raw casuarius constraints which will be returned
         # from this method to be added to the casuarius solver.
@@ -550,20 +512,19 @@ class WxContainer(WxConstraintsWidget):
             raw_cns_extend(child.hard_constraints())
             if isinst(child, WxContainer_):
                 if child.transfer_layout_ownership(self):
-                    cn_dicts_extend(child.user_constraints())
+                    add_info(child.user_constraints())
                     raw_cns_extend(child.contents_constraints())
                 else:
                     raw_cns_extend(child.size_hint_constraints())
             else:
                 raw_cns_extend(child.size_hint_constraints())
-                cn_dicts_extend(child.user_constraints())
-
-        # Convert the list of Enaml constraints info dicts to actual
-        # casuarius LinearConstraint objects for the solver.
-        add_cn = raw_cns.append
-        as_cn = as_linear_constraint
-        for info in cn_dicts:
-            add_cn(as_cn(info, cn_owners))
+                add_info(child.user_constraints())
+
+        # Convert the Enaml constraint encodings to actual casuarius
+        # LinearConstraint objects for the solver.
+        as_cns = as_linear_constraints
+        for info in cn_infos:
+            raw_cns_extend(as_cns(info, cn_owners))
 
         # We keep a strong reference to the constraint owners dict,
         # since it may include instances of LayoutBox which were
@@ -367,7 +367,7 @@ class WxObject(object):
             parent._children.append(self)
             if parent._initialized:
                 if self._initialized:
-                    curr.child_added(self)
+                    parent.child_added(self)
                 else:
                     DeferredCall(parent.child_added, self)
 
@@ -409,6 +409,17 @@ class WxObject(object):
             if isinstance(parent, wx.Window):
                 widget.Reparent(parent)
 
+    def reattached(self):
+        """ Called when this object was moved to a new parent by a
+        'children_changed' action.
+
+        The default implementation of this method is a no-op. Widgets
+        reimplement it to show the widget again, since a widget which
+        is removed from its parent is hidden.
+
+        """
+        pass
+
     def index_of(self, child):
         """ Return the index of the given child.
 
@@ -471,8 +482,15 @@ class WxObject(object):
             if child is not None and child._parent is self:
                 child.set_parent(None)
 
+        # Reparent the existing children which were moved here.
+        for object_id in content.get('moved', ()):
+            child = lookup(object_id)
+            if child is not None:
+                child.set_parent(self)
+                child.reattached()
+
         # Build or reparent the children being added.
-        for tree in content['added']:
+        for tree in self._session.unpack_snapshot(content['added']):
             object_id = tree['object_id']
             child = lookup(object_id)
             if child is not None:
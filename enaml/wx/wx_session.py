@@ -2,9 +2,9 @@
 #  Copyright (c) 2012, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-from collections import defaultdict
 import logging
 
+from enaml.snapshot_table import SnapshotUnpacker
 from enaml.utils import make_dispatcher
 
 from .wx_widget_registry import WxWidgetRegistry
@@ -17,6 +17,14 @@ logger = logging.getLogger(__name__)
 dispatch_action = make_dispatcher('on_action_', logger)
 
 
+#: The actions of a message batch which are dispatched first, in order.
+_BATCH_ORDER = ('children_changed', 'destroy', 'relayout')
+
+
+#: The set of the actions in `_BATCH_ORDER`.
+_BATCH_PRIORITY = frozenset(_BATCH_ORDER)
+
+
 class WxSession(object):
     """ An object which manages a session of Wx client objects.
 
@@ -38,6 +46,7 @@ class WxSession(object):
         self._registered_objects = {}
         self._windows = []
         self._socket = None
+        self._unpacker = SnapshotUnpacker()
 
     #--------------------------------------------------------------------------
     # Public API
@@ -47,12 +56,13 @@ class WxSession(object):
 
         Parameters
         ----------
-        snapshot : list of dicts
-            The list of tree snapshots to build for this session.
+        snapshot : list of dicts or dict
+            The list of tree snapshots to build for this session, or
+            a packed class table snapshot of the trees.
 
         """
         windows = self._windows
-        for tree in snapshot:
+        for tree in self.unpack_snapshot(snapshot):
             window = self.build(tree, None)
             if window is not None:
                 windows.append(window)
@@ -80,9 +90,9 @@ class WxSession(object):
 
         Parameters
         ----------
-        tree : dict
+        tree : dict or list
             The dictionary snapshot representation of the tree of
-            items to build.
+            items to build, or a node of a class table snapshot.
 
         parent : WxObject or None
             The parent for the tree, or None if the tree is top-level.
@@ -95,6 +105,7 @@ class WxSession(object):
             the building errors will be sent to the error logger.
 
         """
+        tree = self._unpacker.expand(tree)
         groups = self._widget_groups
         factory = WxWidgetRegistry.lookup(tree['class'], groups)
         if factory is None:
@@ -113,6 +124,28 @@ class WxSession(object):
             self.build(child, obj)
         return obj
 
+    def unpack_snapshot(self, snapshot):
+        """ Unpack a snapshot sent by the server session.
+
+        Class table entries carried by a packed snapshot are added to
+        the table of the session, so every packed snapshot must be
+        unpacked in the order it was received.
+
+        Parameters
+        ----------
+        snapshot : object
+            A packed class table snapshot, a snapshot dict, or a list
+            of snapshot dicts.
+
+        Returns
+        -------
+        result : list
+            The list of top-level snapshot dicts. Each dict can be
+            passed to `build`.
+
+        """
+        return self._unpacker.load(snapshot)
+
     def register(self, obj):
         """ Register an object with the session.
 
@@ -218,11 +251,21 @@ class WxSession(object):
         """ Handle the 'add_window' action from the Enaml session.
 
         """
-        window = self.build(content['window'], None)
-        if window is not None:
-            self._windows.append(window)
-            window.initialize()
-            window.activate()
+        for tree in self.unpack_snapshot(content['window']):
+            window = self.build(tree, None)
+            if window is not None:
+                self._windows.append(window)
+                window.initialize()
+                window.activate()
+
+    def on_action_snapshot_complete(self, content):
+        """ Handle the 'snapshot_complete' action from the Enaml session.
+
+        The chunks of a streamed snapshot are built as they arrive, so
+        there is nothing left to do.
+
+        """
+        pass
 
     def on_action_message_batch(self, content):
         """ Handle the 'message_batch' action sent by the Enaml session.
@@ -231,25 +274,24 @@ class WxSession(object):
         order 'children_changed' -> 'destroy' -> 'relayout' -> other...
 
         """
-        actions = defaultdict(list)
-        for item in content['batch']:
-            action = item[1]
-            actions[action].append(item)
-        ordered = []
-        batch_order = ('children_changed', 'destroy', 'relayout')
-        for key in batch_order:
-            ordered.extend(actions.pop(key, ()))
-        for value in actions.itervalues():
-            ordered.extend(value)
+        # The batch is routed in one pass per priority action and one
+        # pass for the rest, which avoids regrouping the messages.
+        batch = content['batch']
         objects = self._registered_objects
-        for object_id, action, msg_content in ordered:
-            try:
-                obj = objects[object_id]
-            except KeyError:
-                msg = "Invalid object id sent to WxSession %s:%s"
-                logger.warn(msg % (object_id, action))
-            else:
-                dispatch_action(obj, action, msg_content)
+        for key in _BATCH_ORDER + (None,):
+            for object_id, action, msg_content in batch:
+                if key is None:
+                    if action in _BATCH_PRIORITY:
+                        continue
+                elif action != key:
+                    continue
+                try:
+                    obj = objects[object_id]
+                except KeyError:
+                    msg = "Invalid object id sent to WxSession %s:%s"
+                    logger.warn(msg % (object_id, action))
+                else:
+                    dispatch_action(obj, action, msg_content)
 
     def on_action_close(self, content):
         """ Handle the 'close' action sent by the Enaml session.
@@ -46,6 +46,10 @@ class WxWidget(WxObject):
     #: color of the widget has been changed.
     _fgcolor_changed = False
 
+    #: The visibility last requested by the Enaml widget. It is used
+    #: to restore the visibility after the widget is reparented.
+    _visible = True
+
     #--------------------------------------------------------------------------
     # Setup Methods
     #--------------------------------------------------------------------------
@@ -74,6 +78,13 @@ class WxWidget(WxObject):
     #--------------------------------------------------------------------------
     # Public API
     #--------------------------------------------------------------------------
+    def reattached(self):
+        """ Restore the visibility of the widget after it was moved to
+        a new parent.
+
+        """
+        self.widget().Show(self._visible)
+
     def update_geometry(self):
         """ Notify the layout system that this widget has changed.
 
@@ -200,6 +211,7 @@ class WxWidget(WxObject):
             Whether or not the widget is visible.
 
         """
+        self._visible = visible
         self.widget().Show(visible)
 
     def set_bgcolor(self, bgcolor):
@@ -0,0 +1,222 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+import logging
+import threading
+import time
+import uuid
+
+from zmq.eventloop.ioloop import IOLoop
+
+from enaml.application import Application
+
+
+logger = logging.getLogger(__name__)
+
+
+class ZMQApplication(Application):
+    """ A headless implementation of an Enaml application.
+
+    A ZMQApplication runs the server-side Enaml sessions on a zmq
+    IOLoop, with no dependency on a gui toolkit. The client side of
+    each session lives in a remote process and communicates with the
+    session through the action socket provided to `activate_session`,
+    which is normally done by a `ZMQServer`.
+
+    """
+    def __init__(self, factories, ioloop=None):
+        """ Initialize a ZMQApplication.
+
+        Parameters
+        ----------
+        factories : iterable
+            An iterable of SessionFactory instances to pass to the
+            superclass constructor.
+
+        ioloop : IOLoop, optional
+            The zmq IOLoop to use for the application. The default is
+            the global IOLoop instance.
+
+        """
+        super(ZMQApplication, self).__init__(factories)
+        if ioloop is None:
+            ioloop = IOLoop.instance()
+        self._ioloop = ioloop
+        self._thread = threading.current_thread()
+        self._sessions = {}
+
+    #--------------------------------------------------------------------------
+    # Abstract API Implementation
+    #--------------------------------------------------------------------------
+    def start_session(self, name, session_id=None):
+        """ Start a new session of the given name.
+
+        This method will create and open a new session object for the
+        requested session type and return the new session_id. If the
+        session name is invalid, an exception will be raised. The
+        session will not be active until `activate_session` is called
+        with the socket for the remote client.
+
+        Parameters
+        ----------
+        name : str
+            The name of the session to start.
+
+        session_id : str, optional
+            The identifier to use for the session. This is used when
+            the identifier is assigned by a front end which shards the
+            sessions over multiple processes. The default creates a
+            new unique identifier.
+
+        Returns
+        -------
+        result : str
+            The unique identifier for the created session.
+
+        """
+        if name not in self._named_factories:
+            raise ValueError('Invalid session name')
+        if session_id is None:
+            session_id = uuid.uuid4().hex
+        elif session_id in self._sessions:
+            raise ValueError('Duplicate session id')
+        factory = self._named_factories[name]
+        session = factory()
+        session.open(session_id)
+        self._sessions[session_id] = session
+        return session_id
+
+    def end_session(self, session_id):
+        """ End the session with the given session id.
+
+        This method will close down the existing session. If the session
+        id is not valid, an exception will be raised.
+
+        Parameters
+        ----------
+        session_id : str
+            The unique identifier for the session to close.
+
+        """
+        if session_id not in self._sessions:
+            raise ValueError('Invalid session id')
+        session = self._sessions.pop(session_id)
+        if session.is_active:
+            session.close()
+
+    def session(self, session_id):
+        """ Get the session for the given session id.
+
+        Parameters
+        ----------
+        session_id : str
+            The unique identifier for the session to retrieve.
+
+        Returns
+        -------
+        result : Session or None
+            The session object with the given id, or None if the id
+            does not correspond to an active session.
+
+        """
+        return self._sessions.get(session_id)
+
+    def sessions(self):
+        """ Get the currently active sessions for the application.
+
+        Returns
+        -------
+        result : list
+            The list of currently active sessions for the application.
+
+        """
+        return self._sessions.values()
+
+    def start(self):
+        """ Start the application's main event loop.
+
+        """
+        self._ioloop.start()
+
+    def stop(self):
+        """ Stop the application's main event loop.
+
+        """
+        self._ioloop.stop()
+
+    def deferred_call(self, callback, *args, **kwargs):
+        """ Invoke a callable on the next cycle of the main event loop
+        thread.
+
+        Parameters
+        ----------
+        callback : callable
+            The callable object to execute at some point in the future.
+
+        *args, **kwargs
+            Any additional positional and keyword arguments to pass to
+            the callback.
+
+        """
+        self._ioloop.add_callback(lambda: callback(*args, **kwargs))
+
+    def timed_call(self, ms, callback, *args, **kwargs):
+        """ Invoke a callable on the main event loop thread at a
+        specified time in the future.
+
+        Parameters
+        ----------
+        ms : int
+            The time to delay, in milliseconds, before executing the
+            callable.
+
+        callback : callable
+            The callable object to execute at some point in the future.
+
+        *args, **kwargs
+            Any additional positional and keyword arguments to pass to
+            the callback.
+
+        """
+        # IOLoop.add_timeout is not thread-safe, so the timeout is
+        # added from the ioloop thread via the thread-safe callback.
+        deadline = time.time() + ms / 1000.0
+        f = lambda: callback(*args, **kwargs)
+        ioloop = self._ioloop
+        ioloop.add_callback(lambda: ioloop.add_timeout(deadline, f))
+
+    def is_main_thread(self):
+        """ Indicates whether the caller is on the main event loop thread.
+
+        Returns
+        -------
+        result : bool
+            True if called from the thread which created the application.
+            False otherwise.
+
+        """
+        return threading.current_thread() is self._thread
+
+    #--------------------------------------------------------------------------
+    # Public API
+    #--------------------------------------------------------------------------
+    def activate_session(self, session_id, socket):
+        """ Activate a session which was started with `start_session`.
+
+        The client for the session should be built from the session's
+        snapshot before this method is called, so that it is ready to
+        receive the messages sent during activation.
+
+        Parameters
+        ----------
+        session_id : str
+            The unique identifier of the session to activate.
+
+        socket : ActionSocketInterface
+            The socket to use for messaging with the remote client.
+
+        """
+        if session_id not in self._sessions:
+            raise ValueError('Invalid session id')
+        self._sessions[session_id].activate(socket)
@@ -2,226 +2,645 @@
 #  Copyright (c) 2012, Enthought, Inc.
 #  All rights reserved.
 #------------------------------------------------------------------------------
-import json
+from collections import OrderedDict
+import logging
+import time
+import types
 
 import zmq
-from zmq.eventloop.ioloop import IOLoop
+from zmq.eventloop.ioloop import PeriodicCallback
 from zmq.eventloop.zmqstream import ZMQStream
 
-from enaml.message import Message
-from enaml.request import BaseRequest, BasePushHandler
+from enaml.codec import negotiate_codec, lookup_codec
+from enaml.outbound_queue import OutboundQueue, BLOCK, DEFAULT_MAXSIZE
+from enaml.socket_interface import ActionSocketInterface
 from enaml.utils import log_exceptions
+from enaml.weakmethod import WeakMethod
 
 
-def pack_message(routing_id, message):
-    """ Pack a routing id and Message into a mutlipart zmq message.
+logger = logging.getLogger(__name__)
+
+
+#: The session id used by clients to address the server itself.
+SERVER_ID = ''
+
+#: The delay, in seconds, before retrying to drain an outbound queue
+#: while the zmq socket cannot accept more messages for the client.
+DRAIN_RETRY = 0.005
+
+#: The default time, in seconds, after which a silent client is reaped.
+DEFAULT_IDLE_TIMEOUT = 300.0
+
+#: The maximum number of reaped client ids remembered by a ClientReaper.
+REAPED_MEMORY = 10000
+
+
+def pack_action(routing_id, session_id, codec, object_id, action, content):
+    """ Pack an action into a multipart zmq message.
 
     Parameters
     ----------
     routing_id : str
         The zmq socket identity to place first in the message.
 
-    message : Message
-        The Message object to serialized into the multipart message.
+    session_id : str
+        The identifier of the session which sent the action, or the
+        empty string if the action was sent by the server.
+
+    codec : AbstractCodec
+        The codec to use for encoding the action.
+
+    object_id, action, content
+        The object id, action name, and content dict of the action.
+
+    Returns
+    -------
+    result : list
+        The 3-element list of routing_id, session_id and payload.
 
     """
-    multipart = [routing_id]
-    dumps = json.dumps
-    multipart.extend(dumps(part) for part in message)
-    return multipart
+    payload = codec.encode_action(object_id, action, content)
+    return [routing_id, session_id, payload]
 
 
-def unpack_message(multipart):
-    """ Unpack a mutlipart Enaml message received by the server.
+def unpack_action(multipart, codec):
+    """ Unpack a multipart action message received by the server.
 
     Parameters
     ----------
     multipart : list
-        The 5-element list representing the routing_id, header, 
-        parent_header, metadata, and content of a client message.
+        The 3-element list representing the routing_id, session_id,
+        and encoded payload of a client message.
+
+    codec : AbstractCodec
+        The codec to use for decoding the payload.
 
     Returns
     -------
-    routing_id, message : str, Message
-        The zmq routing id and the deserialized Message object.
+    routing_id, session_id, action : str, str, tuple
+        The zmq routing id, the session id, and the decoded 3-tuple
+        of (object_id, action, content).
 
     """
-    if len(multipart) != 5:
+    if len(multipart) != 3:
         raise TypeError('Invalid wire message: %s' % multipart)
-    routing_id = multipart[0]
-    loads = json.loads
-    return routing_id, Message(loads(part) for part in multipart[1:])
+    routing_id, session_id, payload = multipart
+    return routing_id, session_id, codec.decode_action(payload)
+
+
+def reject_reaped(stream, routing_id, payload):
+    """ Tell a reaped client that it must reconnect.
+
+    The codecs of a reaped client were released, and a fresh codec
+    would be out of step with the string tables the client still has.
+    Instead of serving the message, the server replies on the server
+    channel with an 'error' action whose 'reconnect' key is True. The
+    client must then discard its sessions and codecs, and connect a
+    new socket, which is given a new routing id by the server.
+
+    The reply is encoded by a fresh codec of the type detected from
+    the payload. The strings of the reply which are not in the static
+    table are defined where they are first used, so the stale decoder
+    of the client can still read it. The reply is sent without waiting
+    and is not retried, since the next message of the client is
+    rejected in the same way.
+
+    Parameters
+    ----------
+    stream : ZMQStream
+        The zmq socket stream of the server router.
+
+    routing_id : str
+        The zmq identity of the reaped client.
 
+    payload : str
+        The encoded payload received from the client.
 
-class ZMQRequest(BaseRequest):
-    """ A concrete BaseRequest implementation for the ZMQServer.
+    """
+    codec = negotiate_codec(payload)()
+    content = {'message': 'The client was reaped', 'reconnect': True}
+    packed = pack_action(
+        routing_id, SERVER_ID, codec, SERVER_ID, 'error', content
+    )
+    try:
+        stream.socket.send_multipart(packed, zmq.NOBLOCK)
+    except zmq.ZMQError:
+        pass
+
+
+class ZMQActionSocket(object):
+    """ A concrete implementation of ActionSocketInterface.
+
+    A ZMQActionSocket sends the actions of a server session to the
+    remote client of that session. Instances are created by the
+    ZMQServer when a client starts a session.
+
+    Sent actions are held in a bounded OutboundQueue, which is drained
+    on a later cycle of the ioloop. The actions are written directly to
+    the zmq socket without waiting, rather than through the unbounded
+    send queue of the stream. When the socket cannot accept more
+    messages for the client, because its high water mark is reached,
+    the remaining actions are held in the queue and the drain is
+    retried later. The overflow policy of the queue applies once the
+    queue is full; the BLOCK policy then waits for the client to read
+    its messages, which stalls the ioloop. Use the DROP_OLDEST or MERGE
+    policies to keep a slow client from stalling the other sessions.
+
+    A ROUTER socket must have the ROUTER_MANDATORY option set, so that
+    it reports a full client instead of silently dropping the message.
 
     """
-    def __init__(self, message, routing_id, stream, ioloop):
-        """ Initialize a ZMQRequest.
+    def __init__(self, routing_id, session_id, stream, codec,
+                 maxsize=DEFAULT_MAXSIZE, policy=BLOCK, policies=None):
+        """ Initialize a ZMQActionSocket.
 
         Parameters
         ----------
-        message : Message
-            The Message instance that generated this request.
-
         routing_id : str
             The zmq identity string for the client.
 
+        session_id : str
+            The identifier of the session using the socket.
+
         stream : ZMQStream
-            The zmq socket stream for this request.
+            The zmq socket stream for the client.
 
-        ioloop : IOLoop
-            The zmq IOLoop instance for this request.
+        codec : AbstractCodec
+            The codec negotiated for the client.
+
+        maxsize : int, optional
+            The maximum number of actions to hold in the queue.
+
+        policy : str, optional
+            The default overflow policy of the queue.
+
+        policies : dict, optional
+            A mapping of action name to overflow policy.
 
         """
-        self._message = message
         self._routing_id = routing_id
+        self._session_id = session_id
         self._stream = stream
-        self._ioloop = ioloop
-        self._finished = False
+        self._codec = codec
+        self._callback = None
+        self._queue = OutboundQueue(
+            self._write, maxsize, policy, policies, self._write_blocking,
+        )
+        self._drain_pending = False
 
-    #--------------------------------------------------------------------------
-    # Abstract API implementation
-    #--------------------------------------------------------------------------
-    @property
-    def message(self):
-        """ The Message object for this request.
+    def _send(self, object_id, action, content, flags):
+        """ Encode an action and send it on the zmq socket.
+
+        An action for a client which is no longer connected is
+        discarded. The codec is rolled back when the socket does not
+        accept the message, so that the strings interned by the encode
+        are defined again when the action is retried.
+
+        """
+        codec = self._codec
+        mark = codec.mark()
+        packed = pack_action(
+            self._routing_id, self._session_id, codec, object_id, action,
+            content,
+        )
+        try:
+            self._stream.socket.send_multipart(packed, flags)
+        except zmq.ZMQError as e:
+            codec.rollback(mark)
+            if e.errno != zmq.EHOSTUNREACH:
+                raise
+
+    def _write(self, object_id, action, content):
+        """ Write an action to the socket without waiting.
 
         Returns
         -------
-        result : Message
-            The Message instance pertaining to this request.
+        result : bool
+            False if the socket cannot accept the action yet.
+
+        """
+        try:
+            self._send(object_id, action, content, zmq.NOBLOCK)
+        except zmq.Again:
+            return False
+        return True
+
+    def _write_blocking(self, object_id, action, content):
+        """ Write an action to the socket, waiting until it is accepted.
 
         """
-        return self._message
+        self._send(object_id, action, content, 0)
 
-    def add_callback(self, callback):
-        """ Add a callback to the event queue to be called later.
+    def _drain(self):
+        """ Drain the outbound queue into the socket.
 
-        This is can be used by the request handlers to defer long 
-        running work until a future time, at which point the results
-        can be pushed to the client with the 'push_handler()'.
+        The drain is retried later if the socket could not accept all
+        of the queued actions.
+
+        """
+        self._drain_pending = False
+        if self._queue.drain():
+            self._drain_pending = True
+            deadline = time.time() + DRAIN_RETRY
+            self._stream.io_loop.add_timeout(deadline, self._drain)
+
+    def queue(self):
+        """ Get the outbound queue for the socket.
+
+        Returns
+        -------
+        result : OutboundQueue
+            The queue which holds the actions waiting to be written.
+            Its `stats` method reports the depth and high water mark.
+
+        """
+        return self._queue
+
+    def on_message(self, callback):
+        """ Register a callback for receiving messages sent by a client
+        object.
 
         Parameters
         ----------
         callback : callable
-            A callable which should be invoked by the event loop at 
-            some future time. This method will return immediately.
+            A callable with an argument signature that is equivalent to
+            the `send` method. If the callback is a bound method, then
+            the lifetime of the callback will be bound to lifetime of
+            the method owner object.
 
         """
-        self._ioloop.add_callback(callback)
+        if isinstance(callback, types.MethodType):
+            callback = WeakMethod(callback)
+        self._callback = callback
 
-    @log_exceptions
-    def send_reply(self, message):
-        """ Send the given message to the client as a reply.
+    def send(self, object_id, action, content):
+        """ Send the action to the remote client.
 
         Parameters
         ----------
-        message : Message
-            A Message instance to send to the client as a reply to
-            this particular request.
+        object_id : str
+            The object id of the target object.
+
+        action : str
+            The action that should be performed by the object.
 
-        Notes
-        -----
-        * Users should not usually call this method directly. Instead,
-          users should call the 'reply' convenience method. 
-        * Calling this method effectively closes the request and further 
-          calls to this method will log an error.
+        content : dict
+            The content dictionary for the action.
 
         """
-        if self._finished:
-            raise RuntimeError('Request already finished')
-        packed = pack_message(self._routing_id, message)
-        self._stream.send_multipart(packed)
-        self._finished = True
+        self._queue.push(object_id, action, content)
+        if not self._drain_pending:
+            self._drain_pending = True
+            self._stream.io_loop.add_callback(self._drain)
 
-    def push_handler(self):
-        """ Returns an object that can be used to push unsolicited 
-        messages to this client.
+    def receive(self, object_id, action, content):
+        """ Receive a message sent by the remote client.
 
-        Returns
-        -------
-        result : ZMQPushHandler
-            A ZMQPushHandler instance which can be used to push messages
-            to this client, without the client initiating a request.
+        The message will be routed to the registered callback, if one
+        exists.
+
+        Parameters
+        ----------
+        object_id : str
+            The object id of the target object.
+
+        action : str
+            The action that should be performed by the object.
+
+        content : dict
+            The content dictionary for the action.
+
+        """
+        callback = self._callback
+        if callback is not None:
+            callback(object_id, action, content)
+
+    def deliver(self, payload):
+        """ Decode a payload sent by the remote client and receive it.
+
+        Parameters
+        ----------
+        payload : str
+            The encoded action sent by the client for the session.
 
         """
-        return ZMQPushHandler(self._routing_id, self._stream, self._ioloop)
+        object_id, action, content = self._codec.decode_action(payload)
+        self.receive(object_id, action, content)
 
+    def routing_id(self):
+        """ Get the zmq identity of the client for this socket.
 
-class ZMQPushHandler(BasePushHandler):
-    """ A concrete BasePushHandler implementation for the ZMQServer.
+        """
+        return self._routing_id
 
-    Instances of this class will remain functional for the lifetime
-    of the originating client. If the client disconnects, then 
-    this handler will silently drop the messages.
+    def codec(self):
+        """ Get the codec negotiated for the client of this socket.
+
+        """
+        return self._codec
+
+
+ActionSocketInterface.register(ZMQActionSocket)
+
+
+class ZMQSessionHost(object):
+    """ An object which hosts the sessions of a ZMQApplication.
+
+    The session host starts, activates, and ends the sessions of an
+    application on behalf of remote clients, and delivers the session
+    actions sent by those clients. Each session is a separate channel
+    with its own codec instance, so that the sessions of a client may
+    be hosted by different processes.
 
     """
-    def __init__(self, routing_id, stream, ioloop):
-        """ Initialize a ZMQPushHandler.
+    def __init__(self, app, stream):
+        """ Initialize a ZMQSessionHost.
 
         Parameters
         ----------
-        routing_id : str
-            The zmq identity string for the client.
+        app : ZMQApplication
+            The headless application which owns the sessions.
 
         stream : ZMQStream
-            The zmq socket stream for this push handler.
-
-        ioloop : IOLoop
-            The zmq IOLoop instance for this push handler.
+            The stream used to send messages to the clients. Messages
+            are sent as [routing_id, session_id, payload].
 
         """
-        self._routing_id = routing_id
+        self._app = app
         self._stream = stream
-        self._ioloop = ioloop
+        self._sockets = {}
+        self._messages = 0
 
-    @log_exceptions
-    def push_message(self, message):
-        """ Push the given message to the client.
+    def start_session(self, routing_id, name, codec_name, session_id=None):
+        """ Start a session for a client and activate it.
+
+        A 'session_started' action is sent on the new session channel
+        before the session is activated. Its content contains the new
+        'session_id', the 'widget_groups', the 'snapshot' of the
+        session windows, and whether the snapshot is 'streamed'.
 
         Parameters
         ----------
-        message : Message
-            The Message instance that should be pushed to the client.
+        routing_id : str
+            The zmq identity of the client.
+
+        name : str
+            The name of the session to start.
+
+        codec_name : str
+            The name of the codec to use for the session channel.
+
+        session_id : str, optional
+            The identifier to use for the session. The default lets
+            the application create a unique identifier.
+
+        Returns
+        -------
+        result : str
+            The identifier of the new session.
 
         """
-        packed = pack_message(self._routing_id, message)
-        self._stream.send_multipart(packed)
+        app = self._app
+        session_id = app.start_session(name, session_id)
+        session = app.session(session_id)
+        codec = lookup_codec(codec_name)()
+        socket = ZMQActionSocket(routing_id, session_id, self._stream, codec)
+        content = {
+            'session_id': session_id,
+            'widget_groups': session.widget_groups[:],
+            'snapshot': session.snapshot(),
+            'streamed': session.stream_snapshots,
+        }
+        socket.send(SERVER_ID, 'session_started', content)
+        self._sockets[session_id] = socket
+        app.activate_session(session_id, socket)
+        return session_id
+
+    def end_session(self, routing_id, session_id):
+        """ End a session owned by a client.
 
-    def add_callback(self, callback):
-        """ Add a callback to the event queue to be called later.
+        Parameters
+        ----------
+        routing_id : str
+            The zmq identity of the client.
 
-        This is used as a convenience for Session objects to provide
-        a way to run callables in a deferred fashion. It does not 
-        imply any communication with the client. It is merely an
-        abstract entry point into the zmq event loop. 
+        session_id : str
+            The identifier of the session to end.
 
-        Call it a concession to practicality over purity - SCC
+        """
+        socket = self._sockets.get(session_id)
+        if socket is None or socket.routing_id() != routing_id:
+            raise ValueError('Invalid session id')
+        self._app.end_session(session_id)
+        del self._sockets[session_id]
+
+    def end_client(self, routing_id):
+        """ End all of the sessions owned by a client.
+
+        This is used to reap the sessions of a client which went away
+        without ending them.
+
+        Parameters
+        ----------
+        routing_id : str
+            The zmq identity of the client.
+
+        Returns
+        -------
+        result : list
+            The identifiers of the sessions which were ended.
+
+        """
+        sockets = self._sockets
+        session_ids = [
+            session_id for session_id, socket in sockets.iteritems()
+            if socket.routing_id() == routing_id
+        ]
+        for session_id in session_ids:
+            self._app.end_session(session_id)
+            del sockets[session_id]
+        return session_ids
+
+    def deliver(self, routing_id, session_id, payload):
+        """ Deliver an encoded action sent by a client to its session.
+
+        Parameters
+        ----------
+        routing_id : str
+            The zmq identity of the client.
+
+        session_id : str
+            The identifier of the target session.
+
+        payload : str
+            The encoded action.
+
+        """
+        socket = self._sockets.get(session_id)
+        if socket is None or socket.routing_id() != routing_id:
+            msg = "Invalid session id sent to ZMQSessionHost: %s"
+            logger.warn(msg % session_id)
+            return
+        self._messages += 1
+        socket.deliver(payload)
+
+    def stats(self):
+        """ Get the health statistics for the host.
+
+        Returns
+        -------
+        result : dict
+            A dict with the number of hosted 'sessions', the number of
+            'messages' delivered, the 'task_backlog' of the app, the
+            total 'queue_depth' of the outbound socket queues, and the
+            largest 'queue_high_water' mark of those queues.
+
+        """
+        depth = 0
+        high_water = 0
+        for socket in self._sockets.itervalues():
+            stats = socket.queue().stats()
+            depth += stats['depth']
+            high_water = max(high_water, stats['high_water'])
+        return {
+            'sessions': len(self._sockets),
+            'messages': self._messages,
+            'task_backlog': self._app.task_stats()['backlog'],
+            'queue_depth': depth,
+            'queue_high_water': high_water,
+        }
+
+
+class ClientReaper(object):
+    """ An object which reaps the clients of a server which go silent.
+
+    A zmq ROUTER socket does not report when a peer goes away, so the
+    server records the time of the last message received from each
+    client. A client which sends nothing for longer than the timeout
+    is considered gone, and the reap callback is invoked with its
+    routing id so that its sessions and codecs can be released. Idle
+    clients keep themselves alive with a 'heartbeat' server action.
+
+    The ids of the most recently reaped clients are remembered, so that
+    a reaped client which comes back is rejected instead of being
+    served with fresh codecs. See `reject_reaped`.
+
+    """
+    def __init__(self, callback, timeout, ioloop):
+        """ Initialize a ClientReaper.
 
         Parameters
         ----------
         callback : callable
-            A callable which should be invoked by the event loop at 
-            some future time. This method returns immediately.
+            A callable which accepts the routing id of a client which
+            should be reaped.
+
+        timeout : float or None
+            The time, in seconds, after which a silent client is
+            reaped. If None, clients are never reaped.
+
+        ioloop : IOLoop
+            The zmq IOLoop on which to check for idle clients.
+
+        """
+        self._callback = callback
+        self._timeout = timeout
+        self._last_seen = {}
+        self._reaped = OrderedDict()
+        self._checker = None
+        if timeout is not None:
+            interval = max(timeout * 250.0, 100.0)
+            self._checker = PeriodicCallback(self._reap, interval, ioloop)
+            self._checker.start()
+
+    @log_exceptions
+    def _reap(self):
+        """ Reap the clients which have been silent for too long.
 
         """
-        self._ioloop.add_callback(callback)
+        deadline = time.time() - self._timeout
+        last_seen = self._last_seen
+        idle = [rid for rid, seen in last_seen.iteritems() if seen < deadline]
+        reaped = self._reaped
+        for routing_id in idle:
+            del last_seen[routing_id]
+            reaped[routing_id] = None
+            if len(reaped) > REAPED_MEMORY:
+                reaped.popitem(last=False)
+            self._callback(routing_id)
+
+    def touch(self, routing_id):
+        """ Record activity for a client.
+
+        Parameters
+        ----------
+        routing_id : str
+            The zmq identity of the client.
+
+        Returns
+        -------
+        result : bool
+            False if the client was reaped, in which case its message
+            must be rejected rather than served.
+
+        """
+        if routing_id in self._reaped:
+            return False
+        self._last_seen[routing_id] = time.time()
+        return True
+
+    def stop(self):
+        """ Stop checking for idle clients.
+
+        """
+        if self._checker is not None:
+            self._checker.stop()
+            self._checker = None
 
 
 class ZMQServer(object):
     """ An Enaml Application server which uses ZeroMQ sockets.
 
+    The server binds a ROUTER socket. Clients send multipart messages
+    of [session_id, payload], where the payload is an action encoded
+    with a codec negotiated from the first message of the client. An
+    empty session id addresses the server itself, which handles the
+    following actions:
+
+    'discover'
+        Reply with a 'discover_reply' action listing the available
+        sessions.
+
+    'start_session'
+        Start the session named by the 'name' key of the content. A
+        'session_started' action is sent on the new session channel.
+        See `ZMQSessionHost.start_session`.
+
+    'end_session'
+        End the session with the 'session_id' given in the content.
+
+    'heartbeat'
+        Do nothing. An otherwise idle client sends this to keep its
+        sessions alive.
+
+    Errors are replied with an 'error' action. All other messages are
+    delivered to the session with the given id.
+
+    A client which sends no message for longer than the idle timeout
+    is assumed to have gone away. Its sessions are ended and its codec
+    is released. If the client comes back, its messages are answered
+    with an 'error' action which asks it to reconnect; see
+    `reject_reaped`.
+
     """
-    def __init__(self, app, host, port):
+    def __init__(self, app, host, port, idle_timeout=DEFAULT_IDLE_TIMEOUT):
         """ Initialize a ZMQServer.
 
         Parameters
         ----------
-        app : Application
-            The Enaml Application instance which should be served by 
-            this server.
+        app : ZMQApplication
+            The headless Enaml Application instance which should be
+            served by this server.
 
         host : string
             The host address for tcp communication. e.g. '127.0.0.1'
@@ -229,19 +648,75 @@ class ZMQServer(object):
         port : int
             The host port to use for communication. e.g. 8888
 
+        idle_timeout : float or None, optional
+            The time, in seconds, after which a silent client is reaped.
+            If None, clients are only released by 'end_session'.
+
         """
-        ctxt = zmq.Context()
+        ctxt = zmq.Context.instance()
         router = ctxt.socket(zmq.ROUTER)
+        router.setsockopt(zmq.ROUTER_MANDATORY, 1)
         router.bind('tcp://%s:%s' % (host, port))
         self._app = app
         self._router = router
-        self._stream = ZMQStream(router)
+        self._stream = ZMQStream(router, app._ioloop)
         self._stream.on_recv(self._on_recv)
-        self._ioloop = IOLoop.instance()
+        self._host = ZMQSessionHost(app, self._stream)
+        self._codecs = {}
+        self._reaper = ClientReaper(
+            self._reap_client, idle_timeout, app._ioloop
+        )
 
     #--------------------------------------------------------------------------
     # Private API
     #--------------------------------------------------------------------------
+    def _server_codec(self, routing_id, payload):
+        """ Get the server channel codec for a client.
+
+        The codec is negotiated from the first server message received
+        from a client. Clients which send binary encoded messages will
+        be served with the binary codec; all others fall back to JSON.
+
+        Parameters
+        ----------
+        routing_id : str
+            The zmq identity of the client.
+
+        payload : str
+            The encoded payload received from the client.
+
+        Returns
+        -------
+        result : AbstractCodec
+            The codec instance to use for the client server channel.
+
+        """
+        codecs = self._codecs
+        codec = codecs.get(routing_id)
+        if codec is None:
+            codec = negotiate_codec(payload)()
+            codecs[routing_id] = codec
+        return codec
+
+    def _reply(self, routing_id, action, content):
+        """ Send a server action to a client.
+
+        """
+        codec = self._codecs[routing_id]
+        packed = pack_action(
+            routing_id, SERVER_ID, codec, SERVER_ID, action, content
+        )
+        self._stream.send_multipart(packed)
+
+    def _reap_client(self, routing_id):
+        """ Release the sessions and codec of a silent client.
+
+        """
+        session_ids = self._host.end_client(routing_id)
+        self._codecs.pop(routing_id, None)
+        msg = 'Reaped idle client %r with %d sessions'
+        logger.info(msg % (routing_id, len(session_ids)))
+
     @log_exceptions
     def _on_recv(self, multipart):
         """ The zmq stream message receive handler.
@@ -252,24 +727,48 @@ class ZMQServer(object):
             The multipart message received by the client.
 
         """
-        routing_id, message = unpack_message(multipart)
-        request = ZMQRequest(message, routing_id, self._stream, self._ioloop)
-        self._app.handle_request(request)
+        if len(multipart) != 3:
+            raise TypeError('Invalid wire message: %s' % multipart)
+        routing_id, session_id, payload = multipart
+        if not self._reaper.touch(routing_id):
+            reject_reaped(self._stream, routing_id, payload)
+            return
+        if session_id != SERVER_ID:
+            self._host.deliver(routing_id, session_id, payload)
+            return
+        codec = self._server_codec(routing_id, payload)
+        object_id, action, content = codec.decode_action(payload)
+        try:
+            if action == 'discover':
+                reply = {'sessions': self._app.discover()}
+                self._reply(routing_id, 'discover_reply', reply)
+            elif action == 'start_session':
+                name = content['name']
+                self._host.start_session(routing_id, name, codec.name)
+            elif action == 'end_session':
+                self._host.end_session(routing_id, content['session_id'])
+            elif action == 'heartbeat':
+                pass
+            else:
+                raise ValueError('Invalid server action: %s' % action)
+        except Exception as e:
+            self._reply(routing_id, 'error', {'message': str(e)})
+            raise
 
     #--------------------------------------------------------------------------
     # Public API
     #--------------------------------------------------------------------------
     def start(self):
-        """ Start the server's io loop. This call will block until
-        the 'stop' method is called.
+        """ Start the server's application event loop. This call will
+        block until the 'stop' method is called.
 
         """
-        self._ioloop.start()
+        self._app.start()
 
     def stop(self):
-        """ Stop the server's io loop. This will cause a previous call
-        to 'start' to return.
+        """ Stop the server's application event loop. This will cause a
+        previous call to 'start' to return.
 
         """
-        self._ioloop.stop()
-
+        self._reaper.stop()
+        self._app.stop()
@@ -0,0 +1,677 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2013, Enthought, Inc.
+#  All rights reserved.
+#------------------------------------------------------------------------------
+""" Multi-process session hosting behind a single ZMQ router.
+
+A `ZMQShardedServer` binds one client facing ROUTER socket and spawns
+a number of worker processes, each of which runs its own headless
+`ZMQApplication`. New sessions are load balanced across the workers
+and all subsequent messages for a session are forwarded, without being
+decoded, to the worker which owns the session.
+
+The front and the workers communicate over a second ROUTER socket to
+which each worker connects with a DEALER socket. Session messages are
+forwarded as [routing_id, session_id, payload], exactly as they were
+received from or will be sent to the client. Control messages are sent
+as [SERVER_ID, json] and have an 'op' key which is one of:
+
+'ready'
+    Sent by a worker once it is connected. Carries the worker 'pid'.
+
+'start_session'
+    Sent by the front to start a session with a given 'routing_id',
+    'session_id', 'name', and 'codec' name on a worker.
+
+'end_session'
+    Sent by the front to end a session on a worker.
+
+'started', 'ended', 'failed'
+    Sent by a worker to acknowledge a session request. A failure
+    carries the 'message' to report to the client.
+
+'stats'
+    Sent periodically by each worker with its health statistics.
+
+Client routing ids are arbitrary bytes, so they are hex encoded in the
+'routing_id' key of the json control messages.
+
+The workers are forked before the front creates its zmq context, since
+a zmq context is not fork safe. Each worker receives the address of
+the back end router over a pipe once the front has bound it. The front
+polls the liveness of the workers; when a worker exits, its sessions
+are released and their clients are sent an 'error' action with the
+'session_id' of each lost session.
+
+"""
+import json
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+
+import zmq
+from zmq.eventloop.ioloop import IOLoop, PeriodicCallback
+from zmq.eventloop.zmqstream import ZMQStream
+
+from enaml.codec import negotiate_codec
+from enaml.outbound_queue import DEFAULT_MAXSIZE
+from enaml.utils import log_exceptions
+
+from .zmq_application import ZMQApplication
+from .zmq_server import (
+    DEFAULT_IDLE_TIMEOUT, SERVER_ID, ClientReaper, ZMQActionSocket,
+    ZMQSessionHost, reject_reaped,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+#: The default interval, in milliseconds, between worker stats reports.
+REPORT_INTERVAL = 1000
+
+#: The action name under which the front queues a forwarded payload.
+FORWARD = None
+
+
+def _pack_control(op, **content):
+    """ Pack a control message for the front/worker channel.
+
+    """
+    content['op'] = op
+    return [SERVER_ID, json.dumps(content)]
+
+
+#------------------------------------------------------------------------------
+# Worker Process
+#------------------------------------------------------------------------------
+class ZMQShardWorker(object):
+    """ The session host which runs in a worker process of a sharded
+    server.
+
+    """
+    def __init__(self, factories, address, identity, interval):
+        """ Initialize a ZMQShardWorker.
+
+        Parameters
+        ----------
+        factories : iterable
+            The SessionFactory instances for the worker application.
+
+        address : str
+            The zmq address of the back end router of the front.
+
+        identity : str
+            The zmq identity of the worker.
+
+        interval : int
+            The interval, in milliseconds, between stats reports.
+
+        """
+        # A fresh context and ioloop are used in the child process. The
+        # worker is forked before the front creates its own context.
+        ioloop = IOLoop()
+        dealer = zmq.Context().socket(zmq.DEALER)
+        dealer.setsockopt(zmq.IDENTITY, identity)
+        dealer.connect(address)
+        self._app = ZMQApplication(factories, ioloop)
+        self._stream = ZMQStream(dealer, ioloop)
+        self._stream.on_recv(self._on_recv)
+        self._host = ZMQSessionHost(self._app, self._stream)
+        self._reporter = PeriodicCallback(self._report, interval, ioloop)
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _send_control(self, op, **content):
+        """ Send a control message to the front.
+
+        """
+        self._stream.send_multipart(_pack_control(op, **content))
+
+    def _report(self):
+        """ Send the health statistics of the worker to the front.
+
+        """
+        self._send_control('stats', **self._host.stats())
+
+    def _on_control(self, content):
+        """ Handle a control message sent by the front.
+
+        """
+        op = content['op']
+        routing_id = str(content['routing_id']).decode('hex')
+        session_id = str(content['session_id'])
+        try:
+            if op == 'start_session':
+                self._host.start_session(
+                    routing_id, content['name'], content['codec'], session_id,
+                )
+                self._send_control('started', session_id=session_id)
+            elif op == 'end_session':
+                self._host.end_session(routing_id, session_id)
+                self._send_control('ended', session_id=session_id)
+            else:
+                raise ValueError('Invalid control op: %s' % op)
+        except Exception as e:
+            self._send_control(
+                'failed', op=op, session_id=session_id,
+                routing_id=routing_id.encode('hex'), message=str(e),
+            )
+            raise
+
+    @log_exceptions
+    def _on_recv(self, multipart):
+        """ The zmq stream message receive handler.
+
+        """
+        if len(multipart) == 2 and multipart[0] == SERVER_ID:
+            self._on_control(json.loads(multipart[1]))
+        elif len(multipart) == 3:
+            self._host.deliver(*multipart)
+        else:
+            raise TypeError('Invalid wire message: %s' % multipart)
+
+    #--------------------------------------------------------------------------
+    # Public API
+    #--------------------------------------------------------------------------
+    def start(self):
+        """ Announce the worker to the front and run its event loop.
+
+        """
+        self._send_control('ready', pid=os.getpid())
+        self._reporter.start()
+        self._app.start()
+
+
+def run_shard_worker(factories, conn, identity, interval=REPORT_INTERVAL):
+    """ The entry point of a sharded server worker process.
+
+    Parameters
+    ----------
+    factories : iterable
+        The SessionFactory instances for the worker application.
+
+    conn : Connection
+        The multiprocessing connection on which the front sends the
+        zmq address of its back end router, or None if the front was
+        stopped before it was bound.
+
+    identity : str
+        The zmq identity of the worker.
+
+    interval : int, optional
+        The interval, in milliseconds, between stats reports.
+
+    """
+    address = conn.recv()
+    conn.close()
+    if address is not None:
+        ZMQShardWorker(factories, address, identity, interval).start()
+
+
+#------------------------------------------------------------------------------
+# Front Router
+#------------------------------------------------------------------------------
+class WorkerState(object):
+    """ The bookkeeping kept by the front for a worker process.
+
+    """
+    __slots__ = ('process', 'ready', 'exited', 'sessions', 'pending',
+                 'stats', 'last_report')
+
+    def __init__(self, process):
+        self.process = process
+        self.ready = False
+        self.exited = False
+        self.sessions = 0
+        self.pending = 0
+        self.stats = {}
+        self.last_report = None
+
+
+class ZMQFrontSocket(ZMQActionSocket):
+    """ The outbound channel of the front of a sharded server to a
+    client.
+
+    The replies of the front on the server channel and the session
+    messages forwarded from the workers are written to the client
+    through one bounded queue, in the order they were produced. A
+    forwarded payload was encoded by the codec of a worker session, so
+    dropping it would leave the client codec out of step with that of
+    the worker. The queue therefore always uses the BLOCK policy and
+    never drops or merges a message.
+
+    """
+    def __init__(self, routing_id, stream, codec, maxsize=DEFAULT_MAXSIZE):
+        """ Initialize a ZMQFrontSocket.
+
+        Parameters
+        ----------
+        routing_id : str
+            The zmq identity string for the client.
+
+        stream : ZMQStream
+            The zmq socket stream of the client facing router.
+
+        codec : AbstractCodec
+            The codec negotiated for the server channel of the client.
+
+        maxsize : int, optional
+            The maximum number of messages to hold in the queue.
+
+        """
+        super(ZMQFrontSocket, self).__init__(
+            routing_id, SERVER_ID, stream, codec, maxsize,
+        )
+
+    def _send(self, object_id, action, content, flags):
+        """ Send a server action or a forwarded payload to the client.
+
+        A forwarded payload is queued with the FORWARD action, the
+        session id as the object id, and the payload as the content.
+
+        """
+        if action is not FORWARD:
+            super(ZMQFrontSocket, self)._send(
+                object_id, action, content, flags,
+            )
+            return
+        packed = [self._routing_id, object_id, content]
+        try:
+            self._stream.socket.send_multipart(packed, flags)
+        except zmq.ZMQError as e:
+            if e.errno != zmq.EHOSTUNREACH:
+                raise
+
+    def forward(self, session_id, payload):
+        """ Forward an encoded session message to the client.
+
+        Parameters
+        ----------
+        session_id : str
+            The identifier of the session which sent the message.
+
+        payload : str
+            The payload encoded by the worker which owns the session.
+
+        """
+        self.send(session_id, FORWARD, payload)
+
+
+class ZMQShardedServer(object):
+    """ A ZMQ server which shards sessions over worker processes.
+
+    The client protocol is the same as that of `ZMQServer`. The front
+    handles the server channel itself: it replies to 'discover',
+    assigns the id of a new session and forwards 'start_session' to
+    the worker with the least load, which sends the 'session_started'
+    reply on the new session channel. Session messages are pinned to
+    the owning worker by session id and are forwarded undecoded.
+
+    Clients which go silent for longer than the idle timeout are reaped
+    by the front, which asks the owning workers to end their sessions.
+    A reaped client which comes back is asked to reconnect.
+
+    The messages for a client are written through a bounded queue on a
+    ROUTER_MANDATORY socket; see `ZMQFrontSocket`.
+
+    """
+    def __init__(self, factories, host, port, workers=None,
+                 interval=REPORT_INTERVAL, ioloop=None,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, maxsize=DEFAULT_MAXSIZE):
+        """ Initialize a ZMQShardedServer.
+
+        Parameters
+        ----------
+        factories : iterable
+            The SessionFactory instances to serve. They are pickled and
+            sent to the workers, so the session classes must be
+            importable by the worker processes.
+
+        host : string
+            The host address for tcp communication. e.g. '127.0.0.1'
+
+        port : int
+            The host port to use for communication. e.g. 8888
+
+        workers : int, optional
+            The number of worker processes. The default is the number
+            of cpus of the machine.
+
+        interval : int, optional
+            The interval, in milliseconds, between worker stats reports.
+
+        ioloop : IOLoop, optional
+            The zmq IOLoop to use for the front. The default is the
+            global IOLoop instance.
+
+        idle_timeout : float or None, optional
+            The time, in seconds, after which a silent client is reaped.
+            If None, clients are only released by 'end_session'.
+
+        maxsize : int, optional
+            The maximum number of messages the front holds for a client
+            which cannot keep up.
+
+        """
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        if workers < 1:
+            raise ValueError('The number of workers must be positive')
+        if ioloop is None:
+            ioloop = IOLoop.instance()
+        self._factories = list(factories)
+        self._ioloop = ioloop
+        self._workers = {}
+        self._owners = {}
+        self._clients = {}
+        self._maxsize = maxsize
+        self._reaper = ClientReaper(self._reap_client, idle_timeout, ioloop)
+        self._monitor = PeriodicCallback(
+            self._check_workers, interval, ioloop
+        )
+
+        # The workers are forked before the zmq context is created and
+        # are sent the back end address once it is bound.
+        conns = []
+        for idx in xrange(workers):
+            identity = 'worker-%d' % idx
+            reader, writer = multiprocessing.Pipe(duplex=False)
+            args = (self._factories, reader, identity, interval)
+            process = multiprocessing.Process(
+                target=run_shard_worker, args=args, name=identity,
+            )
+            process.daemon = True
+            process.start()
+            reader.close()
+            conns.append(writer)
+            self._workers[identity] = WorkerState(process)
+
+        address = None
+        try:
+            ctxt = self._context = zmq.Context()
+            front = ctxt.socket(zmq.ROUTER)
+            front.setsockopt(zmq.ROUTER_MANDATORY, 1)
+            front.bind('tcp://%s:%s' % (host, port))
+            back = ctxt.socket(zmq.ROUTER)
+            back_port = back.bind_to_random_port('tcp://127.0.0.1')
+            address = 'tcp://127.0.0.1:%d' % back_port
+        finally:
+            for conn in conns:
+                conn.send(address)
+                conn.close()
+        self._front = ZMQStream(front, ioloop)
+        self._front.on_recv(self._on_front_recv)
+        self._back = ZMQStream(back, ioloop)
+        self._back.on_recv(self._on_back_recv)
+
+    #--------------------------------------------------------------------------
+    # Private API
+    #--------------------------------------------------------------------------
+    def _server_codec(self, routing_id, payload):
+        """ Get the server channel codec for a client.
+
+        """
+        clients = self._clients
+        client = clients.get(routing_id)
+        if client is None:
+            codec = negotiate_codec(payload)()
+            client = ZMQFrontSocket(
+                routing_id, self._front, codec, self._maxsize,
+            )
+            clients[routing_id] = client
+        return client.codec()
+
+    def _reply(self, routing_id, action, content):
+        """ Send a server action to a client.
+
+        """
+        self._clients[routing_id].send(SERVER_ID, action, content)
+
+    def _send_control(self, worker_id, op, **content):
+        """ Send a control message to a worker.
+
+        """
+        self._back.send_multipart([worker_id] + _pack_control(op, **content))
+
+    def _select_worker(self):
+        """ Select the ready worker with the least number of sessions.
+
+        """
+        best = None
+        best_load = None
+        for worker_id, state in self._workers.iteritems():
+            if not state.ready or not state.process.is_alive():
+                continue
+            load = state.sessions + state.pending
+            if best is None or load < best_load:
+                best = worker_id
+                best_load = load
+        if best is None:
+            raise RuntimeError('No session workers are available')
+        return best
+
+    def _start_session(self, routing_id, name, codec):
+        """ Assign a new session to a worker.
+
+        """
+        if name not in [fact.name for fact in self._factories]:
+            raise ValueError('Invalid session name')
+        worker_id = self._select_worker()
+        session_id = uuid.uuid4().hex
+        self._owners[session_id] = (worker_id, routing_id)
+        self._workers[worker_id].pending += 1
+        self._send_control(
+            worker_id, 'start_session', routing_id=routing_id.encode('hex'),
+            session_id=session_id, name=name, codec=codec.name,
+        )
+
+    def _end_session(self, routing_id, session_id):
+        """ Forward an end session request to the owning worker.
+
+        """
+        owner = self._owners.get(session_id)
+        if owner is None or owner[1] != routing_id:
+            raise ValueError('Invalid session id')
+        self._send_control(
+            owner[0], 'end_session', routing_id=routing_id.encode('hex'),
+            session_id=session_id,
+        )
+
+    def _reap_client(self, routing_id):
+        """ Release the sessions and channel of a silent client.
+
+        """
+        for session_id, owner in self._owners.items():
+            if owner[1] == routing_id:
+                self._end_session(routing_id, session_id)
+        self._clients.pop(routing_id, None)
+        logger.info('Reaped idle client %r' % routing_id)
+
+    @log_exceptions
+    def _check_workers(self):
+        """ Release the sessions of the workers which have exited.
+
+        """
+        for worker_id, state in self._workers.iteritems():
+            if not state.exited and not state.process.is_alive():
+                self._reap_worker(worker_id, state)
+
+    def _reap_worker(self, worker_id, state):
+        """ Release the sessions owned by a worker which has exited.
+
+        The clients of the lost sessions are sent an 'error' action
+        with the id of the session.
+
+        """
+        state.exited = True
+        state.ready = False
+        state.sessions = 0
+        state.pending = 0
+        lost = [
+            (session_id, owner[1])
+            for session_id, owner in self._owners.iteritems()
+            if owner[0] == worker_id
+        ]
+        msg = 'Session worker %s exited with code %s, %d sessions lost'
+        logger.error(msg % (worker_id, state.process.exitcode, len(lost)))
+        for session_id, routing_id in lost:
+            del self._owners[session_id]
+            if routing_id in self._clients:
+                content = {
+                    'message': 'The session worker exited',
+                    'session_id': session_id,
+                }
+                self._reply(routing_id, 'error', content)
+
+    @log_exceptions
+    def _on_front_recv(self, multipart):
+        """ The client facing stream message receive handler.
+
+        """
+        if len(multipart) != 3:
+            raise TypeError('Invalid wire message: %s' % multipart)
+        routing_id, session_id, payload = multipart
+        if not self._reaper.touch(routing_id):
+            reject_reaped(self._front, routing_id, payload)
+            return
+        if session_id != SERVER_ID:
+            owner = self._owners.get(session_id)
+            if owner is None or owner[1] != routing_id:
+                msg = "Invalid session id sent to ZMQShardedServer: %s"
+                logger.warn(msg % session_id)
+                return
+            self._back.send_multipart([owner[0]] + multipart)
+            return
+        codec = self._server_codec(routing_id, payload)
+        object_id, action, content = codec.decode_action(payload)
+        try:
+            if action == 'discover':
+                sessions = [
+                    {'name': fact.name, 'description': fact.description}
+                    for fact in self._factories
+                ]
+                reply = {'sessions': sessions}
+                self._reply(routing_id, 'discover_reply', reply)
+            elif action == 'start_session':
+                self._start_session(routing_id, content['name'], codec)
+            elif action == 'end_session':
+                self._end_session(routing_id, content['session_id'])
+            elif action == 'heartbeat':
+                pass
+            else:
+                raise ValueError('Invalid server action: %s' % action)
+        except Exception as e:
+            self._reply(routing_id, 'error', {'message': str(e)})
+            raise
+
+    def _on_control(self, worker_id, content):
+        """ Handle a control message sent by a worker.
+
+        """
+        state = self._workers[worker_id]
+        op = content.pop('op')
+        if op == 'ready':
+            state.ready = True
+        elif op == 'stats':
+            state.stats = content
+            state.last_report = time.time()
+        elif op == 'started':
+            state.pending -= 1
+            state.sessions += 1
+        elif op == 'ended':
+            state.sessions -= 1
+            self._owners.pop(content['session_id'], None)
+        elif op == 'failed':
+            if content['op'] == 'start_session':
+                state.pending -= 1
+                self._owners.pop(content['session_id'], None)
+            routing_id = str(content['routing_id']).decode('hex')
+            if routing_id in self._clients:
+                reply = {'message': content['message']}
+                self._reply(routing_id, 'error', reply)
+        else:
+            raise ValueError('Invalid control op: %s' % op)
+
+    @log_exceptions
+    def _on_back_recv(self, multipart):
+        """ The worker facing stream message receive handler.
+
+        """
+        worker_id = multipart[0]
+        if worker_id not in self._workers:
+            raise ValueError('Unknown worker: %s' % worker_id)
+        if len(multipart) == 3 and multipart[1] == SERVER_ID:
+            self._on_control(worker_id, json.loads(multipart[2]))
+        elif len(multipart) == 4:
+            routing_id, session_id, payload = multipart[1:]
+            client = self._clients.get(routing_id)
+            if client is None:
+                msg = "Dropped a message for the released client %r"
+                logger.warn(msg % routing_id)
+                return
+            client.forward(session_id, payload)
+        else:
+            raise TypeError('Invalid wire message: %s' % multipart)
+
+    #--------------------------------------------------------------------------
+    # Public API
+    #--------------------------------------------------------------------------
+    def health(self):
+        """ Get the health and backlog report of the workers.
+
+        Returns
+        -------
+        result : dict
+            A dict mapping the worker identity to a dict with the 'pid'
+            and 'alive' state of the worker process, the 'ready' state,
+            the number of 'sessions' and 'pending_starts' assigned by
+            the front, the 'task_backlog', 'messages', 'queue_depth',
+            and 'queue_high_water' values and the 'last_report' time of
+            the latest worker stats.
+
+        """
+        report = {}
+        for worker_id, state in self._workers.iteritems():
+            stats = state.stats
+            report[worker_id] = {
+                'pid': state.process.pid,
+                'alive': state.process.is_alive(),
+                'ready': state.ready,
+                'sessions': state.sessions,
+                'pending_starts': state.pending,
+                'task_backlog': stats.get('task_backlog', 0),
+                'messages': stats.get('messages', 0),
+                'queue_depth': stats.get('queue_depth', 0),
+                'queue_high_water': stats.get('queue_high_water', 0),
+                'last_report': state.last_report,
+            }
+        return report
+
+    def start(self):
+        """ Start the front event loop. This call will block until the
+        'stop' method is called.
+
+        The worker processes are started when the server is created.
+
+        """
+        self._monitor.start()
+        self._ioloop.start()
+
+    def stop(self):
+        """ Stop the front event loop, terminate the workers, and close
+        the sockets of the front.
+
+        """
+        self._reaper.stop()
+        self._monitor.stop()
+        self._ioloop.stop()
+        for state in self._workers.itervalues():
+            if state.process.is_alive():
+                state.process.terminate()
+        self._front.close(linger=0)
+        self._back.close(linger=0)
+        self._context.term()